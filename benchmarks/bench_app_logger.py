@@ -0,0 +1,51 @@
+"""
+应用日志写入基准测试
+
+模拟 launch_items 一次启动 N 个图标时每项一条日志，比较调用线程上的耗时：
+旧版 write_log 每条都 makedirs + 打开文件 + 追加 + 关闭；新版 AppLogger 只入队。
+同时给出新版从入队到全部落盘的总耗时。
+
+运行: python -m benchmarks.bench_app_logger [条数]
+"""
+import os
+import sys
+import time
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.app_logger import AppLogger
+
+def legacy_write_log(log_dir, log_file, msg):
+    """旧版 LauncherLogic.write_log"""
+    log_entry = f'{time.strftime("%Y-%m-%d %H:%M:%S")} {msg}'
+    os.makedirs(log_dir, exist_ok=True)
+    with open(log_file, 'a', encoding='utf-8') as f:
+        f.write(log_entry + '\n')
+
+def main(n=500):
+    workdir = tempfile.mkdtemp(prefix='ql_bench_')
+    messages = [f'启动: C:/Program Files/App{i}/app{i}.exe (延迟 {i % 50}ms)' for i in range(n)]
+    print(f'日志条数: {n}')
+
+    legacy_file = os.path.join(workdir, 'legacy.log')
+    start = time.perf_counter()
+    for msg in messages:
+        legacy_write_log(workdir, legacy_file, msg)
+    legacy = time.perf_counter() - start
+    print(f'{"旧版逐条打开文件":<20} 调用线程 {legacy * 1000:>9.2f} ms  每条 {legacy / n * 1e6:>8.1f} µs')
+
+    for label, json_path in (('新版队列', None), ('新版队列+JSON', os.path.join(workdir, 'app.log.jsonl'))):
+        logger = AppLogger(os.path.join(workdir, 'app.log'), json_path=json_path)
+        start = time.perf_counter()
+        for i, msg in enumerate(messages):
+            logger.log(msg, event='launch', index=i)
+        queued = time.perf_counter() - start
+        logger.flush()
+        total = time.perf_counter() - start
+        logger.close()
+        print(f'{label:<20} 调用线程 {queued * 1000:>9.2f} ms  每条 {queued / n * 1e6:>8.1f} µs'
+              f'  全部落盘 {total * 1000:.2f} ms（{logger.batch_count} 批）')
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 500)
@@ -0,0 +1,70 @@
+"""
+勾选框切换延迟基准测试
+
+在 offscreen 平台下构造 100 ~ 10000 个图标项（其中 10% 已勾选），
+测量勾选/取消勾选一个未勾选图标的平均耗时（经过模型、勾选索引和保存调度）。
+
+运行: python -m benchmarks.bench_checkbox_toggle
+"""
+import os
+import sys
+import json
+import time
+import tempfile
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PyQt5.QtWidgets import QApplication
+
+SIZES = [100, 1000, 10000]
+TOGGLES = 50
+
+def build(n, workdir):
+    from launcher.launcher_ui import LauncherUI
+    from launcher.launcher_logic import LauncherLogic
+    from launcher.launcher_data import LauncherData
+    target = os.path.join(workdir, 'tool.exe')
+    open(target, 'w').close()
+    data_file = os.path.join(workdir, f'data_{n}.json')
+    checked_every = 10
+    icons = []
+    for i in range(n):
+        checked = i % checked_every == 0
+        icons.append([target, checked, None, i // checked_every + 1 if checked else None])
+    with open(data_file, 'w', encoding='utf-8') as f:
+        json.dump({'icons': icons, 'cmds': []}, f)
+    ui = LauncherUI()
+    data = LauncherData(data_file)
+    logic = LauncherLogic(ui, data)
+    return ui, data, logic
+
+def measure(n, workdir):
+    ui, data, logic = build(n, workdir)
+    # 选一个未勾选的图标反复勾选/取消
+    row = n // 2 + 1
+    start = time.perf_counter()
+    for _ in range(TOGGLES):
+        ui.icon_model.toggle_checked(row)
+        ui.icon_model.toggle_checked(row)
+    toggle_ms = (time.perf_counter() - start) * 1000 / (TOGGLES * 2)
+    data.flush()
+    ui.deleteLater()
+    return toggle_ms
+
+def main():
+    app = QApplication.instance() or QApplication(sys.argv)
+    workdir = tempfile.mkdtemp(prefix='ql_bench_')
+    cwd = os.getcwd()
+    os.chdir(workdir)
+    try:
+        print(f"{'图标数':>8} {'勾选切换(ms)':>14}")
+        for n in SIZES:
+            toggle_ms = measure(n, workdir)
+            app.processEvents()  # 释放上一规模的界面（deleteLater）
+            print(f'{n:>8} {toggle_ms:>14.3f}')
+    finally:
+        os.chdir(cwd)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+"""
+启动面板模糊匹配基准测试
+
+生成 N 个候选（类似程序文件名加所在文件夹的图标，以及命令行），其中少量有启动记录，
+测量建立索引的耗时，模拟逐字输入几个查询时每次按键的查询耗时（中位数 / P95 / 最大），
+以及不使用上一次结果、从头查询时最慢的几个短查询。
+
+运行: python -m benchmarks.bench_fuzzy_index [候选数]
+"""
+import os
+import sys
+import time
+import random
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.fuzzy_index import FuzzyIndex
+
+SYLLABLES = ['qu', 'ick', 'lau', 'nch', 'er', 'vis', 'ual', 'stu', 'dio', 'code', 'fire', 'fox', 'chr', 'ome',
+             'not', 'epad', 'pho', 'to', 'shop', 'ser', 'ver', 'back', 'up', 'sync', 'job', 'data', 'base',
+             'tool', 'kit', 'win', 'dows', 'term', 'in', 'al', 'py', 'thon']
+EXTENSIONS = ['.exe', '.bat', '.lnk', '.py', '.cmd']
+TYPED = ['visual studio', 'firefox', 'tool backup', 'sync job data', 'qlexe', 'python server', 'dows term', 'chrome']
+COLD = ['e', 'er', 'ae', 'sy', 'vsc', 'exe', 'tool b', 'fire fox']
+
+def generate(n, rng):
+    def word():
+        return ''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(1, 3)))
+
+    def name():
+        words = [word() for _ in range(rng.randint(1, 3))]
+        sep = rng.choice(['_', '-', ' ', ''])
+        if not sep:
+            words = [w.capitalize() for w in words]
+        return sep.join(words)
+
+    items = []
+    now = time.time()
+    for i in range(n):
+        if i % 5:
+            text = f'{name()}{rng.choice(EXTENSIONS)}  C:\\{word()}\\{name()}'
+        else:
+            text = f'python {name()}.py --{word()} {rng.randint(1, 99)}'
+        used = rng.random() < 0.01
+        items.append((i, text, rng.randint(1, 30) if used else 0, now - rng.random() * 30 * 86400 if used else None))
+    return items
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))]
+
+def main(n=50000):
+    rng = random.Random(42)
+    items = generate(n, rng)
+    index = FuzzyIndex()
+    start = time.perf_counter()
+    index.add_many(items)
+    print(f'建立索引: {n} 个候选，{(time.perf_counter() - start) * 1000:.0f} ms')
+
+    latencies = []
+    for query in TYPED:
+        for length in range(1, len(query) + 1):
+            start = time.perf_counter()
+            index.search(query[:length])
+            latencies.append((time.perf_counter() - start) * 1000)
+    print(f'逐字输入: {len(latencies)} 次按键，中位数 {percentile(latencies, 0.5):.2f} ms，'
+          f'P95 {percentile(latencies, 0.95):.2f} ms，最大 {max(latencies):.2f} ms')
+
+    for query in COLD:
+        best = None
+        for _ in range(3):
+            index.search('')  # 换一个查询，使下次从头求候选集合
+            start = time.perf_counter()
+            results = index.search(query)
+            elapsed = (time.perf_counter() - start) * 1000
+            best = elapsed if best is None else min(best, elapsed)
+        print(f'从头查询 {query!r}: {best:.2f} ms，{len(results)} 项结果')
+
+    # 增删各1000个候选，查询仍然保持一致
+    start = time.perf_counter()
+    for key, text, _, _ in items[:1000]:
+        index.remove(key)
+    for key, text, count, last_time in items[:1000]:
+        index.add(key, text, count, last_time)
+    index.search('x')
+    print(f'增量更新: 删除并重新加入1000个候选，{(time.perf_counter() - start) * 1000:.0f} ms')
+
+if __name__ == '__main__':
+    args = sys.argv[1:]
+    main(int(args[0]) if args else 50000)
@@ -0,0 +1,58 @@
+"""
+图标区域启动耗时与内存基准测试
+
+生成包含 N 个图标的 launcher_data.json，在 offscreen 平台下测量
+创建界面、加载数据并完成首次绘制的耗时，以及进程常驻内存(RSS)的增量。
+
+运行: python -m benchmarks.bench_icon_startup [N]
+"""
+import os
+import sys
+import json
+import time
+import tempfile
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PyQt5.QtWidgets import QApplication
+
+def rss_mb():
+    """当前进程常驻内存(MB)，仅Linux可用，其它平台返回0"""
+    try:
+        with open('/proc/self/status', encoding='ascii') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return 0.0
+
+def main(n=5000):
+    app = QApplication.instance() or QApplication(sys.argv)
+    workdir = tempfile.mkdtemp(prefix='ql_bench_')
+    os.chdir(workdir)
+    target = os.path.join(workdir, 'tool.exe')
+    open(target, 'w').close()
+    data_file = os.path.join(workdir, 'launcher_data.json')
+    icons = [[target, i % 10 == 0, '2024-01-01 00:00:00', i // 10 + 1 if i % 10 == 0 else None] for i in range(n)]
+    with open(data_file, 'w', encoding='utf-8') as f:
+        json.dump({'icons': icons, 'cmds': []}, f)
+
+    from launcher.launcher_ui import LauncherUI
+    from launcher.launcher_logic import LauncherLogic
+    from launcher.launcher_data import LauncherData
+    base_rss = rss_mb()
+    start = time.perf_counter()
+    ui = LauncherUI()
+    data = LauncherData(data_file)
+    LauncherLogic(ui, data)
+    ui.show()
+    app.processEvents()
+    elapsed = time.perf_counter() - start
+    print(f'图标数: {n}')
+    print(f'启动到首次绘制: {elapsed * 1000:.0f} ms')
+    print(f'RSS 增量: {rss_mb() - base_rss:.1f} MB')
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5000)
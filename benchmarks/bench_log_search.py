@@ -0,0 +1,89 @@
+"""
+日志全文搜索基准测试
+
+在临时目录生成 N 个运行日志（每个约 S KB，内容是带时间戳和编号的典型日志行，
+少量文件中混入一条罕见的错误信息），测量首次建立索引的耗时和吞吐，
+再对比有索引与直接逐个扫描（相当于外部 grep）时几种查询的耗时。
+
+运行: python -m benchmarks.bench_log_search [文件数] [每个文件KB]
+"""
+import os
+import sys
+import time
+import random
+import shutil
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.log_search import LogSearchIndex
+
+COMMANDS = ['python_server.py', 'node_app.js', 'backup.bat', 'sync_job', 'worker_-q_high']
+LEVELS = ['INFO', 'INFO', 'INFO', 'DEBUG', 'WARNING']
+MESSAGES = ['processed request id={} in {}ms', 'connected to 10.0.{}.{}:5432', 'cache hit ratio {}.{}%',
+            'queue depth {} (max {})', 'heartbeat seq={} lag={}ms']
+RARE = 'ERROR disk quota exceeded on volume vol-{}'
+
+def generate(log_dir, n, size_kb, rare_every=500):
+    rng = random.Random(42)
+    total = 0
+    old = time.time() - 3600
+    for i in range(n):
+        cmd = COMMANDS[i % len(COMMANDS)]
+        ts = time.strftime('%Y%m%d_%H%M%S', time.localtime(old - (n - i) * 60))
+        lines = []
+        size = 0
+        while size < size_kb * 1024:
+            msg = rng.choice(MESSAGES).format(rng.randint(0, 99999), rng.randint(0, 999))
+            line = f'2026-10-18 12:{rng.randint(0, 59):02d}:{rng.randint(0, 59):02d} {rng.choice(LEVELS)} {msg}'
+            lines.append(line)
+            size += len(line) + 1
+        if i % rare_every == 7:
+            lines.insert(len(lines) // 2, RARE.format(i))
+        data = ('\n'.join(lines) + '\n').encode()
+        path = os.path.join(log_dir, f'{cmd}_{ts}.log')
+        with open(path, 'wb') as f:
+            f.write(data)
+        os.utime(path, (old, old))
+        total += len(data)
+    return total
+
+def timed_search(index, query, **kwargs):
+    hits = []
+    stats = index.search(query, max_results=kwargs.pop('max_results', 100), on_hit=hits.append, **kwargs)
+    return stats, hits
+
+def main(n=2000, size_kb=256):
+    workdir = tempfile.mkdtemp(prefix='bench_log_search_')
+    try:
+        log_dir = os.path.join(workdir, 'log')
+        os.makedirs(log_dir)
+        total = generate(log_dir, n, size_kb)
+        print(f'日志: {n} 个文件，共 {total / 1024 / 1024:.0f} MB')
+        index = LogSearchIndex(log_dir, os.path.join(workdir, 'log_search.db'))
+        start = time.perf_counter()
+        stats = index.update()
+        elapsed = time.perf_counter() - start
+        status = index.status()
+        print(f'建立索引: {elapsed:.1f}s（{total / 1024 / 1024 / elapsed:.0f} MB/s），'
+              f'{stats["segments"]} 个段，索引大小 {status["db_bytes"] / 1024 / 1024:.1f} MB')
+        queries = [
+            ('罕见子串', 'disk quota exceeded', {}),
+            ('罕见正则', r'quota exceeded on volume vol-\d+', {'regex': True}),
+            ('常见子串（取前100条）', 'heartbeat', {}),
+            ('按命令过滤', 'quota', {'base': 'sync_job'}),
+        ]
+        for label, query, kwargs in queries:
+            search_stats, hits = timed_search(index, query, **kwargs)
+            print(f'{label}: {search_stats["elapsed"] * 1000:.1f} ms，候选 {search_stats["candidates"]}/{search_stats["total"]} 个文件，'
+                  f'扫描 {search_stats["files"]} 个，{search_stats["hits"]} 条结果')
+        # 没有索引时需要扫描全部文件
+        empty = LogSearchIndex(log_dir, os.path.join(workdir, 'empty.db'))
+        search_stats, _ = timed_search(empty, 'disk quota exceeded', max_results=10 ** 9)
+        print(f'无索引全量扫描: {search_stats["elapsed"] * 1000:.0f} ms，扫描 {search_stats["files"]} 个文件')
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+if __name__ == '__main__':
+    args = sys.argv[1:]
+    main(int(args[0]) if args else 2000, int(args[1]) if len(args) > 1 else 256)
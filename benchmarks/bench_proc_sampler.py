@@ -0,0 +1,56 @@
+"""
+进程采样器开销基准测试
+
+启动 N 个子进程（每个是 sh -c 包着的 sleep，进程树共 2N 个进程）并全部跟踪，
+按指定间隔采样一段时间，统计采样线程消耗的 CPU 时间占墙钟时间的比例。
+
+运行: python -m benchmarks.bench_proc_sampler [进程数] [采样间隔秒] [持续秒数]
+"""
+import os
+import sys
+import time
+import signal
+import subprocess
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.proc_sampler import ProcSampler
+
+def main(n=200, interval=1.0, duration=10.0):
+    sampler = ProcSampler(interval=interval)
+    if not sampler.available:
+        print('当前平台无法采样（需要 /proc 或 psutil）')
+        return
+    # 放入独立进程组，结束时连同 sleep 子进程一起终止
+    procs = [subprocess.Popen('sleep 600; true', shell=True, start_new_session=True) for _ in range(n)]
+    try:
+        for i, p in enumerate(procs):
+            sampler.track(('bench', i), p.pid)
+        sampler.sample_once()  # 第一轮发现子进程
+        print(f'跟踪根进程: {n}，进程总数: {sampler.tracked_processes}，系统进程数: {len(sampler.reader.list_pids())}')
+        busy_before = sampler.busy_seconds
+        passes_before = sampler.pass_count
+        start = time.monotonic()
+        sampler.start()
+        time.sleep(duration)
+        sampler.stop()
+        wall = time.monotonic() - start
+        busy = sampler.busy_seconds - busy_before
+        passes = sampler.pass_count - passes_before
+        print(f'采样间隔 {interval}s，{passes} 轮，每轮平均 {busy / max(1, passes) * 1000:.2f} ms CPU')
+        print(f'采样线程 CPU 占用: {busy / wall * 100:.3f}%')
+        usage = sampler.usage(('bench', 0))
+        print(f'示例: {usage}')
+    finally:
+        for p in procs:
+            try:
+                os.killpg(p.pid, signal.SIGKILL)
+            except OSError:
+                pass
+            p.wait()
+
+if __name__ == '__main__':
+    args = sys.argv[1:]
+    main(int(args[0]) if args else 200,
+         float(args[1]) if len(args) > 1 else 1.0,
+         float(args[2]) if len(args) > 2 else 10.0)
@@ -0,0 +1,81 @@
+"""
+run_cmd_with_log 输出吞吐基准测试
+
+子进程尽可能快地输出 N 行（每行约80字节，N取1000的整数倍），分别用旧版逐行实现（文本模式读取、
+print + write + flush）和新版分块缓冲实现记录日志，比较 MB/s 与 行/s。
+两种实现的控制台回显都重定向到空设备，只比较管道和日志写入本身。
+
+运行: python -m benchmarks.bench_subprocess_logger [行数]
+"""
+import os
+import sys
+import time
+import tempfile
+import subprocess
+import contextlib
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.subprocess_logger import run_cmd_with_log
+from utils.run_history import RunHistory
+
+LINE = 'x' * 72
+
+def producer_cmd(lines, workdir):
+    # 预先拼好1000行的数据块反复写出，让子进程本身不成为瓶颈
+    script = os.path.join(workdir, 'producer.py')
+    with open(script, 'w', encoding='utf-8') as f:
+        f.write('import sys\n'
+                'w = sys.stdout.buffer.write\n'
+                f"block = b''.join(b'%08d ' % i + b'{LINE}' + b'\\n' for i in range(1000))\n"
+                f'for _ in range({lines} // 1000):\n'
+                '    w(block)\n')
+    return f'"{sys.executable}" "{script}"'
+
+def legacy_run_cmd_with_log(cmd, log_filename):
+    """旧版实现的核心循环"""
+    with open(log_filename, 'w', encoding='utf-8') as log_file:
+        process = subprocess.Popen(cmd, shell=True, stdout=subprocess.PIPE,
+                                   stderr=subprocess.STDOUT, encoding='utf-8', errors='replace')
+        for line in process.stdout:
+            decoded = line.rstrip()
+            print(decoded)
+            log_file.write(decoded + '\n')
+            log_file.flush()
+        process.wait()
+
+def measure(label, func, lines):
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        start = time.perf_counter()
+        log_filename = func()
+        elapsed = time.perf_counter() - start
+    size = os.path.getsize(log_filename)
+    print(f'{label:<22} {elapsed:>8.2f} s {size / elapsed / 1e6:>10.1f} MB/s {lines / elapsed:>14,.0f} 行/s')
+    return elapsed
+
+def main(lines=500000):
+    workdir = tempfile.mkdtemp(prefix='ql_bench_')
+    cmd = producer_cmd(lines, workdir)
+    print(f'输出行数: {lines}')
+    print(f"{'实现':<22} {'耗时':>10} {'吞吐':>15} {'行速率':>17}")
+
+    def legacy():
+        path = os.path.join(workdir, 'legacy.log')
+        legacy_run_cmd_with_log(cmd, path)
+        return path
+
+    # 运行记录写入临时目录，不污染 data/run_history.db
+    history = RunHistory(os.path.join(workdir, 'run_history.db'))
+
+    def buffered(echo):
+        def run():
+            return run_cmd_with_log(cmd, workdir, echo=echo, history=history)
+        return run
+
+    measure('旧版逐行', legacy, lines)
+    measure('新版分块(不回显)', buffered(False), lines)
+    measure('新版分块(回显)', buffered(True), lines)
+    history.close()
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 500000)
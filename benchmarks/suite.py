@@ -0,0 +1,385 @@
+"""
+基准测试套件
+
+在 offscreen 平台下依次测量常用路径，结果保存为 JSON，不同版本的结果可以直接比较：
+- launcher_data: LauncherData 保存（生成快照并写入文件）和加载，100 / 1000 / 10000 个图标
+- checked: 勾选切换（勾选序号增量更新）和清除全部勾选，其中 10% 的图标已勾选
+- log_finder: find_command_log_files 在 1000 ~ 100000 个日志文件的目录中首次查找（扫描建立索引）和之后的查找
+- subprocess_log: run_cmd_with_log 记录子进程输出的吞吐
+- log_viewer: 日志查看器追加显示新内容的吞吐
+- output_ring: 运行输出内存缓冲追加并由订阅方读出的吞吐（逐行小块和 64KB 大块）
+- metrics: 指标记录（计数、直方图计时）在关闭和开启时每次调用的开销
+
+每项重复若干次取中位数。结果的键为 "测量项[参数]"，如 "launcher_data.save[n=1000]"。
+
+运行:
+    python -m benchmarks.suite run [-o 结果.json] [--quick] [-k 名称过滤]
+    python -m benchmarks.suite compare 旧结果.json 新结果.json [--threshold 百分比]
+
+compare 列出两次结果的变化，有测量项变差超过阈值（默认 10%）时退出代码为1，可以在CI中使用。
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import platform
+import argparse
+import itertools
+import tempfile
+import statistics
+import subprocess
+import contextlib
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+RESULTS_DIR = 'data/benchmarks'
+DEFAULT_THRESHOLD = 10.0  # 变差超过这个百分比算作性能下降
+
+class Suite:
+    """
+    收集测量结果
+
+    Args:
+        quick: 只测较小的规模、较少的重复次数
+    """
+    def __init__(self, quick=False):
+        self.quick = quick
+        self.results = {}
+
+    def sizes(self, full, quick):
+        return quick if self.quick else full
+
+    def repeats(self, full=5):
+        return 3 if self.quick else full
+
+    def record(self, name, params, value, unit, better='lower'):
+        """
+        记录一项结果
+
+        Args:
+            name: 测量项名称
+            params: 参数 dict，如 {'n': 1000}
+            value: 测量值
+            unit: 单位，如 'ms'、'MB/s'
+            better: 'lower' 越小越好，'higher' 越大越好
+        """
+        key = f"{name}[{','.join(f'{k}={v}' for k, v in params.items())}]" if params else name
+        self.results[key] = {'value': round(value, 4), 'unit': unit, 'better': better}
+        print(f'  {key:<48} {value:>12.3f} {unit}')
+
+def median_ms(func, repeat, setup=None):
+    """重复执行 func 取耗时中位数（毫秒），setup 在每次执行前调用且不计时"""
+    samples = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+def wait_events(ms=0):
+    from PyQt5.QtCore import QEventLoop, QTimer
+    loop = QEventLoop()
+    QTimer.singleShot(ms, loop.quit)
+    loop.exec_()
+
+# ---- 测量项 ----
+def bench_launcher_data(suite, workdir):
+    from launcher.launcher_ui import LauncherUI
+    from launcher.launcher_data import LauncherData
+    from utils.launcher_profile import LauncherProfile, IconEntry
+    target = os.path.join(workdir, 'tool.exe')
+    open(target, 'w').close()
+    for n in suite.sizes([100, 1000, 10000], [100, 1000]):
+        data_file = os.path.join(workdir, f'launcher_data_{n}.json')
+        icons = [IconEntry(target, i % 10 == 0, None, i // 10 + 1 if i % 10 == 0 else None) for i in range(n)]
+        cmds = [f'python job_{i}.py --id {i}' for i in range(n // 10)]
+        LauncherProfile(icons, cmds).save(data_file)
+        ui = LauncherUI()
+        data = LauncherData(data_file)
+
+        def reset():
+            ui.cmd_area.clear()
+
+        suite.record('launcher_data.load', {'n': n}, median_ms(lambda: data.load(ui), suite.repeats(), reset), 'ms')
+
+        def save():
+            # save() 只安排延迟写入，flush() 立即生成快照并等待后台线程写完
+            data.save(ui)
+            data.flush()
+
+        suite.record('launcher_data.save', {'n': n}, median_ms(save, suite.repeats()), 'ms')
+        wait_events()
+        ui.deleteLater()
+
+def bench_checked(suite, workdir):
+    from benchmarks.bench_checkbox_toggle import build
+    toggles = 20 if suite.quick else 50
+    for n in suite.sizes([100, 1000, 10000], [100, 1000]):
+        ui, data, logic = build(n, workdir)
+        model = ui.icon_model
+
+        def toggle(row):
+            def run():
+                for _ in range(toggles):
+                    model.toggle_checked(row)
+                    model.toggle_checked(row)
+            return run
+
+        # 中间一个未勾选的图标
+        middle = median_ms(toggle(n // 2 + 1), suite.repeats()) / (toggles * 2)
+        suite.record('checked.toggle', {'n': n}, middle, 'ms')
+        # 取消勾选序号为1的图标（其余所有序号都要变化）再重新勾选（排到最后），下一次取消新的第1个
+        checked = [row for row in range(n) if model.entry(row).checked]
+        rotation = itertools.cycle(sorted(checked, key=lambda row: model.entry(row).order))
+
+        def toggle_first():
+            for _ in range(toggles):
+                row = next(rotation)
+                model.toggle_checked(row)
+                model.toggle_checked(row)
+
+        first = median_ms(toggle_first, suite.repeats()) / (toggles * 2)
+        suite.record('checked.toggle_first', {'n': n}, first, 'ms')
+
+        def recheck():
+            for row in checked:
+                model.set_checked(row, True)
+
+        suite.record('checked.clear', {'n': n}, median_ms(model.clear_checked, suite.repeats(), recheck), 'ms')
+        data.flush()
+        wait_events()
+        ui.deleteLater()
+
+def bench_log_finder(suite, workdir):
+    from utils.log_filename import get_base_log_filename
+    from utils.log_finder import find_command_log_files
+    from utils.log_index import LogIndex
+    commands = [f'python worker_{i}.py --queue q{i}' for i in range(200)]
+    for n in suite.sizes([1000, 10000, 100000], [1000, 10000]):
+        log_dir = os.path.join(workdir, f'log_{n}')
+        os.makedirs(log_dir)
+        for i in range(n):
+            base = get_base_log_filename(commands[i % len(commands)])
+            stamp = time.strftime('%Y%m%d_%H%M%S', time.localtime(1700000000 + i))
+            open(os.path.join(log_dir, f'{base}_{stamp}.log'), 'w').close()
+        # 首次查找：扫描目录建立索引
+        cold = median_ms(lambda: LogIndex(log_dir).latest(get_base_log_filename(commands[0])), suite.repeats(3))
+        suite.record('log_finder.first', {'files': n}, cold, 'ms')
+        find_command_log_files(commands[0], log_dir)
+        warm = median_ms(lambda: [find_command_log_files(cmd, log_dir) for cmd in commands], suite.repeats())
+        suite.record('log_finder.lookup', {'files': n}, warm / len(commands), 'ms')
+        shutil.rmtree(log_dir, ignore_errors=True)
+
+def bench_subprocess_log(suite, workdir):
+    from benchmarks.bench_subprocess_logger import producer_cmd
+    from utils.subprocess_logger import run_cmd_with_log
+    from utils.run_history import RunHistory
+    lines = 50000 if suite.quick else 200000
+    cmd = producer_cmd(lines, workdir)
+    log_dir = os.path.join(workdir, 'log_subprocess')
+    history = RunHistory(os.path.join(workdir, 'run_history.db'))
+    samples = []
+    for _ in range(suite.repeats(3)):
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            start = time.perf_counter()
+            path = run_cmd_with_log(cmd, log_dir, echo=False, history=history)
+            elapsed = time.perf_counter() - start
+        samples.append(os.path.getsize(path) / elapsed / 1e6)
+    history.close()
+    suite.record('subprocess_log.throughput', {'lines': lines}, statistics.median(samples), 'MB/s', 'higher')
+
+def bench_log_viewer(suite, workdir):
+    from launcher.launcher_ui import LauncherUI
+    from launcher.log_viewer import LogViewer
+    ui = LauncherUI()
+    viewer = LogViewer(ui, os.path.join(workdir, 'log_viewer'))
+    viewer.ensure_log_display()
+    ui.show()
+    chunk = ''.join(f'{i:08d} 2024-01-01 12:00:00 INFO worker processed item {i} in 12ms ok\n' for i in range(100))
+    chunks = 50 if suite.quick else 200
+    samples = []
+    for _ in range(suite.repeats(3)):
+        viewer.clear_log_display()
+        wait_events()
+        start = time.perf_counter()
+        for _ in range(chunks):
+            # 与跟踪器读到新内容时相同的路径：信号 -> update_log_display，每块之后处理一次界面事件
+            viewer.signals.log_update.emit(chunk)
+            wait_events()
+        elapsed = time.perf_counter() - start
+        samples.append(len(chunk.encode('utf-8')) * chunks / elapsed / 1e6)
+    suite.record('log_viewer.append', {'lines': chunks * 100}, statistics.median(samples), 'MB/s', 'higher')
+    viewer.tailer.stop()
+    ui.close()
+    ui.deleteLater()
+
+def bench_output_ring(suite, workdir):
+    from utils.output_ring import OutputRing
+    total = (8 if suite.quick else 32) * 1024 * 1024
+    for size in (64, 64 * 1024):
+        chunk = (b'x' * (size - 1)) + b'\n'
+
+        def run():
+            ring = OutputRing('bench.log')
+            position = 0
+            for _ in range(total // size):
+                ring.append(chunk)
+                data, offset = ring.read_from(position)
+                position = offset + len(data)
+
+        elapsed = median_ms(run, suite.repeats()) / 1000
+        suite.record('output_ring.throughput', {'chunk': size}, total / elapsed / 1e6, 'MB/s', 'higher')
+
+def bench_metrics(suite, workdir):
+    from utils.metrics import MetricsRegistry
+    calls = 20000 if suite.quick else 100000
+    for enabled in (False, True):
+        registry = MetricsRegistry(enabled)
+        counter = registry.counter('bench_total', '')
+        histogram = registry.histogram('bench_seconds', '')
+
+        def inc():
+            for _ in range(calls):
+                counter.inc()
+
+        def timed():
+            for _ in range(calls):
+                with histogram.time():
+                    pass
+
+        params = {'enabled': int(enabled)}
+        suite.record('metrics.inc', params, median_ms(inc, suite.repeats()) * 1000 / calls, 'us')
+        suite.record('metrics.time', params, median_ms(timed, suite.repeats()) * 1000 / calls, 'us')
+
+BENCHMARKS = [
+    ('launcher_data', bench_launcher_data),
+    ('checked', bench_checked),
+    ('log_finder', bench_log_finder),
+    ('subprocess_log', bench_subprocess_log),
+    ('log_viewer', bench_log_viewer),
+    ('output_ring', bench_output_ring),
+    ('metrics', bench_metrics),
+]
+
+# ---- 运行与比较 ----
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+def run(args):
+    from PyQt5.QtWidgets import QApplication
+    from PyQt5.QtCore import QT_VERSION_STR
+    app = QApplication.instance() or QApplication(sys.argv)
+    suite = Suite(quick=args.quick)
+    selected = [(name, func) for name, func in BENCHMARKS if not args.k or any(k in name for k in args.k)]
+    output = os.path.abspath(args.output or os.path.join(
+        RESULTS_DIR, f"{time.strftime('%Y%m%d_%H%M%S')}_{_git_commit() or 'unknown'}.json"))
+    # 运行日志、运行历史等都写到临时目录中，不影响当前目录的数据
+    workdir = tempfile.mkdtemp(prefix='ql_bench_')
+    cwd = os.getcwd()
+    os.chdir(workdir)
+    try:
+        for name, func in selected:
+            print(f'{name}:')
+            case_dir = os.path.join(workdir, name)
+            os.makedirs(case_dir)
+            func(suite, case_dir)
+            app.processEvents()  # 释放上一项创建的界面（deleteLater），不影响下一项
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+    report = {
+        'meta': {
+            'time': time.strftime('%Y-%m-%d %H:%M:%S'),
+            'commit': _git_commit(),
+            'python': platform.python_version(),
+            'qt': QT_VERSION_STR,
+            'platform': platform.platform(),
+            'quick': args.quick,
+        },
+        'results': suite.results,
+    }
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f'结果已保存: {output}')
+    return 0
+
+def compare_results(old, new, threshold=DEFAULT_THRESHOLD):
+    """
+    比较两次结果
+
+    Args:
+        old: 旧结果（run 保存的 JSON 内容）
+        new: 新结果
+        threshold: 变差超过这个百分比算作性能下降
+
+    Returns:
+        list: [(键, 旧值, 新值, 变化百分比, 是否变差超过阈值)]，变化百分比为正表示变好，只在一边有的项值为None
+    """
+    rows = []
+    old_results, new_results = old.get('results', {}), new.get('results', {})
+    for key in list(old_results) + [key for key in new_results if key not in old_results]:
+        before, after = old_results.get(key), new_results.get(key)
+        if before is None or after is None:
+            rows.append((key, before and before['value'], after and after['value'], None, False))
+            continue
+        if not before['value']:
+            change = 0.0
+        elif after.get('better', 'lower') == 'higher':
+            change = (after['value'] - before['value']) / before['value'] * 100
+        else:
+            change = (before['value'] - after['value']) / before['value'] * 100
+        rows.append((key, before['value'], after['value'], change, change < -threshold))
+    return rows
+
+def compare(args):
+    with open(args.old, encoding='utf-8') as f:
+        old = json.load(f)
+    with open(args.new, encoding='utf-8') as f:
+        new = json.load(f)
+    print(f"旧: {old['meta'].get('commit')} {old['meta'].get('time')}    新: {new['meta'].get('commit')} {new['meta'].get('time')}")
+    rows = compare_results(old, new, args.threshold)
+    regressions = 0
+    for key, before, after, change, regressed in rows:
+        if change is None:
+            print(f"  {key:<48} {'-' if before is None else f'{before:.3f}':>12} -> {'-' if after is None else f'{after:.3f}':>12}")
+            continue
+        mark = '  变差' if regressed else ''
+        regressions += regressed
+        print(f'  {key:<48} {before:>12.3f} -> {after:>12.3f} {change:>+8.1f}%{mark}')
+    if regressions:
+        print(f'{regressions} 项变差超过 {args.threshold:g}%')
+        return 1
+    return 0
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.suite', description='QuickLauncher 基准测试套件')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    p = sub.add_parser('run', help='运行基准测试并保存 JSON 结果')
+    p.add_argument('-o', '--output', help=f'结果文件路径（默认保存到 {RESULTS_DIR}/时间_提交.json）')
+    p.add_argument('--quick', action='store_true', help='只测较小的规模，较快完成')
+    p.add_argument('-k', action='append', help='只运行名称包含该文本的测量项，可重复')
+    p.set_defaults(func=run)
+
+    p = sub.add_parser('compare', help='比较两次结果')
+    p.add_argument('old', help='旧结果文件')
+    p.add_argument('new', help='新结果文件')
+    p.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD, help='变差超过这个百分比时退出代码为1')
+    p.set_defaults(func=compare)
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+if __name__ == '__main__':
+    sys.exit(main())
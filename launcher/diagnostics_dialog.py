@@ -0,0 +1,128 @@
+from PyQt5.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QTableWidget, QTableWidgetItem, QLabel,
+                             QPushButton, QCheckBox, QHeaderView, QAbstractItemView, QApplication)
+from PyQt5.QtCore import Qt, QTimer
+
+def format_seconds(value):
+    if value is None:
+        return ''
+    if value < 1:
+        return f'{value * 1000:.2f} ms'
+    return f'{value:.2f} s'
+
+def format_number(value):
+    if value is None:
+        return ''
+    if isinstance(value, float) and not value.is_integer():
+        return f'{value:.3f}'
+    return f'{int(value):,}'
+
+class DiagnosticsDialog(QDialog):
+    """
+    诊断面板（Ctrl+Shift+D）
+
+    每秒刷新一次指标注册表的当前值：计数器和仪表显示数值，耗时直方图显示次数、平均、P50/P95（按分桶估算）和最大值。
+    未用 --metrics 启动时可以在这里临时开启采集，关闭后不再记录（已记录的值保留）。
+
+    Args:
+        registry: MetricsRegistry
+        exporter: MetricsExporter，未导出时为 None
+    """
+    HEADERS = ['指标', '标签', '次数/值', '平均', 'P50', 'P95', '最大']
+    REFRESH_MS = 1000
+
+    def __init__(self, registry, exporter=None, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle('诊断')
+        self.resize(900, 450)
+        self.registry = registry
+        self.exporter = exporter
+
+        self.enabled_check = QCheckBox('采集指标')
+        self.enabled_check.setChecked(registry.enabled)
+        self.enabled_check.toggled.connect(self.set_enabled)
+        self.export_label = QLabel()
+        top_layout = QHBoxLayout()
+        top_layout.addWidget(self.enabled_check)
+        top_layout.addWidget(self.export_label)
+        top_layout.addStretch()
+
+        self.table = QTableWidget(0, len(self.HEADERS))
+        self.table.setHorizontalHeaderLabels(self.HEADERS)
+        self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.table.verticalHeader().setVisible(False)
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
+        self.table.horizontalHeader().setStretchLastSection(True)
+
+        btn_reset = QPushButton('清零')
+        btn_reset.clicked.connect(self.reset)
+        btn_copy = QPushButton('复制 Prometheus 文本')
+        btn_copy.clicked.connect(self.copy_text)
+        btn_close = QPushButton('关闭')
+        btn_close.clicked.connect(self.accept)
+        btn_layout = QHBoxLayout()
+        btn_layout.addWidget(btn_reset)
+        btn_layout.addWidget(btn_copy)
+        btn_layout.addStretch()
+        btn_layout.addWidget(btn_close)
+
+        layout = QVBoxLayout()
+        layout.addLayout(top_layout)
+        layout.addWidget(self.table)
+        layout.addLayout(btn_layout)
+        self.setLayout(layout)
+
+        self._timer = QTimer(self)
+        self._timer.setInterval(self.REFRESH_MS)
+        self._timer.timeout.connect(self.refresh)
+        self.refresh()
+
+    # 只在显示时刷新
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.refresh()
+        self._timer.start()
+
+    def hideEvent(self, event):
+        self._timer.stop()
+        super().hideEvent(event)
+
+    def set_enabled(self, enabled):
+        self.registry.enable(enabled)
+        self.refresh()
+
+    def reset(self):
+        self.registry.reset()
+        self.refresh()
+
+    def copy_text(self):
+        QApplication.clipboard().setText(self.registry.render())
+
+    def refresh(self):
+        if self.exporter is None:
+            export = '未导出（启动时加 --metrics 写入 data/metrics.prom）'
+        else:
+            parts = [part for part in (self.exporter.path, self.exporter.url) if part]
+            export = '导出到: ' + '，'.join(parts)
+            if self.exporter.last_error is not None:
+                export += f'（写入失败: {self.exporter.last_error}）'
+        self.export_label.setText(export)
+
+        rows = self.registry.snapshot()
+        self.table.setRowCount(len(rows))
+        for row, metric in enumerate(rows):
+            value = metric['value']
+            labels = ', '.join(f'{k}={v}' for k, v in metric['labels'].items())
+            if metric['kind'] == 'histogram' and value is not None:
+                fmt = format_seconds if metric['name'].endswith('_seconds') else format_number
+                values = [str(value['count']), fmt(value['avg']), fmt(value['p50']), fmt(value['p95']),
+                          fmt(value['max'])]
+            else:
+                values = [format_number(value), '', '', '', '']
+            for col, text in enumerate([metric['help'], labels] + values):
+                item = QTableWidgetItem(text)
+                if col == 0:
+                    item.setToolTip(metric['name'])
+                elif col >= 2:
+                    item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
+                self.table.setItem(row, col, item)
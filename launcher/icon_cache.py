@@ -0,0 +1,214 @@
+import os
+import hashlib
+import threading
+from collections import OrderedDict
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, QFileInfo, Qt, pyqtSignal
+from PyQt5.QtGui import QIcon, QImage, QPixmap
+from PyQt5.QtWidgets import QApplication, QStyle, QFileIconProvider
+
+class _LoaderSignals(QObject):
+    """后台加载结果，跨线程发回UI线程"""
+    loaded = pyqtSignal(str, int, object, str)  # 路径, 尺寸, QImage或None, 需要取系统图标时的缩略图文件名
+
+class _IconLoadTask(QRunnable):
+    def __init__(self, cache, path, size):
+        super().__init__()
+        self.cache = cache
+        self.path = path
+        self.size = size
+
+    def run(self):
+        image, name = None, ''
+        try:
+            image, name = self.cache._load_image(self.path, self.size)
+        except Exception as e:
+            print(f'加载图标失败: {self.path} 错误: {e}')
+        self.cache._signals.loaded.emit(self.path, self.size, image, name)
+
+class IconCache(QObject):
+    """
+    图标缓存：内存LRU + 磁盘缩略图
+
+    - icon(path) 立即返回：命中内存缓存时返回图标，否则返回占位图标并在后台线程加载，
+      加载完成后发出 icon_loaded(path)。
+    - 磁盘缩略图保存在 cache_dir 下，以 路径+尺寸+修改时间 的哈希命名，
+      源文件修改后自动失效；总大小超过 disk_limit_bytes 时按最久未使用淘汰。
+    - QImage 无法解码的文件（.exe、.lnk 等）在UI线程用 QFileIconProvider 取系统图标
+      （它不能在后台线程使用），结果同样写入磁盘缩略图，之后的启动直接读缩略图。
+    - 内存缓存按图像字节数计算，超过 memory_limit_bytes 时淘汰最久未使用的图标。
+    """
+    icon_loaded = pyqtSignal(str)
+
+    def __init__(self, cache_dir='data/icon_cache', size=20,
+                 memory_limit_bytes=8 * 1024 * 1024, disk_limit_bytes=64 * 1024 * 1024,
+                 max_threads=2, parent=None):
+        super().__init__(parent)
+        self.cache_dir = cache_dir
+        self.size = size
+        self.memory_limit_bytes = memory_limit_bytes
+        self.disk_limit_bytes = disk_limit_bytes
+        self._memory = OrderedDict()  # (路径, 尺寸) -> (QIcon, 字节数)
+        self._memory_bytes = 0
+        self._pending = set()  # 正在后台加载的 (路径, 尺寸)
+        self._failed = set()  # 无法加载图标的 (路径, 尺寸)，使用占位图标
+        self._disk_lock = threading.Lock()
+        self._disk_files = None  # 文件名 -> 字节数，首次写入时扫描
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(max_threads)
+        self._signals = _LoaderSignals()
+        self._signals.loaded.connect(self._on_loaded)
+        self._placeholder = None
+        self._icon_provider = None
+        # 统计计数（后台线程也会更新，用锁保护）
+        self._stats_lock = threading.Lock()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.failures = 0
+        self.evictions = 0
+
+    def placeholder(self):
+        if self._placeholder is None:
+            self._placeholder = QApplication.style().standardIcon(QStyle.SP_FileIcon)
+        return self._placeholder
+
+    def icon(self, path, size=None):
+        """返回图标；未缓存时返回占位图标并在后台加载"""
+        key = (path, size or self.size)
+        cached = self._memory.get(key)
+        if cached is not None:
+            self._memory.move_to_end(key)
+            self._count('memory_hits')
+            return cached[0]
+        if key not in self._pending and key not in self._failed:
+            self._pending.add(key)
+            self._pool.start(_IconLoadTask(self, key[0], key[1]))
+        return self.placeholder()
+
+    def invalidate(self, path):
+        """丢弃某个路径的内存缓存（磁盘缩略图按修改时间自动失效）"""
+        for key in [k for k in self._memory if k[0] == path]:
+            self._memory_bytes -= self._memory.pop(key)[1]
+        self._failed = {k for k in self._failed if k[0] != path}
+
+    def stats(self):
+        with self._stats_lock:
+            return {
+                'memory_hits': self.memory_hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'failures': self.failures,
+                'evictions': self.evictions,
+                'memory_items': len(self._memory),
+                'memory_bytes': self._memory_bytes,
+            }
+
+    def _count(self, name):
+        with self._stats_lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    # ---- UI线程 ----
+    def _on_loaded(self, path, size, image, name):
+        key = (path, size)
+        self._pending.discard(key)
+        if name:
+            image = self._provider_image(path, size, name)
+        if image is None or image.isNull():
+            self._failed.add(key)
+            return
+        icon = QIcon(QPixmap.fromImage(image))
+        nbytes = image.sizeInBytes()
+        self._memory[key] = (icon, nbytes)
+        self._memory_bytes += nbytes
+        while self._memory_bytes > self.memory_limit_bytes and len(self._memory) > 1:
+            _, (_, freed) = self._memory.popitem(last=False)
+            self._memory_bytes -= freed
+            self._count('evictions')
+        self.icon_loaded.emit(path)
+
+    def _provider_image(self, path, size, name):
+        """用系统图标提供者取文件图标，缩略图交给后台线程写入磁盘"""
+        if self._icon_provider is None:
+            self._icon_provider = QFileIconProvider()
+        image = self._icon_provider.icon(QFileInfo(path)).pixmap(size, size).toImage()
+        if image.isNull():
+            self._count('failures')
+            return None
+        if image.width() != size and image.height() != size:
+            image = image.scaled(size, size, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+        thumb_path = os.path.join(self.cache_dir, name)
+        self._pool.start(lambda: self._store_thumbnail(name, thumb_path, image))
+        return image
+
+    # ---- 后台线程 ----
+    def _thumbnail_name(self, path, size, mtime_ns):
+        digest = hashlib.sha1(f'{os.path.abspath(path)}|{size}|{mtime_ns}'.encode('utf-8')).hexdigest()
+        return f'{digest}.png'
+
+    def _load_image(self, path, size):
+        """
+        读取磁盘缩略图或解码源文件
+
+        Returns:
+            tuple: (QImage或None, 缩略图文件名)；文件名非空表示无法解码，需要在UI线程取系统图标
+        """
+        try:
+            mtime_ns = os.stat(path).st_mtime_ns
+        except OSError:
+            self._count('failures')
+            return None, ''
+        name = self._thumbnail_name(path, size, mtime_ns)
+        thumb_path = os.path.join(self.cache_dir, name)
+        image = QImage(thumb_path) if os.path.exists(thumb_path) else QImage()
+        if not image.isNull():
+            self._count('disk_hits')
+            try:
+                os.utime(thumb_path)  # 记录最近使用时间，供淘汰使用
+            except OSError:
+                pass
+            return image, ''
+        self._count('misses')
+        image = QImage(path)
+        if image.isNull():
+            return None, name
+        image = image.scaled(size, size, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+        self._store_thumbnail(name, thumb_path, image)
+        return image, ''
+
+    def _store_thumbnail(self, name, thumb_path, image):
+        with self._disk_lock:
+            try:
+                os.makedirs(self.cache_dir, exist_ok=True)
+                if self._disk_files is None:
+                    self._disk_files = {}
+                    for entry in os.scandir(self.cache_dir):
+                        if entry.is_file() and entry.name.endswith('.png'):
+                            self._disk_files[entry.name] = entry.stat().st_size
+                tmp_path = thumb_path + '.tmp'
+                if not image.save(tmp_path, 'PNG'):
+                    return
+                os.replace(tmp_path, thumb_path)
+                self._disk_files[name] = os.path.getsize(thumb_path)
+                self._evict_disk()
+            except OSError as e:
+                print(f'写入图标缓存失败: {thumb_path} 错误: {e}')
+
+    def _evict_disk(self):
+        total = sum(self._disk_files.values())
+        if total <= self.disk_limit_bytes:
+            return
+        # 按最近使用时间从旧到新淘汰
+        def last_used(name):
+            try:
+                return os.path.getmtime(os.path.join(self.cache_dir, name))
+            except OSError:
+                return 0
+        for name in sorted(self._disk_files, key=last_used):
+            if total <= self.disk_limit_bytes:
+                break
+            try:
+                os.remove(os.path.join(self.cache_dir, name))
+            except OSError:
+                pass
+            total -= self._disk_files.pop(name)
+            self._count('evictions')
@@ -0,0 +1,303 @@
+import os
+from PyQt5.QtCore import Qt, QAbstractListModel, QModelIndex, QMimeData, QByteArray, QSize, QRect, pyqtSignal
+from PyQt5.QtWidgets import QStyledItemDelegate, QStyle, QApplication
+from utils.checked_order import CheckedOrderIndex
+from utils.metrics import RENUMBER_SECONDS
+from utils.launcher_profile import IconEntry  # noqa: F401 条目定义在不依赖Qt的配置模型中，这里重新导出
+
+# 自定义数据角色
+PathRole = Qt.UserRole  # 与原 QListWidgetItem.data(Qt.UserRole) 保持一致
+LaunchTimeRole = Qt.UserRole + 1
+EntryRole = Qt.UserRole + 2
+UsageRole = Qt.UserRole + 3  # 进程资源占用文本，命令列表项也使用这个角色
+
+ROWS_MIME_TYPE = 'application/x-quicklauncher-icon-rows'
+
+class IconListModel(QAbstractListModel):
+    """
+    图标区域的数据模型
+
+    勾选序号由内部的 CheckedOrderIndex 维护，视图只会为可见行调用 data()，
+    所以条目数量再多，界面开销也只和可见行数有关。
+    条目 -> 行号、路径 -> 条目 的映射随增删和移动更新，图标加载完成、资源占用更新时
+    直接找到对应的行，不需要遍历所有条目。
+    图标由 IconCache 在后台加载，加载完成前显示占位图标。
+    """
+    # 拖入外部文件: 文件路径列表
+    files_dropped = pyqtSignal(list)
+    # 勾选状态变化: 条目
+    check_changed = pyqtSignal(object)
+
+    def __init__(self, icon_cache=None, parent=None):
+        super().__init__(parent)
+        self.entries = []
+        self.checked_index = CheckedOrderIndex()
+        self._rows = {}  # 条目 -> 行号
+        self._path_entries = {}  # 路径 -> 条目列表（同一文件可以添加多次）
+        self._with_usage = set()  # 有资源占用文本的条目
+        self.icon_cache = icon_cache
+        if icon_cache is not None:
+            icon_cache.icon_loaded.connect(self._on_icon_loaded)
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.entries)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        entry = self.entries[index.row()]
+        if role == Qt.DisplayRole:
+            return f'{entry.number}. {entry.name}' if entry.number is not None else entry.name
+        if role == Qt.DecorationRole:
+            return self.icon_cache.icon(entry.path) if self.icon_cache is not None else None
+        if role == Qt.CheckStateRole:
+            return Qt.Checked if entry.checked else Qt.Unchecked
+        if role == Qt.ToolTipRole or role == PathRole:
+            return entry.path
+        if role == LaunchTimeRole:
+            return entry.launch_time
+        if role == UsageRole:
+            return entry.usage
+        if role == EntryRole:
+            return entry
+        return None
+
+    def setData(self, index, value, role=Qt.EditRole):
+        if index.isValid() and role == Qt.CheckStateRole:
+            self.set_checked(index.row(), value == Qt.Checked)
+            return True
+        return False
+
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.ItemIsDropEnabled
+        return Qt.ItemIsEnabled | Qt.ItemIsSelectable | Qt.ItemIsDragEnabled
+
+    # ---- 条目增删 ----
+    def set_entries(self, entries):
+        """整体替换条目并按保存的勾选顺序号重建勾选索引"""
+        self.beginResetModel()
+        self.entries = list(entries)
+        self.checked_index = CheckedOrderIndex()
+        self._rows = {}
+        self._path_entries = {}
+        self._with_usage = {entry for entry in self.entries if entry.usage is not None}
+        self._reindex(0)
+        for entry in self.entries:
+            self._path_entries.setdefault(entry.path, []).append(entry)
+        for entry in self.entries:
+            if entry.checked and entry.order is not None:
+                self.checked_index.add(entry, entry.order)
+                entry.order = self.checked_index.order(entry)
+        for entry in self.entries:
+            entry.number = self.checked_index.rank(entry)
+        self.endResetModel()
+
+    def append(self, entry):
+        row = len(self.entries)
+        self.beginInsertRows(QModelIndex(), row, row)
+        self.entries.append(entry)
+        self._rows[entry] = row
+        self._path_entries.setdefault(entry.path, []).append(entry)
+        if entry.usage is not None:
+            self._with_usage.add(entry)
+        self.endInsertRows()
+
+    def remove_row(self, row):
+        entry = self.entries[row]
+        self.beginRemoveRows(QModelIndex(), row, row)
+        del self.entries[row]
+        del self._rows[entry]
+        same_path = self._path_entries[entry.path]
+        same_path.remove(entry)
+        if not same_path:
+            del self._path_entries[entry.path]
+        self._with_usage.discard(entry)
+        self._reindex(row)
+        self.endRemoveRows()
+        self._apply_number_changes(self.checked_index.remove(entry))
+
+    def entry(self, row):
+        return self.entries[row]
+
+    def row_of(self, entry):
+        return self._rows.get(entry, -1)
+
+    def entry_for_path(self, path):
+        """路径对应的、行号最小的条目，没有时返回 None"""
+        same_path = self._path_entries.get(path)
+        return min(same_path, key=self._rows.__getitem__) if same_path else None
+
+    def _reindex(self, start, end=None):
+        # 更新 start 到 end（不含）之间各行的行号
+        rows = self._rows
+        entries = self.entries
+        for row in range(start, len(entries) if end is None else end):
+            rows[entries[row]] = row
+
+    # ---- 勾选 ----
+    def set_checked(self, row, checked):
+        entry = self.entries[row]
+        if entry.checked == checked:
+            return
+        entry.checked = checked
+        with RENUMBER_SECONDS.time():
+            if checked:
+                changes = self.checked_index.add(entry)
+                entry.order = self.checked_index.order(entry)
+            else:
+                changes = self.checked_index.remove(entry)
+                entry.order = None
+            index = self.index(row)
+            self.dataChanged.emit(index, index, [Qt.CheckStateRole])
+            self._apply_number_changes(changes, row)
+        self.check_changed.emit(entry)
+
+    def toggle_checked(self, row):
+        self.set_checked(row, not self.entries[row].checked)
+
+    def checked_entries(self):
+        """按勾选顺序返回已勾选的条目"""
+        return self.checked_index.keys()
+
+    def clear_checked(self):
+        with RENUMBER_SECONDS.time():
+            for entry in self.entries:
+                if entry.checked:
+                    entry.checked = False
+                    entry.order = None
+            self.checked_index.clear()
+            for entry in self.entries:
+                entry.number = None
+            self._emit_all_changed()
+
+    def set_launch_time(self, entry, launch_time):
+        entry.launch_time = launch_time
+        row = self.row_of(entry)
+        if row >= 0:
+            index = self.index(row)
+            self.dataChanged.emit(index, index, [LaunchTimeRole])
+
+    def set_usages(self, usages):
+        """更新资源占用文本，usages 为 {条目: 文本}，不在其中的条目清空；只刷新文本变化的行"""
+        changed = [entry for entry in self._with_usage if entry not in usages]
+        changed.extend(entry for entry, usage in usages.items() if entry in self._rows and usage != entry.usage)
+        for entry in changed:
+            entry.usage = usages.get(entry)
+            if entry.usage is None:
+                self._with_usage.discard(entry)
+            else:
+                self._with_usage.add(entry)
+            index = self.index(self._rows[entry])
+            self.dataChanged.emit(index, index, [UsageRole])
+
+    def _apply_number_changes(self, changes, row=None):
+        """只更新序号实际变化的条目；涉及多行时发一次整体刷新，视图只重绘可见行"""
+        if not changes:
+            return
+        for entry, number in changes:
+            entry.number = number
+        if len(changes) == 1 and row is not None and changes[0][0] is self.entries[row]:
+            index = self.index(row)
+            self.dataChanged.emit(index, index, [Qt.DisplayRole])
+        else:
+            self._emit_all_changed()
+
+    def _on_icon_loaded(self, path):
+        for entry in self._path_entries.get(path, ()):
+            index = self.index(self._rows[entry])
+            self.dataChanged.emit(index, index, [Qt.DecorationRole])
+
+    def _emit_all_changed(self):
+        if self.entries:
+            self.dataChanged.emit(self.index(0), self.index(len(self.entries) - 1))
+
+    # ---- 拖放 ----
+    def supportedDropActions(self):
+        return Qt.MoveAction | Qt.CopyAction
+
+    def supportedDragActions(self):
+        return Qt.MoveAction
+
+    def mimeTypes(self):
+        return [ROWS_MIME_TYPE, 'text/uri-list']
+
+    def mimeData(self, indexes):
+        mime = QMimeData()
+        rows = sorted({index.row() for index in indexes if index.isValid()})
+        mime.setData(ROWS_MIME_TYPE, QByteArray(','.join(map(str, rows)).encode()))
+        return mime
+
+    def dropMimeData(self, mime, action, row, column, parent):
+        if mime.hasUrls():
+            paths = [url.toLocalFile() for url in mime.urls() if url.isLocalFile()]
+            paths = [p for p in paths if os.path.isfile(p)]
+            if paths:
+                self.files_dropped.emit(paths)
+            # 返回False，避免视图把它当作移动而删除源数据
+            return False
+        if not mime.hasFormat(ROWS_MIME_TYPE) or action != Qt.MoveAction:
+            return False
+        raw = bytes(mime.data(ROWS_MIME_TYPE)).decode()
+        rows = [int(r) for r in raw.split(',') if r]
+        if row < 0:
+            row = parent.row() if parent.isValid() else len(self.entries)
+        self.move_rows(rows, row)
+        return False
+
+    # 不重写 moveRows：QListView 在内部拖放时会先调用 moveRow 再调用 dropMimeData，
+    # 两处都移动会把条目移动两次，所以内部移动只在 dropMimeData 中完成
+    def _move_block(self, source_row, count, dest_child):
+        if source_row <= dest_child <= source_row + count:
+            return False
+        if not self.beginMoveRows(QModelIndex(), source_row, source_row + count - 1, QModelIndex(), dest_child):
+            return False
+        moved = self.entries[source_row:source_row + count]
+        del self.entries[source_row:source_row + count]
+        insert_at = dest_child if dest_child < source_row else dest_child - count
+        self.entries[insert_at:insert_at] = moved
+        self._reindex(min(source_row, insert_at), max(source_row, insert_at) + count)
+        self.endMoveRows()
+        return True
+
+    def move_rows(self, rows, dest):
+        """把若干行（可不连续）按原有顺序移动到 dest 之前"""
+        entries = [self.entries[r] for r in sorted(rows)]
+        for entry in entries:
+            source = self.row_of(entry)
+            if source != dest and source + 1 != dest:
+                self._move_block(source, 1, dest)
+            # 后续条目紧跟在刚移动的条目之后
+            dest = self.row_of(entry) + 1
+
+class IconItemDelegate(QStyledItemDelegate):
+    """绘制图标项：勾选框、图标、带序号的名称，以及右侧的资源占用和启动时间"""
+    ROW_HEIGHT = 28
+    TIME_MARGIN = 8
+
+    def paint(self, painter, option, index):
+        launch_time = '  '.join(text for text in (index.data(UsageRole), index.data(LaunchTimeRole)) if text)
+        if not launch_time:
+            super().paint(painter, option, index)
+            return
+        metrics = option.fontMetrics
+        time_width = metrics.horizontalAdvance(launch_time) + self.TIME_MARGIN * 2
+        # 先按整行绘制背景（选中/悬停），再把名称区域让出启动时间的位置
+        self.initStyleOption(option, index)
+        style = option.widget.style() if option.widget else QApplication.style()
+        style.drawPrimitive(QStyle.PE_PanelItemViewItem, option, painter, option.widget)
+        name_option = type(option)(option)
+        name_option.rect = QRect(option.rect.left(), option.rect.top(),
+                                 max(0, option.rect.width() - time_width), option.rect.height())
+        super().paint(painter, name_option, index)
+        time_rect = QRect(option.rect.right() - time_width + self.TIME_MARGIN, option.rect.top(),
+                          time_width - self.TIME_MARGIN * 2, option.rect.height())
+        painter.save()
+        if option.state & QStyle.State_Selected:
+            painter.setPen(option.palette.highlightedText().color())
+        painter.drawText(time_rect, Qt.AlignVCenter | Qt.AlignRight, launch_time)
+        painter.restore()
+
+    def sizeHint(self, option, index):
+        size = super().sizeHint(option, index)
+        return QSize(size.width(), max(size.height(), self.ROW_HEIGHT))
@@ -0,0 +1,53 @@
+import threading
+from PyQt5.QtCore import QObject, pyqtSignal
+
+class _PendingReply:
+    """连接线程等待界面线程处理结果"""
+    def __init__(self):
+        self.event = threading.Event()
+        self.response = None
+        self.expired = False  # 连接线程已等待超时，不再需要处理
+
+class InstanceBridge(QObject):
+    """
+    把单实例服务端（连接线程）收到的请求转到界面线程处理，并等待处理结果
+
+    handler(request) 在界面线程中调用，返回回复 dict。handler 为 None 时（程序还在启动、逻辑对象尚未创建）
+    收到的请求先排队，set_handler 之后按收到的顺序处理。
+    """
+    received = pyqtSignal(object, object)  # 请求, _PendingReply
+
+    def __init__(self, handler=None, timeout=10.0, parent=None):
+        super().__init__(parent)
+        self.handler = handler
+        self.timeout = timeout
+        self._queued = []  # [(请求, _PendingReply)]，等待 handler
+        self.received.connect(self._on_received)
+
+    # 在连接线程中调用，可直接用作 InstanceServer 的 handler
+    def handle(self, request):
+        pending = _PendingReply()
+        self.received.emit(request, pending)
+        if not pending.event.wait(self.timeout):
+            pending.expired = True
+            return {'ok': False, 'message': '界面没有及时响应'}
+        return pending.response
+
+    # 设置处理函数（界面线程中调用），并处理排队的请求
+    def set_handler(self, handler):
+        self.handler = handler
+        queued, self._queued = self._queued, []
+        for request, pending in queued:
+            if not pending.expired:
+                self._on_received(request, pending)
+
+    def _on_received(self, request, pending):
+        if self.handler is None:
+            self._queued.append((request, pending))
+            return
+        try:
+            pending.response = self.handler(request)
+        except Exception as e:
+            pending.response = {'ok': False, 'message': f'处理请求出错: {e}'}
+        finally:
+            pending.event.set()
@@ -0,0 +1,281 @@
+import os
+import time
+import threading
+from collections import Counter
+from PyQt5.QtWidgets import QDialog, QVBoxLayout, QLineEdit, QListWidget, QListWidgetItem, QLabel, QStyle
+from PyQt5.QtCore import Qt, QObject, QEvent, pyqtSignal
+from utils.fuzzy_index import FuzzyIndex
+from launcher.icon_model import LaunchTimeRole
+from launcher.run_history_view import LastRunRole, STATUS_RUNNING
+
+def cmd_key(cmd):
+    return ('cmd', cmd)
+
+def icon_text(entry):
+    # 文件名在前（前缀匹配），所在文件夹也参与匹配
+    return f'{entry.name}  {os.path.dirname(entry.path)}'
+
+def icon_usage(entry):
+    """图标只记录了最近一次启动时间，按启动过一次计算使用频率"""
+    if not entry.launch_time:
+        return 0, None
+    try:
+        return 1, time.mktime(time.strptime(entry.launch_time, '%Y-%m-%d %H:%M:%S'))
+    except (TypeError, ValueError):
+        return 0, None
+
+class _BuildSignals(QObject):
+    """后台线程建立的索引转到界面线程"""
+    built = pyqtSignal(object)  # (FuzzyIndex, 命令计数)
+
+class PaletteIndexer(QObject):
+    """
+    把图标区域和命令区域的条目同步到 FuzzyIndex
+
+    第一次打开启动面板时在后台线程建立索引，之后跟随两个模型的增删信号增量更新；
+    模型重置、编辑命令文本等少见的变化只做标记，下次打开面板时再整体比对。
+    图标设置启动时间（set_launch_time）和命令开始运行（不含自动重启）记为一次启动，用于按使用频率排序。
+    """
+    ready = pyqtSignal()
+
+    def __init__(self, icon_model, cmd_area, run_history, parent=None):
+        super().__init__(parent)
+        self.icon_model = icon_model
+        self.cmd_area = cmd_area
+        self.run_history = run_history
+        self.index = None  # 建立完成前为 None
+        self._building = False
+        self._stale = False  # 模型有无法增量处理的变化，下次使用前需要整体比对
+        self._cmd_counts = Counter()  # 命令 -> 命令区域中的条数（允许重复的命令）
+        self._signals = _BuildSignals()
+        self._signals.built.connect(self._on_built)
+        icon_model.rowsInserted.connect(self._on_icons_inserted)
+        icon_model.rowsAboutToBeRemoved.connect(self._on_icons_removed)
+        icon_model.modelReset.connect(self._on_reset)
+        icon_model.dataChanged.connect(self._on_icon_changed)
+        cmd_model = cmd_area.model()
+        cmd_model.rowsInserted.connect(self._on_cmds_inserted)
+        cmd_model.rowsAboutToBeRemoved.connect(self._on_cmds_removed)
+        cmd_model.modelReset.connect(self._on_reset)
+        cmd_model.dataChanged.connect(self._on_cmd_changed)
+
+    def prepare(self):
+        """使用前调用：还没有索引时开始在后台建立，有标记的变化时整体比对"""
+        if self.index is not None:
+            if self._stale:
+                self.sync()
+            return
+        if self._building:
+            return
+        self._building = True
+        self._stale = False
+        entries = list(self.icon_model.entries)
+        cmds = [self.cmd_area.item(i).text() for i in range(self.cmd_area.count())]
+        threading.Thread(target=self._build, args=(entries, cmds), name='PaletteIndex', daemon=True).start()
+
+    def _build(self, entries, cmds):
+        index = FuzzyIndex()
+        counts = Counter(cmds)
+        usage = self.run_history.usage() if counts else {}
+        items = [(entry, icon_text(entry)) + icon_usage(entry) for entry in entries]
+        items.extend((cmd_key(cmd), cmd) + tuple(usage.get(cmd, (0, None))) for cmd in counts)
+        index.add_many(items)
+        self._signals.built.emit((index, counts))
+
+    def _on_built(self, result):
+        self.index, self._cmd_counts = result
+        self._building = False
+        if self._stale:
+            self.sync()
+        self.ready.emit()
+
+    def sync(self):
+        """与两个模型整体比对"""
+        self._stale = False
+        index = self.index
+        entries = self.icon_model.entries
+        counts = Counter(self.cmd_area.item(i).text() for i in range(self.cmd_area.count()))
+        wanted = set(entries)
+        wanted.update(cmd_key(cmd) for cmd in counts)
+        for key in index.keys():
+            if key not in wanted:
+                index.remove(key)
+        for entry in entries:
+            if entry not in index:
+                index.add(entry, icon_text(entry), *icon_usage(entry))
+        new_cmds = [cmd for cmd in counts if cmd_key(cmd) not in index]
+        if new_cmds:
+            usage = self.run_history.usage()
+            for cmd in new_cmds:
+                index.add(cmd_key(cmd), cmd, *usage.get(cmd, (0, None)))
+        self._cmd_counts = counts
+
+    def _pending(self):
+        # 索引尚未建立完成：正在建立时记下有变化，还没开始建立时不需要处理
+        if self.index is None:
+            self._stale = self._stale or self._building
+            return True
+        return False
+
+    def _on_reset(self):
+        self._stale = self.index is not None or self._building
+
+    # ---- 图标区域 ----
+    def _on_icons_inserted(self, parent, first, last):
+        if self._pending():
+            return
+        for row in range(first, last + 1):
+            entry = self.icon_model.entry(row)
+            self.index.add(entry, icon_text(entry), *icon_usage(entry))
+
+    def _on_icons_removed(self, parent, first, last):
+        if self._pending():
+            return
+        for row in range(first, last + 1):
+            self.index.remove(self.icon_model.entry(row))
+
+    def _on_icon_changed(self, top_left, bottom_right, roles):
+        if LaunchTimeRole not in roles or self._pending():
+            return
+        for row in range(top_left.row(), bottom_right.row() + 1):
+            self.index.touch(self.icon_model.entry(row))
+
+    # ---- 命令区域 ----
+    def _on_cmds_inserted(self, parent, first, last):
+        if self._pending():
+            return
+        for row in range(first, last + 1):
+            cmd = self.cmd_area.item(row).text()
+            self._cmd_counts[cmd] += 1
+            if self._cmd_counts[cmd] == 1:
+                summary = self.run_history.summary(cmd)
+                self.index.add(cmd_key(cmd), cmd, summary['count'], summary['last_start'])
+
+    def _on_cmds_removed(self, parent, first, last):
+        if self._pending():
+            return
+        for row in range(first, last + 1):
+            cmd = self.cmd_area.item(row).text()
+            self._cmd_counts[cmd] -= 1
+            if self._cmd_counts[cmd] <= 0:
+                del self._cmd_counts[cmd]
+                self.index.remove(cmd_key(cmd))
+
+    def _on_cmd_changed(self, top_left, bottom_right, roles):
+        if Qt.DisplayRole in roles or Qt.EditRole in roles or not roles:
+            # 编辑了命令文本，不知道原来的文本，下次使用前整体比对
+            self._stale = self.index is not None or self._building
+            return
+        if LastRunRole not in roles or self._pending():
+            return
+        for row in range(top_left.row(), bottom_right.row() + 1):
+            item = self.cmd_area.item(row)
+            run = item.data(LastRunRole)
+            # 自动重启带有 note，不算一次启动
+            if run and run.get('status') == STATUS_RUNNING and not run.get('note'):
+                self.index.touch(cmd_key(item.text()), run.get('start_time'))
+
+class LaunchPalette(QDialog):
+    """
+    快速启动面板（Ctrl+P）
+
+    输入时模糊匹配图标和命令，按匹配程度和使用频率排序，
+    上下键选择，回车或单击发出 launch_requested(键)，由主逻辑按原有方式启动。
+    """
+    launch_requested = pyqtSignal(object)  # IconEntry 或 ('cmd', 命令)
+
+    MAX_RESULTS = 50
+
+    def __init__(self, indexer, icon_cache=None, parent=None):
+        super().__init__(parent, Qt.Popup)
+        self.indexer = indexer
+        self.icon_cache = icon_cache
+        self._result_keys = []  # 与结果列表的行对应的候选键
+        self.indexer.ready.connect(self.refresh)
+        self.resize(600, 420)
+
+        self.query_edit = QLineEdit()
+        self.query_edit.setPlaceholderText('输入名称或命令，回车启动')
+        self.query_edit.textChanged.connect(self.refresh)
+        self.query_edit.returnPressed.connect(self.launch_current)
+        self.query_edit.installEventFilter(self)
+        self.result_list = QListWidget()
+        self.result_list.setUniformItemSizes(True)
+        self.result_list.itemClicked.connect(self._on_item_clicked)
+        self.status_label = QLabel()
+        self._cmd_icon = self.style().standardIcon(QStyle.SP_CommandLink)
+
+        layout = QVBoxLayout()
+        layout.setContentsMargins(6, 6, 6, 6)
+        layout.addWidget(self.query_edit)
+        layout.addWidget(self.result_list)
+        layout.addWidget(self.status_label)
+        self.setLayout(layout)
+
+    # 在主窗口上方居中弹出，清空上次的输入
+    def popup(self):
+        self.indexer.prepare()
+        if self.indexer.index is not None:
+            self.indexer.index.refresh_frecency()
+        parent = self.parentWidget()
+        if parent is not None:
+            geometry = parent.geometry()
+            self.move(geometry.x() + (geometry.width() - self.width()) // 2, geometry.y() + 40)
+        self.query_edit.blockSignals(True)
+        self.query_edit.clear()
+        self.query_edit.blockSignals(False)
+        self.refresh()
+        self.show()
+        self.activateWindow()
+        self.query_edit.setFocus()
+
+    def refresh(self):
+        index = self.indexer.index
+        self.result_list.clear()
+        self._result_keys = []
+        if index is None:
+            self.status_label.setText('正在建立索引...')
+            return
+        start = time.perf_counter()
+        results = index.search(self.query_edit.text(), self.MAX_RESULTS)
+        elapsed = (time.perf_counter() - start) * 1000
+        self._result_keys = [key for key, _ in results]
+        for key in self._result_keys:
+            self.result_list.addItem(self._make_item(key))
+        if results:
+            self.result_list.setCurrentRow(0)
+        self.status_label.setText(f'{len(results)} 项结果（共 {len(index)} 项），{elapsed:.1f} ms')
+
+    def _make_item(self, key):
+        if isinstance(key, tuple):
+            item = QListWidgetItem(self._cmd_icon, key[1])
+            item.setToolTip(f'命令: {key[1]}')
+        else:
+            item = QListWidgetItem(f'{key.name}    {os.path.dirname(key.path)}')
+            if self.icon_cache is not None:
+                item.setIcon(self.icon_cache.icon(key.path))
+            item.setToolTip(key.path)
+        return item
+
+    def launch_current(self):
+        row = self.result_list.currentRow()
+        if not 0 <= row < len(self._result_keys):
+            return
+        self.hide()
+        self.launch_requested.emit(self._result_keys[row])
+
+    def _on_item_clicked(self, item):
+        self.result_list.setCurrentItem(item)
+        self.launch_current()
+
+    def eventFilter(self, obj, event):
+        # 输入框中的上下键、翻页键移动结果列表的选择
+        if obj is self.query_edit and event.type() == QEvent.KeyPress:
+            count = self.result_list.count()
+            page = 10
+            moves = {Qt.Key_Up: -1, Qt.Key_Down: 1, Qt.Key_PageUp: -page, Qt.Key_PageDown: page}
+            if event.key() in moves and count:
+                row = self.result_list.currentRow() + moves[event.key()]
+                self.result_list.setCurrentRow(max(0, min(count - 1, row)))
+                return True
+        return super().eventFilter(obj, event)
@@ -0,0 +1,132 @@
+import time
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal
+from utils.launch_queue import LaunchQueue
+from utils.metrics import ICON_SPAWN_SECONDS, LAUNCH_FAILURES
+
+class LaunchScheduler(QObject):
+    """
+    由Qt事件循环驱动的依次启动调度器，替代在UI线程中 time.sleep 的做法
+
+    launch_func(entry) 负责真正启动一项，失败时抛出异常。
+    """
+    # 单项启动结果: 序号(从1开始), 条目, 是否成功, 启动延迟(毫秒), 错误信息
+    item_launched = pyqtSignal(int, object, bool, float, str)
+    # 进度: 已启动数量, 总数量
+    progress = pyqtSignal(int, int)
+    # 状态变化: idle / running / paused
+    state_changed = pyqtSignal(str)
+    # 一轮启动结束（全部启动完或被取消）
+    finished = pyqtSignal()
+
+    def __init__(self, launch_func, parent=None):
+        super().__init__(parent)
+        self.launch_func = launch_func
+        self.queue = LaunchQueue()
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self._on_timeout)
+
+    @property
+    def state(self):
+        return self.queue.state
+
+    def enqueue(self, entries, delay=None):
+        """按顺序追加待启动条目，delay 为启动间隔（秒）"""
+        was_idle = self.queue.state == LaunchQueue.IDLE
+        self.queue.extend(entries, delay)
+        self._after_change(was_idle)
+
+    def launch_now(self, entries):
+        """插队立即启动，不打断正在进行的一轮"""
+        was_idle = self.queue.state == LaunchQueue.IDLE
+        self.queue.push_front(entries)
+        self._after_change(was_idle)
+
+    def pause(self):
+        if self.queue.pause():
+            self._timer.stop()
+            self.state_changed.emit(self.queue.state)
+
+    def resume(self):
+        if self.queue.resume():
+            self.state_changed.emit(self.queue.state)
+            self._schedule()
+
+    def cancel(self):
+        if self.queue.state == LaunchQueue.IDLE:
+            return
+        self._timer.stop()
+        self.queue.cancel()
+        self.state_changed.emit(self.queue.state)
+        self.finished.emit()
+
+    def _after_change(self, was_idle):
+        if was_idle and self.queue.state != LaunchQueue.IDLE:
+            self.state_changed.emit(self.queue.state)
+        self.progress.emit(self.queue.done, self.queue.total)
+        self._schedule()
+
+    def _schedule(self):
+        wait = self.queue.time_until_next()
+        if wait is None:
+            self._timer.stop()
+            return
+        self._timer.start(int(wait * 1000))
+
+    def _on_timeout(self):
+        taken = self.queue.take_due()
+        if taken is None:
+            self._schedule()
+            return
+        entry, due = taken
+        index = self.queue.done
+        ok, error = True, ''
+        try:
+            self.launch_func(entry)
+        except Exception as e:
+            ok, error = False, str(e)
+        latency_ms = (time.monotonic() - due) * 1000
+        if ok:
+            ICON_SPAWN_SECONDS.observe(latency_ms / 1000)
+        else:
+            LAUNCH_FAILURES.inc(kind='icon')
+        self.item_launched.emit(index, entry, ok, latency_ms, error)
+        self.progress.emit(self.queue.done, self.queue.total)
+        if self.queue.state == LaunchQueue.IDLE:
+            self.state_changed.emit(self.queue.state)
+            self.finished.emit()
+        else:
+            self._schedule()
+
+class GroupLauncher(QObject):
+    """
+    启动组执行器：整组在进程监管器的事件循环中按依赖图并行启动，事件经信号转到界面线程
+
+    start_func(node) 在监管器线程中启动一个节点，返回 RunHandle 或 subprocess.Popen，失败时抛出异常。
+    """
+    # 启动组事件（dict），见 utils.launch_graph 的 EVENT_*
+    event = pyqtSignal(object)
+
+    def __init__(self, start_func, parent=None):
+        super().__init__(parent)
+        self.start_func = start_func
+        self.runs = {}  # 组名 -> 最近一次的 GroupRun
+
+    def start(self, group):
+        """启动一个组，同名的组正在启动时返回 None"""
+        from utils.launch_graph import start_group
+        run = self.runs.get(group.name)
+        if run is not None and not run.done:
+            return None
+        run = start_group(group, self.start_func, on_event=self.event.emit)
+        self.runs[group.name] = run
+        return run
+
+    def cancel(self, name):
+        run = self.runs.get(name)
+        if run is not None:
+            run.cancel()
+
+    def running(self):
+        """正在启动的组名"""
+        return [name for name, run in self.runs.items() if not run.done]
@@ -1,56 +1,89 @@
 import os
-import json
+import threading
 from PyQt5.QtWidgets import QListWidgetItem
-from PyQt5.QtGui import QIcon
-from PyQt5.QtCore import Qt
-from launcher.launcher_ui import IconItemWidget
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal
+from utils.data_writer import WriteBehindWriter
+from utils.metrics import SAVE_REQUESTS, SAVE_SNAPSHOT_SECONDS
+from utils.launcher_profile import LauncherProfile, DATA_FILE
+
+class _PathCheckSignals(QObject):
+    """后台检查图标路径的结果，跨线程发回UI线程"""
+    missing = pyqtSignal(object)  # 不存在的路径集合
 
 # 启动器数据管理类，负责保存和加载界面数据
 class LauncherData:
-    def __init__(self, data_file='data/launcher_data.json'):
+    def __init__(self, data_file=DATA_FILE, save_delay_ms=500):
         # 数据文件路径
         self.data_file = data_file
+        # 合并保存的时间窗口（毫秒），窗口内的多次保存只落盘一次
+        self.save_delay_ms = save_delay_ms
+        self._ui = None
+        self._dirty = False  # 是否有未保存的修改
+        self._save_timer = None
+        self._writer = WriteBehindWriter(self.data_file)
+        # 命令 -> 重启策略（RestartPolicy），只保存启用了自动重启的命令
+        self.cmd_policies = {}
+        self._path_signals = _PathCheckSignals()
+        self._path_signals.missing.connect(self._remove_missing)
 
-    # 保存界面数据到文件
+    # 标记数据已修改，延迟合并后在后台线程写入文件
     def save(self, ui):
-        data = {
-            # 保存图标区域的文件路径、勾选状态和启动时间
-            'icons': [(
-                ui.icon_area.item(i).data(Qt.UserRole),
-                ui.icon_area.itemWidget(ui.icon_area.item(i)).checkbox.isChecked(),
-                getattr(ui.icon_area.itemWidget(ui.icon_area.item(i)), 'time_label', None) and ui.icon_area.itemWidget(ui.icon_area.item(i)).time_label.text() or None,
-                getattr(ui.icon_area.itemWidget(ui.icon_area.item(i)), 'checked_order', None)
-            ) for i in range(ui.icon_area.count())],
-            # 保存命令区域的所有命令文本
-            'cmds': [ui.cmd_area.item(i).text() for i in range(ui.cmd_area.count())]
-        }
-        # print('[DEBUG][save] icons:', data['icons'])
-        # 写入JSON文件
-        with open(self.data_file, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        self._ui = ui
+        self._dirty = True
+        SAVE_REQUESTS.inc()
+        if self._save_timer is None:
+            self._save_timer = QTimer()
+            self._save_timer.setSingleShot(True)
+            self._save_timer.timeout.connect(self._write_snapshot)
+        # 重新计时，窗口内的多次修改合并为一次写入
+        self._save_timer.start(self.save_delay_ms)
+
+    # 立即写入所有未保存的修改并等待写入完成（退出和重启前调用）
+    def flush(self):
+        if self._save_timer is not None:
+            self._save_timer.stop()
+        self._write_snapshot()
+        self._writer.flush()
+
+    # 从界面收集需要保存的数据（格式由 LauncherProfile 定义，与命令行工具共用）
+    def snapshot(self, ui):
+        cmds = [ui.cmd_area.item(i).text() for i in range(ui.cmd_area.count())]
+        return LauncherProfile(ui.icon_model.entries, cmds, self.cmd_policies).to_dict()
+
+    # 在UI线程生成数据快照，交给后台线程原子写入
+    def _write_snapshot(self):
+        if not self._dirty or self._ui is None:
+            return
+        self._dirty = False
+        with SAVE_SNAPSHOT_SECONDS.time():
+            data = self.snapshot(self._ui)
+        self._writer.submit(data)
 
     # 从文件加载界面数据
     def load(self, ui):
-        if not os.path.exists(self.data_file):
-            return
-        with open(self.data_file, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        # print('[DEBUG][load] icons:', data.get('icons', []))
-        # 恢复图标区域
-        for icon_info in data.get('icons', []):
-            if isinstance(icon_info, (list, tuple)) and len(icon_info) >= 2:
-                path, checked = icon_info[0], icon_info[1]
-                launch_time = icon_info[2] if len(icon_info) > 2 else None
-                checked_order = icon_info[3] if len(icon_info) > 3 else None
-                if os.path.exists(path):
-                    item = QListWidgetItem()
-                    icon = QIcon(path)
-                    widget = IconItemWidget(icon, os.path.basename(path), launch_time)
-                    item.setData(Qt.UserRole, path)
-                    ui.icon_area.addItem(item)
-                    ui.icon_area.setItemWidget(item, widget)
-                    widget.checkbox.setChecked(checked)
-                    widget.checked_order = checked_order
+        profile = LauncherProfile.load(self.data_file)
+        # 恢复图标区域，只创建轻量的条目记录
+        entries = profile.icons
+        ui.icon_model.set_entries(entries)
+        # 在后台线程检查路径是否存在（网络路径、休眠的磁盘可能很慢），不存在的再从列表中移除
+        self._ui = ui
+        paths = [entry.path for entry in entries]
+        threading.Thread(target=self._check_paths, args=(paths,), daemon=True).start()
         # 恢复命令区域
-        for cmd in data.get('cmds', []):
-            ui.cmd_area.addItem(QListWidgetItem(cmd)) 
\ No newline at end of file
+        for cmd in profile.cmds:
+            ui.cmd_area.addItem(QListWidgetItem(cmd))
+        # 恢复重启策略（原地更新，监管器持有同一个字典）
+        self.cmd_policies.clear()
+        self.cmd_policies.update(profile.cmd_policies)
+
+    def _check_paths(self, paths):
+        missing = {path for path in paths if not os.path.exists(path)}
+        if missing:
+            self._path_signals.missing.emit(missing)
+
+    # 移除路径不存在的图标项（与原来加载时直接跳过一致，下次保存时从文件中去掉）
+    def _remove_missing(self, missing):
+        model = self._ui.icon_model
+        for row in reversed(range(model.rowCount())):
+            if model.entry(row).path in missing:
+                model.remove_row(row)
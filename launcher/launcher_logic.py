@@ -1,39 +1,82 @@
 import os
+import json
 import time
-import subprocess
 import threading
 import sys
-from PyQt5.QtWidgets import QListWidgetItem, QMessageBox, QInputDialog, QApplication, QMenu
-from PyQt5.QtGui import QIcon
+from PyQt5.QtWidgets import QListWidgetItem, QMessageBox, QInputDialog, QMenu, QSystemTrayIcon, QShortcut
 from PyQt5.QtCore import Qt
-from launcher.launcher_drag import DragDropHandler
-from launcher.launcher_ui import IconItemWidget
+from PyQt5.QtGui import QKeySequence
+from launcher.icon_model import IconEntry
 from launcher.log_viewer import LogViewer
+from launcher.run_history_view import RunSignals, LastRunRole, STATUS_RUNNING, STATUS_BACKOFF
+from launcher.restart_policy_dialog import RestartSignals
+from launcher.process_monitor import ProcessMonitor
+from launcher.icon_model import UsageRole
+from launcher.launch_scheduler import LaunchScheduler, GroupLauncher
+from utils.launch_queue import launch_path
+from utils.launcher_profile import find_icon
 from utils import subprocess_logger
 from utils.log_finder import open_command_log
+from utils.log_index import get_log_index
+from utils.log_search import get_log_search
+from utils.log_retention import LogRetention, RetentionPolicy
+from utils.app_logger import AppLogger
+from utils.run_history import get_run_history, run_from_handle, STATUS_SUCCESS, STATUS_CANCELLED
+from utils.restart_policy import (RestartSupervisor, STATE_RUNNING, STATE_BACKOFF, EVENT_SCHEDULED,
+                                  EVENT_RESTARTED, EVENT_RESTART_FAILED, EVENT_LIMIT, EVENT_CRASH_LOOP)
 from utils.process_utils import restart_program
+from utils.output_ring import get_output_rings
+from utils.metrics import get_metrics, CHILDREN_RUNNING, CHILDREN_QUEUED, PROCESS_TREES, OUTPUT_RING_BYTES
 
 # 启动器主逻辑类，负责界面与数据的交互和功能实现
 class LauncherLogic:
-    def __init__(self, ui, data):
+    def __init__(self, ui, data, profiler=None):
         self.ui = ui
         self.data = data
+        self.profiler = profiler  # 启动耗时分析（--profile-startup）
         self.log_dir = 'data/log'  # 日志目录
         os.makedirs(self.log_dir, exist_ok=True)  # 确保日志目录存在
+        # 在后台线程扫描一次日志目录建立索引，空格查看日志时直接命中
+        threading.Thread(target=get_log_index(self.log_dir).ensure_fresh, daemon=True).start()
         self.log_file = os.path.join(self.log_dir, 'launcher.log')  # 日志文件
+        # 应用日志在后台线程批量写入，同时输出结构化的 launcher.log.jsonl
+        self.app_logger = AppLogger(self.log_file, json_path=self.log_file + '.jsonl')
+        # 后台按保留策略压缩已结束的运行日志并清理超出上限的旧日志
+        self.log_retention = LogRetention(self.log_dir, RetentionPolicy.load())
+        self.log_retention.start()
+        # 后台为已结束的运行日志增量建立全文索引，供命令页的“搜索日志”使用
+        get_log_search(self.log_dir).start()
         self.scripts_folder = os.path.abspath('.')  # 脚本文件夹路径
-        self.drag_handler = DragDropHandler(self)  # 拖拽处理器
+        self.launch_scheduler = LaunchScheduler(self._launch_item)  # 依次启动调度器
+        self.groups_file = 'data/launch_groups.json'  # 启动组配置
+        self.group_launcher = GroupLauncher(self._start_group_node)  # 按依赖图启动的启动组
+        self.palette = None  # 快速启动面板（Ctrl+P），第一次使用时创建
+        self.diagnostics = None  # 诊断面板（Ctrl+Shift+D），第一次使用时创建
+        self.metrics_exporter = None  # 指标导出（--metrics 开启时由 main.py 设置）
+        self.run_history = get_run_history()  # 命令运行历史
+        self.run_signals = RunSignals()  # 命令运行结束通知（跨线程）
+        self.process_monitor = ProcessMonitor()  # 启动的进程树的CPU/内存采样
+        self.restart_signals = RestartSignals()  # 自动重启事件通知（跨线程）
+        # 按命令的重启策略自动重启退出的命令，策略保存在 launcher_data.json 中
+        self.restarter = RestartSupervisor(self._restart_cmd, self.data.cmd_policies,
+                                           on_event=self.restart_signals.event.emit)
         
+        self._mark('创建后台服务')
         # 创建日志查看器
         self.log_viewer = LogViewer(self.ui, self.log_dir)
+        self._mark('构建命令页')
         
         # 设置cmd_area的log_viewer引用，用于空格键查看日志
         self.ui.cmd_area.log_viewer = self.log_viewer
         
+        self.icon_model = self.ui.icon_model  # 图标区域数据模型
         self.connect_signals()  # 连接信号与槽
-        self.checked_order_counter = 1  # 勾选顺序号计数器
         self.load_items()  # 加载数据
-        self.update_numbers()  # 更新编号显示
+        self._mark('加载数据')
+
+    def _mark(self, phase):
+        if self.profiler is not None:
+            self.profiler.mark(phase)
 
     # 连接所有按钮和控件的信号
     def connect_signals(self):
@@ -44,55 +87,78 @@ class LauncherLogic:
         self.ui.btn_launch_cmd.clicked.connect(self.launch_cmd)
         self.ui.btn_log.clicked.connect(self.show_log)
         self.ui.btn_open_scripts.clicked.connect(self.open_scripts_folder)
-        self.ui.icon_area.model().rowsMoved.connect(self.update_numbers)
-        self.ui.icon_area.itemSelectionChanged.connect(self.update_numbers)
+        # 序号只取决于勾选顺序，与行位置和选中状态无关，拖动排序后只需保存
+        self.icon_model.rowsMoved.connect(self.save_items)
+        self.icon_model.check_changed.connect(self.on_icon_item_changed)
+        self.icon_model.files_dropped.connect(self.add_icon_items)
+        self.ui.icon_area.clicked.connect(self.on_icon_clicked)
         self.ui.icon_area.setContextMenuPolicy(Qt.CustomContextMenu)
         self.ui.icon_area.customContextMenuRequested.connect(self.icon_context_menu)
         self.ui.cmd_area.setContextMenuPolicy(Qt.CustomContextMenu)
         self.ui.cmd_area.customContextMenuRequested.connect(self.cmd_context_menu)
         self.ui.btn_restart.clicked.connect(restart_program)
-        
-        # 绑定清空日志按钮
-        if hasattr(self.ui, 'btn_clear_log'):
-            self.ui.btn_clear_log.clicked.connect(self.log_viewer.clear_log_display)
+        self.ui.btn_pause_launch.clicked.connect(self.toggle_launch_pause)
+        self.ui.btn_cancel_launch.clicked.connect(self.launch_scheduler.cancel)
+        self.launch_scheduler.item_launched.connect(self.on_item_launched)
+        self.launch_scheduler.progress.connect(self.on_launch_progress)
+        self.launch_scheduler.state_changed.connect(self.on_launch_state_changed)
+        self.run_signals.run_finished.connect(self.on_cmd_finished)
+        self.process_monitor.usage_updated.connect(self.on_usage_updated)
+        self.restart_signals.event.connect(self.on_restart_event)
+        self.group_launcher.event.connect(self.on_group_event)
+        # 启动组菜单在每次弹出时重新读取配置文件
+        self.group_menu = QMenu(self.ui.btn_launch_group)
+        self.group_menu.aboutToShow.connect(self.populate_group_menu)
+        self.ui.btn_launch_group.setMenu(self.group_menu)
+        self.process_monitor.start()
+        self.palette_shortcut = QShortcut(QKeySequence('Ctrl+P'), self.ui)
+        self.palette_shortcut.activated.connect(self.show_palette)
+        self.diagnostics_shortcut = QShortcut(QKeySequence('Ctrl+Shift+D'), self.ui)
+        self.diagnostics_shortcut.activated.connect(self.show_diagnostics)
+        # 子进程数等仪表在采集时读取，热路径上不需要记录
+        CHILDREN_RUNNING.set_function(lambda: self._supervisor_stat('running'))
+        CHILDREN_QUEUED.set_function(lambda: self._supervisor_stat('queued'))
+        PROCESS_TREES.set_function(lambda: len(self.process_monitor.sampler.usages()))
+        OUTPUT_RING_BYTES.set_function(lambda: get_output_rings().total_bytes())
+        # 清空日志按钮随命令页一起延迟创建，由 LogViewer 连接
 
     # 添加图标项到图标区域
     def add_icon_item(self, path):
-        name = os.path.basename(path)
-        item = QListWidgetItem()
-        icon = QIcon(path)
-        widget = IconItemWidget(icon, name)
-        item.setData(Qt.UserRole, path)
-        self.ui.icon_area.addItem(item)
-        self.ui.icon_area.setItemWidget(item, widget)
-        widget.checkbox.setChecked(False)
-        widget.set_item(item)
-        widget.on_checkbox_state_changed = self.on_icon_item_changed
+        self.icon_model.append(IconEntry(path))
         self.save_items()
-        self.update_numbers()
+
+    # 批量添加拖入的文件
+    def add_icon_items(self, paths):
+        for path in paths:
+            self.add_icon_item(path)
+
+    # 点击图标项切换勾选
+    def on_icon_clicked(self, index):
+        self.icon_model.toggle_checked(index.row())
 
     # 图标区域右键菜单，删除图标项
     def icon_context_menu(self, pos):
-        item = self.ui.icon_area.itemAt(pos)
-        if item:
+        index = self.ui.icon_area.indexAt(pos)
+        if index.isValid():
+            entry = self.icon_model.entry(index.row())
             menu = QMenu(self.ui.icon_area)
             action_launch = menu.addAction("立刻启动")
             action_delete = menu.addAction("删除")
             action = menu.exec_(self.ui.icon_area.mapToGlobal(pos))
             if action == action_launch:
-                self.launch_items([item])
+                self.launch_items([entry], immediate=True)
             elif action == action_delete:
-                name = item.text() or os.path.basename(item.data(Qt.UserRole))
                 reply = QMessageBox.question(
                     self.ui.icon_area,
                     "确认删除",
-                    f"是否删除 {name}？",
+                    f"是否删除 {entry.name}？",
                     QMessageBox.Yes | QMessageBox.No
                 )
                 if reply == QMessageBox.Yes:
-                    self.ui.icon_area.takeItem(self.ui.icon_area.row(item))
+                    row = self.icon_model.row_of(entry)
+                    if row >= 0:
+                        self.icon_model.remove_row(row)
                     self.save_items()
-                    self.update_numbers()
 
     # 命令区域右键菜单，删除命令项
     def cmd_context_menu(self, pos):
@@ -102,18 +168,17 @@ class LauncherLogic:
             action_launch = menu.addAction("立刻启动")
             action_edit = menu.addAction("编辑")
             action_open_log = menu.addAction("打开日志文件")
+            action_history = menu.addAction("运行历史")
+            action_policy = menu.addAction("重启策略...")
+            action_stop = menu.addAction("停止")
+            state = self.restarter.state(item.text())
+            action_stop.setEnabled(bool(state) and state['state'] in (STATE_RUNNING, STATE_BACKOFF))
             action_delete = menu.addAction("删除")
             menu.addSeparator()
             menu.addAction("提示: 按空格键可快速查看日志").setEnabled(False)
             action = menu.exec_(self.ui.cmd_area.mapToGlobal(pos))
             if action == action_launch:
-                cmd = item.text()
-                # 使用异步方式执行命令
-                log_filename = subprocess_logger.run_cmd_async_with_log(cmd)
-                if log_filename:
-                    self.write_log(f'异步启动命令: {cmd}，日志: {log_filename}')
-                    # 设置当前监控的日志文件
-                    self.log_viewer.set_current_log_file(log_filename)
+                self.start_cmd(item.text())
             elif action == action_edit:
                 old_cmd = item.text()
                 input_dialog = QInputDialog(self.ui)
@@ -125,7 +190,30 @@ class LauncherLogic:
                 new_cmd = input_dialog.textValue()
                 if ok and new_cmd.strip():
                     item.setText(new_cmd.strip())
+                    # 重启策略跟随命令
+                    policy = self.data.cmd_policies.pop(old_cmd, None)
+                    if policy is not None:
+                        self.data.cmd_policies[new_cmd.strip()] = policy
+                    if new_cmd.strip() != old_cmd:
+                        self.restarter.forget(old_cmd)
+                    self.refresh_cmd_status([item])
                     self.save_items()
+            elif action == action_history:
+                from launcher.run_history_view import RunHistoryDialog
+                dlg = RunHistoryDialog(self.run_history, item.text(), self.ui,
+                                       on_open_log=self.log_viewer.set_current_log_file)
+                dlg.exec_()
+            elif action == action_policy:
+                from launcher.restart_policy_dialog import RestartPolicyDialog
+                cmd = item.text()
+                dlg = RestartPolicyDialog(cmd, self.data.cmd_policies.get(cmd), self.ui)
+                if dlg.exec_():
+                    self.data.cmd_policies[cmd] = dlg.policy()
+                    self.write_log(f'重启策略: {cmd} -> {dlg.policy().mode}', event='restart_policy', cmd=cmd,
+                                   policy=dlg.policy().to_dict())
+                    self.save_items()
+            elif action == action_stop:
+                self.stop_cmd(item.text())
             elif action == action_open_log:
                 # 只打开日志文件，不在右边查看
                 success, message = open_command_log(item.text(), self.log_dir, self.ui)
@@ -141,85 +229,194 @@ class LauncherLogic:
                     QMessageBox.Yes | QMessageBox.No
                 )
                 if reply == QMessageBox.Yes:
+                    # 不再自动重启（不终止正在运行的进程）
+                    self.data.cmd_policies.pop(item.text(), None)
+                    self.restarter.forget(item.text())
                     self.ui.cmd_area.takeItem(self.ui.cmd_area.row(item))
                     self.save_items()
 
     # 启动所有图标项
     def launch_all(self):
-        self.launch_items([self.ui.icon_area.item(i) for i in range(self.ui.icon_area.count())])
+        self.launch_items(list(self.icon_model.entries))
 
     # 启动所有勾选的图标项
     def launch_checked(self):
-        # 按checked_order排序启动
-        checked_items = []
-        for i in range(self.ui.icon_area.count()):
-            item = self.ui.icon_area.item(i)
-            widget = self.ui.icon_area.itemWidget(item)
-            if widget and widget.checkbox.isChecked() and widget.checked_order is not None:
-                checked_items.append((item, widget.checked_order))
-        checked_items.sort(key=lambda x: x[1])
-        items = [item for item, _ in checked_items]
-        self.launch_items(items)
+        # 按勾选顺序启动
+        self.launch_items(self.icon_model.checked_entries())
 
     # 清空所有勾选
     def clear_checked(self):
-        for i in range(self.ui.icon_area.count()):
-            widget = self.ui.icon_area.itemWidget(self.ui.icon_area.item(i))
-            if widget:
-                widget.checkbox.setChecked(False)
-        self.update_numbers()
-
-    # 启动传入的图标项列表
-    def launch_items(self, items):
-        delay = self.ui.delay_spin.value()  # 启动间隔
-        for idx, item in enumerate(items):
-            path = item.data(Qt.UserRole)
-            try:
-                subprocess.Popen([path], shell=True)
-                self.write_log(f'启动: {path}')
-                # 设置启动时间
-                widget = self.ui.icon_area.itemWidget(item)
-                if widget:
-                    widget.set_launch_time(time.strftime('%Y-%m-%d %H:%M:%S'))
-            except Exception as e:
-                self.write_log(f'启动失败: {path} 错误: {e}')
-            if idx < len(items) - 1:
-                QApplication.processEvents()
-                time.sleep(delay)
+        self.icon_model.clear_checked()
         self.save_items()
 
-    # 更新图标项的编号显示
-    def update_numbers(self):
-        # 收集所有勾选的 item 及其顺序号
-        checked_items = []
-        for i in range(self.ui.icon_area.count()):
-            item = self.ui.icon_area.item(i)
-            widget = self.ui.icon_area.itemWidget(item)
-            if widget and widget.checkbox.isChecked() and widget.checked_order is not None:
-                checked_items.append((item, widget.checked_order))
-        # 按checked_order排序
-        checked_items.sort(key=lambda x: x[1])
-        # 给所有 item 设置显示
-        for i in range(self.ui.icon_area.count()):
-            item = self.ui.icon_area.item(i)
-            path = item.data(Qt.UserRole)
-            widget = self.ui.icon_area.itemWidget(item)
-            if not widget:
-                icon = QIcon(path)
-                widget = IconItemWidget(icon, os.path.basename(path))
-                self.ui.icon_area.setItemWidget(item, widget)
-            # 查找item在checked_items中的序号
-            idx = None
-            for pos, (checked_item, _) in enumerate(checked_items):
-                if item is checked_item:
-                    idx = pos + 1
-                    break
-            if idx is not None:
-                widget.name_label.setText(f'{idx}. {os.path.basename(path)}')
-            else:
-                widget.name_label.setText(os.path.basename(path))
+    # 启动传入的图标项列表，交给调度器按延迟依次启动，不阻塞界面
+    def launch_items(self, items, immediate=False):
+        if immediate:
+            self.launch_scheduler.launch_now(items)
+        else:
+            self.launch_scheduler.enqueue(items, self.ui.delay_spin.value())
+
+    # 调度器回调：真正启动一项，失败时抛出异常
+    def _launch_item(self, entry):
+        process = launch_path(entry.path)
+        self._track_icon_launch(entry, process.pid)
+
+    def _track_icon_launch(self, entry, pid):
+        # 跟踪进程树的资源占用，显示在图标右侧
+        self.process_monitor.track(entry, pid)
+        # 设置启动时间
+        self.icon_model.set_launch_time(entry, time.strftime('%Y-%m-%d %H:%M:%S'))
+
+    def on_item_launched(self, index, entry, ok, latency_ms, error):
+        path = entry.path
+        if ok:
+            self.write_log(f'启动: {path} (延迟 {latency_ms:.0f}ms)', event='launch', path=path, latency_ms=round(latency_ms, 1))
+        else:
+            self.write_log(f'启动失败: {path} 错误: {error}', level='ERROR', event='launch', path=path, error=error)
         self.save_items()
 
+    def on_launch_progress(self, done, total):
+        if self.launch_scheduler.state == 'idle':
+            self.ui.launch_status_label.setText(f'已启动 {done}/{total}' if total else '')
+        else:
+            self.ui.launch_status_label.setText(f'启动中 {done}/{total}')
+
+    def on_launch_state_changed(self, state):
+        running = state != 'idle'
+        self.ui.btn_pause_launch.setEnabled(running)
+        self.ui.btn_cancel_launch.setEnabled(running)
+        self.ui.btn_pause_launch.setText('继续' if state == 'paused' else '暂停')
+        self.on_launch_progress(self.launch_scheduler.queue.done, self.launch_scheduler.queue.total)
+
+    # 暂停/继续依次启动
+    def toggle_launch_pause(self):
+        if self.launch_scheduler.state == 'paused':
+            self.launch_scheduler.resume()
+        else:
+            self.launch_scheduler.pause()
+
+    # 填充启动组菜单：配置中的每个组、正在启动的组的取消项和编辑配置
+    def populate_group_menu(self):
+        from utils.launch_graph import load_groups
+        self.group_menu.clear()
+        groups, errors = load_groups(self.groups_file)
+        running = self.group_launcher.running()
+        for group in groups:
+            action = self.group_menu.addAction(f'{group.name}（{len(group.nodes)} 项）')
+            action.setEnabled(group.name not in running)
+            action.triggered.connect(lambda _checked, g=group: self.launch_group(g))
+        for error in errors:
+            self.group_menu.addAction(f'配置错误: {error}').setEnabled(False)
+        if not groups and not errors:
+            self.group_menu.addAction('没有启动组').setEnabled(False)
+        self.group_menu.addSeparator()
+        for name in running:
+            self.group_menu.addAction(f'取消启动组: {name}').triggered.connect(
+                lambda _checked, n=name: self.group_launcher.cancel(n))
+        self.group_menu.addAction('编辑启动组配置...').triggered.connect(self.edit_groups_file)
+
+    # 打开启动组配置文件，不存在时写入示例
+    def edit_groups_file(self):
+        from utils.launch_graph import EXAMPLE_CONFIG
+        if not os.path.exists(self.groups_file):
+            os.makedirs(os.path.dirname(self.groups_file), exist_ok=True)
+            with open(self.groups_file, 'w', encoding='utf-8') as f:
+                json.dump(EXAMPLE_CONFIG, f, ensure_ascii=False, indent=2)
+        os.startfile(os.path.abspath(self.groups_file))
+
+    def launch_group(self, group):
+        if self.group_launcher.start(group) is None:
+            return
+        self.write_log(f'启动组: {group.name}，顺序: {" -> ".join(group.order)}', event='group_start',
+                       group=group.name, nodes=group.order)
+        self.ui.launch_status_label.setText(f'启动组 {group.name}: 就绪 0/{len(group.nodes)}')
+
+    # 启动组回调（在监管器线程中调用）：启动一个节点
+    def _start_group_node(self, node):
+        if node.kind == 'cmd':
+            handle = subprocess_logger.start_cmd_with_log(node.target, self.log_dir)
+            handle.add_done_callback(self.run_signals.run_finished.emit)
+            return handle
+        if not os.path.exists(node.target):
+            raise FileNotFoundError(node.target)
+        return launch_path(node.target)
+
+    # 启动组事件（已由信号转到界面线程）
+    def on_group_event(self, event):
+        from utils.launch_graph import EVENT_NODE, EVENT_FINISHED, NODE_PROBING, NODE_READY, NODE_FAILED, NODE_SKIPPED
+        name = event['group']
+        group_run = self.group_launcher.runs.get(name)
+        if event['type'] == EVENT_NODE:
+            status, target = event['status'], event['target']
+            if status == NODE_PROBING:
+                run = event['run']
+                if event['kind'] == 'cmd':
+                    self._track_cmd_run(target, run)
+                    self.restarter.watch(target, run)
+                else:
+                    entry = self.icon_model.entry_for_path(target)
+                    if entry is not None:
+                        self._track_icon_launch(entry, run.pid)
+                        self.save_items()
+                self.write_log(f"启动组 {name}: 启动 {event['node']}", event='group_node_start',
+                               group=name, node=event['node'], target=target)
+            elif status == NODE_READY:
+                self.write_log(f"启动组 {name}: {event['node']} 已就绪", event='group_node_ready',
+                               group=name, node=event['node'])
+            elif status in (NODE_FAILED, NODE_SKIPPED):
+                self.write_log(f"启动组 {name}: {event['node']} {'失败' if status == NODE_FAILED else '跳过'}，"
+                               f"{event.get('error')}", level='WARNING', event='group_node_' + status,
+                               group=name, node=event['node'], error=event.get('error'))
+            if group_run is not None and not group_run.done:
+                counts = group_run.counts()
+                self.ui.launch_status_label.setText(
+                    f"启动组 {name}: 就绪 {counts.get(NODE_READY, 0)}/{len(group_run.group.nodes)}")
+        elif event['type'] == EVENT_FINISHED:
+            results = event['results']
+            ready = sum(1 for status in results.values() if status == NODE_READY)
+            text = f"启动组 {name}: 就绪 {ready}/{len(results)}，耗时 {event['elapsed']:.1f}秒"
+            self.ui.launch_status_label.setText(text)
+            self.write_log(text, level='INFO' if event['ok'] else 'WARNING', event='group_end', group=name,
+                           ok=event['ok'], elapsed=round(event['elapsed'], 2), results=results)
+            if event['ok']:
+                self.ui.tray_manager.show_message('启动组已就绪', text)
+            else:
+                failed = [node for node, status in results.items() if status != NODE_READY]
+                self.ui.tray_manager.show_message('启动组未全部就绪', f"{text}\n未就绪: {', '.join(failed)}",
+                                                  QSystemTrayIcon.Warning, 10000)
+
+    # 显示快速启动面板，第一次使用时在后台建立图标和命令的模糊匹配索引
+    def show_palette(self):
+        if self.palette is None:
+            from launcher.launch_palette import LaunchPalette, PaletteIndexer
+            indexer = PaletteIndexer(self.icon_model, self.ui.cmd_area, self.run_history, self.ui)
+            self.palette = LaunchPalette(indexer, self.ui.icon_cache, self.ui)
+            self.palette.launch_requested.connect(self.launch_from_palette)
+        self.palette.popup()
+
+    # 显示诊断面板：热路径的计数、耗时分布和子进程数
+    def show_diagnostics(self):
+        if self.diagnostics is None:
+            from launcher.diagnostics_dialog import DiagnosticsDialog
+            self.diagnostics = DiagnosticsDialog(get_metrics(), self.metrics_exporter, self.ui)
+        self.diagnostics.exporter = self.metrics_exporter
+        self.diagnostics.show()
+        self.diagnostics.raise_()
+        self.diagnostics.activateWindow()
+
+    # 子进程数仪表的取值：采集时才导入进程监管器（会导入 asyncio），不拖慢启动
+    def _supervisor_stat(self, key):
+        from utils.process_supervisor import get_supervisor
+        return get_supervisor().stats()[key]
+
+    # 按原有方式启动面板中选择的图标或命令
+    def launch_from_palette(self, key):
+        if isinstance(key, IconEntry):
+            if self.icon_model.row_of(key) >= 0:
+                self.launch_items([key], immediate=True)
+        else:
+            self.start_cmd(key[1])
+
     # 添加命令到命令区域
     def add_command(self):
         text, ok = QInputDialog.getText(self.ui, '添加命令', '输入命令:')
@@ -232,24 +429,120 @@ class LauncherLogic:
     def launch_cmd(self):
         items = [self.ui.cmd_area.item(i) for i in range(self.ui.cmd_area.count()) if self.ui.cmd_area.item(i).isSelected()]
         for item in items:
-            cmd = item.text()
-            # 使用异步方式执行命令
-            log_filename = subprocess_logger.run_cmd_async_with_log(cmd)
-            if log_filename:
-                self.write_log(f'异步启动命令: {cmd}，日志: {log_filename}')
-                # 设置当前监控的日志文件
-                self.log_viewer.set_current_log_file(log_filename)
+            self.start_cmd(item.text())
+
+    # 由进程监管器异步执行命令，实时显示日志并在命令右侧显示运行状态
+    def start_cmd(self, cmd):
+        handle = subprocess_logger.start_cmd_with_log(cmd, self.log_dir)
+        log_filename = handle.log_path
+        self.write_log(f'异步启动命令: {cmd}，日志: {log_filename}', event='cmd_start', cmd=cmd, log=log_filename)
+        handle.add_done_callback(self.run_signals.run_finished.emit)
+        self._track_cmd_run(cmd, handle)
+        # 按重启策略监管，手动启动会取消等待中的重启
+        self.restarter.watch(cmd, handle)
+        # 设置当前监控的日志文件
+        self.log_viewer.set_current_log_file(log_filename)
+        return handle
+
+    # 在命令右侧显示运行状态和资源占用
+    def _track_cmd_run(self, cmd, handle, note=None):
+        self._set_cmd_status(cmd, {'status': STATUS_RUNNING, 'start_time': time.time(), 'note': note})
+        self.process_monitor.track(('cmd', cmd), handle)
+
+    # 重启监管器回调（在监管器线程中调用）：追加到上次的日志，或按策略写入新日志
+    def _restart_cmd(self, cmd, log_path):
+        handle = subprocess_logger.start_cmd_with_log(cmd, self.log_dir, existing_log_filename=log_path)
+        # 先于监管器的回调登记，界面总是先收到运行结束、再收到重启事件
+        handle.add_done_callback(self.run_signals.run_finished.emit)
+        return handle
+
+    # 停止命令：取消等待中的自动重启并终止正在运行的进程
+    def stop_cmd(self, cmd):
+        state = self.restarter.state(cmd)
+        self.restarter.stop(cmd)
+        self.write_log(f'停止命令: {cmd}', event='cmd_stop', cmd=cmd)
+        if state and state['state'] == STATE_BACKOFF:
+            self._set_cmd_status(cmd, {'status': STATUS_CANCELLED, 'note': '已停止自动重启'})
+
+    # 自动重启事件（已由信号转到界面线程）
+    def on_restart_event(self, event):
+        cmd = event['cmd']
+        kind = event['type']
+        tray = self.ui.tray_manager
+        if kind == EVENT_SCHEDULED:
+            self._set_cmd_status(cmd, {'status': STATUS_BACKOFF, 'restart_at': time.time() + event['delay'],
+                                       'note': f"第{event['attempt']}次"})
+            self.write_log(f"命令退出，{event['delay']:.1f}秒后自动重启: {cmd}，退出代码: {event['exit_code']}",
+                           level='WARNING', event='cmd_restart_scheduled', cmd=cmd,
+                           delay=round(event['delay'], 2), attempt=event['attempt'], exit_code=event['exit_code'])
+        elif kind == EVENT_RESTARTED:
+            handle, previous = event['handle'], event['previous']
+            self._track_cmd_run(cmd, handle, note=f"已自动重启{event['total']}次")
+            self.write_log(f'自动重启命令: {cmd}，日志: {handle.log_path}', event='cmd_restart', cmd=cmd,
+                           log=handle.log_path, total=event['total'])
+            # 正在查看上一次运行的日志时切换到新日志
+            if previous is not None and self.log_viewer.current_log_file == previous.log_path != handle.log_path:
+                self.log_viewer.set_current_log_file(handle.log_path)
+            exit_code = previous.exit_code if previous is not None else None
+            tray.show_message('命令已自动重启', f"{cmd}\n退出代码: {exit_code}，累计重启 {event['total']} 次")
+        elif kind in (EVENT_LIMIT, EVENT_CRASH_LOOP):
+            if kind == EVENT_CRASH_LOOP:
+                reason = f"连续 {event['count']} 次启动后很快退出（崩溃循环）"
+            else:
+                reason = f"重启次数达到上限（{event['count']} 次）"
+            run = run_from_handle(event['handle'])
+            run['note'] = '崩溃循环，已停止重启' if kind == EVENT_CRASH_LOOP else '重启次数超限，已停止重启'
+            self._set_cmd_status(cmd, run)
+            self.write_log(f'停止自动重启: {cmd}，{reason}', level='ERROR', event='cmd_restart_stopped',
+                           cmd=cmd, reason=kind, count=event['count'], exit_code=event['exit_code'])
+            tray.show_message('已停止自动重启', f'{cmd}\n{reason}', QSystemTrayIcon.Warning, 10000)
+        elif kind == EVENT_RESTART_FAILED:
+            self.write_log(f"自动重启失败: {cmd} 错误: {event['error']}", level='ERROR',
+                           event='cmd_restart_failed', cmd=cmd, error=event['error'])
+            tray.show_message('自动重启失败', f"{cmd}\n{event['error']}", QSystemTrayIcon.Critical, 10000)
+
+    # 命令运行结束（已由信号转到界面线程）
+    def on_cmd_finished(self, handle):
+        run = run_from_handle(handle)
+        self._set_cmd_status(handle.cmd, run)
+        self.write_log(f"命令结束: {handle.cmd}，结果: {run['status']}，退出代码: {handle.exit_code}",
+                       level='INFO' if run['status'] == STATUS_SUCCESS else 'WARNING',
+                       event='cmd_end', cmd=handle.cmd, exit_code=handle.exit_code,
+                       duration=run['duration'], log=handle.log_path)
+
+    # 进程资源占用有变化，更新图标和命令右侧的显示
+    def on_usage_updated(self, usages):
+        self.icon_model.set_usages(usages)
+        for i in range(self.ui.cmd_area.count()):
+            item = self.ui.cmd_area.item(i)
+            usage = usages.get(('cmd', item.text()))
+            if item.data(UsageRole) != usage:
+                item.setData(UsageRole, usage)
+
+    def _set_cmd_status(self, cmd, run):
+        for i in range(self.ui.cmd_area.count()):
+            item = self.ui.cmd_area.item(i)
+            if item.text() == cmd:
+                item.setData(LastRunRole, run)
+
+    # 从运行历史读取命令最近一次运行的状态
+    def refresh_cmd_status(self, items=None):
+        if items is None:
+            items = [self.ui.cmd_area.item(i) for i in range(self.ui.cmd_area.count())]
+        last_runs = self.run_history.last_runs(item.text() for item in items)
+        for item in items:
+            item.setData(LastRunRole, last_runs.get(item.text()))
 
     # 显示日志内容
     def show_log(self):
+        self.app_logger.flush()  # 先写入队列中尚未落盘的记录
         if not os.path.exists(self.log_file):
             QMessageBox.information(self.ui, '日志', '暂无日志')
             return
-        with open(self.log_file, 'r', encoding='utf-8') as f:
-            log = f.read()
-        dlg = QMessageBox(self.ui)
-        dlg.setWindowTitle('日志')
-        dlg.setText(log[-2000:] if len(log) > 2000 else log)
+        from launcher.log_tail_dialog import LogTailDialog
+        # 从文件末尾读取，可继续向前翻到轮转出去的旧日志
+        paths = [self.log_file] + [f'{self.log_file}.{i}' for i in range(1, self.app_logger.backups + 1)]
+        dlg = LogTailDialog(paths, self.ui)
         dlg.exec_()
 
     # 打开脚本文件夹
@@ -260,12 +553,33 @@ class LauncherLogic:
         else:
             QMessageBox.warning(self.ui, '错误', '脚本文件夹不存在')
 
-    # 写入日志
-    def write_log(self, msg):
-        log_entry = f'{time.strftime("%Y-%m-%d %H:%M:%S")} {msg}'
-        os.makedirs(self.log_dir, exist_ok=True)  # 确保日志目录存在
-        with open(self.log_file, 'a', encoding='utf-8') as f:
-            f.write(log_entry + '\n')
+    # 处理再次运行 main.py 转发来的请求（界面线程），返回回复 dict
+    def handle_request(self, request):
+        from utils.instance_ipc import ACTION_SHOW, ACTION_LAUNCH, ACTION_RUN, ACTION_TAIL, tail_response
+        action = request.get('action')
+        if action == ACTION_SHOW:
+            self.ui.tray_manager.show_and_focus_window()
+            return {'ok': True, 'message': '已显示窗口'}
+        if action == ACTION_LAUNCH:
+            target = str(request.get('target', ''))
+            entry = find_icon(self.icon_model.entries, target)
+            if entry is None:
+                return {'ok': False, 'message': f'图标区域中没有: {target}'}
+            self.launch_items([entry], immediate=True)
+            return {'ok': True, 'message': f'启动: {entry.path}'}
+        if action == ACTION_RUN:
+            cmd = str(request.get('cmd', '')).strip()
+            if not cmd:
+                return {'ok': False, 'message': '命令为空'}
+            handle = self.start_cmd(cmd)
+            return {'ok': True, 'message': f'已运行命令，日志: {handle.log_path}', 'log': handle.log_path}
+        if action == ACTION_TAIL:
+            return tail_response(str(request.get('cmd', '')), int(request.get('lines', 50)), self.log_dir)
+        return {'ok': False, 'message': f'未知请求: {action}'}
+
+    # 写入日志（只放入队列，由后台线程批量写入并按大小轮转）
+    def write_log(self, msg, level='INFO', **fields):
+        self.app_logger.log(msg, level, **fields)
 
     # 保存界面数据
     def save_items(self):
@@ -274,25 +588,8 @@ class LauncherLogic:
     # 加载界面数据
     def load_items(self):
         self.data.load(self.ui)
-        # 恢复控件的item和回调绑定
-        max_checked_order = 0
-        for i in range(self.ui.icon_area.count()):
-            item = self.ui.icon_area.item(i)
-            widget = self.ui.icon_area.itemWidget(item)
-            if widget:
-                widget.set_item(item)
-                widget.on_checkbox_state_changed = self.on_icon_item_changed
-                # 检查最大 checked_order
-                if widget.checked_order is not None and widget.checked_order > max_checked_order:
-                    max_checked_order = widget.checked_order
-        self.checked_order_counter = max_checked_order + 1
-
-    def on_icon_item_changed(self, item):
-        widget = self.ui.icon_area.itemWidget(item)
-        if widget:
-            if widget.checkbox.isChecked():
-                widget.checked_order = self.checked_order_counter
-                self.checked_order_counter += 1
-            else:
-                widget.checked_order = None
-        self.update_numbers() 
\ No newline at end of file
+        self.refresh_cmd_status()
+
+    # 勾选状态变化后保存（序号由模型增量维护）
+    def on_icon_item_changed(self, entry):
+        self.save_items()
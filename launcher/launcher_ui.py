@@ -1,9 +1,11 @@
-from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QListWidget, QLabel, QSpinBox, QListWidgetItem, QFileDialog, QInputDialog, QMessageBox, QStackedWidget, QSizePolicy, QFrame, QCheckBox)
+from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QListWidget, QListView, QLabel, QSpinBox, QListWidgetItem, QFileDialog, QInputDialog, QMessageBox, QStackedWidget, QSizePolicy, QFrame, QAbstractItemView)
 from PyQt5.QtGui import QIcon, QKeySequence
-from PyQt5.QtCore import Qt, QSize
-from typing import Optional, Callable
+from PyQt5.QtCore import Qt, QSize, QTimer, pyqtSignal
 from launcher.tray_manager import TrayManager
 from launcher.icon_creator import create_window_icon
+from launcher.icon_model import IconListModel, IconItemDelegate
+from launcher.icon_cache import IconCache
+from launcher.run_history_view import CommandItemDelegate
 from utils.process_utils import restart_program
 
 # 自定义命令列表控件，支持空格键查看日志
@@ -27,8 +29,12 @@ class CommandListWidget(QListWidget):
 
 # 启动器主界面类，负责界面布局和控件初始化
 class LauncherUI(QWidget):
+    # 窗口第一次绘制完成（启动时在此之后再加载数据和其余模块）
+    first_painted = pyqtSignal()
+
     def __init__(self):
         super().__init__()
+        self._painted = False
         self.setWindowTitle('QuickLauncher')  # 设置窗口标题
         self.resize(800, 500)  # 设置窗口大小
         # 设置窗口图标
@@ -54,10 +60,17 @@ class LauncherUI(QWidget):
         self.stack = QStackedWidget()
 
         # --- 软件启动页 ---
-        self.icon_area = QListWidget()
-        self.icon_area.setSelectionMode(QListWidget.MultiSelection)
-        self.icon_area.setDragDropMode(QListWidget.InternalMove)
-        self.icon_area.setIconSize(QSize(48, 48))
+        # 使用模型/视图，只有可见行才会被绘制；图标由缓存在后台加载
+        self.icon_cache = IconCache('data/icon_cache', size=20)
+        self.icon_model = IconListModel(self.icon_cache)
+        self.icon_area = QListView()
+        self.icon_area.setModel(self.icon_model)
+        self.icon_area.setItemDelegate(IconItemDelegate(self.icon_area))
+        self.icon_area.setUniformItemSizes(True)
+        self.icon_area.setSelectionMode(QAbstractItemView.MultiSelection)
+        # 内部拖动排序由模型的 dropMimeData 完成，外部拖入的文件由模型转发
+        self.icon_area.setDragDropMode(QAbstractItemView.DragDrop)
+        self.icon_area.setIconSize(QSize(20, 20))
         self.icon_area.setAcceptDrops(True)
         self.icon_area.setDragEnabled(True)
         self.icon_area.viewport().setAcceptDrops(True)
@@ -67,17 +80,29 @@ class LauncherUI(QWidget):
         btn_all = QPushButton('全部启动')
         btn_checked = QPushButton('启动勾选')
         btn_clear = QPushButton('清空勾选')
+        # 按依赖图和就绪探测启动的启动组（菜单由 LauncherLogic 填充）
+        self.btn_launch_group = QPushButton('启动组')
         self.delay_spin = QSpinBox()
         self.delay_spin.setRange(0, 60)
         self.delay_spin.setValue(2)
         delay_label = QLabel('延迟(秒)')
+        # 依次启动的进度和控制按钮
+        self.launch_status_label = QLabel('')
+        self.btn_pause_launch = QPushButton('暂停')
+        self.btn_cancel_launch = QPushButton('取消启动')
+        self.btn_pause_launch.setEnabled(False)
+        self.btn_cancel_launch.setEnabled(False)
         icon_btn_layout = QHBoxLayout()
         icon_btn_layout.addWidget(btn_all)
         icon_btn_layout.addWidget(btn_checked)
         icon_btn_layout.addWidget(btn_clear)
+        icon_btn_layout.addWidget(self.btn_launch_group)
         icon_btn_layout.addWidget(delay_label)
         icon_btn_layout.addWidget(self.delay_spin)
         icon_btn_layout.addStretch()
+        icon_btn_layout.addWidget(self.launch_status_label)
+        icon_btn_layout.addWidget(self.btn_pause_launch)
+        icon_btn_layout.addWidget(self.btn_cancel_launch)
 
         icon_page_layout = QVBoxLayout()
         icon_page_layout.addWidget(QLabel('图标区域（可拖动排序，拖入可添加）'))
@@ -91,6 +116,7 @@ class LauncherUI(QWidget):
         self.cmd_area = CommandListWidget()
         self.cmd_area.setSelectionMode(QListWidget.MultiSelection)
         self.cmd_area.setDragDropMode(QListWidget.InternalMove)
+        self.cmd_area.setItemDelegate(CommandItemDelegate(self.cmd_area))
         
         # 初始化命令按钮
         btn_add_cmd = QPushButton('添加命令')
@@ -147,6 +173,13 @@ class LauncherUI(QWidget):
         self.btn_software.setChecked(False)
         self.btn_command.setChecked(True)
 
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if not self._painted:
+            self._painted = True
+            # 等本轮绘制（包括子控件）结束后再通知
+            QTimer.singleShot(0, self.first_painted.emit)
+
     def closeEvent(self, event):
         event.ignore()
         self.hide()
@@ -164,37 +197,3 @@ class LauncherUI(QWidget):
             restart_program()
         else:
             super().keyPressEvent(event)
-
-class IconItemWidget(QWidget):
-    def __init__(self, icon, name, launch_time=None, parent=None):
-        super().__init__(parent)
-        layout = QHBoxLayout(self)
-        self.checkbox = QCheckBox()
-        self.name_label = QLabel(name)
-        self.time_label = QLabel(launch_time or "")
-        layout.addWidget(self.checkbox)
-        layout.addWidget(self.name_label)
-        layout.addStretch()
-        layout.addWidget(self.time_label)
-        layout.setContentsMargins(2, 2, 2, 2)
-        self.setLayout(layout)
-        self.setAttribute(Qt.WA_Hover, True)
-        self.checked_order = None  # 新增：勾选顺序号
-        self._item = None  # 保存对应的QListWidgetItem
-        self.on_checkbox_state_changed: Optional[Callable] = None  # 外部注入的回调
-        self.checkbox.stateChanged.connect(self._checkbox_state_changed)
-
-    def set_item(self, item):
-        self._item = item
-
-    def _checkbox_state_changed(self, state):
-        if self.on_checkbox_state_changed and self._item is not None:
-            self.on_checkbox_state_changed(self._item)
-
-    def mousePressEvent(self, event):
-        if event.button() == Qt.LeftButton:
-            self.checkbox.setChecked(not self.checkbox.isChecked())
-        super().mousePressEvent(event)
-
-    def set_launch_time(self, launch_time):
-        self.time_label.setText(launch_time) 
\ No newline at end of file
@@ -0,0 +1,301 @@
+import threading
+from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QPlainTextEdit, QScrollBar,
+                             QLabel, QLineEdit, QPushButton, QTextEdit)
+from PyQt5.QtCore import Qt, QObject, QEvent, pyqtSignal
+from PyQt5.QtGui import QIntValidator, QColor, QTextFormat, QTextCursor
+from utils.line_index import SparseLineIndex, MappedLogFile
+
+class _IndexSignals(QObject):
+    # 已索引行数, 已索引字节数, 文件大小
+    progress = pyqtSignal(int, int, int)
+
+class _IndexWorker(threading.Thread):
+    """后台建立行索引的线程，使用自己的 mmap，文件增长后由 wake() 唤醒继续索引"""
+    STEP_BYTES = 64 * 1024 * 1024
+    def __init__(self, path, index, signals):
+        super().__init__(name='LogLineIndexer', daemon=True)
+        self.path = path
+        self.index = index
+        self.signals = signals
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+
+    def wake(self):
+        self._wake.set()
+
+    def stop(self):
+        self._stopped.set()
+        self._wake.set()
+
+    def run(self):
+        try:
+            mapped = MappedLogFile(self.path)
+        except OSError as e:
+            print(f"打开日志文件出错: {e}")
+            return
+        try:
+            while not self._stopped.is_set():
+                self._wake.clear()
+                size = mapped.remap()
+                # 分段索引，每段结束后报告进度，界面可以边建边浏览
+                while mapped.map is not None and self.index.indexed_bytes < size and not self._stopped.is_set():
+                    step_end = min(size, self.index.indexed_bytes + self.STEP_BYTES)
+                    self.index.extend(mapped.map, step_end, should_stop=self._stopped.is_set)
+                    self.signals.progress.emit(self.index.line_count, self.index.indexed_bytes, size)
+                if self._stopped.is_set():
+                    break
+                self.signals.progress.emit(self.index.line_count, self.index.indexed_bytes, size)
+                self._wake.wait()
+        finally:
+            mapped.close()
+
+class LogPageView(QWidget):
+    """
+    大日志文件的分页查看控件
+
+    文件通过 mmap 映射，行偏移索引在后台线程中增量建立；
+    只解码并显示当前窗口内的行，内存占用与文件大小无关。
+    支持滚动浏览整个文件、跳转到指定行和跳到末尾，停在末尾时自动跟随新增内容。
+    """
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.path = None
+        self.index = None
+        self._mapped = None
+        self._worker = None
+        self._signals = None
+        self._file_size = 0
+        self._following = True  # 停在末尾时跟随新增内容
+        self._pending_line = None  # 跳转目标尚未被索引到时暂存
+        self._highlight_line = None  # 高亮显示的行（从0开始），如搜索结果所在行
+
+        # 顶部工具栏：状态、跳转到行、跳到末尾
+        self.status_label = QLabel()
+        self.line_edit = QLineEdit()
+        self.line_edit.setPlaceholderText('行号')
+        self.line_edit.setValidator(QIntValidator(1, 2 ** 31 - 1, self))
+        self.line_edit.setFixedWidth(90)
+        self.line_edit.returnPressed.connect(self._on_goto_clicked)
+        self.btn_goto = QPushButton('跳转')
+        self.btn_goto.clicked.connect(self._on_goto_clicked)
+        self.btn_end = QPushButton('跳到末尾')
+        self.btn_end.clicked.connect(self.goto_end)
+
+        bar_layout = QHBoxLayout()
+        bar_layout.setContentsMargins(0, 0, 0, 0)
+        bar_layout.addWidget(self.status_label)
+        bar_layout.addStretch()
+        bar_layout.addWidget(self.line_edit)
+        bar_layout.addWidget(self.btn_goto)
+        bar_layout.addWidget(self.btn_end)
+
+        # 文本区只放可见的几十行，纵向滚动由外部滚动条按行号控制
+        self.text = QPlainTextEdit()
+        self.text.setReadOnly(True)
+        self.text.setLineWrapMode(QPlainTextEdit.NoWrap)
+        self.text.setVerticalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+        self.text.installEventFilter(self)
+        self.text.viewport().installEventFilter(self)
+
+        self.scrollbar = QScrollBar(Qt.Vertical)
+        self.scrollbar.valueChanged.connect(self._on_scroll)
+
+        body_layout = QHBoxLayout()
+        body_layout.setContentsMargins(0, 0, 0, 0)
+        body_layout.setSpacing(0)
+        body_layout.addWidget(self.text)
+        body_layout.addWidget(self.scrollbar)
+
+        layout = QVBoxLayout()
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.addLayout(bar_layout)
+        layout.addLayout(body_layout)
+        self.setLayout(layout)
+
+    # 打开文件并在后台建立索引
+    def open(self, path):
+        self.close()
+        self.path = path
+        self.index = SparseLineIndex()
+        self._following = True
+        self._pending_line = None
+        self._highlight_line = None
+        try:
+            self._mapped = MappedLogFile(path)
+        except OSError as e:
+            self._mapped = None
+            self.status_label.setText(f'打开日志文件出错: {e}')
+            return
+        self._file_size = self._mapped.size
+        # 每个后台线程使用独立的信号对象，旧文件残留的进度通知不会影响新文件
+        self._signals = _IndexSignals()
+        self._signals.progress.connect(self._on_index_progress)
+        self._worker = _IndexWorker(path, self.index, self._signals)
+        self._worker.start()
+        self._update_status()
+
+    # 关闭文件，停止后台索引
+    def close(self):
+        if self._worker is not None:
+            self._worker.stop()
+            self._worker = None
+        if self._signals is not None:
+            self._signals.progress.disconnect(self._on_index_progress)
+            self._signals = None
+        if self._mapped is not None:
+            self._mapped.close()
+            self._mapped = None
+        self.path = None
+        self.index = None
+        self.text.clear()
+        self.scrollbar.setRange(0, 0)
+        self.status_label.clear()
+
+    # 文件有新增内容，继续索引
+    def refresh(self):
+        if self._worker is not None:
+            self._worker.wake()
+
+    # 可见行数
+    def visible_lines(self):
+        line_height = max(1, self.text.fontMetrics().lineSpacing())
+        return max(1, self.text.viewport().height() // line_height)
+
+    # 当前显示的第一行（从0开始）
+    def first_line(self):
+        return self.scrollbar.value()
+
+    # 跳转到指定行（从1开始），尚未索引到时等索引完成后再跳；highlight 时把该行居中并高亮
+    def goto_line(self, line, highlight=False):
+        target = max(0, line - 1)
+        if self.index is None:
+            return
+        if highlight:
+            self._highlight_line = target
+        if target >= self.index.line_count and self.index.indexed_bytes < self._file_size:
+            self._pending_line = target
+            self._update_status()
+            return
+        self._pending_line = None
+        self._following = False
+        if self._highlight_line == target:
+            target = max(0, target - self.visible_lines() // 2)
+        self.scrollbar.setValue(min(target, self.scrollbar.maximum()))
+        self._render()
+
+    # 跳到文件末尾并跟随新增内容
+    def goto_end(self):
+        self._following = True
+        self._pending_line = None
+        self.scrollbar.setValue(self.scrollbar.maximum())
+        self._render()
+
+    def _on_goto_clicked(self):
+        text = self.line_edit.text()
+        if text:
+            self.goto_line(int(text))
+
+    def _on_index_progress(self, line_count, indexed_bytes, file_size):
+        if self.index is None:
+            return
+        self._file_size = file_size
+        self._update_range()
+        if self._pending_line is not None and (self._pending_line < line_count or indexed_bytes >= file_size):
+            self.goto_line(self._pending_line + 1)
+        elif self._following:
+            self.scrollbar.setValue(self.scrollbar.maximum())
+        self._render()
+        self._update_status()
+
+    def _update_range(self):
+        if self.index is None:
+            return
+        maximum = max(0, self.index.line_count - self.visible_lines())
+        self.scrollbar.blockSignals(True)
+        self.scrollbar.setRange(0, maximum)
+        self.scrollbar.setPageStep(self.visible_lines())
+        self.scrollbar.blockSignals(False)
+
+    def _on_scroll(self, value):
+        self._following = value >= self.scrollbar.maximum()
+        self._render()
+
+    # 只解码并显示当前窗口内的行
+    def _render(self):
+        if self.index is None or self._mapped is None:
+            return
+        if self.index.indexed_bytes > self._mapped.size:
+            try:
+                self._mapped.remap()
+            except (OSError, ValueError) as e:
+                print(f"重新映射日志文件出错: {e}")
+                return
+        if self._mapped.map is None:
+            self.text.clear()
+            return
+        lines = self.index.read_lines(self._mapped.map, self.first_line(), self.visible_lines())
+        hbar = self.text.horizontalScrollBar()
+        h_value = hbar.value()
+        self.text.setPlainText('\n'.join(lines))
+        self._apply_highlight(len(lines))
+        hbar.setValue(h_value)
+        self._update_status()
+
+    def _apply_highlight(self, shown):
+        selections = []
+        row = None if self._highlight_line is None else self._highlight_line - self.first_line()
+        if row is not None and 0 <= row < shown:
+            selection = QTextEdit.ExtraSelection()
+            selection.format.setBackground(QColor(255, 235, 150))
+            selection.format.setProperty(QTextFormat.FullWidthSelection, True)
+            selection.cursor = QTextCursor(self.text.document().findBlockByNumber(row))
+            selections.append(selection)
+        self.text.setExtraSelections(selections)
+
+    def _update_status(self):
+        if self.index is None:
+            return
+        total = self.index.line_count
+        first = self.first_line() + 1 if total else 0
+        last = min(total, self.first_line() + self.visible_lines())
+        status = f'第 {first}-{last} 行 / 共 {total} 行'
+        if self.index.indexed_bytes < self._file_size:
+            status += f'（索引中 {self.index.indexed_bytes * 100 // max(1, self._file_size)}%）'
+        if self._pending_line is not None:
+            status += f'，等待跳转到第 {self._pending_line + 1} 行'
+        self.status_label.setText(status)
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self._update_range()
+        if self._following:
+            self.scrollbar.setValue(self.scrollbar.maximum())
+        elif self._highlight_line is not None and not 0 <= self._highlight_line - self.first_line() < self.visible_lines():
+            # 跳转时还未完成布局，尺寸变化后让高亮行重新居中
+            self.scrollbar.setValue(max(0, self._highlight_line - self.visible_lines() // 2))
+        self._render()
+
+    def eventFilter(self, obj, event):
+        # 滚轮和翻页键转交给外部滚动条，按行滚动
+        if event.type() == QEvent.Wheel and obj is self.text.viewport():
+            if event.angleDelta().y():
+                steps = event.angleDelta().y() // 40
+                self.scrollbar.setValue(self.scrollbar.value() - steps)
+                return True
+        elif event.type() == QEvent.KeyPress and obj is self.text:
+            key = event.key()
+            page = self.visible_lines()
+            moves = {
+                Qt.Key_Up: -1, Qt.Key_Down: 1,
+                Qt.Key_PageUp: -page, Qt.Key_PageDown: page,
+            }
+            if key in moves:
+                self.scrollbar.setValue(self.scrollbar.value() + moves[key])
+                return True
+            if key == Qt.Key_Home and event.modifiers() & Qt.ControlModifier:
+                self.scrollbar.setValue(0)
+                return True
+            if key == Qt.Key_End and event.modifiers() & Qt.ControlModifier:
+                self.goto_end()
+                return True
+        return super().eventFilter(obj, event)
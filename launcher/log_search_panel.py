@@ -0,0 +1,185 @@
+import os
+import time
+import threading
+from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLineEdit, QCheckBox, QComboBox,
+                             QPushButton, QListWidget, QListWidgetItem, QLabel)
+from PyQt5.QtCore import Qt, QObject, pyqtSignal
+from utils.log_filename import get_base_log_filename
+
+# 结果项上保存 (日志路径, 行号) 的角色
+HitRole = Qt.UserRole
+
+class _SearchSignals(QObject):
+    """搜索线程的结果分批转到界面线程"""
+    hits = pyqtSignal(int, object)  # 搜索序号, [结果 dict]
+    finished = pyqtSignal(int, object)  # 搜索序号, 统计 dict（出错时为错误信息字符串）
+
+class LogSearchPanel(QWidget):
+    """
+    命令日志全文搜索面板
+
+    在后台线程中查询 utils.log_search 的索引，结果分批流式加入列表，
+    单击结果发出 hit_activated(日志路径, 行号)，由日志查看器跳转到该行。
+    """
+    hit_activated = pyqtSignal(str, int)
+
+    TIME_RANGES = [('全部时间', None), ('最近1小时', 3600), ('最近24小时', 86400),
+                   ('最近7天', 7 * 86400), ('最近30天', 30 * 86400)]
+    MAX_RESULTS = 2000
+    BATCH_SECONDS = 0.1  # 结果最多攒这么久再发给界面
+
+    def __init__(self, log_dir='data/log', commands=None, parent=None):
+        super().__init__(parent)
+        self.log_dir = log_dir
+        self.commands = commands or (lambda: [])  # 返回命令列表，用于按命令过滤
+        self._search_id = 0
+        self._stop = None  # 当前搜索的停止标志
+        self._signals = _SearchSignals()
+        self._signals.hits.connect(self._on_hits)
+        self._signals.finished.connect(self._on_finished)
+
+        self.query_edit = QLineEdit()
+        self.query_edit.setPlaceholderText('搜索所有命令日志（回车搜索）')
+        self.query_edit.returnPressed.connect(self.start_search)
+        self.regex_check = QCheckBox('正则')
+        self.case_check = QCheckBox('区分大小写')
+        self.cmd_combo = QComboBox()
+        self.cmd_combo.setMinimumContentsLength(12)
+        self.cmd_combo.setSizeAdjustPolicy(QComboBox.AdjustToMinimumContentsLengthWithIcon)
+        self.time_combo = QComboBox()
+        for text, _ in self.TIME_RANGES:
+            self.time_combo.addItem(text)
+        self.btn_search = QPushButton('搜索')
+        self.btn_search.clicked.connect(self.start_search)
+        self.btn_stop = QPushButton('停止')
+        self.btn_stop.clicked.connect(self.stop_search)
+        self.btn_stop.setEnabled(False)
+
+        query_layout = QHBoxLayout()
+        query_layout.setContentsMargins(0, 0, 0, 0)
+        query_layout.addWidget(self.query_edit, 1)
+        query_layout.addWidget(self.regex_check)
+        query_layout.addWidget(self.case_check)
+        query_layout.addWidget(self.btn_search)
+        query_layout.addWidget(self.btn_stop)
+
+        filter_layout = QHBoxLayout()
+        filter_layout.setContentsMargins(0, 0, 0, 0)
+        filter_layout.addWidget(QLabel('命令'))
+        filter_layout.addWidget(self.cmd_combo, 1)
+        filter_layout.addWidget(QLabel('时间'))
+        filter_layout.addWidget(self.time_combo)
+
+        self.result_list = QListWidget()
+        self.result_list.setUniformItemSizes(True)
+        self.result_list.itemClicked.connect(self._on_item_activated)
+        self.result_list.itemActivated.connect(self._on_item_activated)
+        self.status_label = QLabel()
+
+        layout = QVBoxLayout()
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.addLayout(query_layout)
+        layout.addLayout(filter_layout)
+        layout.addWidget(self.result_list)
+        layout.addWidget(self.status_label)
+        self.setLayout(layout)
+        self.refresh_commands()
+
+    # 重新读取命令列表，保留当前选择
+    def refresh_commands(self):
+        current = self.cmd_combo.currentData()
+        self.cmd_combo.blockSignals(True)
+        self.cmd_combo.clear()
+        self.cmd_combo.addItem('全部命令', None)
+        for cmd in self.commands():
+            self.cmd_combo.addItem(cmd, cmd)
+        index = self.cmd_combo.findData(current) if current is not None else 0
+        self.cmd_combo.setCurrentIndex(max(0, index))
+        self.cmd_combo.blockSignals(False)
+
+    # 显示面板并聚焦输入框
+    def activate(self):
+        self.refresh_commands()
+        self.show()
+        self.query_edit.setFocus()
+        self.query_edit.selectAll()
+
+    def start_search(self):
+        query = self.query_edit.text()
+        if not query:
+            return
+        self.stop_search()
+        self._search_id += 1
+        self._stop = threading.Event()
+        cmd = self.cmd_combo.currentData()
+        seconds = self.TIME_RANGES[self.time_combo.currentIndex()][1]
+        options = {
+            'regex': self.regex_check.isChecked(),
+            'ignore_case': not self.case_check.isChecked(),
+            'base': get_base_log_filename(cmd) if cmd else None,
+            'since': time.time() - seconds if seconds else None,
+            'max_results': self.MAX_RESULTS,
+        }
+        self.result_list.clear()
+        self.status_label.setText('搜索中...')
+        self.btn_stop.setEnabled(True)
+        threading.Thread(target=self._run, args=(self._search_id, query, options, self._stop),
+                         name='LogSearch', daemon=True).start()
+
+    def stop_search(self):
+        if self._stop is not None:
+            self._stop.set()
+            self._stop = None
+        self.btn_stop.setEnabled(False)
+
+    def _run(self, search_id, query, options, stop):
+        from utils.log_search import get_log_search
+        pending = []
+        last_emit = time.monotonic()
+
+        def on_hit(hit):
+            nonlocal last_emit
+            pending.append(hit)
+            now = time.monotonic()
+            if now - last_emit >= self.BATCH_SECONDS or len(pending) >= 200:
+                self._signals.hits.emit(search_id, pending[:])
+                pending.clear()
+                last_emit = now
+
+        try:
+            stats = get_log_search(self.log_dir).search(query, on_hit=on_hit, should_stop=stop.is_set, **options)
+        except Exception as e:
+            stats = f'搜索失败: {e}'
+        if pending:
+            self._signals.hits.emit(search_id, pending)
+        self._signals.finished.emit(search_id, stats)
+
+    def _on_hits(self, search_id, hits):
+        if search_id != self._search_id:
+            return
+        for hit in hits:
+            ts = hit['ts']  # YYYYmmdd_HHMMSS
+            run_time = f'{ts[4:6]}-{ts[6:8]} {ts[9:11]}:{ts[11:13]}'
+            item = QListWidgetItem(f"{hit['base']}  {run_time}  第{hit['line']}行: {hit['text'].strip()}")
+            item.setToolTip(f"{os.path.basename(hit['path'])}:{hit['line']}")
+            item.setData(HitRole, (hit['path'], hit['line']))
+            self.result_list.addItem(item)
+        self.status_label.setText(f'搜索中... 已找到 {self.result_list.count()} 条')
+
+    def _on_finished(self, search_id, stats):
+        if search_id != self._search_id:
+            return
+        self.btn_stop.setEnabled(False)
+        self._stop = None
+        if isinstance(stats, str):
+            self.status_label.setText(stats)
+            return
+        text = (f"{stats['hits']} 条结果，扫描 {stats['files']}/{stats['total']} 个日志"
+                f"（索引筛选后 {stats['candidates']} 个），{stats['elapsed'] * 1000:.0f} ms")
+        if stats['truncated']:
+            text += f'，只显示前 {self.MAX_RESULTS} 条'
+        self.status_label.setText(text)
+
+    def _on_item_activated(self, item):
+        path, line = item.data(HitRole)
+        self.hit_activated.emit(path, line)
@@ -0,0 +1,91 @@
+import os
+from PyQt5.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QPlainTextEdit, QLineEdit,
+                             QPushButton, QLabel)
+from utils.log_tail import TailReader
+
+class LogTailDialog(QDialog):
+    """
+    查看应用日志的对话框
+
+    打开时只从文件末尾读取最后一页，打开耗时与日志大小无关；
+    点击“加载更早的日志”继续向前翻页（包括轮转出去的 launcher.log.1 ...），
+    过滤框按关键字（不区分大小写）筛选已加载的行。
+    """
+    PAGE_LINES = 500
+
+    def __init__(self, paths, parent=None, title='日志'):
+        super().__init__(parent)
+        self.setWindowTitle(title)
+        self.resize(900, 600)
+        self.reader = TailReader(paths)
+        self.lines = []  # 已加载的行（按文件顺序）
+
+        self.filter_edit = QLineEdit()
+        self.filter_edit.setPlaceholderText('过滤（输入关键字）')
+        self.filter_edit.setClearButtonEnabled(True)
+        self.filter_edit.textChanged.connect(self.render)
+
+        self.text = QPlainTextEdit()
+        self.text.setReadOnly(True)
+        self.text.setLineWrapMode(QPlainTextEdit.NoWrap)
+
+        self.status_label = QLabel()
+        self.btn_more = QPushButton('加载更早的日志')
+        self.btn_more.clicked.connect(self.load_more)
+        btn_close = QPushButton('关闭')
+        btn_close.clicked.connect(self.accept)
+
+        btn_layout = QHBoxLayout()
+        btn_layout.addWidget(self.btn_more)
+        btn_layout.addWidget(self.status_label)
+        btn_layout.addStretch()
+        btn_layout.addWidget(btn_close)
+
+        layout = QVBoxLayout()
+        layout.addWidget(self.filter_edit)
+        layout.addWidget(self.text)
+        layout.addLayout(btn_layout)
+        self.setLayout(layout)
+
+        self.load_more()
+
+    # 向前加载一页
+    def load_more(self):
+        older = self.reader.read_previous(self.PAGE_LINES)
+        first_load = not self.lines
+        self.lines = older + self.lines
+        bar = self.text.verticalScrollBar()
+        offset = bar.value()
+        added = len(self._filtered(older))
+        self.render()
+        if first_load:
+            bar.setValue(bar.maximum())
+        else:
+            # 保持原来看到的位置不动，新加载的内容在上方
+            bar.setValue(offset + added)
+        self._update_status()
+
+    def _filtered(self, lines):
+        keyword = self.filter_edit.text().strip().lower()
+        if not keyword:
+            return lines
+        return [line for line in lines if keyword in line.lower()]
+
+    # 按过滤条件显示已加载的行
+    def render(self):
+        shown = self._filtered(self.lines)
+        self.text.setPlainText('\n'.join(shown))
+        self.text.verticalScrollBar().setValue(self.text.verticalScrollBar().maximum())
+        self._update_status(len(shown))
+
+    def _update_status(self, shown=None):
+        shown = len(self._filtered(self.lines)) if shown is None else shown
+        status = f'已加载 {len(self.lines)} 行'
+        if shown != len(self.lines):
+            status += f'，匹配 {shown} 行'
+        if self.reader.at_start:
+            status += '（已到最早的日志）'
+        elif self.reader.current_path:
+            status += f'（{os.path.basename(self.reader.current_path)}）'
+        self.status_label.setText(status)
+        self.btn_more.setEnabled(not self.reader.at_start)
@@ -0,0 +1,221 @@
+import os
+import sys
+import time
+import codecs
+from PyQt5.QtCore import QObject, QTimer, QFileSystemWatcher, pyqtSignal
+from utils.metrics import get_metrics, TAIL_LAG_SECONDS, TAIL_BEHIND_BYTES
+
+class LogTailer(QObject):
+    """
+    事件驱动的日志跟踪器
+
+    - 保持文件句柄打开，按字节读取新增内容，并用增量UTF-8解码器解码，
+      多字节字符跨两次读取也不会乱码。
+    - 由 QFileSystemWatcher（Linux 下为 inotify）的文件变化通知驱动，空闲时不占用CPU；
+      无法监听时退回自适应轮询：有新内容时缩短间隔，空闲时逐步拉长。
+    - Windows 下写入方一直打开文件追加时，QFileSystemWatcher 可能收不到变化通知，
+      监听时另外检查文件大小/修改时间，有变化时补读一次；检查间隔在文件空闲时逐步拉长。
+      其他平台的通知可靠，不做这项检查，空闲时没有定时唤醒。
+    - 文件被截断或被替换（删除后重建、改名覆盖）时发出 reset，并从头重新读取。
+    """
+    text_appended = pyqtSignal(str)
+    # 文件被截断或替换，已显示的内容作废
+    reset = pyqtSignal()
+
+    READ_LIMIT = 4 * 1024 * 1024  # 单次最多读取的字节数，剩余部分在下一轮事件循环继续读
+    MIN_POLL_MS = 50
+    MAX_POLL_MS = 2000
+    STAT_CHECK = sys.platform == 'win32'  # 监听模式下是否检查文件大小/修改时间
+    MIN_STAT_CHECK_MS = 250
+    MAX_STAT_CHECK_MS = 8000
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.path = None
+        self._file = None
+        self._identity = None  # (st_dev, st_ino)，用于识别文件替换
+        self._position = 0
+        self._decoder = None
+        self._watcher = QFileSystemWatcher(self)
+        self._watcher.fileChanged.connect(self._on_file_changed)
+        self._watcher.directoryChanged.connect(self._on_directory_changed)
+        self._poll_timer = QTimer(self)
+        self._poll_timer.setSingleShot(True)
+        self._poll_timer.timeout.connect(self._poll)
+        self._poll_interval = self.MIN_POLL_MS
+        self._continue_timer = QTimer(self)
+        self._continue_timer.setSingleShot(True)
+        self._continue_timer.timeout.connect(self.read_available)
+        self._stat_timer = QTimer(self)
+        self._stat_timer.setSingleShot(True)
+        self._stat_timer.timeout.connect(self._check_stat)
+        self._stat_interval = self.MIN_STAT_CHECK_MS
+        self._last_stat = None  # 上次读取时文件的 (大小, 修改时间)
+        self.polling = False  # 是否处于轮询模式
+        self._caught_up = False  # 是否已读完开始跟踪时已有的内容（之后才记录跟踪延迟）
+
+    @property
+    def position(self):
+        return self._position
+
+    def follow(self, path, offset=0):
+        """
+        开始跟踪文件
+
+        Args:
+            path: 日志文件路径
+            offset: 从哪个字节位置开始读取（0 表示从头读取全部内容）
+        """
+        self.stop()
+        self.path = path
+        self._position = offset
+        self._caught_up = False
+        self._open()
+        self._watch()
+        self.read_available()
+
+    def stop(self):
+        """停止跟踪并关闭文件句柄"""
+        paths = self._watcher.files() + self._watcher.directories()
+        if paths:
+            self._watcher.removePaths(paths)
+        self._poll_timer.stop()
+        self._continue_timer.stop()
+        self._stat_timer.stop()
+        self._last_stat = None
+        self._close()
+        self.path = None
+        self.polling = False
+
+    def _open(self):
+        self._close()
+        self._decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+        try:
+            self._file = open(self.path, 'rb')
+            st = os.fstat(self._file.fileno())
+            self._identity = (st.st_dev, st.st_ino)
+            if self._position > st.st_size:
+                self._position = 0
+            self._file.seek(self._position)
+        except OSError:
+            self._file = None
+            self._identity = None
+
+    def _close(self):
+        if self._file is not None:
+            try:
+                self._file.close()
+            except OSError:
+                pass
+        self._file = None
+
+    def _watch(self):
+        directory = os.path.dirname(os.path.abspath(self.path))
+        file_ok = os.path.exists(self.path) and self._watcher.addPath(self.path)
+        dir_ok = self._watcher.addPath(directory)
+        self.polling = not (file_ok and dir_ok)
+        if self.polling:
+            self._poll_interval = self.MIN_POLL_MS
+            self._poll_timer.start(self._poll_interval)
+        elif self.STAT_CHECK:
+            self._stat_interval = self.MIN_STAT_CHECK_MS
+            self._stat_timer.start(self._stat_interval)
+
+    def _on_file_changed(self, path):
+        self.read_available()
+        if self._stat_timer.isActive():
+            # 文件正在写入，检查间隔恢复到最短
+            self._stat_interval = self.MIN_STAT_CHECK_MS
+            self._stat_timer.start(self._stat_interval)
+        # 文件被删除或替换后监听会失效，需要重新添加
+        if self.path and path == self.path and path not in self._watcher.files() and os.path.exists(path):
+            self._watcher.addPath(path)
+
+    def _on_directory_changed(self, _):
+        if not self.path:
+            return
+        if self.path not in self._watcher.files() and os.path.exists(self.path):
+            self._watcher.addPath(self.path)
+        self.read_available()
+
+    def _poll(self):
+        got_data = self.read_available()
+        if got_data:
+            self._poll_interval = self.MIN_POLL_MS
+        else:
+            self._poll_interval = min(self._poll_interval * 2, self.MAX_POLL_MS)
+        if self.polling and self.path:
+            self._poll_timer.start(self._poll_interval)
+
+    def _check_stat(self):
+        # 监听漏掉的追加：大小或修改时间与上次读取时不同才读取；没有变化时下次检查的间隔加倍
+        if not self.path or self.polling:
+            return
+        try:
+            st = os.stat(self.path)
+            changed = (st.st_size, st.st_mtime_ns) != self._last_stat
+        except OSError:
+            changed = False
+        if changed and self.read_available():
+            self._stat_interval = self.MIN_STAT_CHECK_MS
+        else:
+            self._stat_interval = min(self._stat_interval * 2, self.MAX_STAT_CHECK_MS)
+        self._stat_timer.start(self._stat_interval)
+
+    def _check_replaced(self):
+        """检查文件是否被截断或替换，是则重新打开并发出 reset"""
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return False
+        self._last_stat = (st.st_size, st.st_mtime_ns)
+        identity = (st.st_dev, st.st_ino)
+        if self._file is None or identity != self._identity or st.st_size < self._position:
+            replaced = identity != self._identity
+            self._position = 0
+            self._open()
+            if replaced and not self.polling:
+                # 新文件需要重新建立监听，旧的监听还指向被替换掉的文件
+                if self.path in self._watcher.files():
+                    self._watcher.removePath(self.path)
+                self._watcher.addPath(self.path)
+            self.reset.emit()
+            return True
+        return False
+
+    def read_available(self):
+        """读取所有新增内容，返回是否读到了数据"""
+        if not self.path:
+            return False
+        self._check_replaced()
+        if self._file is None:
+            return False
+        try:
+            data = self._file.read(self.READ_LIMIT)
+        except OSError as e:
+            print(f"读取日志文件出错: {e}")
+            return False
+        if not data:
+            self._caught_up = True
+            return False
+        self._position += len(data)
+        text = self._decoder.decode(data)
+        if text:
+            self.text_appended.emit(text)
+        if self._caught_up and get_metrics().enabled:
+            self._record_lag()
+        if len(data) >= self.READ_LIMIT:
+            # 还有剩余内容，让出事件循环后继续读取，避免界面卡顿
+            self._continue_timer.start(0)
+        else:
+            self._caught_up = True
+        return True
+
+    def _record_lag(self):
+        # 跟踪延迟：文件最后一次写入到这次读出并显示的时间，以及还没读到的字节数
+        try:
+            st = os.fstat(self._file.fileno())
+        except OSError:
+            return
+        TAIL_LAG_SECONDS.observe(max(0.0, time.time() - st.st_mtime))
+        TAIL_BEHIND_BYTES.set(max(0, st.st_size - self._position))
@@ -1,35 +1,66 @@
 import os
 import time
-from PyQt5.QtWidgets import QWidget, QVBoxLayout, QLabel, QTextEdit, QSplitter, QPushButton, QHBoxLayout
-from PyQt5.QtCore import Qt, QTimer, pyqtSignal, QObject
-from PyQt5.QtGui import QTextCursor
+import threading
+from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QLabel, QTextEdit, QSplitter, QPushButton, QHBoxLayout,
+                             QStackedWidget, QShortcut)
+from PyQt5.QtCore import Qt, pyqtSignal, QObject
+from PyQt5.QtGui import QTextCursor, QKeySequence
 from utils.log_finder import find_command_log_files
+from launcher.log_tailer import LogTailer
+from launcher.output_follower import OutputFollower
+from launcher.log_page_view import LogPageView
+from launcher.log_search_panel import LogSearchPanel
+from utils.log_io import is_compressed, materialize
+from utils.output_ring import get_output_rings
 
 class LogSignals(QObject):
     """用于日志更新的信号类"""
     log_update = pyqtSignal(str)
     log_file_changed = pyqtSignal(str)
+    # 压缩归档解压完成: (归档路径, 解压后的路径，失败时为空)
+    archive_ready = pyqtSignal(str, str)
 
 class LogViewer:
     """日志查看器类，负责显示和更新命令执行日志"""
+    # 超过该大小的日志改用分页视图，只加载可见的行
+    PAGED_VIEW_THRESHOLD = 8 * 1024 * 1024
+
     def __init__(self, ui, log_dir='data/log'):
         self.ui = ui
         self.log_dir = log_dir
         self.current_log_file = None
-        self.last_log_size = 0
+        self.paged = False  # 当前是否使用分页视图
+        self._goto_line = None  # 压缩归档解压完成后要跳转的行（搜索结果）
         self.signals = LogSignals()
         
-        # 创建日志显示区域
-        self.create_log_display()
+        # 日志显示区域（命令页）在第一次切换到命令页或需要显示日志时才创建，不拖慢启动
+        self.display_created = False
+        if hasattr(self.ui, 'stack'):
+            self.ui.stack.currentChanged.connect(self.on_page_changed)
         
-        # 创建日志监控定时器
-        self.log_timer = QTimer()
-        self.log_timer.timeout.connect(self.check_for_new_logs)
-        self.log_timer.start(1000)  # 每秒检查一次
+        # 由文件变化通知驱动的日志跟踪器，取代每秒轮询
+        self.tailer = LogTailer()
+        self.tailer.text_appended.connect(self.signals.log_update)
+        self.tailer.reset.connect(self.on_log_reset)
+        # 正在运行的命令直接订阅内存中的输出缓冲，不从日志文件读回
+        self.follower = OutputFollower()
+        self.follower.text_appended.connect(self.signals.log_update)
+        self.follower.finished.connect(self.on_output_finished)
         
         # 连接信号
         self.signals.log_update.connect(self.update_log_display)
         self.signals.log_file_changed.connect(self.display_log_file)
+        self.signals.archive_ready.connect(self.on_archive_ready)
+    
+    def on_page_changed(self, index):
+        if index == 1:
+            self.ensure_log_display()
+    
+    def ensure_log_display(self):
+        """确保日志显示区域已创建"""
+        if not self.display_created:
+            self.display_created = True
+            self.create_log_display()
     
     def create_log_display(self):
         """创建日志显示区域"""
@@ -39,10 +70,23 @@ class LogViewer:
         self.ui.log_display.setPlaceholderText("命令执行日志将显示在这里...")
         self.ui.log_display.setLineWrapMode(QTextEdit.NoWrap)
         
+        # 大日志文件的分页视图，与文本框叠放在一起按需切换
+        self.ui.log_page_view = LogPageView()
+        self.ui.log_stack = QStackedWidget()
+        self.ui.log_stack.addWidget(self.ui.log_display)
+        self.ui.log_stack.addWidget(self.ui.log_page_view)
+        
         # 创建清空日志按钮
         self.ui.btn_clear_log = QPushButton('清空日志')
         self.ui.btn_clear_log.clicked.connect(self.clear_log_display)
         
+        # 全文搜索面板，默认隐藏，点击“搜索日志”或 Ctrl+F 显示
+        self.ui.log_search_panel = LogSearchPanel(self.log_dir, commands=self._commands)
+        self.ui.log_search_panel.hit_activated.connect(self.show_log_line)
+        self.ui.log_search_panel.hide()
+        self.ui.btn_search_log = QPushButton('搜索日志')
+        self.ui.btn_search_log.clicked.connect(self.toggle_search_panel)
+        
         # 如果命令启动页已经初始化，则添加日志区域
         if hasattr(self.ui, 'cmd_area') and hasattr(self.ui, 'stack'):
             # 获取命令启动页
@@ -72,6 +116,7 @@ class LogViewer:
             cmd_btn_layout.addWidget(self.ui.btn_log)
             cmd_btn_layout.addWidget(self.ui.btn_open_scripts)
             cmd_btn_layout.addWidget(self.ui.btn_clear_log)
+            cmd_btn_layout.addWidget(self.ui.btn_search_log)
             cmd_btn_layout.addStretch()
             
             cmd_area_layout.addLayout(cmd_btn_layout)
@@ -83,7 +128,12 @@ class LogViewer:
             # 日志区域布局
             log_layout = QVBoxLayout()
             log_layout.addWidget(QLabel('命令执行日志'))
-            log_layout.addWidget(self.ui.log_display)
+            # 搜索结果在上、日志内容在下，可拖动分割线调整高度
+            log_splitter = QSplitter(Qt.Vertical)
+            log_splitter.addWidget(self.ui.log_search_panel)
+            log_splitter.addWidget(self.ui.log_stack)
+            log_splitter.setSizes([200, 400])
+            log_layout.addWidget(log_splitter)
             
             # 添加清空日志按钮到日志区域
             log_btn_layout = QHBoxLayout()
@@ -102,54 +152,154 @@ class LogViewer:
             
             # 添加到命令页布局
             cmd_page.layout().addWidget(splitter)
+            shortcut = QShortcut(QKeySequence.Find, cmd_page)
+            shortcut.setContext(Qt.WidgetWithChildrenShortcut)
+            shortcut.activated.connect(self.ui.log_search_panel.activate)
+    
+    def _commands(self):
+        cmd_area = getattr(self.ui, 'cmd_area', None)
+        if cmd_area is None:
+            return []
+        return [cmd_area.item(i).text() for i in range(cmd_area.count())]
+    
+    def toggle_search_panel(self):
+        """显示或隐藏全文搜索面板"""
+        panel = self.ui.log_search_panel
+        if panel.isVisible():
+            panel.stop_search()
+            panel.hide()
+        else:
+            panel.activate()
     
     def set_current_log_file(self, log_file):
         """设置当前要监控的日志文件"""
         self.current_log_file = log_file
-        self.last_log_size = 0
         # 通知UI更新
         self.signals.log_file_changed.emit(log_file)
     
     def display_log_file(self, log_file):
-        """显示日志文件内容"""
+        """显示日志文件内容，并持续跟踪新增内容"""
+        self.ensure_log_display()
+        self._goto_line = None
         # 清空当前日志显示
+        self.show_text_view()
         self.ui.log_display.clear()
-        if log_file and os.path.exists(log_file):
+        self.tailer.stop()
+        self.follower.stop()
+        ring = get_output_rings().get(log_file)
+        if ring is not None:
+            # 正在运行的命令：从内存缓冲显示已有输出并订阅新输出，不读日志文件
+            self.ui.log_display.append(f"=== 正在监控运行输出: {os.path.basename(log_file)} ===\n")
+            self.follower.follow(ring)
+        elif log_file and os.path.exists(log_file) and is_compressed(log_file):
+            # 压缩归档在后台线程解压，完成后按普通日志显示
+            self.ui.log_display.append(f"=== 正在解压日志归档: {os.path.basename(log_file)} ===\n")
+            threading.Thread(target=self._extract_archive, args=(log_file,), daemon=True).start()
+        elif log_file and os.path.exists(log_file) and os.path.getsize(log_file) >= self.PAGED_VIEW_THRESHOLD:
+            # 大文件：分页视图只读取可见的行，跟踪器只负责通知文件增长
+            self.show_paged_view(log_file)
+            self.tailer.follow(log_file, offset=os.path.getsize(log_file))
+        elif log_file and os.path.exists(log_file):
             # 添加标题
             self.ui.log_display.append(f"=== 正在监控日志文件: {os.path.basename(log_file)} ===\n")
-            
-            # 读取日志文件内容
-            try:
-                with open(log_file, 'r', encoding='utf-8', errors='replace') as f:
-                    content = f.read()
-                    self.ui.log_display.append(content)
-                    self.last_log_size = os.path.getsize(log_file)
-            except Exception as e:
-                self.ui.log_display.append(f"读取日志失败: {str(e)}")
+            # 从头读取已有内容，之后由文件变化通知驱动增量读取
+            self.tailer.follow(log_file)
         else:
             self.ui.log_display.append("没有可显示的日志文件")
     
-    def check_for_new_logs(self):
-        """检查日志文件是否有更新"""
-        if self.current_log_file and os.path.exists(self.current_log_file):
-            try:
-                # 获取当前文件大小
-                current_size = os.path.getsize(self.current_log_file)
-                if current_size > self.last_log_size:
-                    # 有新内容，读取新增部分
-                    with open(self.current_log_file, 'r', encoding='utf-8', errors='replace') as f:
-                        f.seek(self.last_log_size)
-                        new_content = f.read()
-                        if new_content:
-                            # 更新到UI
-                            self.signals.log_update.emit(new_content)
-                    # 更新记录的文件大小
-                    self.last_log_size = current_size
-            except Exception as e:
-                print(f"监控日志文件出错: {e}")
+    def _extract_archive(self, log_file):
+        try:
+            plain_file = materialize(log_file)
+        except (OSError, EOFError, ValueError) as e:
+            print(f"解压日志归档出错: {e}")
+            plain_file = ''
+        self.signals.archive_ready.emit(log_file, plain_file)
+    
+    def on_archive_ready(self, log_file, plain_file):
+        """日志归档解压完成，显示解压后的内容"""
+        if log_file != self.current_log_file:
+            return
+        self.ui.log_display.clear()
+        if plain_file and self._goto_line is not None:
+            line, self._goto_line = self._goto_line, None
+            self.show_paged_view(plain_file)
+            self.ui.log_page_view.goto_line(line, highlight=True)
+        elif not plain_file:
+            self.ui.log_display.append(f"=== 无法解压日志归档: {os.path.basename(log_file)} ===")
+        elif os.path.getsize(plain_file) >= self.PAGED_VIEW_THRESHOLD:
+            self.show_paged_view(plain_file)
+        else:
+            self.ui.log_display.append(f"=== 日志归档: {os.path.basename(log_file)} ===\n")
+            self.tailer.follow(plain_file)
+    
+    def show_log_line(self, log_file, line):
+        """在分页视图中打开日志并跳转到指定行（从1开始，如搜索结果），正在写入的日志继续跟踪"""
+        self.ensure_log_display()
+        self.current_log_file = log_file
+        self.tailer.stop()
+        self.follower.stop()
+        if not os.path.exists(log_file):
+            self.show_text_view()
+            self.ui.log_display.clear()
+            self.ui.log_display.append(f"日志文件已不存在: {log_file}")
+            return
+        if is_compressed(log_file):
+            self._goto_line = line
+            self.show_text_view()
+            self.ui.log_display.clear()
+            self.ui.log_display.append(f"=== 正在解压日志归档: {os.path.basename(log_file)} ===\n")
+            threading.Thread(target=self._extract_archive, args=(log_file,), daemon=True).start()
+            return
+        self._goto_line = None
+        self.show_paged_view(log_file)
+        self.tailer.follow(log_file, offset=os.path.getsize(log_file))
+        self.ui.log_page_view.goto_line(line, highlight=True)
+    
+    def show_text_view(self):
+        """切换回普通文本视图"""
+        if self.paged:
+            self.paged = False
+            self.ui.log_page_view.close()
+            self.ui.log_stack.setCurrentWidget(self.ui.log_display)
+    
+    def show_paged_view(self, log_file):
+        """切换到分页视图显示大日志文件"""
+        self.paged = True
+        self.ui.log_display.clear()
+        self.ui.log_stack.setCurrentWidget(self.ui.log_page_view)
+        self.ui.log_page_view.open(log_file)
+    
+    def on_output_finished(self, log_file, position):
+        """运行结束且输出已显示完，之后追加到同一日志的内容（如自动重启）改由文件跟踪"""
+        if log_file == self.current_log_file:
+            self.tailer.follow(log_file, offset=position)
+    
+    def on_log_reset(self):
+        """日志文件被截断或替换，重新显示"""
+        if self.paged:
+            self.ui.log_page_view.open(self.tailer.path)
+            # 新文件的内容由分页视图读取，跟踪器从末尾继续
+            self.tailer.follow(self.tailer.path, offset=os.path.getsize(self.tailer.path))
+            return
+        self.ui.log_display.clear()
+        self.ui.log_display.append(f"=== 日志文件已重置: {os.path.basename(self.current_log_file or '')} ===\n")
     
     def update_log_display(self, text):
         """更新日志显示内容"""
+        if self.paged:
+            self.ui.log_page_view.refresh()
+            return
+        if self.follower.ring is not None:
+            path, shown = self.follower.path, self.follower.received
+        else:
+            path, shown = self.tailer.path, self.tailer.position
+        if path and shown >= self.PAGED_VIEW_THRESHOLD:
+            # 跟踪中的日志增长到阈值以上，改用分页视图（从文件读取，跟踪器只负责通知文件增长）
+            if self.follower.ring is not None:
+                self.follower.stop()
+                self.tailer.follow(path, offset=os.path.getsize(path))
+            self.show_paged_view(path)
+            return
         cursor = self.ui.log_display.textCursor()
         cursor.movePosition(QTextCursor.End)
         self.ui.log_display.setTextCursor(cursor)
@@ -158,6 +308,8 @@ class LogViewer:
     
     def clear_log_display(self):
         """清空日志显示区域"""
+        self.ensure_log_display()
+        self.show_text_view()
         self.ui.log_display.clear()
     
     def find_and_display_cmd_log(self, cmd):
@@ -170,6 +322,8 @@ class LogViewer:
         
     def display_no_log_message(self, cmd):
         """显示命令没有日志的提示信息"""
+        self.ensure_log_display()
+        self.show_text_view()
         self.ui.log_display.clear()
         self.ui.log_display.append(f"=== 命令没有日志文件 ===\n")
         self.ui.log_display.append(f"命令: {cmd}\n")
@@ -0,0 +1,116 @@
+import time
+import codecs
+import threading
+from PyQt5.QtCore import Qt, QObject, pyqtSignal
+from utils.metrics import get_metrics, TAIL_LAG_SECONDS, TAIL_BEHIND_BYTES
+
+class OutputFollower(QObject):
+    """
+    订阅正在运行的命令的输出缓冲（OutputRing），新增内容直接从内存读取
+
+    - 写入方线程只在有新输出时发一次跨线程通知（上一次通知还没处理时不再重复发送），
+      界面线程收到后一次读完新增的部分，用增量UTF-8解码器解码后发出 text_appended。
+    - position 与日志文件的偏移量一致：缓冲不包含文件开头时（自动重启追加到已有日志），
+      较短的开头部分从文件读取一次，过长时只显示提示；界面处理不过来、部分输出已被缓冲丢弃时同样插入提示，
+      完整内容都在日志文件中。
+    - 运行结束并读完后发出 finished(路径, 偏移量)，之后追加到同一日志的内容改由文件跟踪。
+    """
+    text_appended = pyqtSignal(str)
+    finished = pyqtSignal(str, object)
+    _wake = pyqtSignal()
+
+    PREFIX_LIMIT = 1024 * 1024  # 缓冲之前的内容不超过该大小时从文件读取
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.ring = None
+        self.path = None
+        self._position = 0
+        self._decoder = None
+        self.received = 0  # 本次跟踪以来显示的字节数
+        self._lock = threading.Lock()
+        self._scheduled = False
+        self._woken_at = None
+        self._wake.connect(self._read, Qt.QueuedConnection)
+
+    @property
+    def position(self):
+        return self._position
+
+    def follow(self, ring):
+        """开始跟踪一个输出缓冲，先显示已有内容"""
+        self.stop()
+        self.ring = ring
+        self.path = ring.path
+        self._position = 0
+        self.received = 0
+        self._decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+        ring.subscribe(self._notify)
+        if ring.start:
+            self._read_prefix(ring.start)
+        self._read()
+
+    def stop(self):
+        if self.ring is not None:
+            self.ring.unsubscribe(self._notify)
+        self.ring = None
+        self.path = None
+        with self._lock:
+            self._scheduled = False
+
+    def _read_prefix(self, size):
+        if size > self.PREFIX_LIMIT:
+            self._emit_note(f'只显示最近的输出，之前的 {size // 1024} KB 见日志文件')
+            self._position = size
+            return
+        try:
+            with open(self.path, 'rb') as f:
+                data = f.read(size)
+        except OSError as e:
+            print(f"读取日志文件出错: {e}")
+            data = b''
+        if len(data) < size:
+            self._emit_note('只显示最近的输出，之前的内容见日志文件')
+        self._append(data)
+        self._position = size
+
+    # 写入方线程：合并通知，界面线程读取之前只发一次
+    def _notify(self):
+        with self._lock:
+            if self._scheduled:
+                return
+            self._scheduled = True
+            self._woken_at = time.monotonic()
+        self._wake.emit()
+
+    def _read(self):
+        with self._lock:
+            self._scheduled = False
+            woken_at, self._woken_at = self._woken_at, None
+        ring = self.ring
+        if ring is None:
+            return
+        closed = ring.closed  # 先取状态再读，保证结束前的输出都已读到
+        data, offset = ring.read_from(self._position)
+        if offset > self._position:
+            self._emit_note(f'输出过快，跳过了 {offset - self._position} 字节，完整内容见日志文件')
+            self._decoder.reset()
+        if data:
+            self._position = offset + len(data)
+            self._append(data)
+        if get_metrics().enabled and woken_at is not None:
+            TAIL_LAG_SECONDS.observe(time.monotonic() - woken_at)
+            TAIL_BEHIND_BYTES.set(max(0, ring.end - self._position))
+        if closed and self._position >= ring.end:
+            path, position = self.path, self._position
+            self.stop()
+            self.finished.emit(path, position)
+
+    def _append(self, data):
+        self.received += len(data)
+        text = self._decoder.decode(data)
+        if text:
+            self.text_appended.emit(text)
+
+    def _emit_note(self, text):
+        self.text_appended.emit(f'\n=== {text} ===\n')
@@ -0,0 +1,61 @@
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal
+from utils.proc_sampler import ProcSampler
+
+def format_kb(kb):
+    if kb >= 1024 * 1024:
+        return f'{kb / 1024 / 1024:.1f}G'
+    if kb >= 1024:
+        return f'{kb / 1024:.0f}M'
+    return f'{kb}K'
+
+def format_usage(usage):
+    """列表右侧显示的资源占用，如 "12% 350M (峰值 80% 512M)" """
+    if not usage:
+        return None
+    return (f"{usage['cpu']:.0f}% {format_kb(usage['rss'])} "
+            f"(峰值 {usage['peak_cpu']:.0f}% {format_kb(usage['peak_rss'])})")
+
+class ProcessMonitor(QObject):
+    """
+    进程资源监视器
+
+    采样在 ProcSampler 的后台线程中进行，界面线程按相同间隔读取汇总结果并发出 usage_updated，
+    参数为 {键: 格式化后的占用文本}，只包含仍在运行的进程树。
+    """
+    usage_updated = pyqtSignal(object)
+
+    def __init__(self, interval=2.0, parent=None):
+        super().__init__(parent)
+        self.sampler = ProcSampler(interval=interval)
+        self._timer = QTimer(self)
+        self._timer.setInterval(int(interval * 1000))
+        self._timer.timeout.connect(self.refresh)
+        self._last = {}
+
+    @property
+    def available(self):
+        return self.sampler.available
+
+    def start(self):
+        if not self.available:
+            return
+        self.sampler.start()
+        self._timer.start()
+
+    def stop(self):
+        self._timer.stop()
+        self.sampler.stop()
+
+    # 跟踪进程树（pid 或排队中的 RunHandle）
+    def track(self, key, pid):
+        self.sampler.track(key, pid)
+
+    def usage(self, key):
+        return self.sampler.usage(key)
+
+    # 读取汇总结果，有变化时通知界面
+    def refresh(self):
+        texts = {key: format_usage(usage) for key, usage in self.sampler.usages().items()}
+        if texts != self._last:
+            self._last = texts
+            self.usage_updated.emit(texts)
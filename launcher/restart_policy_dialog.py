@@ -0,0 +1,118 @@
+from PyQt5.QtWidgets import (QDialog, QFormLayout, QVBoxLayout, QHBoxLayout, QComboBox, QDoubleSpinBox,
+                             QSpinBox, QCheckBox, QPushButton, QLabel)
+from PyQt5.QtCore import QObject, pyqtSignal
+from utils.restart_policy import RestartPolicy, RESTART_NEVER, RESTART_ON_FAILURE, RESTART_ALWAYS
+
+MODE_TEXT = {
+    RESTART_NEVER: '不重启',
+    RESTART_ON_FAILURE: '失败时重启（退出代码非0）',
+    RESTART_ALWAYS: '总是重启',
+}
+
+class RestartSignals(QObject):
+    """把重启监管器的事件（在监管器线程中产生）转到界面线程"""
+    event = pyqtSignal(object)  # dict，见 utils.restart_policy 的 EVENT_*
+
+class RestartPolicyDialog(QDialog):
+    """
+    编辑单个命令的重启策略
+
+    Args:
+        cmd: 命令
+        policy: 当前的 RestartPolicy，None 时使用默认值
+    """
+    def __init__(self, cmd, policy=None, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle(f'重启策略 - {cmd}')
+        self.resize(520, 0)
+        policy = policy or RestartPolicy()
+
+        self.mode_combo = QComboBox()
+        for mode, text in MODE_TEXT.items():
+            self.mode_combo.addItem(text, mode)
+        self.mode_combo.setCurrentIndex(self.mode_combo.findData(policy.mode))
+        self.mode_combo.currentIndexChanged.connect(self.update_enabled)
+
+        self.backoff_initial = self._double_spin(policy.backoff_initial, 0, 3600, ' 秒')
+        self.backoff_max = self._double_spin(policy.backoff_max, 0, 86400, ' 秒')
+        self.backoff_factor = self._double_spin(policy.backoff_factor, 1, 10, ' 倍')
+        self.jitter = self._double_spin(policy.jitter * 100, 0, 100, ' %')
+        self.max_restarts = self._spin(policy.max_restarts, 1, 10000, ' 次')
+        self.window_seconds = self._spin(policy.window_seconds, 1, 86400, ' 秒')
+        self.min_uptime = self._double_spin(policy.min_uptime, 0, 86400, ' 秒')
+        self.crash_loop_count = self._spin(policy.crash_loop_count, 1, 1000, ' 次')
+        self.new_log = QCheckBox('每次重启写入新的日志文件（否则追加到同一个日志）')
+        self.new_log.setChecked(policy.new_log)
+
+        form = QFormLayout()
+        form.addRow('重启模式:', self.mode_combo)
+        form.addRow('首次重启等待:', self.backoff_initial)
+        form.addRow('最长等待:', self.backoff_max)
+        form.addRow('等待时间倍数:', self.backoff_factor)
+        form.addRow('随机抖动:', self.jitter)
+        form.addRow('窗口内最多重启:', self.max_restarts)
+        form.addRow('重启次数统计窗口:', self.window_seconds)
+        form.addRow('正常运行时长:', self.min_uptime)
+        form.addRow('崩溃循环判定:', self.crash_loop_count)
+        form.addRow('', self.new_log)
+        self.settings = [self.backoff_initial, self.backoff_max, self.backoff_factor, self.jitter,
+                         self.max_restarts, self.window_seconds, self.min_uptime, self.crash_loop_count,
+                         self.new_log]
+
+        hint = QLabel('运行不足“正常运行时长”就退出的次数连续达到“崩溃循环判定”，'
+                      '或统计窗口内重启次数达到上限时，停止自动重启并在托盘提示。')
+        hint.setWordWrap(True)
+
+        btn_ok = QPushButton('确定')
+        btn_ok.clicked.connect(self.accept)
+        btn_cancel = QPushButton('取消')
+        btn_cancel.clicked.connect(self.reject)
+        btn_layout = QHBoxLayout()
+        btn_layout.addStretch()
+        btn_layout.addWidget(btn_ok)
+        btn_layout.addWidget(btn_cancel)
+
+        layout = QVBoxLayout()
+        layout.addLayout(form)
+        layout.addWidget(hint)
+        layout.addLayout(btn_layout)
+        self.setLayout(layout)
+        self.update_enabled()
+
+    @staticmethod
+    def _double_spin(value, minimum, maximum, suffix):
+        spin = QDoubleSpinBox()
+        spin.setRange(minimum, maximum)
+        spin.setDecimals(1)
+        spin.setSuffix(suffix)
+        spin.setValue(value)
+        return spin
+
+    @staticmethod
+    def _spin(value, minimum, maximum, suffix):
+        spin = QSpinBox()
+        spin.setRange(minimum, maximum)
+        spin.setSuffix(suffix)
+        spin.setValue(int(value))
+        return spin
+
+    # 不重启时其他设置无效
+    def update_enabled(self):
+        enabled = self.mode_combo.currentData() != RESTART_NEVER
+        for widget in self.settings:
+            widget.setEnabled(enabled)
+
+    def policy(self):
+        """对话框中设置的策略"""
+        return RestartPolicy(
+            mode=self.mode_combo.currentData(),
+            backoff_initial=self.backoff_initial.value(),
+            backoff_max=self.backoff_max.value(),
+            backoff_factor=self.backoff_factor.value(),
+            jitter=self.jitter.value() / 100,
+            max_restarts=self.max_restarts.value(),
+            window_seconds=self.window_seconds.value(),
+            min_uptime=self.min_uptime.value(),
+            crash_loop_count=self.crash_loop_count.value(),
+            new_log=self.new_log.isChecked(),
+        )
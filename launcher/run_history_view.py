@@ -0,0 +1,136 @@
+import os
+import time
+from PyQt5.QtWidgets import (QStyledItemDelegate, QStyle, QApplication, QDialog, QVBoxLayout, QHBoxLayout,
+                             QTableWidget, QTableWidgetItem, QLabel, QPushButton, QHeaderView, QAbstractItemView)
+from PyQt5.QtCore import Qt, QObject, QRect, pyqtSignal
+from PyQt5.QtGui import QColor
+from utils.run_history import (STATUS_SUCCESS, STATUS_FAILED, STATUS_CANCELLED, STATUS_RUNNING, STATUS_BACKOFF,  # noqa: F401
+                               STATUS_TEXT, format_duration, format_status)
+from launcher.icon_model import UsageRole
+
+# 命令项上保存最近一次运行记录（dict）的角色
+LastRunRole = Qt.UserRole + 1
+
+STATUS_COLOR = {
+    STATUS_SUCCESS: QColor(0, 128, 0),
+    STATUS_FAILED: QColor(200, 0, 0),
+    STATUS_CANCELLED: QColor(128, 128, 128),
+    STATUS_RUNNING: QColor(0, 90, 200),
+    STATUS_BACKOFF: QColor(200, 120, 0),
+}
+
+class RunSignals(QObject):
+    """把监管器线程中的运行事件转到界面线程"""
+    run_finished = pyqtSignal(object)  # RunHandle
+
+class CommandItemDelegate(QStyledItemDelegate):
+    """绘制命令项：左侧命令文本，右侧运行中的资源占用和最近一次运行的状态"""
+    STATUS_MARGIN = 8
+
+    def paint(self, painter, option, index):
+        run = index.data(LastRunRole)
+        if not run:
+            super().paint(painter, option, index)
+            return
+        status_text = format_status(run)
+        usage = index.data(UsageRole)
+        if usage:
+            status_text = f'{usage}  {status_text}'
+        metrics = option.fontMetrics
+        status_width = metrics.horizontalAdvance(status_text) + self.STATUS_MARGIN * 2
+        # 先按整行绘制背景（选中/悬停），再把命令区域让出状态的位置
+        self.initStyleOption(option, index)
+        style = option.widget.style() if option.widget else QApplication.style()
+        style.drawPrimitive(QStyle.PE_PanelItemViewItem, option, painter, option.widget)
+        cmd_option = type(option)(option)
+        cmd_option.rect = QRect(option.rect.left(), option.rect.top(),
+                                max(0, option.rect.width() - status_width), option.rect.height())
+        super().paint(painter, cmd_option, index)
+        status_rect = QRect(option.rect.right() - status_width + self.STATUS_MARGIN, option.rect.top(),
+                            status_width - self.STATUS_MARGIN * 2, option.rect.height())
+        painter.save()
+        if option.state & QStyle.State_Selected:
+            painter.setPen(option.palette.highlightedText().color())
+        else:
+            painter.setPen(STATUS_COLOR.get(run.get('status'), option.palette.text().color()))
+        painter.drawText(status_rect, Qt.AlignVCenter | Qt.AlignRight, status_text)
+        painter.restore()
+
+class RunHistoryDialog(QDialog):
+    """
+    单个命令的运行历史
+
+    Args:
+        history: RunHistory
+        cmd: 命令
+        on_open_log: 双击记录时调用 on_open_log(日志路径)
+    """
+    HEADERS = ['开始时间', '耗时', '结果', '退出代码', '输出', 'PID', '日志']
+
+    def __init__(self, history, cmd, parent=None, on_open_log=None, limit=500):
+        super().__init__(parent)
+        self.setWindowTitle(f'运行历史 - {cmd}')
+        self.resize(900, 450)
+        self.on_open_log = on_open_log
+        history.flush(0.5)  # 刚结束的运行可能还在写入队列中
+        self.runs = history.history(cmd, limit)
+        summary = history.summary(cmd)
+
+        summary_text = f"共运行 {summary['count']} 次，失败 {summary['failures']} 次"
+        if summary['avg_duration'] is not None:
+            summary_text += (f"，平均耗时 {format_duration(summary['avg_duration'])}"
+                             f"，最长 {format_duration(summary['max_duration'])}")
+        if summary['count'] > len(self.runs):
+            summary_text += f'（显示最近 {len(self.runs)} 次）'
+        self.summary_label = QLabel(summary_text)
+
+        self.table = QTableWidget(len(self.runs), len(self.HEADERS))
+        self.table.setHorizontalHeaderLabels(self.HEADERS)
+        self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.table.verticalHeader().setVisible(False)
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
+        self.table.horizontalHeader().setStretchLastSection(True)
+        for row, run in enumerate(self.runs):
+            values = [
+                time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(run['start_time'])),
+                format_duration(run['duration']),
+                STATUS_TEXT.get(run['status'], run['status']),
+                '' if run['exit_code'] is None else str(run['exit_code']),
+                f"{(run['bytes_written'] or 0) / 1024:.1f} KB",
+                '' if run['pid'] is None else str(run['pid']),
+                run['log_path'] or '',
+            ]
+            for col, value in enumerate(values):
+                item = QTableWidgetItem(value)
+                if col == 2:
+                    item.setForeground(STATUS_COLOR.get(run['status'], QColor(0, 0, 0)))
+                self.table.setItem(row, col, item)
+        self.table.cellDoubleClicked.connect(self.open_log)
+
+        btn_close = QPushButton('关闭')
+        btn_close.clicked.connect(self.accept)
+        btn_layout = QHBoxLayout()
+        btn_layout.addWidget(QLabel('双击记录查看日志'))
+        btn_layout.addStretch()
+        btn_layout.addWidget(btn_close)
+
+        layout = QVBoxLayout()
+        layout.addWidget(self.summary_label)
+        layout.addWidget(self.table)
+        layout.addLayout(btn_layout)
+        self.setLayout(layout)
+
+    # 双击记录，在日志区域显示对应日志
+    def open_log(self, row, _column):
+        log_path = self.runs[row]['log_path']
+        if not log_path or self.on_open_log is None:
+            return
+        if not os.path.exists(log_path):
+            # 日志可能已被压缩归档
+            for suffix in ('.gz', '.xz'):
+                if os.path.exists(log_path + suffix):
+                    log_path += suffix
+                    break
+        self.on_open_log(log_path)
+        self.accept()
@@ -1,28 +1,109 @@
 import sys
 import os
-from PyQt5.QtWidgets import QApplication
-from launcher.launcher_ui import LauncherUI
-from launcher.launcher_logic import LauncherLogic
-from launcher.launcher_data import LauncherData
+import time
+started_at = time.perf_counter()
 
 # 自动切换到脚本目录
 os.chdir(os.path.dirname(os.path.abspath(__file__)))
 
-# 设置编码
-# os.system('chcp 65001') # 会打印 Active code page: 65001
-# 不打印，静默执行
-import subprocess
-subprocess.run('chcp 65001', shell=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+# 已有实例在运行时，把请求（显示窗口、启动、运行命令、查看日志）转发给它后直接退出。
+# 这一步最先执行，只加载 socket/json，启动耗时分析、运行指标和 PyQt5 都在之后才导入
+from utils.instance_ipc import (parse_request, send_request, print_response, tail_response,
+                                ACTION_LAUNCH, ACTION_RUN, ACTION_TAIL)
+request, rest = parse_request(sys.argv[1:])
+sys.argv[1:] = rest  # 程序重启时不再重复执行本次请求
+response = send_request(request)
+if response is not None:
+    sys.exit(print_response(response))
+if request['action'] == ACTION_TAIL:
+    # 查看日志不需要界面，没有实例时在本进程中读取
+    sys.exit(print_response(tail_response(request['cmd'], request['lines'])))
+
+from utils.startup_profile import StartupProfiler
+from utils.process_utils import register_restart_hook, set_console_utf8
+from utils.metrics import get_metrics, options_from_argv
+
+# 启动耗时分析：python main.py --profile-startup（从进程开始执行 main.py 时计时）
+profiler = StartupProfiler.from_argv(start=started_at)
+# 运行指标：python main.py --metrics [--metrics-port 端口]，未开启时热路径上的记录都是空操作
+metrics_options = options_from_argv()
+get_metrics().enable(metrics_options['enabled'])
+profiler.mark('检查已运行的实例')
+
+# 设置编码（仅 Windows 需要切换控制台代码页，直接调用系统接口，不启动 chcp 子进程）
+set_console_utf8()
 os.environ['PYTHONIOENCODING'] = 'utf-8'
+
+# 先只导入显示窗口所需的模块，其余模块在窗口显示后再导入
+from PyQt5.QtWidgets import QApplication
+from launcher.launcher_ui import LauncherUI
+profiler.mark('导入界面模块')
 # 创建Qt应用
 app = QApplication(sys.argv)
+profiler.mark('创建 QApplication')
+# 尽早监听之后再次运行 main.py 转发来的请求，避免启动期间再打开一个实例；逻辑对象创建前收到的请求先排队
+from launcher.instance_bridge import InstanceBridge
+from utils.instance_ipc import InstanceServer
+bridge = InstanceBridge(parent=app)
+server = InstanceServer(bridge.handle)
+server_error = None
+try:
+    server.start()
+except OSError as e:
+    server_error = e
+app.aboutToQuit.connect(server.close)
+register_restart_hook(server.close)
+profiler.mark('监听单实例请求')
 # 创建UI界面
 ui = LauncherUI()
-# 创建数据管理对象
-data = LauncherData()
-# 创建逻辑处理对象，连接UI和数据
-logic = LauncherLogic(ui, data)
+profiler.mark('构建界面')
 # 显示主界面
 ui.show()
+profiler.mark('显示窗口')
+
+logic = None
+
+# 窗口首次绘制后再创建逻辑对象：导入其余模块、加载数据、构建命令页
+def init_logic():
+    global logic
+    profiler.mark('首次绘制')
+    from launcher.launcher_logic import LauncherLogic
+    from launcher.launcher_data import LauncherData
+    profiler.mark('导入逻辑模块')
+    # 创建数据管理对象
+    data = LauncherData()
+    # 创建逻辑处理对象，连接UI和数据
+    logic = LauncherLogic(ui, data, profiler=profiler)
+    # 退出和重启前把未写入的数据落盘
+    app.aboutToQuit.connect(data.flush)
+    app.aboutToQuit.connect(logic.app_logger.close)
+    register_restart_hook(data.flush)
+    register_restart_hook(logic.app_logger.close)
+    app.aboutToQuit.connect(logic.run_history.close)
+    register_restart_hook(logic.run_history.close)
+    # 退出时删除查看压缩日志时解压出的临时文件
+    from utils.log_io import remove_materialized
+    app.aboutToQuit.connect(remove_materialized)
+    # 处理启动期间排队的和之后转发来的请求
+    if server_error is not None:
+        logic.write_log(f'单实例监听失败: {server_error}', level='WARNING')
+    bridge.set_handler(logic.handle_request)
+    # 开启指标时定期写入 data/metrics.prom，指定端口时另在本机回环地址上提供 /metrics
+    if metrics_options['enabled']:
+        from utils.metrics import MetricsExporter
+        exporter = MetricsExporter(get_metrics(), port=metrics_options['port'])
+        try:
+            exporter.start()
+        except OSError as e:
+            logic.write_log(f'指标端口监听失败: {e}', level='WARNING')
+        logic.metrics_exporter = exporter
+        app.aboutToQuit.connect(exporter.close)
+        register_restart_hook(exporter.close)
+    # 本次启动带有启动/运行命令的请求时，在数据加载后执行
+    if request['action'] in (ACTION_LAUNCH, ACTION_RUN):
+        print_response(logic.handle_request(request))
+    profiler.report()
+
+ui.first_painted.connect(init_logic)
 # 进入主事件循环
 sys.exit(app.exec_())
@@ -0,0 +1,20 @@
+"""
+QuickLauncher 命令行模式，不导入 PyQt5，可在没有显示器的服务器或CI中使用：
+
+    python quicklauncher.py list
+    python quicklauncher.py launch "命令"
+    python quicklauncher.py tail "命令" -n 100
+"""
+
+import os
+import sys
+from utils.process_utils import set_console_utf8
+
+# 与 main.py 一样切换到脚本目录，配置、日志和命令的工作目录与图形界面一致
+os.chdir(os.path.dirname(os.path.abspath(__file__)))
+set_console_utf8()
+
+from utils.cli import main
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,14 @@
+import os
+import sys
+
+# 测试直接导入仓库中的 utils / launcher 包
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+@pytest.fixture(scope='session')
+def qapp():
+    """界面相关测试共用的 QApplication，没有显示环境时使用 offscreen 平台"""
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    widgets = pytest.importorskip('PyQt5.QtWidgets')
+    return widgets.QApplication.instance() or widgets.QApplication([])
@@ -0,0 +1,51 @@
+import json
+import os
+from utils.app_logger import AppLogger, FLUSH_BATCH
+
+def test_text_and_json_records(tmp_path):
+    path = str(tmp_path / 'launcher.log')
+    logger = AppLogger(path, json_path=path + '.jsonl')
+    logger.log('启动 a')
+    logger.log('失败 b', level='ERROR', cmd='b', code=1)
+    assert logger.flush()
+    logger.close()
+    lines = open(path, encoding='utf-8').read().splitlines()
+    assert lines[0].endswith(' 启动 a')
+    assert lines[1].endswith(' [ERROR] 失败 b')
+    records = [json.loads(line) for line in open(path + '.jsonl', encoding='utf-8')]
+    assert records[1]['msg'] == '失败 b' and records[1]['cmd'] == 'b' and records[1]['code'] == 1
+    assert logger.records_written == 2
+
+def test_close_writes_queued_records(tmp_path):
+    path = str(tmp_path / 'sub' / 'launcher.log')
+    logger = AppLogger(path, flush_policy=FLUSH_BATCH)
+    for i in range(1000):
+        logger.log(f'msg {i}')
+    logger.close()
+    assert len(open(path, encoding='utf-8').read().splitlines()) == 1000
+    # 关闭后的记录被忽略，flush 立即返回
+    logger.log('late')
+    assert logger.flush()
+
+def test_rotates_by_size(tmp_path):
+    path = str(tmp_path / 'launcher.log')
+    logger = AppLogger(path, max_bytes=200, backups=2)
+    for i in range(10):
+        logger.log('x' * 50)
+        logger.flush()
+    logger.close()
+    assert os.path.exists(path + '.1')
+    assert not os.path.exists(path + '.3')
+    assert all(os.path.getsize(p) < 300 for p in (path + '.1', path + '.2') if os.path.exists(p))
+
+def test_drops_oldest_when_queue_full(tmp_path):
+    path = str(tmp_path / 'launcher.log')
+    logger = AppLogger(path, max_queue=2)
+    # 持有条件变量的锁，后台线程取不走队列
+    with logger._cond:
+        for i in range(5):
+            logger.log(f'msg {i}')
+    logger.close()
+    assert logger.dropped == 3
+    lines = open(path, encoding='utf-8').read().splitlines()
+    assert [line.split(' ')[-1] for line in lines] == ['3', '4']
@@ -0,0 +1,52 @@
+import random
+from utils.checked_order import CheckedOrderIndex
+
+def numbers(index):
+    return {key: index.rank(key) for key in index.keys()}
+
+def test_add_appends_and_only_changes_new_key():
+    index = CheckedOrderIndex()
+    assert index.add('a') == [('a', 1)]
+    assert index.add('b') == [('b', 2)]
+    assert index.keys() == ['a', 'b']
+    assert 'a' in index and len(index) == 2
+
+def test_remove_shifts_only_later_keys():
+    index = CheckedOrderIndex()
+    for key in 'abcd':
+        index.add(key)
+    assert index.remove('b') == [('b', None), ('c', 2), ('d', 3)]
+    assert index.remove('d') == [('d', None)]
+    assert index.remove('missing') == []
+    assert numbers(index) == {'a': 1, 'c': 2}
+
+def test_add_with_explicit_order_inserts_in_place():
+    index = CheckedOrderIndex()
+    index.add('a', 1)
+    index.add('c', 5)
+    assert index.add('b', 3) == [('b', 2), ('c', 3)]
+    # 已被占用的顺序号顺延
+    index.add('d', 3)
+    assert index.keys() == ['a', 'b', 'd', 'c']
+    assert index.next_order == 6
+
+def test_clear_reports_all_keys():
+    index = CheckedOrderIndex()
+    index.add('a')
+    index.add('b')
+    assert index.clear() == [('a', None), ('b', None)]
+    assert index.keys() == [] and index.rank('a') is None
+
+def test_changes_match_full_renumbering():
+    rng = random.Random(3)
+    index = CheckedOrderIndex()
+    shown = {}
+    for _ in range(2000):
+        key = rng.randrange(40)
+        changes = index.remove(key) if key in index else index.add(key)
+        for changed, number in changes:
+            if number is None:
+                shown.pop(changed, None)
+            else:
+                shown[changed] = number
+        assert shown == numbers(index)
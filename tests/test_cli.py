@@ -0,0 +1,80 @@
+import os
+import sys
+import json
+import time
+import threading
+import pytest
+from utils import cli, run_history
+from utils.launcher_profile import LauncherProfile, IconEntry
+from utils.process_supervisor import RunHandle
+from utils.run_history import RunHistory, STATUS_SUCCESS, STATUS_FAILED
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    """在临时目录中运行，使用独立的运行历史"""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(run_history, '_history', None)
+    yield tmp_path
+    if run_history._history is not None:
+        run_history._history.close()
+
+def python_cmd(code):
+    return f'"{sys.executable}" -c "{code}"'
+
+def save_profile(cmds, icons=()):
+    LauncherProfile([IconEntry(path, checked=True, order=i) for i, path in enumerate(icons, 1)], cmds).save()
+
+def test_wait_returns_after_done_callbacks():
+    handle = RunHandle(None, 'cmd', 'cmd.log')
+    recorded = []
+
+    def slow_callback(h):
+        time.sleep(0.2)
+        recorded.append(h)
+
+    handle.add_done_callback(slow_callback)
+    threading.Thread(target=handle._finish, args=(RunHandle.EXITED,)).start()
+    assert handle.wait(5)
+    assert recorded == [handle]
+
+def test_launch_records_every_command(workdir, capsys):
+    ok, bad = python_cmd('print(1)'), python_cmd('import sys; sys.exit(3)')
+    save_profile([ok, bad])
+    assert cli.main(['launch', ok, bad, '-q']) == 1
+    out = capsys.readouterr().out
+    assert '启动: ' in out and '失败(3)' in out
+    history = RunHistory(str(workdir / 'data' / 'run_history.db'))
+    try:
+        last = history.last_runs([ok, bad])
+    finally:
+        history.close()
+    assert last[ok]['status'] == STATUS_SUCCESS
+    assert (last[bad]['status'], last[bad]['exit_code']) == (STATUS_FAILED, 3)
+
+def test_launch_rejects_unknown_targets(workdir, capsys):
+    save_profile(['echo a'])
+    assert cli.main(['launch', 'missing']) == 1
+    assert 'missing' in capsys.readouterr().err
+    assert cli.main(['launch']) == 1
+
+def test_list_json(workdir, capsys):
+    save_profile(['echo a'], icons=['/opt/app.exe'])
+    assert cli.main(['list', '--json']) == 0
+    data = json.loads(capsys.readouterr().out)
+    assert data['cmds'] == [{'cmd': 'echo a', 'last_run': None, 'restart': None}]
+    assert data['icons'][0]['name'] == 'app.exe' and data['icons'][0]['order'] == 1
+
+def test_tail(workdir, capsys):
+    os.makedirs('data/log')
+    with open('data/log/echo_a_20240101_000000.log', 'w', encoding='utf-8') as f:
+        f.write('一\n二\n三\n')
+    assert cli.main(['tail', 'echo a', '-n', '2']) == 0
+    assert capsys.readouterr().out == '二\n三\n'
+    assert cli.main(['tail', 'other']) == 1
+
+def test_parse_age():
+    assert cli._parse_age('30m') == 1800
+    assert cli._parse_age('2D') == 172800
+    assert cli._parse_age('15') == 15
+    with pytest.raises(ValueError):
+        cli._parse_age('abc')
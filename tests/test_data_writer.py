@@ -0,0 +1,44 @@
+import os
+import json
+import pytest
+from utils.data_writer import atomic_write_json, WriteBehindWriter
+
+def test_atomic_write_json_replaces_file_without_leftovers(tmp_path):
+    path = tmp_path / 'sub' / 'data.json'
+    atomic_write_json(str(path), {'a': 1})
+    atomic_write_json(str(path), {'a': '中文'})
+    assert json.loads(path.read_text(encoding='utf-8')) == {'a': '中文'}
+    assert os.listdir(path.parent) == ['data.json']
+
+def test_atomic_write_json_keeps_old_file_on_error(tmp_path):
+    path = tmp_path / 'data.json'
+    atomic_write_json(str(path), {'a': 1})
+    with pytest.raises(TypeError):
+        atomic_write_json(str(path), {'a': object()})
+    assert json.loads(path.read_text(encoding='utf-8')) == {'a': 1}
+    assert os.listdir(tmp_path) == ['data.json']
+
+def test_writer_coalesces_and_skips_unchanged(tmp_path):
+    path = tmp_path / 'data.json'
+    writer = WriteBehindWriter(str(path))
+    try:
+        for i in range(50):
+            writer.submit({'n': i})
+        assert writer.flush(5)
+        assert json.loads(path.read_text(encoding='utf-8')) == {'n': 49}
+        count = writer.write_count
+        assert 1 <= count <= 50
+        writer.submit({'n': 49})
+        assert writer.flush(5)
+        assert writer.write_count == count
+    finally:
+        writer.close(5)
+
+def test_writer_close_writes_pending_and_rejects_submit(tmp_path):
+    path = tmp_path / 'data.json'
+    writer = WriteBehindWriter(str(path))
+    writer.submit([1, 2, 3])
+    writer.close(5)
+    assert json.loads(path.read_text(encoding='utf-8')) == [1, 2, 3]
+    with pytest.raises(RuntimeError):
+        writer.submit([4])
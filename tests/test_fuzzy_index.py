@@ -0,0 +1,119 @@
+import random
+import pytest
+from utils.fuzzy_index import (FuzzyIndex, word_starts, frecency, _fuzzy_pattern, TIER_PREFIX, TIER_WORD,
+                               TIER_SUBSTRING, TIER_FUZZY, FUZZY_COMPACT, FRECENCY_WEIGHT, HALF_LIFE)
+
+NOW = 1_700_000_000.0
+
+def reference_score(term, text):
+    """逐个候选直接计算的查询词得分，不匹配时为 None"""
+    hay = text.lower()
+    starts = word_starts(text)
+    if hay.startswith(term):
+        return TIER_PREFIX
+    if any(hay.startswith(term, pos) for pos in starts if pos) or ''.join(hay[p] for p in starts).startswith(term):
+        return TIER_WORD
+    if term in hay:
+        return TIER_SUBSTRING
+    m = _fuzzy_pattern(term).match(hay)
+    if m is None:
+        return None
+    return TIER_FUZZY + FUZZY_COMPACT * len(term) / (m.end() - m.start(1))
+
+def reference_search(texts, bonus, query, limit):
+    results = []
+    for key, text in texts.items():
+        scores = [reference_score(term, text) for term in query.lower().split()]
+        if None not in scores:
+            results.append((round(sum(scores) + bonus.get(key, 0.0), 9), -len(text)))
+    return sorted(results, reverse=True)[:limit]
+
+@pytest.fixture
+def index():
+    index = FuzzyIndex()
+    index.refresh_frecency(NOW)
+    return index
+
+def test_word_starts():
+    assert word_starts('run_server.py') == [0, 4, 11]
+    assert word_starts('openBrowserTab') == [0, 4, 11]
+    assert word_starts('') == []
+
+def test_frecency():
+    assert frecency(0, NOW, NOW) == 0.0
+    assert frecency(3, None, NOW) == 0.0
+    assert frecency(32, NOW, NOW) == FRECENCY_WEIGHT
+    assert frecency(32, NOW - HALF_LIFE, NOW) == pytest.approx(FRECENCY_WEIGHT / 2)
+    assert frecency(1, NOW, NOW) < frecency(4, NOW, NOW)
+
+def test_tiers(index):
+    index.add_many([('prefix', 'server start', 0, None), ('word', 'run server', 0, None),
+                    ('initials', 'Start Every Run Very Early Rapidly', 0, None),
+                    ('substring', 'webserver', 0, None), ('fuzzy', 'stage revert', 0, None),
+                    ('miss', 'client', 0, None)])
+    result = dict(index.search('server'))
+    assert result['prefix'] == TIER_PREFIX
+    assert result['word'] == result['initials'] == TIER_WORD
+    assert result['substring'] == TIER_SUBSTRING
+    assert TIER_FUZZY < result['fuzzy'] < TIER_SUBSTRING
+    assert 'miss' not in result
+    assert [key for key, _ in index.search('server')][0] == 'prefix'
+
+def test_ties_prefer_short_text_and_limit(index):
+    index.add_many([('long', 'build all targets', 0, None), ('short', 'build', 0, None),
+                    ('mid', 'build app', 0, None)])
+    assert [key for key, _ in index.search('build')] == ['short', 'mid', 'long']
+    assert [key for key, _ in index.search('build', limit=2)] == ['short', 'mid']
+
+def test_multiple_terms_must_all_match(index):
+    index.add_many([('a', 'python api server', 0, None), ('b', 'python worker', 0, None)])
+    result = dict(index.search('serv py'))
+    assert set(result) == {'a'}
+    assert result['a'] == TIER_WORD + TIER_PREFIX
+
+def test_usage_bonus_and_empty_query(index):
+    index.add('a', 'deploy staging')
+    index.add('b', 'deploy production')
+    assert [key for key, _ in index.search('deploy')] == ['a', 'b']
+    index.touch('b', NOW)
+    index.touch('b', NOW - 10)
+    assert [key for key, _ in index.search('deploy')] == ['b', 'a']
+    assert index.search('') == [('b', pytest.approx(frecency(2, NOW, NOW)))]
+    index.set_usage('b', 0, None)
+    assert index.search('') == []
+
+def test_add_remove_and_update(index):
+    index.add('a', 'alpha')
+    index.touch('a', NOW)
+    assert index.search('alp')[0][0] == 'a'
+    index.add('a', 'beta')
+    assert index.search('alp') == []
+    assert index.text('a') == 'beta' and index.search('')[0][0] == 'a'  # 改名保留使用记录
+    index.remove('a')
+    index.remove('a')
+    assert len(index) == 0 and 'a' not in index and index.search('bet') == []
+
+def test_matches_reference_while_typing(index):
+    rng = random.Random(7)
+    words = ['run', 'server', 'Api', 'test', 'build', 'deploy', 'log', 'py', 'node', 'watch', 'db']
+    texts, bonus = {}, {}
+    for i in range(600):
+        text = rng.choice(['_', ' ', '-', '']).join(rng.sample(words, rng.randint(1, 4)))
+        texts[i] = text
+        index.add(i, text)
+        if i % 7 == 0:
+            index.set_usage(i, rng.randint(1, 20), NOW - rng.random() * 10 * 86400)
+            bonus[i] = frecency(*index._usage[index._ids[i]], NOW)
+    for i in range(0, 600, 11):
+        index.remove(i)
+        del texts[i]
+        bonus.pop(i, None)
+    for query in ('sr', 'serv', 'server', 'rsv', 'run se', 'run serv', 'a b c', 'dpl', 'lg nd w', 'py'):
+        # 逐个字符输入，检查增量缓存
+        for end in range(1, len(query) + 1):
+            typed = query[:end]
+            if not typed.strip():
+                continue
+            expected = reference_search(texts, bonus, typed, 20)
+            got = [(round(score, 9), -len(texts[key])) for key, score in index.search(typed, limit=20)]
+            assert got == expected, typed
@@ -0,0 +1,60 @@
+import time
+import pytest
+
+pytest.importorskip('PyQt5')
+
+from PyQt5.QtGui import QImage, QColor
+from launcher.icon_cache import IconCache
+
+def wait_until(qapp, condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        qapp.processEvents()
+        time.sleep(0.005)
+    return condition()
+
+@pytest.fixture
+def image_path(tmp_path):
+    image = QImage(64, 64, QImage.Format_ARGB32)
+    image.fill(QColor('red'))
+    path = str(tmp_path / 'app.png')
+    assert image.save(path)
+    return path
+
+def test_loads_in_background_and_reuses_disk_thumbnail(qapp, tmp_path, image_path):
+    cache_dir = str(tmp_path / 'cache')
+    cache = IconCache(cache_dir)
+    loaded = []
+    cache.icon_loaded.connect(loaded.append)
+    assert cache.icon(image_path).cacheKey() == cache.placeholder().cacheKey()
+    assert wait_until(qapp, lambda: loaded == [image_path])
+    assert cache.icon(image_path).cacheKey() != cache.placeholder().cacheKey()
+    assert (cache.stats()['misses'], cache.stats()['memory_hits']) == (1, 1)
+    # 新的缓存实例（相当于下一次启动）直接读取磁盘缩略图
+    second = IconCache(cache_dir)
+    second.icon(image_path)
+    assert wait_until(qapp, lambda: second.stats()['memory_items'] == 1)
+    assert (second.stats()['disk_hits'], second.stats()['misses']) == (1, 0)
+
+def test_missing_file_keeps_placeholder(qapp, tmp_path):
+    cache = IconCache(str(tmp_path / 'cache'))
+    path = str(tmp_path / 'missing.png')
+    cache.icon(path)
+    assert wait_until(qapp, lambda: cache.stats()['failures'] == 1)
+    wait_until(qapp, lambda: not cache._pending)
+    assert cache.icon(path).cacheKey() == cache.placeholder().cacheKey()
+    assert cache.stats()['failures'] == 1  # 失败后不再重复加载
+
+def test_memory_limit_evicts_least_recently_used(qapp, tmp_path):
+    paths = []
+    for i in range(3):
+        image = QImage(64, 64, QImage.Format_ARGB32)
+        image.fill(QColor(i * 80, 0, 0))
+        paths.append(str(tmp_path / f'{i}.png'))
+        image.save(paths[-1])
+    cache = IconCache(str(tmp_path / 'cache'), memory_limit_bytes=2 * 20 * 20 * 4)
+    for path in paths:
+        cache.icon(path)
+        assert wait_until(qapp, lambda: (path, cache.size) in cache._memory)
+    assert cache.stats()['memory_items'] == 2 and cache.stats()['evictions'] == 1
+    assert (paths[0], cache.size) not in cache._memory
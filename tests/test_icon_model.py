@@ -0,0 +1,99 @@
+import pytest
+
+pytest.importorskip('PyQt5')
+
+from PyQt5.QtCore import Qt, QObject, pyqtSignal
+from launcher.icon_model import IconListModel, IconEntry, UsageRole
+
+class FakeIconCache(QObject):
+    """记录请求的图标，load() 模拟后台加载完成"""
+    icon_loaded = pyqtSignal(str)
+
+    def __init__(self):
+        super().__init__()
+        self.loaded = set()
+        self.requested = []
+
+    def icon(self, path):
+        if path in self.loaded:
+            return f'icon:{path}'
+        self.requested.append(path)
+        return 'placeholder'
+
+    def load(self, path):
+        self.loaded.add(path)
+        self.icon_loaded.emit(path)
+
+@pytest.fixture
+def model(qapp):
+    model = IconListModel(FakeIconCache())
+    model.set_entries([IconEntry(f'/apps/{name}.exe') for name in 'abcde'])
+    model.changed = []
+    model.dataChanged.connect(lambda top, bottom, roles: model.changed.append((top.row(), bottom.row(), list(roles))))
+    return model
+
+def names(model):
+    return [entry.name[0] for entry in model.entries]
+
+def assert_rows_consistent(model):
+    assert [model.row_of(entry) for entry in model.entries] == list(range(len(model.entries)))
+
+def test_insert_remove_and_move(model):
+    model.append(IconEntry('/apps/f.exe'))
+    assert model.rowCount() == 6 and model.row_of(model.entries[-1]) == 5
+    removed = model.entries[1]
+    model.remove_row(1)
+    assert names(model) == list('acdef') and model.row_of(removed) == -1
+    assert_rows_consistent(model)
+    model.move_rows([0, 2], 4)
+    assert names(model) == list('ceadf')
+    assert_rows_consistent(model)
+
+def test_move_rows_keeps_order(model):
+    model.move_rows([0, 2], 4)
+    assert names(model) == list('bdace')
+    assert_rows_consistent(model)
+    model.move_rows([4], 0)
+    assert names(model) == list('ebdac')
+    assert_rows_consistent(model)
+    assert model.entry_for_path('/apps/a.exe') is model.entries[3]
+
+def test_checked_numbering(model):
+    for row in (0, 2, 4):
+        model.set_checked(row, True)
+    assert [entry.number for entry in model.entries] == [1, None, 2, None, 3]
+    model.set_checked(2, False)
+    assert [entry.number for entry in model.entries] == [1, None, None, None, 2]
+    assert model.data(model.index(4)) == '2. e.exe'
+    assert model.data(model.index(0), Qt.CheckStateRole) == Qt.Checked
+    assert model.checked_entries() == [model.entries[0], model.entries[4]]
+    # 重新载入时按保存的顺序号恢复序号
+    entries = [IconEntry('/x/1', checked=True, order=5), IconEntry('/x/2'), IconEntry('/x/3', checked=True, order=2)]
+    model.set_entries(entries)
+    assert [entry.number for entry in entries] == [2, None, 1]
+    model.clear_checked()
+    assert model.checked_entries() == [] and all(entry.number is None for entry in entries)
+
+def test_icons_load_in_background(model):
+    model.append(IconEntry('/apps/b.exe'))  # 同一文件的第二个条目
+    model.changed.clear()
+    assert model.data(model.index(1), Qt.DecorationRole) == 'placeholder'
+    assert '/apps/b.exe' in model.icon_cache.requested
+    model.icon_cache.load('/apps/b.exe')
+    assert model.changed == [(1, 1, [Qt.DecorationRole]), (5, 5, [Qt.DecorationRole])]
+    assert model.data(model.index(5), Qt.DecorationRole) == 'icon:/apps/b.exe'
+    model.icon_cache.load('/apps/other.exe')
+    assert len(model.changed) == 2
+
+def test_set_usages_only_refreshes_changed_rows(model):
+    a, c = model.entries[0], model.entries[2]
+    model.set_usages({a: '1%', c: '2%'})
+    assert sorted(model.changed) == [(0, 0, [UsageRole]), (2, 2, [UsageRole])]
+    model.changed.clear()
+    model.set_usages({a: '1%', c: '3%'})
+    assert model.changed == [(2, 2, [UsageRole])]
+    model.changed.clear()
+    model.remove_row(0)
+    model.changed.clear()
+    model.set_usages({})
+    assert model.changed == [(1, 1, [UsageRole])] and c.usage is None
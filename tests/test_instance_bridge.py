@@ -0,0 +1,43 @@
+import time
+import threading
+import pytest
+pytest.importorskip('PyQt5')
+from launcher.instance_bridge import InstanceBridge
+from utils.instance_ipc import InstanceServer, send_request
+
+def wait_until(qapp, condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        qapp.processEvents()
+        time.sleep(0.01)
+    return condition()
+
+def test_requests_before_handler_are_queued(qapp, tmp_path):
+    instance_file = str(tmp_path / 'instance.json')
+    bridge = InstanceBridge()
+    server = InstanceServer(bridge.handle, instance_file)
+    server.start()
+    responses = []
+    try:
+        client = threading.Thread(target=lambda: responses.append(send_request({'action': 'show'}, instance_file)))
+        client.start()
+        assert wait_until(qapp, lambda: len(bridge._queued) == 1)
+        assert responses == []
+        handled = []
+        bridge.set_handler(lambda request: handled.append(request) or {'ok': True, 'message': 'shown'})
+        client.join(5)
+        assert handled == [{'action': 'show'}] and responses == [{'ok': True, 'message': 'shown'}]
+    finally:
+        server.close()
+
+def test_expired_queued_request_is_dropped(qapp):
+    bridge = InstanceBridge(timeout=0.05)
+    responses = []
+    client = threading.Thread(target=lambda: responses.append(bridge.handle({'action': 'run', 'cmd': 'x'})))
+    client.start()
+    assert wait_until(qapp, lambda: len(bridge._queued) == 1)
+    client.join(5)
+    assert responses[0]['ok'] is False
+    handled = []
+    bridge.set_handler(handled.append)
+    assert handled == [] and bridge._queued == []
@@ -0,0 +1,46 @@
+import pytest
+from utils import instance_ipc
+from utils.instance_ipc import InstanceServer, parse_request, send_request, read_instance
+
+@pytest.mark.parametrize('argv', [
+    [], ['--show'], ['--launch', 'Notepad'], ['--run', 'python a.py'], ['--tail', 'python a.py'],
+    ['--tail', 'python a.py', '--lines', '7'],
+])
+def test_simple_forms_match_argparse(argv, monkeypatch):
+    fast = parse_request(argv)
+    monkeypatch.setattr(instance_ipc, '_parse_simple', lambda argv: None)
+    assert fast == parse_request(argv)
+
+def test_other_arguments_fall_back_to_argparse():
+    request, rest = parse_request(['--run', 'x', '--metrics'])
+    assert request == {'action': 'run', 'cmd': 'x'} and rest == ['--metrics']
+    assert parse_request(['--profile-startup']) == ({'action': 'show'}, ['--profile-startup'])
+    assert parse_request(['--run=x']) == ({'action': 'run', 'cmd': 'x'}, [])
+
+def test_request_round_trip(tmp_path):
+    instance_file = str(tmp_path / 'instance.json')
+    assert send_request({'action': 'show'}, instance_file) is None
+    server = InstanceServer(lambda request: {'ok': True, 'echo': request}, instance_file)
+    server.start()
+    try:
+        response = send_request({'action': 'run', 'cmd': 'x'}, instance_file)
+        assert response == {'ok': True, 'echo': {'action': 'run', 'cmd': 'x'}}
+        assert server.request_count == 1
+    finally:
+        server.close()
+    assert read_instance(instance_file) is None
+    server._thread.join(2)
+    assert not server._thread.is_alive()  # 关闭后接受连接的线程退出
+
+def test_stale_instance_file_is_ignored(tmp_path):
+    instance_file = str(tmp_path / 'instance.json')
+    server = InstanceServer(lambda request: {'ok': True}, instance_file)
+    server.start()
+    with open(instance_file, encoding='utf-8') as f:
+        content = f.read()
+    server.close()
+    # 模拟实例异常退出，留下实例信息文件
+    with open(instance_file, 'w', encoding='utf-8') as f:
+        f.write(content)
+    assert read_instance(instance_file) is not None
+    assert send_request({'action': 'show'}, instance_file) is None
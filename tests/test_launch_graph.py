@@ -0,0 +1,106 @@
+import asyncio
+import json
+import pytest
+from utils.launch_graph import (LaunchNode, LaunchGroup, LaunchGraphError, GroupRun, load_groups, wait_ready,
+                                NODE_READY, NODE_FAILED, NODE_SKIPPED, EVENT_FINISHED)
+
+class FakeRun:
+    """模拟 subprocess.Popen：exit_code 为 None 表示仍在运行"""
+    def __init__(self, exit_code=None, log_path=None):
+        self.exit_code = exit_code
+        self.log_path = log_path
+
+    def poll(self):
+        return self.exit_code
+
+def make_group(nodes):
+    return LaunchGroup.from_dict({'name': 'g', 'nodes': nodes})
+
+def test_node_validation():
+    assert LaunchNode.from_dict({'cmd': 'a'}).id == 'a'
+    assert LaunchNode.from_dict({'icon': 'x.lnk', 'ready': {'type': 'file', 'path': 'p'}}).kind == 'icon'
+    for config in ({'id': 'x'},
+                   {'cmd': 'a', 'ready': {'type': 'http'}},
+                   {'cmd': 'a', 'ready': {'type': 'log', 'pattern': '('}},
+                   {'icon': 'x.lnk', 'ready': {'type': 'log', 'pattern': 'ok'}},
+                   {'icon': 'x.lnk', 'ready': {'type': 'alive', 'seconds': 3}},
+                   {'cmd': 'a', 'ready': {'type': 'tcp'}},
+                   {'cmd': 'a', 'ready': {'type': 'tcp', 'port': 'http'}},
+                   {'cmd': 'a', 'ready': {'type': 'tcp', 'port': 70000}},
+                   {'cmd': 'a', 'ready': {'type': 'file'}},
+                   {'cmd': 'a', 'ready': {'type': 'alive', 'seconds': 'x'}},
+                   {'cmd': 'a', 'timeout': 'soon'}):
+        with pytest.raises(LaunchGraphError):
+            LaunchNode.from_dict(config)
+    config = {'cmd': 'a', 'ready': {'type': 'tcp', 'port': '8000'}}
+    assert LaunchNode.from_dict(config).probe['port'] == 8000 and config['ready']['port'] == '8000'
+
+def test_topological_order_and_errors():
+    group = make_group([{'id': 'c', 'cmd': 'c', 'after': ['a', 'b']}, {'id': 'b', 'cmd': 'b', 'after': ['a']},
+                        {'id': 'a', 'cmd': 'a'}])
+    assert group.order == ['a', 'b', 'c']
+    with pytest.raises(LaunchGraphError, match='循环'):
+        make_group([{'id': 'a', 'cmd': 'a', 'after': ['b']}, {'id': 'b', 'cmd': 'b', 'after': ['a']}])
+    with pytest.raises(LaunchGraphError, match='不存在'):
+        make_group([{'id': 'a', 'cmd': 'a', 'after': ['missing']}])
+    with pytest.raises(LaunchGraphError, match='重复'):
+        make_group([{'cmd': 'a'}, {'cmd': 'a'}])
+
+def test_load_groups_collects_errors(tmp_path):
+    path = tmp_path / 'groups.json'
+    assert load_groups(str(path)) == ([], [])
+    path.write_text(json.dumps({'groups': [{'name': 'ok', 'nodes': [{'cmd': 'a'}]},
+                                           {'name': 'bad', 'nodes': [{'id': 'x'}]}]}), encoding='utf-8')
+    groups, errors = load_groups(str(path))
+    assert [g.name for g in groups] == ['ok'] and len(errors) == 1
+
+def test_wait_ready_probes(tmp_path):
+    log = tmp_path / 'run.log'
+    log.write_bytes(b'=== start: python api.py Running on ===\nbooting\n')
+    node = LaunchNode.from_dict({'cmd': 'api', 'ready': {'type': 'log', 'pattern': 'Running on'}, 'timeout': 0.2})
+    with pytest.raises(RuntimeError, match='超时'):
+        asyncio.run(wait_ready(node, FakeRun(log_path=str(log)), poll_interval=0.01))
+    with open(log, 'ab') as f:
+        f.write(b'Running on :8000\n')
+    asyncio.run(wait_ready(node, FakeRun(log_path=str(log)), poll_interval=0.01))
+
+    node = LaunchNode.from_dict({'cmd': 'w', 'ready': {'type': 'alive', 'seconds': 0.05}})
+    asyncio.run(wait_ready(node, FakeRun(), poll_interval=0.01))
+    with pytest.raises(RuntimeError, match='退出'):
+        asyncio.run(wait_ready(node, FakeRun(exit_code=0), poll_interval=0.01))
+
+    node = LaunchNode.from_dict({'cmd': 'f', 'ready': {'type': 'file', 'path': str(tmp_path / 'pid')}})
+    (tmp_path / 'pid').write_text('1')
+    asyncio.run(wait_ready(node, FakeRun(exit_code=0), poll_interval=0.01))
+
+def test_failed_node_skips_dependents():
+    group = make_group([
+        {'id': 'db', 'cmd': 'db'},
+        {'id': 'api', 'cmd': 'api', 'after': ['db'], 'ready': {'type': 'alive', 'seconds': 1}},
+        {'id': 'ui', 'cmd': 'ui', 'after': ['api']},
+        {'id': 'docs', 'cmd': 'docs', 'after': ['db']},
+    ])
+    started, events = [], []
+
+    def start(node):
+        started.append(node.id)
+        return FakeRun(exit_code=1 if node.id == 'api' else None)
+
+    group_run = GroupRun(group, start, on_event=events.append, poll_interval=0.01)
+    assert asyncio.run(group_run.run()) is False
+    assert group_run.status == {'db': NODE_READY, 'api': NODE_FAILED, 'ui': NODE_SKIPPED, 'docs': NODE_READY}
+    assert 'ui' not in started
+    assert events[-1]['type'] == EVENT_FINISHED and group_run.done
+
+def test_probe_error_fails_node_instead_of_hanging(monkeypatch):
+    group = make_group([{'id': 'db', 'cmd': 'db', 'ready': {'type': 'file', 'path': 'p'}},
+                        {'id': 'api', 'cmd': 'api', 'after': ['db']}])
+
+    async def broken_wait_ready(node, run, poll_interval):
+        raise KeyError('path')
+
+    monkeypatch.setattr('utils.launch_graph.wait_ready', broken_wait_ready)
+    group_run = GroupRun(group, lambda node: FakeRun(), poll_interval=0.01)
+    assert asyncio.run(asyncio.wait_for(group_run.run(), 5)) is False
+    assert group_run.status == {'db': NODE_FAILED, 'api': NODE_SKIPPED}
+    assert 'KeyError' in group_run.errors['db'] and group_run.done
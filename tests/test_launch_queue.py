@@ -0,0 +1,87 @@
+from utils.launch_queue import LaunchQueue, run_queue
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+def make_queue(delay=2.0):
+    clock = FakeClock()
+    return LaunchQueue(delay, clock=clock), clock
+
+def test_items_are_spaced_by_delay():
+    queue, clock = make_queue()
+    queue.extend(['a', 'b', 'c'])
+    assert queue.take_due() == ('a', 100.0)
+    assert queue.take_due() is None
+    assert queue.time_until_next() == 2.0
+    clock.now += 2
+    assert queue.take_due()[0] == 'b'
+    clock.now += 2
+    assert queue.take_due()[0] == 'c'
+    assert queue.state == LaunchQueue.IDLE
+    assert (queue.done, queue.total) == (3, 3)
+
+def test_pause_keeps_remaining_wait():
+    queue, clock = make_queue()
+    queue.extend(['a', 'b'])
+    queue.take_due()
+    clock.now += 0.5
+    assert queue.pause()
+    assert queue.time_until_next() is None
+    clock.now += 10
+    assert queue.take_due() is None
+    assert queue.resume()
+    assert queue.time_until_next() == 1.5
+
+def test_push_front_while_running_launches_next():
+    queue, clock = make_queue()
+    queue.extend(['a', 'b'])
+    queue.take_due()
+    queue.push_front(['now'])
+    assert queue.take_due()[0] == 'now'
+    assert queue.total == 3
+
+def test_push_front_while_paused_launches_immediately_and_stays_paused():
+    queue, clock = make_queue()
+    queue.extend(['a', 'b'])
+    queue.take_due()
+    queue.pause()
+    queue.push_front(['now'])
+    assert queue.time_until_next() == 0.0
+    assert queue.take_due() == ('now', 100.0)
+    assert queue.state == LaunchQueue.PAUSED
+    assert queue.take_due() is None
+    assert queue.time_until_next() is None
+    queue.resume()
+    clock.now += 2
+    assert queue.take_due()[0] == 'b'
+
+def test_cancel_returns_all_pending():
+    queue, clock = make_queue()
+    queue.extend(['a', 'b', 'c'])
+    queue.take_due()
+    queue.pause()
+    queue.push_front(['now'])
+    assert queue.cancel() == ['now', 'b', 'c']
+    assert queue.state == LaunchQueue.IDLE
+    assert len(queue) == 0
+
+def test_run_queue_reports_failures():
+    queue, clock = make_queue(delay=1.0)
+    queue.extend(['ok', 'bad', 'ok2'])
+    results = []
+
+    def launch(entry):
+        if entry == 'bad':
+            raise OSError('无法启动')
+
+    def sleep(seconds):
+        clock.now += seconds
+
+    failed = run_queue(queue, launch, lambda i, e, ok, err: results.append((i, e, ok, err)), sleep=sleep)
+    assert failed == 1
+    assert results == [(1, 'ok', True, ''), (2, 'bad', False, '无法启动'), (3, 'ok2', True, '')]
+    assert clock.now == 102.0
@@ -0,0 +1,53 @@
+from utils.line_index import SparseLineIndex, MappedLogFile
+
+def make_lines(n):
+    return b''.join(f'line {i}\n'.encode() for i in range(n))
+
+def test_line_offsets_match_full_scan():
+    data = make_lines(1000)
+    index = SparseLineIndex(stride=7, chunk_size=100)
+    index.extend(data, len(data))
+    assert index.line_count == 1000
+    offset = 0
+    for i, line in enumerate(data.split(b'\n')[:-1]):
+        assert index.line_offset(data, i) == offset
+        offset += len(line) + 1
+    assert index.line_offset(data, 1000) is None
+    assert index.line_offset(data, -1) is None
+
+def test_incremental_extend_and_partial_last_line():
+    data = make_lines(10) + b'tail'
+    index = SparseLineIndex(stride=3, chunk_size=16)
+    index.extend(data, 20)
+    index.extend(data, len(data))
+    assert index.line_count == 11
+    assert index.read_lines(data, 9, 5) == ['line 9', 'tail']
+    assert index.read_lines(data, 0, 2) == ['line 0', 'line 1']
+
+def test_read_lines_strips_crlf_and_decodes_utf8():
+    data = '甲\r\n乙\r\n'.encode('utf-8')
+    index = SparseLineIndex(stride=1)
+    index.extend(data, len(data))
+    assert index.read_lines(data, 0, 10) == ['甲', '乙']
+
+def test_extend_can_be_cancelled():
+    data = make_lines(100)
+    index = SparseLineIndex(stride=4, chunk_size=50)
+    index.extend(data, len(data), should_stop=lambda: index.indexed_bytes >= 100)
+    assert 100 <= index.indexed_bytes < len(data)
+    index.extend(data, len(data))
+    assert index.line_count == 100
+
+def test_mapped_file_remaps_after_growth(tmp_path):
+    path = tmp_path / 'run.log'
+    path.write_bytes(b'')
+    mapped = MappedLogFile(str(path))
+    try:
+        assert mapped.size == 0 and mapped.map is None
+        path.write_bytes(make_lines(3))
+        assert mapped.remap() == len(make_lines(3))
+        index = SparseLineIndex()
+        index.extend(mapped.map, mapped.size)
+        assert index.read_lines(mapped.map, 1, 2) == ['line 1', 'line 2']
+    finally:
+        mapped.close()
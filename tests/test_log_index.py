@@ -0,0 +1,66 @@
+import os
+from utils.log_index import LogIndex, parse_log_filename
+
+def touch(log_dir, name):
+    path = os.path.join(log_dir, name)
+    with open(path, 'w') as f:
+        f.write('x')
+    return path
+
+def test_parse_log_filename():
+    assert parse_log_filename('build_app_20240101_120000.log') == ('build_app', '20240101_120000')
+    assert parse_log_filename('build_20240101_120000.log.gz') == ('build', '20240101_120000')
+    assert parse_log_filename('build_20240101_120000.log.xz') == ('build', '20240101_120000')
+    assert parse_log_filename('build.log') is None
+    assert parse_log_filename('build_20240101_120000.txt') is None
+
+def test_latest_and_runs_are_ordered_by_timestamp(tmp_path):
+    log_dir = str(tmp_path)
+    touch(log_dir, 'a_20240101_120000.log')
+    newest = touch(log_dir, 'a_20240102_080000.log.gz')
+    touch(log_dir, 'a_20231231_235959.log')
+    touch(log_dir, 'b_20240101_000000.log')
+    touch(log_dir, 'notes.txt')
+    index = LogIndex(log_dir)
+    assert index.latest('a') == newest
+    assert [os.path.basename(p) for p in index.runs('a')] == [
+        'a_20240102_080000.log.gz', 'a_20240101_120000.log', 'a_20231231_235959.log']
+    assert sorted(index.bases()) == ['a', 'b']
+    assert index.latest('missing') is None
+
+def test_add_does_not_trigger_rescan(tmp_path):
+    log_dir = str(tmp_path)
+    touch(log_dir, 'a_20240101_120000.log')
+    index = LogIndex(log_dir)
+    index.latest('a')
+    assert index.scan_count == 1
+    path = touch(log_dir, 'a_20240103_000000.log')
+    index.add(path)
+    assert index.latest('a') == path
+    assert index.scan_count == 1
+
+def test_external_changes_are_picked_up(tmp_path):
+    log_dir = str(tmp_path)
+    touch(log_dir, 'a_20240101_120000.log')
+    index = LogIndex(log_dir)
+    index.latest('a')
+    path = touch(log_dir, 'a_20240105_000000.log')
+    # 保证目录修改时间与建立索引时不同
+    stat = os.stat(log_dir)
+    os.utime(log_dir, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert index.latest('a') == path
+    assert index.scan_count == 2
+
+def test_latest_skips_deleted_files(tmp_path):
+    log_dir = str(tmp_path)
+    older = touch(log_dir, 'a_20240101_120000.log')
+    newer = touch(log_dir, 'a_20240102_120000.log')
+    index = LogIndex(log_dir)
+    index.latest('a')
+    os.remove(newer)
+    index.remove(newer)
+    assert index.latest('a') == older
+    os.remove(older)
+    index.remove(older)
+    assert index.latest('a') is None
+    assert index.bases() == []
@@ -0,0 +1,43 @@
+import os
+import gzip
+import time
+from utils.log_io import materialize, prune_materialized, remove_materialized, STALE_TEMP_SECONDS
+
+def write_archive(log_dir, name, data):
+    path = os.path.join(log_dir, name + '.gz')
+    with gzip.open(path, 'wb') as f:
+        f.write(data)
+    return path
+
+def test_materialize_caches_and_evicts_least_recently_used(tmp_path):
+    temp_dir = str(tmp_path / 'tmp')
+    paths = [write_archive(str(tmp_path), f'run{i}.log', b'x' * 10) for i in range(3)]
+    first = materialize(paths[0], temp_dir)
+    assert open(first, 'rb').read() == b'x' * 10
+    assert materialize(paths[0], temp_dir) == first
+    # 把第一个文件的最近使用时间提前，之后按文件数淘汰时它最先被删除
+    os.utime(first, (time.time() - 100, os.path.getmtime(first)))
+    materialize(paths[1], temp_dir)
+    materialize(paths[2], temp_dir)
+    assert prune_materialized(temp_dir, max_files=2) == 1
+    assert sorted(os.listdir(temp_dir)) == ['run1.log', 'run2.log']
+    # 字节上限同样淘汰较早使用的文件，keep 指定的文件始终保留
+    os.utime(os.path.join(temp_dir, 'run2.log'), (time.time() - 100, 0))
+    assert prune_materialized(temp_dir, max_bytes=10, keep=os.path.join(temp_dir, 'run2.log')) == 1
+    assert os.listdir(temp_dir) == ['run2.log']
+
+def test_prune_removes_stale_temp_files_and_remove_clears_all(tmp_path):
+    temp_dir = tmp_path / 'tmp'
+    temp_dir.mkdir()
+    stale = temp_dir / 'old.tmp'
+    fresh = temp_dir / 'new.tmp'
+    stale.write_bytes(b'partial')
+    fresh.write_bytes(b'partial')
+    old = time.time() - STALE_TEMP_SECONDS - 10
+    os.utime(stale, (old, old))
+    (temp_dir / 'run.log').write_bytes(b'data')
+    assert prune_materialized(str(temp_dir)) == 1
+    assert sorted(os.listdir(temp_dir)) == ['new.tmp', 'run.log']
+    assert remove_materialized(str(temp_dir)) == 1
+    assert os.listdir(temp_dir) == ['new.tmp']
+    assert remove_materialized(str(tmp_path / 'missing')) == 0
@@ -0,0 +1,71 @@
+import os
+from utils.log_io import open_log
+from utils.log_retention import LogRetention, RetentionPolicy, rotate_file
+
+NOW = 2_000_000_000.0
+DAY = 86400
+
+def write_log(log_dir, name, data=b'output\n', age=DAY):
+    path = os.path.join(log_dir, name)
+    with open(path, 'wb') as f:
+        f.write(data)
+    os.utime(path, (NOW - age, NOW - age))
+    return path
+
+def make_retention(log_dir, active=(), **policy):
+    return LogRetention(log_dir, RetentionPolicy(**policy), active_paths=lambda: set(active),
+                        clock=lambda: NOW)
+
+def test_limits_for_applies_overrides():
+    policy = RetentionPolicy(max_runs_per_command=5, max_age_days=2,
+                             overrides={'server': {'max_runs_per_command': 50, 'unknown': 1}})
+    assert policy.limits_for('other') == (5, 2 * DAY, policy.max_command_bytes)
+    assert policy.limits_for('server')[0] == 50
+
+def test_load_falls_back_to_defaults(tmp_path):
+    path = tmp_path / 'retention.json'
+    assert RetentionPolicy.load(str(path)).max_runs_per_command == 20
+    path.write_text('{"max_runs_per_command": 3}', encoding='utf-8')
+    assert RetentionPolicy.load(str(path)).max_runs_per_command == 3
+    path.write_text('{"bad_key": 1}', encoding='utf-8')
+    assert RetentionPolicy.load(str(path)).max_runs_per_command == 20
+
+def test_old_runs_are_deleted_and_finished_runs_compressed(tmp_path):
+    log_dir = str(tmp_path)
+    for day in range(1, 5):
+        write_log(log_dir, f'a_2024010{day}_000000.log', age=(5 - day) * DAY)
+    stats = make_retention(log_dir, max_runs_per_command=2).run_once()
+    assert stats['deleted'] == 2 and stats['compressed'] == 2
+    assert sorted(os.listdir(log_dir)) == ['a_20240103_000000.log.gz', 'a_20240104_000000.log.gz']
+    with open_log(os.path.join(log_dir, 'a_20240104_000000.log.gz')) as f:
+        assert f.read() == b'output\n'
+
+def test_recent_and_active_logs_are_protected(tmp_path):
+    log_dir = str(tmp_path)
+    active = write_log(log_dir, 'a_20240101_000000.log', age=40 * DAY)
+    write_log(log_dir, 'b_20240101_000000.log', age=10)
+    stats = make_retention(log_dir, active=[os.path.normcase(os.path.abspath(active))],
+                           max_age_days=30).run_once()
+    assert stats == {'compressed': 0, 'deleted': 0, 'freed_bytes': 0}
+    assert len(os.listdir(log_dir)) == 2
+
+def test_total_limit_deletes_oldest_first(tmp_path):
+    log_dir = str(tmp_path)
+    write_log(log_dir, 'a_20240101_000000.log', b'x' * 100, age=3 * DAY)
+    write_log(log_dir, 'b_20240101_000000.log', b'x' * 100, age=2 * DAY)
+    write_log(log_dir, 'c_20240101_000000.log', b'x' * 100, age=1 * DAY)
+    stats = make_retention(log_dir, compression=None, max_total_bytes=250).run_once()
+    assert stats['deleted'] == 1 and stats['freed_bytes'] == 100
+    assert sorted(os.listdir(log_dir)) == ['b_20240101_000000.log', 'c_20240101_000000.log']
+
+def test_rotate_file(tmp_path):
+    path = str(tmp_path / 'launcher.log')
+    for i in range(4):
+        with open(path, 'w') as f:
+            f.write(str(i) * 10)
+        assert rotate_file(path, max_bytes=5, backups=2)
+    assert not os.path.exists(path)
+    assert open(path + '.1').read() == '3' * 10
+    assert open(path + '.2').read() == '2' * 10
+    assert not os.path.exists(path + '.3')
+    assert not rotate_file(path, max_bytes=5)
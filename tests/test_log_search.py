@@ -0,0 +1,88 @@
+import gzip
+import os
+import re
+import pytest
+from utils.log_search import (LogSearchIndex, compile_query, literal_plan, regex_plan, normalize, text_grams,
+                              _bit_positions)
+
+def gram(text):
+    a, b, c = normalize(text.encode())
+    return (a << 16) | (b << 8) | c
+
+def write_log(log_dir, name, lines):
+    path = os.path.join(log_dir, name)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(''.join(line + '\n' for line in lines))
+    return path
+
+@pytest.fixture
+def index(tmp_path):
+    log_dir = tmp_path / 'log'
+    log_dir.mkdir()
+    return LogSearchIndex(str(log_dir), str(tmp_path / 'search.db'), settle_seconds=0)
+
+def search(index, query, **kwargs):
+    hits = []
+    stats = index.search(query, on_hit=hits.append, **kwargs)
+    return [(hit['name'], hit['line'], hit['text']) for hit in hits], stats
+
+def test_normalize_and_grams():
+    assert normalize(b'Error 42') == b'error 00'
+    assert text_grams(b'abcd') == {gram('abc'), gram('bcd')}
+
+def test_query_plans():
+    assert literal_plan(b'ab') is None
+    assert literal_plan(b'Timeout') == ('grams', text_grams(b'timeout'))
+    plan = regex_plan(rb'conn(ect|ected) refused')
+    assert plan[0] == 'and' and ('grams', text_grams(b'conn')) in plan[1]
+    assert regex_plan(rb'.*') is None
+    assert regex_plan(rb'(a|b)c') is None
+    with pytest.raises(ValueError):
+        compile_query('')
+    with pytest.raises(re.error):
+        compile_query('(', regex=True)
+
+def test_bit_positions():
+    assert _bit_positions(0) == []
+    assert _bit_positions(0b100101) == [0, 2, 5]
+
+def test_search_matches_brute_force(index):
+    log_dir = index.log_dir
+    write_log(log_dir, 'api_20240101_000000.log', ['start', 'ERROR timeout 1', 'ok', 'error Timeout 2'])
+    write_log(log_dir, 'api_20240102_000000.log', ['start', 'ready'])
+    write_log(log_dir, 'db_20240101_000000.log', ['connection refused', 'ERROR timeout 3'])
+    assert index.update()['indexed'] == 3
+    hits, stats = search(index, 'timeout')
+    # 同一时间戳按文件名倒序，较新的日志在前
+    assert hits == [('db_20240101_000000.log', 2, 'ERROR timeout 3'), ('api_20240101_000000.log', 2, 'ERROR timeout 1')]
+    assert stats['candidates'] == 2 and stats['unindexed'] == 0
+    hits, _ = search(index, 'timeout', ignore_case=True, base='api')
+    assert [line for _, line, _ in hits] == [2, 4]
+    hits, _ = search(index, r'conn\w+ refused', regex=True)
+    assert hits == [('db_20240101_000000.log', 1, 'connection refused')]
+    hits, stats = search(index, 'timeout', ignore_case=True, max_results=1)
+    assert len(hits) == 1 and stats['truncated']
+
+def test_unindexed_and_changed_logs_are_scanned(index):
+    path = write_log(index.log_dir, 'api_20240101_000000.log', ['first'])
+    index.update()
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write('needle appended\n')
+    write_log(index.log_dir, 'api_20240102_000000.log', ['needle new'])
+    hits, stats = search(index, 'needle')
+    assert [name for name, _, _ in hits] == ['api_20240102_000000.log', 'api_20240101_000000.log']
+    assert stats['unindexed'] == 2
+
+def test_compressed_log_keeps_its_index(index):
+    path = write_log(index.log_dir, 'api_20240101_000000.log', ['needle here'])
+    index.update()
+    with open(path, 'rb') as src, gzip.open(path + '.gz', 'wb') as dst:
+        dst.write(src.read())
+    os.remove(path)
+    stats = index.update()
+    assert (stats['renamed'], stats['indexed']) == (1, 0)
+    hits, _ = search(index, 'needle')
+    assert hits == [('api_20240101_000000.log.gz', 1, 'needle here')]
+    os.remove(path + '.gz')
+    assert index.update()['removed'] == 1
+    assert index.status()['files'] == 0
@@ -0,0 +1,62 @@
+import io
+import os
+import gzip
+import tempfile
+from utils.log_filename import get_base_log_filename
+from utils.log_tail import read_lines_before, tail_command_log, tail_lines, tail_text, TailReader
+
+def test_read_lines_before_matches_splitlines():
+    data = ''.join(f'行 {i}\r\n' for i in range(100)).encode('utf-8')
+    expected = data.decode('utf-8').splitlines()
+    f = io.BytesIO(data)
+    for n in (1, 7, 100, 150):
+        for block_size in (3, 16, 4096):
+            lines, start = read_lines_before(f, len(data), n, block_size)
+            assert lines == expected[-n:]
+            assert data[start:].decode('utf-8').splitlines() == lines
+
+def test_read_lines_before_without_trailing_newline():
+    f = io.BytesIO(b'a\nb\nc')
+    assert read_lines_before(f, 5, 2, block_size=2) == (['b', 'c'], 2)
+    assert read_lines_before(f, 0, 2) == ([], 0)
+
+def test_max_bytes_skips_partial_utf8_character():
+    data = ('甲' * 10).encode('utf-8')
+    lines, start = read_lines_before(io.BytesIO(data), len(data), 1, block_size=4, max_bytes=7)
+    assert start == len(data) - 7
+    assert lines == ['甲甲']
+
+def test_tail_lines_and_tail_text(tmp_path):
+    path = tmp_path / 'run.log'
+    path.write_bytes('一\n二\n三\n'.encode('utf-8'))
+    assert tail_lines(str(path), 2) == ['二', '三']
+    assert tail_text(str(path), 4) == '三\n'
+    # 截断处的不完整字符被跳过
+    assert tail_text(str(path), 3) == '\n'
+
+def test_tail_reader_pages_through_rotated_files(tmp_path):
+    old = tmp_path / 'launcher.log.1'
+    new = tmp_path / 'launcher.log'
+    old.write_text(''.join(f'old {i}\n' for i in range(5)))
+    new.write_text(''.join(f'new {i}\n' for i in range(3)))
+    reader = TailReader([str(new), str(old), str(tmp_path / 'missing.log')], block_size=4)
+    assert reader.read_previous(2) == ['new 1', 'new 2']
+    assert reader.read_previous(2) == ['old 4', 'new 0']
+    assert reader.current_path == str(old)
+    assert reader.read_previous(10) == [f'old {i}' for i in range(4)]
+    assert reader.at_start
+    assert reader.read_previous(10) == []
+
+def test_compressed_log_is_tailed_without_extracting(tmp_path, monkeypatch):
+    monkeypatch.setattr(tempfile, 'tempdir', str(tmp_path / 'tmp'))
+    (tmp_path / 'tmp').mkdir()
+    log_dir = tmp_path / 'log'
+    log_dir.mkdir()
+    cmd = 'echo hi'
+    path = log_dir / f'{get_base_log_filename(cmd)}_20240101_000000.log.gz'
+    with gzip.open(path, 'wb') as f:
+        f.write(''.join(f'行 {i}\r\n' for i in range(1000)).encode('utf-8'))
+    assert tail_lines(str(path), 2) == ['行 998', '行 999']
+    assert tail_lines(str(path), 0) == []
+    assert tail_command_log(cmd, 3, str(log_dir)) == (str(path), ['行 997', '行 998', '行 999'])
+    assert os.listdir(tmp_path / 'tmp') == []
@@ -0,0 +1,79 @@
+import os
+import time
+import pytest
+
+pytest.importorskip('PyQt5')
+
+from launcher.log_tailer import LogTailer
+
+def wait_until(qapp, condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        qapp.processEvents()
+        time.sleep(0.01)
+    return condition()
+
+@pytest.fixture
+def tailer(qapp):
+    tailer = LogTailer()
+    tailer.received = []
+    tailer.resets = 0
+    tailer.text_appended.connect(tailer.received.append)
+
+    def on_reset():
+        tailer.resets += 1
+    tailer.reset.connect(on_reset)
+    yield tailer
+    tailer.stop()
+
+def append(path, data):
+    with open(path, 'ab') as f:
+        f.write(data)
+
+def test_appended_lines_are_delivered(qapp, tailer, tmp_path):
+    path = tmp_path / 'run.log'
+    path.write_bytes('第一行\n'.encode('utf-8'))
+    tailer.follow(str(path))
+    assert ''.join(tailer.received) == '第一行\n'
+    data = '第二行\n'.encode('utf-8')
+    append(path, data[:2])  # 多字节字符分两次写入
+    append(path, data[2:])
+    assert wait_until(qapp, lambda: ''.join(tailer.received) == '第一行\n第二行\n')
+    assert tailer.position == path.stat().st_size
+
+def test_follow_from_offset_and_truncate(qapp, tailer, tmp_path):
+    path = tmp_path / 'run.log'
+    path.write_bytes(b'old\nnew\n')
+    tailer.follow(str(path), offset=4)
+    assert tailer.received == ['new\n']
+    path.write_bytes(b'x\n')
+    assert wait_until(qapp, lambda: tailer.resets == 1 and tailer.received[-1:] == ['x\n'])
+
+def test_rotated_file_is_read_from_start(qapp, tailer, tmp_path):
+    path = tmp_path / 'launcher.log'
+    path.write_bytes(b'before\n')
+    tailer.follow(str(path))
+    os.replace(path, tmp_path / 'launcher.log.1')
+    path.write_bytes(b'after rotate\n')
+    assert wait_until(qapp, lambda: tailer.received[-1:] == ['after rotate\n'])
+    assert tailer.resets == 1
+    append(path, b'more\n')
+    assert wait_until(qapp, lambda: tailer.received[-1:] == ['more\n'])
+
+def test_stat_check_only_where_enabled_and_backs_off(qapp, tailer, tmp_path):
+    path = tmp_path / 'run.log'
+    path.write_bytes(b'a\n')
+    tailer.STAT_CHECK = False
+    tailer.follow(str(path))
+    assert not tailer.polling and not tailer._stat_timer.isActive()
+    tailer.STAT_CHECK = True
+    tailer.follow(str(path))
+    assert tailer._stat_timer.isActive() and tailer._stat_interval == tailer.MIN_STAT_CHECK_MS
+    for _ in range(10):
+        tailer._check_stat()
+    assert tailer._stat_interval == tailer.MAX_STAT_CHECK_MS
+    # 监听漏掉的追加由检查补读，间隔恢复到最短
+    tailer._watcher.removePath(str(path))
+    append(path, b'b\n')
+    tailer._check_stat()
+    assert tailer.received[-1] == 'b\n' and tailer._stat_interval == tailer.MIN_STAT_CHECK_MS
@@ -0,0 +1,105 @@
+import sys
+import urllib.request
+import pytest
+from utils import metrics
+from utils.metrics import MetricsRegistry, MetricsExporter, options_from_argv, LOG_BYTES, LOG_LINES
+from utils.log_filename import get_base_log_filename
+from utils.process_supervisor import ProcessSupervisor
+
+@pytest.fixture
+def registry():
+    return MetricsRegistry(enabled=True)
+
+@pytest.fixture
+def global_metrics():
+    """开启全局注册表，结束后恢复关闭并清空"""
+    registry = metrics.get_metrics()
+    registry.reset()
+    registry.enable()
+    yield registry
+    registry.enable(False)
+    registry.reset()
+
+def test_disabled_registry_records_nothing():
+    registry = MetricsRegistry()
+    counter = registry.counter('c_total', 'c')
+    histogram = registry.histogram('h_seconds', 'h')
+    counter.inc()
+    histogram.observe(1.0)
+    with histogram.time():
+        pass
+    assert counter.value() == 0 and histogram.count() == 0
+
+def test_counter_and_gauge(registry):
+    counter = registry.counter('launch_total', '启动', labels=('kind',))
+    counter.inc(kind='icon')
+    counter.inc(2, kind='icon')
+    counter.inc(kind='cmd')
+    assert (counter.value(kind='icon'), counter.value(kind='cmd'), counter.value(kind='x')) == (3, 1, 0)
+    assert registry.counter('launch_total', '启动') is counter
+    with pytest.raises(ValueError):
+        registry.gauge('launch_total', '启动')
+    gauge = registry.gauge('running', '运行中')
+    gauge.set(5)
+    assert gauge.value() == 5
+    gauge.set_function(lambda: 7)
+    assert [row['value'] for row in registry.snapshot() if row['name'] == 'running'] == [7]
+    gauge.set_function(lambda: 1 / 0)
+    assert [row['value'] for row in registry.snapshot() if row['name'] == 'running'] == [None]
+
+def test_histogram_quantile(registry):
+    histogram = registry.histogram('latency', '延迟', buckets=(1, 2, 4))
+    assert histogram.quantile(0.5) is None
+    for value in (0.5, 1.5, 1.5, 3, 10):
+        histogram.observe(value)
+    assert histogram.count() == 5
+    assert histogram.quantile(0.5) == pytest.approx(1.75)
+    assert histogram.quantile(1.0) == 10
+    row = [row for row in registry.snapshot() if row['name'] == 'latency'][0]
+    assert (row['value']['count'], row['value']['sum'], row['value']['max']) == (5, 16.5, 10)
+
+def test_render_prometheus_text(registry):
+    registry.counter('bytes_total', '字节数', labels=('cmd',)).inc(3, cmd='a "b"\n')
+    histogram = registry.histogram('wait_seconds', '等待', buckets=(0.5, 1))
+    histogram.observe(0.25)
+    histogram.observe(2)
+    registry.gauge('idle', '未记录')
+    lines = registry.render().splitlines()
+    assert 'bytes_total{cmd="a \\"b\\"\\n"} 3' in lines
+    assert 'wait_seconds_bucket{le="0.5"} 1' in lines
+    assert 'wait_seconds_bucket{le="1"} 1' in lines
+    assert 'wait_seconds_bucket{le="+Inf"} 2' in lines
+    assert 'wait_seconds_sum 2.25' in lines and 'wait_seconds_count 2' in lines
+    assert '# TYPE idle gauge' in lines
+
+def test_exporter_writes_textfile_and_serves_http(registry, tmp_path):
+    registry.counter('hits_total', '次数').inc(4)
+    path = tmp_path / 'metrics.prom'
+    exporter = MetricsExporter(registry, str(path), interval=60, port=0)
+    exporter.start()
+    try:
+        with urllib.request.urlopen(exporter.url, timeout=5) as response:
+            assert 'hits_total 4' in response.read().decode('utf-8')
+    finally:
+        exporter.close()
+    assert 'hits_total 4' in path.read_text(encoding='utf-8')
+    assert [p.name for p in tmp_path.iterdir()] == ['metrics.prom']
+
+def test_options_from_argv(monkeypatch):
+    monkeypatch.delenv(metrics.ENV_VAR, raising=False)
+    assert options_from_argv(['main.py']) == {'enabled': False, 'port': None}
+    assert options_from_argv(['main.py', '--metrics']) == {'enabled': True, 'port': None}
+    assert options_from_argv(['main.py', '--metrics-port', '9100']) == {'enabled': True, 'port': 9100}
+    assert options_from_argv(['main.py', '--metrics-port', 'x']) == {'enabled': False, 'port': None}
+    monkeypatch.setenv(metrics.ENV_VAR, '1')
+    assert options_from_argv(['main.py'])['enabled']
+
+def test_log_metrics_are_labelled_by_log_base_name(global_metrics, tmp_path):
+    supervisor = ProcessSupervisor()
+    supervisor.start()
+    cmds = [f'"{sys.executable}" -c "print({i})"' for i in range(2)]
+    handles = [supervisor.submit(cmd, str(tmp_path / f'{i}.log')) for i, cmd in enumerate(cmds)]
+    assert all(handle.wait(10) for handle in handles)
+    labels = {row['labels']['cmd'] for row in global_metrics.snapshot() if row['name'] == LOG_LINES.name}
+    assert labels == {get_base_log_filename(cmd) for cmd in cmds}
+    assert LOG_BYTES.value(cmd=get_base_log_filename(cmds[0])) > 0
@@ -0,0 +1,61 @@
+import io
+from utils.output_pipeline import BufferedLogWriter, LineFramer, pump_pipe
+from utils.output_ring import OutputRing
+
+class CountingFile(io.BytesIO):
+    def __init__(self):
+        super().__init__()
+        self.writes = 0
+
+    def write(self, data):
+        self.writes += 1
+        return super().write(data)
+
+def test_writer_buffers_until_limit():
+    f = CountingFile()
+    writer = BufferedLogWriter(f, flush_bytes=10, flush_interval=60)
+    writer.write(b'abcd')
+    writer.write(b'efgh')
+    assert f.getvalue() == b''
+    writer.write(b'ijkl')
+    assert f.getvalue() == b'abcdefghijkl'
+    assert f.writes == 1
+    assert (writer.bytes_written, writer.flush_count) == (12, 1)
+
+def test_writer_flushes_when_drained():
+    f = io.BytesIO()
+    writer = BufferedLogWriter(f, flush_bytes=1024, flush_interval=60)
+    writer.write(b'line\n', drained=True)
+    assert f.getvalue() == b'line\n'
+
+def test_markers_and_output_reach_ring_in_file_order():
+    f = io.BytesIO()
+    ring = OutputRing('x.log')
+    seen = []
+    writer = BufferedLogWriter(f, flush_bytes=1024, flush_interval=60, on_data=seen.append, ring=ring)
+    writer.write_text('=== 开始 ===\n')
+    writer.write(b'out\n')
+    writer.write_text('=== 结束 ===\n')
+    assert seen == [b'out\n']
+    assert ring.read_from(0)[0] == f.getvalue()
+    # 标记不计入输出字节数
+    assert writer.bytes_written == 4
+
+def test_line_framer_handles_split_multibyte_and_crlf():
+    framer = LineFramer()
+    data = '第一行\r\n第二行\n尾'.encode('utf-8')
+    lines = []
+    for i in range(len(data)):
+        lines += framer.feed(data[i:i + 1])
+    assert lines == ['第一行', '第二行']
+    assert framer.close() == ['尾']
+    assert framer.close() == []
+
+def test_pump_pipe_reads_until_eof():
+    pipe = io.BytesIO(b'x' * 10 + b'y' * 3)
+    f = io.BytesIO()
+    writer = BufferedLogWriter(f, flush_bytes=1024, flush_interval=60)
+    pump_pipe(pipe, writer, chunk_size=5)
+    assert f.getvalue() == b'x' * 10 + b'y' * 3
+    # 最后一块不足 chunk_size 时视为读空并落盘，结束时不再有缓冲数据
+    assert writer.flush_count == 1
@@ -0,0 +1,113 @@
+import os
+import sys
+import random
+import threading
+from collections import deque
+from utils.output_ring import OutputRing, OutputRings
+from utils.process_supervisor import ProcessSupervisor
+
+def test_matches_tail_of_stream():
+    rng = random.Random(3)
+    ring = OutputRing('run.log', base=100, capacity=1000)
+    stream = b''
+    for i in range(400):
+        data = bytes([i % 256]) * rng.choice([1, 7, 60, 300, 999, 1500])
+        ring.append(data)
+        stream += data
+        assert ring.end == 100 + len(stream)
+        assert len(ring) <= 1000
+        data, offset = ring.read_from(0)
+        assert offset == ring.start and data == stream[ring.start - 100:]
+        # 任意位置开始、限制长度的读取与完整输出中对应的字节相同
+        start = rng.randrange(ring.start, ring.end + 1)
+        limit = rng.choice([None, 1, 50, 2000])
+        data, offset = ring.read_from(start, limit)
+        expected = stream[start - 100:] if limit is None else stream[start - 100:start - 100 + limit]
+        assert (data, offset) == (expected, start)
+
+def test_small_writes_are_coalesced_and_evicted_by_chunk():
+    ring = OutputRing('run.log', capacity=1024)
+    for _ in range(1000):
+        ring.append(b'line\n')
+    assert len(ring._chunks) <= 1024 // (ring._coalesce - 5) + 2
+    assert 1024 - ring._coalesce < len(ring) <= 1024
+    assert ring.read_from(0)[0] == b'line\n' * (len(ring) // 5)
+    ring.append(b'x' * 2000)
+    assert (ring.start, len(ring), ring.read_from(0)[0]) == (ring.end - 1024, 1024, b'x' * 1024)
+    assert ring.read_from(ring.end) == (b'', ring.end)
+
+def test_subscribers_and_close():
+    ring = OutputRing('run.log')
+    calls = []
+    callback = lambda: calls.append(ring.closed)
+    ring.subscribe(callback)
+    ring.append(b'a')
+    ring.append(b'')
+    ring.close()
+    assert calls == [False, True]
+    # 订阅者退订前仍可读完剩余内容，退订后内容被释放，偏移量保持连续
+    assert ring.read_from(0) == (b'a', 0)
+    ring.unsubscribe(callback)
+    assert (ring.start, ring.end, len(ring._chunks)) == (1, 1, 0)
+    ring.append(b'b')
+    assert calls == [False, True] and ring.read_from(0) == (b'', 2)
+
+def test_concurrent_reader_sees_consistent_data():
+    ring = OutputRing('run.log', capacity=4096)
+    ring.subscribe(lambda: None)  # 订阅后关闭时保留内容，读取方读完为止
+    errors = []
+
+    def writer():
+        for i in range(2000):
+            ring.append(b'%08d\n' % i)
+        ring.close()
+
+    thread = threading.Thread(target=writer)
+    thread.start()
+    position = 0
+    while not (ring.closed and position >= ring.end):
+        data, offset = ring.read_from(position)
+        if offset % 9 or any(len(line) != 8 for line in data[:len(data) - len(data) % 9].split(b'\n')[:-1]):
+            errors.append((offset, data[:20]))
+        position = offset + len(data)
+    thread.join()
+    assert errors == [] and position == 2000 * 9
+
+def test_rings_lookup_and_release(tmp_path):
+    rings = OutputRings(capacity=10)
+    path = str(tmp_path / 'a.log')
+    old = rings.open(path)
+    ring = rings.open(os.path.join(str(tmp_path), '.', 'a.log'), base=5)
+    assert rings.get(path) is ring and rings.get(None) is None
+    ring.append(b'x' * 30)
+    assert rings.total_bytes() == 10
+    rings.release(old)  # 已被替换的旧缓冲不影响查找表
+    assert rings.get(path) is ring and old.closed
+    rings.release(ring)
+    assert rings.get(path) is None and ring.closed and rings.total_bytes() == 0
+    assert len(ring) == 0 and not ring._chunks  # 没有订阅者，释放时丢弃内容
+
+def test_release_keeps_content_until_subscribers_finish():
+    rings = OutputRings()
+    ring = rings.open('run.log')
+    ring.append(b'output')
+    calls = []
+    callback = lambda: calls.append(ring.read_from(0)[0])
+    ring.subscribe(callback)
+    rings.release(ring)
+    assert calls == [b'output'] and ring.read_from(0) == (b'output', 0)
+    ring.unsubscribe(callback)
+    assert (len(ring), ring.end, ring._chunks) == (0, 6, deque())
+
+def test_supervisor_output_matches_log_offsets(tmp_path):
+    log_path = tmp_path / 'run.log'
+    log_path.write_bytes(b'previous run\n')
+    ring = OutputRing(str(log_path), base=os.path.getsize(log_path))
+    supervisor = ProcessSupervisor()
+    supervisor.start()
+    handle = supervisor.submit(f'"{sys.executable}" -c "print(\'hello\')"', str(log_path), ring=ring)
+    assert handle.wait(10)
+    content = log_path.read_bytes()
+    assert ring.end == len(content)
+    assert ring.read_from(0)[0] == content[ring.start:]
+    assert b'hello' in ring.read_from(0)[0]
@@ -0,0 +1,90 @@
+from types import SimpleNamespace
+from utils.proc_sampler import RingBuffer, ProcSampler
+
+class FakeReader:
+    """pid -> [进程名, 父pid, 启动时间, CPU滴答数, rss KB]"""
+    clk_tck = 100
+
+    def __init__(self):
+        self.procs = {}
+        self.stat_reads = 0
+
+    def read_stat(self, pid):
+        self.stat_reads += 1
+        proc = self.procs.get(pid)
+        return tuple(proc) if proc else None
+
+    def read_peak_rss(self, pid):
+        return 0
+
+    def list_pids(self):
+        return list(self.procs)
+
+def test_ring_buffer_wraps():
+    ring = RingBuffer(3, 'L')
+    assert ring.last is None and ring.max() is None
+    for value in range(5):
+        ring.append(value)
+    assert ring.values() == [2, 3, 4]
+    assert (len(ring), ring.last, ring.max()) == (3, 4, 4)
+
+def test_tree_usage_includes_children():
+    reader = FakeReader()
+    reader.procs = {10: ['shell', 1, 500, 0, 1000], 11: ['app', 10, 501, 0, 3000], 99: ['other', 1, 1, 0, 5]}
+    sampler = ProcSampler(reader=reader)
+    sampler.track('a', 10)
+    sampler.sample_once()
+    usage = sampler.usage('a')
+    assert (usage['processes'], usage['rss']) == (2, 4000)
+    # 父进程退出后子进程仍计入原来的进程树
+    del reader.procs[10]
+    reader.procs[11][1] = 1
+    reader.procs[11][4] = 5000
+    sampler.sample_once()
+    usage = sampler.usage('a')
+    assert (usage['processes'], usage['rss'], usage['peak_rss']) == (1, 5000, 5000)
+    del reader.procs[11]
+    sampler.sample_once()
+    assert sampler.usage('a') is None
+    assert sampler.tracked_processes == 0
+
+def test_pid_reuse_is_not_counted():
+    reader = FakeReader()
+    reader.procs = {10: ['app', 1, 500, 0, 1000]}
+    sampler = ProcSampler(reader=reader, rescan_every=100)
+    sampler.track('a', 10)
+    sampler.sample_once()
+    reader.procs[10] = ['reused', 1, 900, 0, 7000]
+    sampler.sample_once()
+    assert sampler.usage('a') is None
+
+def test_only_tracked_processes_are_read_between_rescans():
+    reader = FakeReader()
+    reader.procs = {pid: ['p', 1, pid, 0, 1] for pid in range(2, 200)}
+    sampler = ProcSampler(reader=reader, rescan_every=10)
+    sampler.track('a', 5)
+    sampler.sample_once()
+    reader.stat_reads = 0
+    sampler.sample_once()
+    assert reader.stat_reads == 1
+
+def test_pending_handle_is_attached_when_pid_is_known():
+    reader = FakeReader()
+    reader.procs = {42: ['app', 1, 7, 0, 100]}
+    sampler = ProcSampler(reader=reader)
+    handle = SimpleNamespace(pid=None, done=False)
+    sampler.track('cmd', handle)
+    sampler.sample_once()
+    assert sampler.usage('cmd') is None
+    handle.pid = 42
+    sampler.sample_once()
+    assert sampler.usage('cmd')['rss'] == 100
+    sampler.untrack('cmd')
+    assert sampler.usage('cmd') is None and sampler.tracked_processes == 0
+
+def test_unavailable_sampler_ignores_tracking():
+    sampler = ProcSampler()
+    sampler.reader = None
+    sampler.track('a', 1)
+    sampler.sample_once()
+    assert sampler.usages() == {}
@@ -0,0 +1,103 @@
+import os
+import re
+import sys
+import time
+import threading
+import pytest
+from utils.process_supervisor import ProcessSupervisor, RunHandle
+
+def python_cmd(code):
+    return f'"{sys.executable}" -c "{code}"'
+
+def sleep_cmd(seconds):
+    return python_cmd(f'import time; time.sleep({seconds})')
+
+@pytest.fixture
+def supervisor():
+    supervisor = ProcessSupervisor(max_concurrent=2)
+    supervisor.start()
+    return supervisor
+
+def wait_for(condition, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+def test_max_concurrent_and_fifo_queue(supervisor, tmp_path):
+    handles = [supervisor.submit(sleep_cmd(0.3), str(tmp_path / f'{i}.log')) for i in range(5)]
+    peak = 0
+    while not all(handle.done for handle in handles):
+        stats = supervisor.stats()
+        peak = max(peak, stats['running'])
+        assert stats['running'] <= 2
+        time.sleep(0.01)
+    assert all(handle.wait(10) for handle in handles)
+    assert peak == 2
+    assert [handle.exit_code for handle in handles] == [0] * 5
+    # 排队的命令按提交顺序启动，每个都在前面某个命令结束之后
+    starts = [handle.start_time for handle in handles]
+    assert starts == sorted(starts)
+    for i in range(2, 5):
+        assert starts[i] >= min(handle.end_time for handle in handles[:i])
+
+def test_cancel_queued_run(tmp_path):
+    supervisor = ProcessSupervisor(max_concurrent=1)
+    running = supervisor.submit(sleep_cmd(0.5), str(tmp_path / 'a.log'))
+    queued = supervisor.submit(python_cmd('print(1)'), str(tmp_path / 'b.log'))
+    queued.cancel()
+    assert queued.wait(5)
+    assert queued.status == RunHandle.CANCELLED and queued.cancelled and queued.pid is None
+    assert '已取消' in (tmp_path / 'b.log').read_text(encoding='utf-8')
+    assert running.wait(10) and running.status == RunHandle.EXITED
+
+def read_text(path):
+    try:
+        return path.read_text(encoding='utf-8')
+    except FileNotFoundError:
+        return ''
+
+def _alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    try:
+        with open(f'/proc/{pid}/stat') as f:
+            return f.read().split(')')[-1].split()[0] != 'Z'  # 僵尸进程已经结束
+    except OSError:
+        return True
+
+@pytest.mark.skipif(sys.platform == 'win32', reason='Windows 上用 taskkill 终止进程树')
+def test_cancel_running_kills_process_tree(supervisor, tmp_path):
+    log = tmp_path / 'tree.log'
+    code = ("import subprocess, sys, time; "
+            "p = subprocess.Popen([sys.executable, '-c', 'import time; time.sleep(60)']); "
+            "print('child=%d' % p.pid, flush=True); time.sleep(60)")
+    handle = supervisor.submit(python_cmd(code), str(log))
+    assert wait_for(lambda: re.search(r'^child=(\d+)$', read_text(log), re.M))
+    child = int(re.search(r'^child=(\d+)$', read_text(log), re.M).group(1))
+    handle.cancel()
+    assert handle.wait(10)
+    assert handle.cancelled and handle.exit_code != 0
+    assert wait_for(lambda: not _alive(child), 5)
+
+@pytest.mark.skipif(not hasattr(os, 'pidfd_open'), reason='没有 pidfd 时 asyncio 为每个子进程使用一个等待线程')
+def test_thread_count_stays_constant(supervisor, tmp_path):
+    supervisor.set_max_concurrent(20)
+    before = threading.active_count()
+    handles = [supervisor.submit(sleep_cmd(0.3), str(tmp_path / f'{i}.log')) for i in range(20)]
+    assert wait_for(lambda: supervisor.stats()['running'] == 20)
+    assert threading.active_count() == before
+    assert all(handle.wait(10) for handle in handles)
+
+def test_finished_handles_are_not_kept(tmp_path):
+    supervisor = ProcessSupervisor(recent_handles=2)
+    handles = []
+    for i in range(4):
+        handles.append(supervisor.submit(python_cmd('print(1)'), str(tmp_path / f'{i}.log')))
+        assert handles[-1].wait(10)
+    assert supervisor.handles() == handles[2:] and supervisor.active() == []
+    assert supervisor.find(str(tmp_path / '0.log')) is None
+    assert supervisor.find(str(tmp_path / '3.log')) is handles[3]
+    assert supervisor.stats()['total'] == 4
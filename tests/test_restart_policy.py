@@ -0,0 +1,150 @@
+import inspect
+import pytest
+from utils.restart_policy import (RestartPolicy, RestartSupervisor, RESTART_ON_FAILURE, RESTART_ALWAYS,
+                                  STATE_RUNNING, STATE_BACKOFF, STATE_IDLE, STATE_STOPPED, STATE_CRASH_LOOP,
+                                  STATE_LIMIT, EVENT_SCHEDULED, EVENT_RESTARTED)
+
+class FakeHandle:
+    def __init__(self, cmd, log_path='run.log'):
+        self.cmd = cmd
+        self.log_path = log_path
+        self.status = 'running'
+        self.exit_code = None
+        self.duration = None
+        self.cancelled = False
+        self.done = False
+        self._callbacks = []
+
+    def add_done_callback(self, callback):
+        if self.done:
+            callback(self)
+        else:
+            self._callbacks.append(callback)
+
+    def finish(self, exit_code, duration=1.0, status='exited'):
+        self.status, self.exit_code, self.duration, self.done = status, exit_code, duration, True
+        for callback in self._callbacks:
+            callback(self)
+
+    def cancel(self):
+        self.cancelled = True
+
+class Harness:
+    def __init__(self, policy):
+        self.now = 0.0
+        self.scheduled = []
+        self.started = []
+        self.events = []
+        self.supervisor = RestartSupervisor(self.start, {'svc': policy}, on_event=self.events.append,
+                                            schedule=lambda delay, fn, *args: self.scheduled.append((fn, args)),
+                                            clock=lambda: self.now, rand=lambda: 0.5)
+
+    def start(self, cmd, log_path):
+        handle = FakeHandle(cmd, log_path)
+        self.started.append(handle)
+        return handle
+
+    def run_scheduled(self):
+        scheduled, self.scheduled = self.scheduled, []
+        for fn, args in scheduled:
+            fn(*args)
+
+def test_should_restart_and_backoff():
+    policy = RestartPolicy(RESTART_ON_FAILURE, backoff_initial=1, backoff_max=5, jitter=0.5)
+    assert policy.should_restart('exited', 1) and policy.should_restart('failed', None)
+    assert not policy.should_restart('exited', 0) and not policy.should_restart('cancelled', 1)
+    assert RestartPolicy(RESTART_ALWAYS).should_restart('exited', 0)
+    assert [policy.backoff(i, rand=lambda: 0.5) for i in range(5)] == [1, 2, 4, 5, 5]
+    assert policy.backoff(0, rand=lambda: 1.0) == 1.5
+    with pytest.raises(ValueError):
+        RestartPolicy('sometimes')
+
+def test_from_dict_round_trip_and_invalid_values():
+    policy = RestartPolicy(RESTART_ALWAYS, max_restarts=3, new_log=True)
+    assert RestartPolicy.from_dict(dict(policy.to_dict(), unknown=1)).to_dict() == policy.to_dict()
+    assert RestartPolicy.from_dict({'mode': 'bogus'}).mode == 'never'
+    assert RestartPolicy.from_dict(None).to_dict() == RestartPolicy().to_dict()
+
+def test_failed_run_is_restarted_into_same_log():
+    h = Harness(RestartPolicy(RESTART_ON_FAILURE, jitter=0))
+    first = FakeHandle('svc', 'svc.log')
+    h.supervisor.watch('svc', first)
+    assert h.supervisor.state('svc')['state'] == STATE_RUNNING
+    first.finish(1)
+    assert h.supervisor.state('svc')['state'] == STATE_BACKOFF
+    assert h.events[-1]['type'] == EVENT_SCHEDULED
+    h.run_scheduled()
+    assert [handle.log_path for handle in h.started] == ['svc.log']
+    assert h.events[-1]['type'] == EVENT_RESTARTED
+    assert h.supervisor.state('svc')['total_restarts'] == 1
+
+def test_cancelled_run_is_not_restarted():
+    h = Harness(RestartPolicy(RESTART_ALWAYS))
+    handle = FakeHandle('svc')
+    h.supervisor.watch('svc', handle)
+    handle.cancel()
+    handle.finish(-15)
+    assert h.supervisor.state('svc')['state'] == STATE_IDLE
+    assert h.scheduled == []
+
+def test_stop_and_forget_cancel_scheduled_restart():
+    for method in ('stop', 'forget'):
+        h = Harness(RestartPolicy(RESTART_ALWAYS))
+        handle = FakeHandle('svc')
+        h.supervisor.watch('svc', handle)
+        handle.finish(0)
+        getattr(h.supervisor, method)('svc')
+        h.run_scheduled()
+        assert h.started == []
+    assert h.supervisor.state('svc') is None
+
+def test_forget_keeps_running_process():
+    h = Harness(RestartPolicy(RESTART_ALWAYS))
+    handle = FakeHandle('svc')
+    h.supervisor.watch('svc', handle)
+    h.supervisor.forget('svc')
+    assert not handle.cancelled
+    handle.finish(1)
+    assert h.scheduled == [] and h.supervisor.state('svc') is None
+    h.supervisor.stop('svc')
+    assert h.supervisor.state('svc') is None
+
+def test_stop_terminates_running_process():
+    h = Harness(RestartPolicy(RESTART_ALWAYS))
+    handle = FakeHandle('svc')
+    h.supervisor.watch('svc', handle)
+    h.supervisor.stop('svc')
+    assert handle.cancelled
+    assert h.supervisor.state('svc')['state'] == STATE_STOPPED
+
+def test_crash_loop_stops_restarting():
+    h = Harness(RestartPolicy(RESTART_ALWAYS, min_uptime=10, crash_loop_count=3))
+    handle = FakeHandle('svc')
+    h.supervisor.watch('svc', handle)
+    for _ in range(2):
+        handle.finish(1, duration=0.5)
+        h.run_scheduled()
+        handle = h.started[-1]
+    handle.finish(1, duration=0.5)
+    assert h.supervisor.state('svc')['state'] == STATE_CRASH_LOOP
+    assert h.events[-1]['count'] == 3
+
+def test_restart_limit_within_window():
+    h = Harness(RestartPolicy(RESTART_ALWAYS, min_uptime=0, max_restarts=2, window_seconds=60))
+    handle = FakeHandle('svc')
+    h.supervisor.watch('svc', handle)
+    for _ in range(2):
+        handle.finish(0, duration=30)
+        h.run_scheduled()
+        handle = h.started[-1]
+    handle.finish(0, duration=30)
+    assert h.supervisor.state('svc')['state'] == STATE_LIMIT
+    # 窗口过去后手动启动，重新计数
+    h.now += 120
+    handle = FakeHandle('svc')
+    h.supervisor.watch('svc', handle)
+    handle.finish(0, duration=30)
+    assert h.supervisor.state('svc')['state'] == STATE_BACKOFF
+
+def test_fields_match_constructor_parameters():
+    assert tuple(inspect.signature(RestartPolicy).parameters) == RestartPolicy.FIELDS
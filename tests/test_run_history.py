@@ -0,0 +1,76 @@
+import os
+import sys
+from types import SimpleNamespace
+import pytest
+from utils.run_history import (RunHistory, run_from_handle, format_duration, format_status,
+                               STATUS_SUCCESS, STATUS_FAILED, STATUS_CANCELLED)
+from utils.subprocess_logger import run_cmd_with_log
+
+@pytest.fixture
+def history(tmp_path):
+    history = RunHistory(str(tmp_path / 'run_history.db'))
+    yield history
+    history.close()
+
+def run(cmd, start, status=STATUS_SUCCESS, duration=1.0, exit_code=0):
+    return {'cmd': cmd, 'start_time': start, 'end_time': start + duration, 'duration': duration,
+            'exit_code': exit_code, 'status': status}
+
+def test_last_runs_returns_latest_run_per_command(history):
+    for cmd in ('a', 'b', 'c'):
+        for start in (100, 300, 200):
+            history.record(run(cmd, start + ord(cmd)))
+    assert history.flush()
+    last = history.last_runs(['a', 'b', 'missing', 'a'])
+    assert set(last) == {'a', 'b'}
+    assert last['a']['start_time'] == 300 + ord('a')
+    assert 'rank' not in last['a']
+    assert history.last_runs([]) == {}
+
+def test_last_runs_splits_large_command_lists(history):
+    cmds = [f'cmd {i}' for i in range(RunHistory.QUERY_BATCH + 10)]
+    for i, cmd in enumerate(cmds):
+        history.record(run(cmd, i))
+    history.flush()
+    last = history.last_runs(cmds)
+    assert len(last) == len(cmds)
+    assert last[cmds[-1]]['start_time'] == len(cmds) - 1
+
+def test_summary_usage_and_failures(history):
+    history.record(run('a', 100, duration=2.0))
+    history.record(run('a', 200, STATUS_FAILED, duration=4.0, exit_code=1))
+    history.record(run('b', 150, STATUS_FAILED, exit_code=2))
+    history.flush()
+    summary = history.summary('a')
+    assert (summary['count'], summary['failures'], summary['avg_duration'], summary['max_duration'],
+            summary['last_start']) == (2, 1, 3.0, 4.0, 200)
+    assert history.summary('missing')['failures'] == 0
+    assert history.usage() == {'a': (2, 200), 'b': (1, 150)}
+    assert [r['cmd'] for r in history.failures(120, 300)] == ['a', 'b']
+    assert [r['start_time'] for r in history.history('a')] == [200, 100]
+
+def test_run_from_handle_status():
+    handle = SimpleNamespace(cmd='a', status='exited', exit_code=0, cancelled=False, start_time=10.0,
+                             submit_time=9.0, end_time=12.5, pid=1, log_path='a.log', bytes_written=3,
+                             error=None)
+    record = run_from_handle(handle)
+    assert (record['status'], record['duration']) == (STATUS_SUCCESS, 2.5)
+    handle.exit_code = 1
+    assert run_from_handle(handle)['status'] == STATUS_FAILED
+    handle.cancelled = True
+    assert run_from_handle(handle)['status'] == STATUS_CANCELLED
+
+def test_format_helpers():
+    assert format_duration(None) == '-'
+    assert format_duration(3.25) == '3.2s'
+    assert format_duration(125) == '2m05s'
+    assert format_duration(7260) == '2h01m'
+    assert format_status({'status': STATUS_FAILED, 'exit_code': 1, 'duration': 1.0}) == '失败(1) 1.0s'
+
+def test_run_cmd_with_log_records_to_given_history(history, tmp_path):
+    cmd = f'"{sys.executable}" -c "print(1)"'
+    path = run_cmd_with_log(cmd, str(tmp_path / 'log'), echo=False, history=history)
+    assert path and os.path.exists(path)
+    history.flush()
+    last = history.last_runs([cmd])[cmd]
+    assert (last['status'], last['log_path']) == (STATUS_SUCCESS, path)
@@ -0,0 +1,39 @@
+import io
+from utils.startup_profile import StartupProfiler, PROFILE_FLAG
+
+class FakeClock:
+    def __init__(self, now=10.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+def test_phases_record_durations_and_totals():
+    clock = FakeClock()
+    profiler = StartupProfiler(True, clock=clock, start=9.5)
+    clock.now = 10.25
+    profiler.mark('导入')
+    clock.now = 11.0
+    profiler.mark('构建界面')
+    assert profiler.phases() == [('导入', 0.75, 0.75), ('构建界面', 0.75, 1.5)]
+    stream = io.StringIO()
+    profiler.report(stream)
+    profiler.report(stream)
+    lines = stream.getvalue().splitlines()
+    assert lines[0] == '启动耗时分析:' and len(lines) == 3
+    # 中文按两列对齐，各行的耗时列位置相同
+    assert lines[1].index('ms') + len('导入') == lines[2].index('ms') + len('构建界面')
+    assert '累计   1500.0 ms' in lines[2]
+
+def test_disabled_profiler_records_nothing():
+    profiler = StartupProfiler(clock=FakeClock())
+    profiler.mark('导入')
+    stream = io.StringIO()
+    profiler.report(stream)
+    assert profiler.phases() == [] and stream.getvalue() == ''
+
+def test_from_argv_removes_flag():
+    argv = ['main.py', PROFILE_FLAG, '--run', 'x', PROFILE_FLAG]
+    profiler = StartupProfiler.from_argv(argv, start=1.0)
+    assert profiler.enabled and profiler.start == 1.0 and argv == ['main.py', '--run', 'x']
+    assert not StartupProfiler.from_argv(['main.py']).enabled
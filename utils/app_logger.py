@@ -0,0 +1,175 @@
+"""
+应用日志（launcher.log）的后台写入器：
+调用方只把日志记录放进内存队列就返回，后台线程持有常开的文件句柄，
+把队列中积累的记录合并成一次写入，并按刷新策略落盘、按大小轮转。
+可以同时输出 JSON Lines 格式的结构化日志（launcher.log.jsonl）。
+"""
+
+import os
+import json
+import time
+import threading
+from collections import deque
+from utils.log_retention import rotate_file
+
+FLUSH_BATCH = 'batch'  # 每写完一批记录就 flush
+FLUSH_INTERVAL = 'interval'  # 距上次 flush 超过 flush_interval 秒才 flush
+
+class AppLogger:
+    """
+    队列化的应用日志写入器
+
+    Args:
+        path: 文本日志路径，每行格式为 "YYYY-mm-dd HH:MM:SS 消息"
+        json_path: 结构化日志路径（JSON Lines），None 表示不输出
+        flush_policy: FLUSH_BATCH 或 FLUSH_INTERVAL；ERROR 级别的记录总是立即 flush
+        flush_interval: FLUSH_INTERVAL 策略下的最长落盘间隔（秒）
+        max_queue: 队列最多积压的记录数，超出时丢弃最旧的记录
+        max_bytes / backups: 日志轮转参数，同 rotate_file
+    """
+    def __init__(self, path='data/log/launcher.log', json_path=None, flush_policy=FLUSH_INTERVAL,
+                 flush_interval=0.5, max_queue=100000, max_bytes=5 * 1024 * 1024, backups=3):
+        self.path = path
+        self.json_path = json_path
+        self.flush_policy = flush_policy
+        self.flush_interval = flush_interval
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self._queue = deque(maxlen=max_queue)
+        self._cond = threading.Condition()
+        self._closed = False
+        self._flush_requested = 0  # flush() 请求序号
+        self._flush_completed = 0  # 后台线程已完成的 flush 序号
+        self._files = {}  # 路径 -> 文件句柄
+        self.records_written = 0
+        self.batch_count = 0
+        self.dropped = 0  # 队列满时丢弃的记录数
+        self.last_error = None
+        self._thread = threading.Thread(target=self._run, name='AppLogger', daemon=True)
+        self._thread.start()
+
+    def log(self, msg, level='INFO', **fields):
+        """
+        记录一条日志，立即返回
+
+        Args:
+            msg: 日志消息
+            level: 日志级别
+            fields: 附加的结构化字段，只写入 JSON Lines 日志
+        """
+        record = (time.time(), level, msg, fields)
+        with self._cond:
+            if self._closed:
+                return
+            if len(self._queue) == self._queue.maxlen:
+                self.dropped += 1
+            # 后台线程每次取走整个队列，只有队列由空变为非空时才需要唤醒
+            if not self._queue:
+                self._cond.notify()
+            self._queue.append(record)
+
+    def flush(self, timeout=2.0):
+        """等待已提交的记录全部写入文件"""
+        with self._cond:
+            if self._closed and not self._thread.is_alive():
+                return True
+            self._flush_requested += 1
+            target = self._flush_requested
+            self._cond.notify()
+            return self._cond.wait_for(lambda: self._flush_completed >= target, timeout)
+
+    def close(self, timeout=2.0):
+        """写完剩余记录，关闭文件并结束后台线程"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        self._thread.join(timeout)
+
+    @staticmethod
+    def format_text(record):
+        created, level, msg, _ = record
+        prefix = '' if level == 'INFO' else f'[{level}] '
+        return f'{time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(created))} {prefix}{msg}\n'
+
+    @staticmethod
+    def format_json(record):
+        created, level, msg, fields = record
+        data = {'time': round(created, 3), 'level': level, 'msg': msg}
+        data.update(fields)
+        return json.dumps(data, ensure_ascii=False, default=str) + '\n'
+
+    def _run(self):
+        last_flush = time.monotonic()
+        dirty = False
+        while True:
+            with self._cond:
+                timeout = None
+                if dirty and self.flush_policy == FLUSH_INTERVAL:
+                    timeout = max(0.0, self.flush_interval - (time.monotonic() - last_flush))
+                self._cond.wait_for(lambda: self._queue or self._closed
+                                    or self._flush_requested > self._flush_completed, timeout)
+                batch = list(self._queue)
+                self._queue.clear()
+                flush_target = self._flush_requested
+                closing = self._closed
+            if batch:
+                self._write_batch(batch)
+                dirty = True
+            force = (closing or flush_target > self._flush_completed
+                     or any(record[1] == 'ERROR' for record in batch))
+            if dirty and (force or self.flush_policy == FLUSH_BATCH
+                          or time.monotonic() - last_flush >= self.flush_interval):
+                self._flush_files()
+                last_flush = time.monotonic()
+                dirty = False
+            with self._cond:
+                self._flush_completed = max(self._flush_completed, flush_target)
+                self._cond.notify_all()
+            if closing:
+                with self._cond:
+                    if self._queue:
+                        continue
+                self._close_files()
+                return
+
+    def _open(self, path):
+        handle = self._files.get(path)
+        if handle is None:
+            os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+            handle = self._files[path] = open(path, 'a', encoding='utf-8')
+        return handle
+
+    def _write_batch(self, batch):
+        targets = [(self.path, self.format_text)]
+        if self.json_path:
+            targets.append((self.json_path, self.format_json))
+        try:
+            for path, formatter in targets:
+                handle = self._open(path)
+                handle.write(''.join(map(formatter, batch)))
+                # 轮转前必须关闭句柄（Windows 下无法重命名已打开的文件）
+                if handle.tell() >= self.max_bytes:
+                    handle.close()
+                    del self._files[path]
+                    rotate_file(path, self.max_bytes, self.backups)
+            self.records_written += len(batch)
+            self.batch_count += 1
+            self.last_error = None
+        except (OSError, ValueError) as e:
+            self.last_error = e
+            print(f'写入应用日志失败: {self.path} 错误: {e}')
+
+    def _flush_files(self):
+        for handle in self._files.values():
+            try:
+                handle.flush()
+            except (OSError, ValueError) as e:
+                self.last_error = e
+
+    def _close_files(self):
+        for handle in self._files.values():
+            try:
+                handle.close()
+            except (OSError, ValueError):
+                pass
+        self._files.clear()
@@ -0,0 +1,90 @@
+from bisect import bisect_left, insort
+
+class CheckedOrderIndex:
+    """
+    勾选顺序索引（不依赖Qt）
+
+    按勾选顺序号维护已勾选条目的有序表，显示序号即条目在表中的位置+1。
+    新勾选的条目总是拿到最大的顺序号，追加到表尾，只影响它自己的序号；
+    取消勾选只会让排在它后面的条目序号减一。
+    增删操作返回序号实际发生变化的条目列表 [(key, 新序号或None)]，
+    调用方只需要刷新这些条目的显示。
+    """
+    def __init__(self):
+        self._orders = []  # 升序排列的勾选顺序号
+        self._key_by_order = {}
+        self._order_by_key = {}
+        self.next_order = 1  # 下一个可分配的勾选顺序号
+
+    def __len__(self):
+        return len(self._orders)
+
+    def __contains__(self, key):
+        return key in self._order_by_key
+
+    def order(self, key):
+        return self._order_by_key.get(key)
+
+    def rank(self, key):
+        """条目的显示序号（从1开始），未勾选返回None"""
+        order = self._order_by_key.get(key)
+        if order is None:
+            return None
+        return bisect_left(self._orders, order) + 1
+
+    def keys(self):
+        """按勾选顺序返回所有已勾选条目"""
+        return [self._key_by_order[o] for o in self._orders]
+
+    def add(self, key, order=None):
+        """
+        勾选条目
+
+        Args:
+            key: 条目
+            order: 指定的勾选顺序号（加载数据时使用），为None时分配新的顺序号
+
+        Returns:
+            list: 序号发生变化的 [(key, 新序号)]
+        """
+        if key in self._order_by_key:
+            self.remove(key)
+        if order is None:
+            order = self.next_order
+        while order in self._key_by_order:
+            order += 1
+        self.next_order = max(self.next_order, order + 1)
+        self._order_by_key[key] = order
+        self._key_by_order[order] = key
+        if not self._orders or order > self._orders[-1]:
+            self._orders.append(order)
+            return [(key, len(self._orders))]
+        insort(self._orders, order)
+        pos = bisect_left(self._orders, order)
+        return self._changes_from(pos)
+
+    def remove(self, key):
+        """
+        取消勾选条目
+
+        Returns:
+            list: 序号发生变化的 [(key, 新序号或None)]
+        """
+        order = self._order_by_key.pop(key, None)
+        if order is None:
+            return []
+        del self._key_by_order[order]
+        pos = bisect_left(self._orders, order)
+        del self._orders[pos]
+        return [(key, None)] + self._changes_from(pos)
+
+    def clear(self):
+        """清空所有勾选，返回 [(key, None)]"""
+        changes = [(key, None) for key in self.keys()]
+        self._orders.clear()
+        self._key_by_order.clear()
+        self._order_by_key.clear()
+        return changes
+
+    def _changes_from(self, pos):
+        return [(self._key_by_order[self._orders[i]], i + 1) for i in range(pos, len(self._orders))]
@@ -0,0 +1,246 @@
+"""
+命令行模式（不导入 PyQt5）：在没有显示器的服务器或CI中使用与图形界面相同的 launcher_data.json，
+列出图标和命令、启动图标或运行命令、查看命令日志。
+
+    python quicklauncher.py list [--json]
+    python quicklauncher.py launch 名称或命令... [--checked] [--all] [--delay 秒] [-q]
+    python quicklauncher.py tail "命令" [-n 行数] [-f]
+    python quicklauncher.py search 文本或正则 [-E] [-s] [--cmd "命令"] [--since 24h] [--update]
+
+launch 运行命令时会等待全部结束（输出写入日志并回显到控制台），任一命令失败时退出代码为1。
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+from utils.launcher_profile import LauncherProfile, DATA_FILE
+
+LOG_DIR = 'data/log'
+FOLLOW_INTERVAL = 0.5  # tail -f 检查新内容的间隔（秒）
+
+def _print_err(message):
+    print(message, file=sys.stderr)
+
+def cmd_list(args):
+    profile = LauncherProfile.load(args.data)
+    from utils.run_history import get_run_history, format_status
+    last_runs = get_run_history().last_runs(profile.cmds) if profile.cmds else {}
+    if args.json:
+        print(json.dumps({
+            'icons': [{'name': e.name, 'path': e.path, 'checked': bool(e.checked), 'order': e.order,
+                       'launch_time': e.launch_time} for e in profile.icons],
+            'cmds': [{'cmd': cmd, 'last_run': last_runs.get(cmd),
+                      'restart': profile.cmd_policies[cmd].mode if cmd in profile.cmd_policies else None}
+                     for cmd in profile.cmds],
+        }, ensure_ascii=False, indent=2))
+        return 0
+    numbers = {id(e): i for i, e in enumerate(profile.checked_icons(), 1)}
+    print(f'图标 ({len(profile.icons)}):')
+    for entry in profile.icons:
+        number = numbers.get(id(entry))
+        mark = f'[{number}]' if number else '[ ]'
+        launched = f'  最近启动 {entry.launch_time}' if entry.launch_time else ''
+        print(f'  {mark:>5} {entry.name}  {entry.path}{launched}')
+    print(f'命令 ({len(profile.cmds)}):')
+    for cmd in profile.cmds:
+        run = last_runs.get(cmd)
+        status = f'  {format_status(run)}' if run else ''
+        print(f'  {cmd}{status}')
+    return 0
+
+def _resolve_targets(profile, args):
+    """
+    Returns:
+        tuple: ([('icon', IconEntry) 或 ('cmd', 命令)], [找不到的名称])
+    """
+    items, unknown = [], []
+    if args.all:
+        items.extend(('icon', e) for e in profile.icons)
+    elif args.checked:
+        items.extend(('icon', e) for e in profile.checked_icons())
+    for target in args.targets:
+        if target in profile.cmds:
+            items.append(('cmd', target))
+            continue
+        entry = profile.find_icon(target)
+        if entry is not None:
+            items.append(('icon', entry))
+        else:
+            unknown.append(target)
+    return items, unknown
+
+def cmd_launch(args):
+    profile = LauncherProfile.load(args.data)
+    items, unknown = _resolve_targets(profile, args)
+    for target in unknown:
+        _print_err(f'配置中没有该图标或命令: {target}')
+    if unknown:
+        return 1
+    if not items:
+        _print_err('没有要启动的项目（指定名称或命令，或使用 --checked / --all）')
+        return 1
+    from utils.launch_queue import LaunchQueue, launch_path, run_queue
+    from utils import subprocess_logger
+    on_output = None if args.quiet else _echo
+    handles = []
+
+    def launch(item):
+        kind, target = item
+        if kind == 'icon':
+            launch_path(target.path)
+        else:
+            handles.append(subprocess_logger.start_cmd_with_log(target, args.log_dir, on_output=on_output))
+
+    def on_launched(index, item, ok, error):
+        kind, target = item
+        name = target.path if kind == 'icon' else target
+        if ok:
+            print(f'[{index}/{len(items)}] 启动: {name}', flush=True)
+        else:
+            _print_err(f'[{index}/{len(items)}] 启动失败: {name} 错误: {error}')
+
+    queue = LaunchQueue()
+    queue.extend(items, args.delay)
+    failed = 0
+    try:
+        failed = run_queue(queue, launch, on_launched)
+        for handle in handles:
+            handle.wait()
+    except KeyboardInterrupt:
+        queue.cancel()
+        for handle in handles:
+            handle.cancel()
+        for handle in handles:
+            handle.wait(5)
+        _print_err('已取消')
+        return 130
+    from utils.run_history import get_run_history, run_from_handle, format_status, STATUS_SUCCESS
+    for handle in handles:
+        run = run_from_handle(handle)
+        print(f'{handle.cmd}: {format_status(run)}  日志: {handle.log_path}')
+        if run['status'] != STATUS_SUCCESS:
+            failed += 1
+    # 运行历史在后台线程写入，退出前等待落盘
+    get_run_history().close()
+    return 1 if failed else 0
+
+def _echo(data):
+    sys.stdout.buffer.write(data)
+    sys.stdout.buffer.flush()
+
+def cmd_tail(args):
+    from utils.log_tail import tail_command_log
+    log_file, lines = tail_command_log(args.cmd, args.lines, args.log_dir)
+    if log_file is None:
+        _print_err(f'未找到命令对应的日志文件: {args.cmd}')
+        return 1
+    for line in lines:
+        print(line)
+    if args.follow:
+        from utils.log_io import is_compressed
+        if is_compressed(log_file):
+            _print_err(f'日志已压缩归档，无法跟踪: {log_file}')
+            return 1
+        try:
+            _follow(log_file)
+        except KeyboardInterrupt:
+            pass
+    return 0
+
+def _follow(path):
+    """持续输出文件新增的内容，文件被截断时从头读取"""
+    position = os.path.getsize(path)
+    while True:
+        time.sleep(FOLLOW_INTERVAL)
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            continue
+        if size < position:
+            position = 0
+        if size == position:
+            continue
+        with open(path, 'rb') as f:
+            f.seek(position)
+            data = f.read(size - position)
+        position += len(data)
+        _echo(data)
+
+def _parse_age(text):
+    """'30m' / '24h' / '7d' / 秒数 -> 秒"""
+    units = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+    if text and text[-1].lower() in units:
+        return float(text[:-1]) * units[text[-1].lower()]
+    return float(text)
+
+def cmd_search(args):
+    from utils.log_search import get_log_search
+    from utils.log_filename import get_base_log_filename
+    index = get_log_search(args.log_dir)
+    if args.update:
+        stats = index.update()
+        _print_err(f"索引已更新: 新增 {stats['indexed']} 个，移除 {stats['removed']} 个")
+    since = time.time() - _parse_age(args.since) if args.since else None
+
+    def on_hit(hit):
+        print(f"{hit['name']}:{hit['line']}: {hit['text']}")
+
+    stats = index.search(args.query, regex=args.regex, ignore_case=not args.case_sensitive,
+                         base=get_base_log_filename(args.cmd) if args.cmd else None,
+                         since=since, max_results=args.max, on_hit=on_hit)
+    _print_err(f"{stats['hits']} 条结果，扫描 {stats['files']}/{stats['total']} 个日志，{stats['elapsed'] * 1000:.0f} ms")
+    return 0 if stats['hits'] else 1
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='quicklauncher', description='QuickLauncher 命令行模式（不需要图形界面）')
+    parser.add_argument('--data', default=DATA_FILE, help='配置文件（相对于程序目录，默认与图形界面共用）')
+    parser.add_argument('--log-dir', default=LOG_DIR, help='命令日志目录')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    p = sub.add_parser('list', help='列出图标和命令（含最近一次运行结果）')
+    p.add_argument('--json', action='store_true', help='以 JSON 输出')
+    p.set_defaults(func=cmd_list)
+
+    p = sub.add_parser('launch', help='启动图标或运行命令')
+    p.add_argument('targets', nargs='*', metavar='名称或命令', help='图标的路径或文件名，或配置中的命令文本')
+    p.add_argument('--checked', action='store_true', help='按勾选顺序启动已勾选的图标')
+    p.add_argument('--all', action='store_true', help='启动所有图标')
+    p.add_argument('--delay', type=float, default=0.0, help='相邻两项的启动间隔（秒）')
+    p.add_argument('-q', '--quiet', action='store_true', help='不回显命令输出（仍写入日志）')
+    p.set_defaults(func=cmd_launch)
+
+    p = sub.add_parser('tail', help='输出命令最新日志的最后几行')
+    p.add_argument('cmd', metavar='命令')
+    p.add_argument('-n', '--lines', type=int, default=50, help='输出的行数')
+    p.add_argument('-f', '--follow', action='store_true', help='持续输出新增内容')
+    p.set_defaults(func=cmd_tail)
+
+    p = sub.add_parser('search', help='在所有命令日志中搜索（使用全文索引）')
+    p.add_argument('query', metavar='文本或正则')
+    p.add_argument('-E', '--regex', action='store_true', help='按正则表达式搜索')
+    p.add_argument('-s', '--case-sensitive', action='store_true', help='区分大小写')
+    p.add_argument('--cmd', help='只搜索该命令的日志')
+    p.add_argument('--since', help='只搜索最近一段时间开始的运行，如 30m、24h、7d')
+    p.add_argument('--max', type=int, default=1000, help='最多输出的结果数')
+    p.add_argument('--update', action='store_true', help='先更新索引（首次建立可能较慢）')
+    p.set_defaults(func=cmd_search)
+    return parser
+
+def main(argv=None):
+    """
+    命令行入口
+
+    Args:
+        argv: 参数列表（不含程序名），默认取 sys.argv[1:]
+
+    Returns:
+        int: 进程退出代码
+    """
+    args = build_parser().parse_args(argv)
+    try:
+        return args.func(args)
+    except (OSError, ValueError) as e:
+        _print_err(f'错误: {e}')
+        return 1
@@ -0,0 +1,97 @@
+import os
+import json
+import tempfile
+import threading
+from utils.metrics import DATA_WRITE_SECONDS
+
+def atomic_write_json(path, data, indent=2):
+    """
+    原子地把数据写入JSON文件：先写同目录下的临时文件，再用 os.replace 替换
+
+    Args:
+        path: 目标文件路径
+        data: 可被JSON序列化的数据
+        indent: JSON缩进
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(prefix='.' + os.path.basename(path) + '.', suffix='.tmp', dir=directory)
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=indent)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+class WriteBehindWriter:
+    """
+    后台写入器：在独立线程中原子地写JSON文件
+
+    多次 submit 之间只保留最新一份数据（后写覆盖先写），
+    与上次写入内容相同的数据会被直接跳过。
+    """
+    def __init__(self, path, indent=2):
+        self.path = path
+        self.indent = indent
+        self._cond = threading.Condition()
+        self._pending = None  # 等待写入的最新数据
+        self._has_pending = False
+        self._writing = False
+        self._last_written = None
+        self._closed = False
+        self.write_count = 0  # 实际落盘次数
+        self.last_error = None
+        self._thread = threading.Thread(target=self._run, name='WriteBehindWriter', daemon=True)
+        self._thread.start()
+
+    def submit(self, data):
+        """提交一份数据，立即返回"""
+        with self._cond:
+            if self._closed:
+                raise RuntimeError('writer已关闭')
+            self._pending = data
+            self._has_pending = True
+            self._cond.notify_all()
+
+    def flush(self, timeout=None):
+        """等待所有已提交的数据写入完成"""
+        with self._cond:
+            return self._cond.wait_for(lambda: not self._has_pending and not self._writing, timeout)
+
+    def close(self, timeout=None):
+        """写完剩余数据并结束后台线程"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join(timeout)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._has_pending or self._closed)
+                if not self._has_pending:
+                    return
+                data = self._pending
+                self._pending = None
+                self._has_pending = False
+                self._writing = True
+            try:
+                if data != self._last_written:
+                    with DATA_WRITE_SECONDS.time(file=os.path.basename(self.path)):
+                        atomic_write_json(self.path, data, self.indent)
+                    self._last_written = data
+                    self.write_count += 1
+                self.last_error = None
+            except Exception as e:
+                self.last_error = e
+                print(f'写入数据文件失败: {self.path} 错误: {e}')
+            finally:
+                with self._cond:
+                    self._writing = False
+                    self._cond.notify_all()
@@ -0,0 +1,489 @@
+"""
+启动面板（Ctrl+P）的模糊匹配索引，不依赖Qt
+
+候选项（图标、命令）在加入时预先处理好，增删改都是增量的：
+- 小写文本按字符建立倒排表（字符 -> 候选编号集合），子序列匹配的候选必须包含查询中的所有字符；
+- 整个文本、每个单词开头的后缀、单词首字母分别放在有序数组中，前缀类匹配用二分查找直接取出。
+
+打分按档次：文本前缀 > 单词开头或首字母缩写 > 子串 > 子序列（越紧凑分越高），
+多个查询词的分数相加，再加上按启动次数和最近启动时间计算的使用频率（frecency）加分。
+每次按键先求字符倒排表的交集（在上一次查询的基础上继续缩小），各档次尽量用集合运算一次取出，
+只有落到子序列档次的候选才逐个用正则确认：没有使用记录的候选按档次（多个查询词时按各词档次的组合）
+从高到低取，取够结果数、剩下的不可能排进前面时就不再计算更低的档次；
+需要完整计算的查询词得分缓存起来，继续输入时只在上一次的匹配中查找。
+"""
+
+import re
+import math
+import time
+import heapq
+import itertools
+from bisect import bisect_left
+
+TIER_PREFIX = 4.0  # 文本以查询开头
+TIER_WORD = 3.0  # 某个单词以查询开头，或单词首字母以查询开头
+TIER_SUBSTRING = 2.0  # 包含查询子串
+TIER_FUZZY = 1.0  # 按顺序包含查询的所有字符，另加不超过 FUZZY_COMPACT 的紧凑度加分
+FUZZY_COMPACT = 0.9
+FRECENCY_WEIGHT = 3.0  # 使用频率加分的上限
+HALF_LIFE = 3 * 86400  # 最近启动时间的加分每3天减半
+
+_SEPARATORS = re.escape(' \t_-./\\:,;()[]{}"\'+=&@#')
+# 分隔符之后的第一个字符，或小写字母、数字后的大写字母（驼峰）
+_WORD_START = re.compile(f'(?:^|(?<=[{_SEPARATORS}]))[^{_SEPARATORS}]|(?<=[a-z0-9])[A-Z]')
+_MAX_CHAR = '\U0010ffff'
+_TERM_CACHE_SIZE = 32  # 缓存完整得分的查询词数
+_BULK_SORT = 64  # 待插入的键超过这个数量时合并后整体排序，而不是逐个插入
+_COMPACT_MIN = 1000  # 有序数组中已删除的候选超过这个数量（且超过八分之一）时清理
+_MAX_COMBINED = 5  # 查询词不超过这个数量时按档次组合取结果（组合数为4的词数次方）
+
+def word_starts(text):
+    """
+    单词开头的位置：分隔符之后的第一个字符、小写字母或数字后的大写字母（驼峰）
+
+    Args:
+        text: 原文本（区分大小写才能识别驼峰）
+
+    Returns:
+        list: 位置列表
+    """
+    return [m.start() for m in _WORD_START.finditer(text)]
+
+def frecency(count, last_time, now):
+    """
+    使用频率加分（0 ~ FRECENCY_WEIGHT）：最近启动时间按半衰期衰减，启动次数越多加分越高
+
+    Args:
+        count: 启动次数
+        last_time: 最近一次启动的时间戳，None 表示没有启动过
+        now: 当前时间戳
+    """
+    if not count or last_time is None:
+        return 0.0
+    recency = 0.5 ** (max(0.0, now - last_time) / HALF_LIFE)
+    visits = min(1.0, 0.4 + 0.2 * math.log2(count))
+    return FRECENCY_WEIGHT * recency * visits
+
+def _fuzzy_pattern(term):
+    # 每个字符之前只跳过不等于它的字符，匹配到的是最左的子序列，失败时不会回溯
+    first = re.escape(term[0])
+    rest = ''.join(f'[^{re.escape(ch)}]*{re.escape(ch)}' for ch in term[1:])
+    return re.compile(f'[^{first}]*({first}){rest}')
+
+class _SortedKeys:
+    """
+    有序字符串数组（与候选编号一一对应），支持前缀范围查询
+
+    新加入的键先放在待插入列表中，查询时少量的逐个插入，大量的（如首次建立索引）合并后整体排序；
+    删除候选时不从数组中移除，由 FuzzyIndex 过滤已删除的编号并定期清理。
+    """
+    __slots__ = ('keys', 'ids', 'pending')
+
+    def __init__(self):
+        self.keys = []
+        self.ids = []
+        self.pending = []
+
+    def add(self, key, id_):
+        self.pending.append((key, id_))
+
+    def prefixed(self, prefix):
+        self.flush()
+        lo = bisect_left(self.keys, prefix)
+        hi = bisect_left(self.keys, prefix + _MAX_CHAR, lo)
+        return self.ids[lo:hi]
+
+    def flush(self):
+        pending, self.pending = self.pending, []
+        if len(pending) < _BULK_SORT:
+            for key, id_ in pending:
+                pos = bisect_left(self.keys, key)
+                self.keys.insert(pos, key)
+                self.ids.insert(pos, id_)
+            return
+        keys = self.keys + [key for key, _ in pending]
+        ids = self.ids + [id_ for _, id_ in pending]
+        order = sorted(range(len(keys)), key=keys.__getitem__)
+        self.keys = [keys[i] for i in order]
+        self.ids = [ids[i] for i in order]
+
+    def discard(self, dead):
+        """移除属于已删除候选的键"""
+        self.flush()
+        kept = [(key, id_) for key, id_ in zip(self.keys, self.ids) if id_ not in dead]
+        self.keys = [key for key, _ in kept]
+        self.ids = [id_ for _, id_ in kept]
+
+class FuzzyIndex:
+    """
+    模糊匹配候选索引
+
+    候选用任意可哈希的键标识（如图标条目对象、('cmd', 命令文本)），
+    查询返回按分数从高到低排列的键。不是线程安全的，应只在一个线程中使用。
+    """
+    def __init__(self):
+        self._ids = {}  # 键 -> 候选编号（编号不复用）
+        self._keys = []  # 候选编号 -> 键（已删除的为 None）
+        self._hays = []  # 小写文本
+        self._initials = []  # 单词首字母
+        self._usage = []  # (启动次数, 最近启动时间)，用元组而不是列表，大量小对象不会拖慢垃圾回收
+        self._bonus = []  # 使用频率加分
+        self._chars = {}  # 字符 -> 候选编号集合
+        self._by_text = _SortedKeys()
+        self._by_word = _SortedKeys()
+        self._by_initials = _SortedKeys()
+        self._dead = set()  # 已删除、但还留在有序数组中的候选编号
+        self._recent = set()  # 有使用频率加分的候选
+        self._bonus_time = time.time()  # 计算加分时使用的当前时间
+        self._version = 0  # 候选有增删时加1，使查询缓存失效
+        self._cache = (None, None, None)  # (版本, 查询字符集合, 候选编号集合)
+        self._term_cache = (None, {})  # (版本, {查询词: (查询字符集合, 完整得分)})
+
+    def __len__(self):
+        return len(self._ids)
+
+    def __contains__(self, key):
+        return key in self._ids
+
+    def keys(self):
+        return list(self._ids)
+
+    def text(self, key):
+        """候选的小写文本"""
+        return self._hays[self._ids[key]]
+
+    # ---- 增删改 ----
+    def add(self, key, text, count=0, last_time=None):
+        """加入候选；键已存在时更新文本（保留使用记录）"""
+        old = self._ids.get(key)
+        if old is not None:
+            if self._hays[old] == text.lower():
+                return
+            count, last_time = self._usage[old]
+            self.remove(key)
+        id_ = len(self._keys)
+        hay = text.lower()
+        starts = word_starts(text)
+        initials = ''.join(hay[pos] for pos in starts)
+        self._ids[key] = id_
+        self._keys.append(key)
+        self._hays.append(hay)
+        self._initials.append(initials)
+        self._usage.append((count, last_time))
+        self._bonus.append(0.0)
+        chars = self._chars
+        for ch in set(hay):
+            ids = chars.get(ch)
+            if ids is None:
+                ids = chars[ch] = set()
+            ids.add(id_)
+        self._by_text.add(hay, id_)
+        for pos in starts:
+            if pos:  # 从开头匹配的归入前缀档次
+                self._by_word.add(hay[pos:], id_)
+        if initials:
+            self._by_initials.add(initials, id_)
+        self._set_bonus(id_)
+        self._version += 1
+
+    def add_many(self, items):
+        """批量加入 (键, 文本, 启动次数, 最近启动时间)，有序数组最后整体排序一次"""
+        for item in items:
+            self.add(*item)
+        for sorted_keys in (self._by_text, self._by_word, self._by_initials):
+            sorted_keys.flush()
+
+    def remove(self, key):
+        id_ = self._ids.pop(key, None)
+        if id_ is None:
+            return
+        for ch in set(self._hays[id_]):
+            self._chars[ch].discard(id_)
+        self._recent.discard(id_)
+        self._keys[id_] = self._hays[id_] = self._initials[id_] = self._usage[id_] = None
+        self._bonus[id_] = 0.0
+        self._dead.add(id_)
+        if len(self._dead) > max(_COMPACT_MIN, len(self._ids) // 8):
+            for sorted_keys in (self._by_text, self._by_word, self._by_initials):
+                sorted_keys.discard(self._dead)
+            self._dead = set()
+        self._version += 1
+
+    def clear(self):
+        self.__init__()
+
+    # ---- 使用频率 ----
+    def set_usage(self, key, count, last_time):
+        """设置候选的启动次数和最近启动时间"""
+        id_ = self._ids.get(key)
+        if id_ is not None:
+            self._usage[id_] = (count, last_time)
+            self._set_bonus(id_)
+
+    def touch(self, key, when=None):
+        """记录一次启动"""
+        id_ = self._ids.get(key)
+        if id_ is None:
+            return
+        when = time.time() if when is None else when
+        count, last_time = self._usage[id_]
+        self._usage[id_] = (count + 1, when if last_time is None else max(last_time, when))
+        self._set_bonus(id_)
+
+    def refresh_frecency(self, now=None):
+        """按当前时间重新计算所有加分（最近启动时间的加分随时间衰减）"""
+        self._bonus_time = time.time() if now is None else now
+        for id_ in list(self._recent):
+            self._set_bonus(id_)
+
+    def _set_bonus(self, id_):
+        count, last_time = self._usage[id_]
+        bonus = frecency(count, last_time, self._bonus_time)
+        self._bonus[id_] = bonus
+        if bonus > 0:
+            self._recent.add(id_)
+        else:
+            self._recent.discard(id_)
+
+    # ---- 查询 ----
+    def search(self, query, limit=50):
+        """
+        模糊查询
+
+        Args:
+            query: 查询文本，空格分隔的多个词都要匹配（不区分大小写）
+            limit: 最多返回的结果数
+
+        Returns:
+            list: [(键, 分数)]，分数从高到低、同分时文本短的在前；查询为空时按使用频率返回最近使用的候选
+        """
+        terms = query.lower().split()
+        if not terms:
+            top = heapq.nlargest(limit, self._recent, key=self._bonus.__getitem__)
+            return [(self._keys[id_], self._bonus[id_]) for id_ in top]
+        chars = set(''.join(terms))
+        candidates = self._candidates(chars)
+        if not candidates:
+            return []
+        if len(terms) == 1:
+            scored = self._search_term(terms[0], candidates, chars, limit)
+        else:
+            scored = self._search_terms(terms, candidates, chars, limit)
+        return [(self._keys[id_], score) for score, _, id_ in scored]
+
+    def _candidates(self, chars):
+        # 包含查询所有字符的候选；查询字符只增不减时在上一次的结果上继续缩小
+        version, cached_chars, cached = self._cache
+        if version == self._version and cached_chars <= chars:
+            result, todo = cached, chars - cached_chars
+        else:
+            result, todo = None, chars
+        for ch in sorted(todo, key=lambda c: len(self._chars.get(c, ()))):
+            ids = self._chars.get(ch)
+            if not ids:
+                result = set()
+                break
+            result = set(ids) if result is None else result & ids
+        if result is None:
+            result = set()
+        self._cache = (self._version, chars, result)
+        return result
+
+    def _prefix_tiers(self, term):
+        # 前缀档次、单词开头档次的候选编号集合（二分查找取出，去掉已删除的）
+        prefix = set(self._by_text.prefixed(term))
+        word = set(self._by_word.prefixed(term))
+        word.update(self._by_initials.prefixed(term))
+        word -= prefix
+        if self._dead:
+            prefix -= self._dead
+            word -= self._dead
+        return prefix, word
+
+    def _plain_scores(self, term, candidates, tiers=None):
+        # 前缀、单词开头、子串三个档次的得分 {候选编号: 分数}，以及需要再做子序列匹配的候选
+        prefix, word = tiers or self._prefix_tiers(term)
+        prefix = prefix & candidates
+        word = word & candidates
+        rest = candidates - prefix - word
+        scores = dict.fromkeys(prefix, TIER_PREFIX)
+        scores.update(dict.fromkeys(word, TIER_WORD))
+        if len(term) == 1:
+            # 单个字符：包含该字符的候选都是子串匹配
+            scores.update(dict.fromkeys(rest, TIER_SUBSTRING))
+            return scores, set()
+        hays = self._hays
+        substring = {id_ for id_ in rest if term in hays[id_]}
+        scores.update(dict.fromkeys(substring, TIER_SUBSTRING))
+        return scores, rest - substring
+
+    def _term_scores(self, term, candidates, tiers=None):
+        # 一个查询词在候选中的得分 {候选编号: 分数}，不匹配的不在结果中
+        scores, rest = self._plain_scores(term, candidates, tiers)
+        scores.update(self._fuzzy_scores(term, rest))
+        return scores
+
+    def _cached_scores(self, term, candidates, chars):
+        # 一个查询词在所有候选中的完整得分，缓存给后续按键使用：
+        # 继续输入时查询字符只增不减，候选范围只会缩小；包含旧词的新词只可能匹配旧词匹配到的候选
+        version, cache = self._term_cache
+        if version != self._version:
+            cache = {}
+            self._term_cache = (self._version, cache)
+        entry = cache.get(term)
+        if entry is not None and entry[0] <= chars:
+            return entry[1]
+        base = None
+        for old, (old_chars, old_scores) in cache.items():
+            if old in term and old_chars <= chars and (base is None or len(old_scores) < len(base)):
+                base = old_scores
+        scores = self._term_scores(term, candidates if base is None else candidates.intersection(base))
+        cache.pop(term, None)
+        if len(cache) >= _TERM_CACHE_SIZE:
+            del cache[next(iter(cache))]
+        cache[term] = (chars, scores)
+        return scores
+
+    def _fuzzy_scores(self, term, ids):
+        hays = self._hays
+        match = _fuzzy_pattern(term).match
+        length = len(term)
+        scores = {}
+        for id_ in ids:
+            m = match(hays[id_])
+            if m is not None:
+                scores[id_] = TIER_FUZZY + FUZZY_COMPACT * length / (m.end() - m.start(1))
+        return scores
+
+    def _top(self, scores, limit):
+        # [(分数, -文本长度, 候选编号)]，分数从高到低、同分时文本短的在前
+        hays = self._hays
+        if len(scores) > limit:
+            # 先按分数找出第 limit 名的分数，只给不低于它的候选比较长度
+            threshold = heapq.nlargest(limit, scores.values())[-1]
+            scores = {id_: score for id_, score in scores.items() if score >= threshold}
+        return heapq.nlargest(limit, ((score, -len(hays[id_]), id_) for id_, score in scores.items()))
+
+    def _combine(self, terms, candidates, term_scores):
+        # 各词得分相加，只保留所有词都匹配的候选；长的词先算，候选范围缩小得最快
+        scores = None
+        for term in terms:
+            current = term_scores(term, candidates)
+            if scores is None:
+                scores = current
+            else:
+                if len(current) < len(scores):
+                    scores, current = current, scores
+                scores = {id_: score + current[id_] for id_, score in scores.items() if id_ in current}
+            if not scores:
+                return {}
+            candidates = scores.keys()
+        return scores
+
+    def _search_terms(self, terms, candidates, chars, limit):
+        # 多个查询词：有使用记录的候选完整打分，其余按各词档次的组合从总分高到低取（词太多时逐个完整打分）
+        terms = sorted(terms, key=len, reverse=True)
+        recent = self._recent & candidates
+        scores = self._combine(terms, recent, self._term_scores) if recent else {}
+        bonus = self._bonus
+        for id_ in scores:
+            scores[id_] += bonus[id_]
+        others = candidates - recent
+        if len(terms) <= _MAX_COMBINED:
+            top = self._take_combined(terms, others, limit)
+        else:
+            complete = self._combine(terms, others, lambda term, _: self._cached_scores(term, candidates, chars))
+            top = self._top({id_: score for id_, score in complete.items() if id_ not in recent}, limit)
+        scores.update((id_, score) for score, _, id_ in top)
+        return self._top(scores, limit)
+
+    def _take_combined(self, terms, candidates, limit):
+        # 每个词的候选分为前缀、单词开头、子串、子序列四档（后两档用到时才计算），各词档次的每种组合
+        # 是档次集合的交集，互不重叠；按组合可能达到的最高总分从高到低取，
+        # 取够结果且下一组的最高总分低于第 limit 名时停止，子序列匹配只对进入这些组合的候选做
+        levels = []
+        for term in terms:
+            prefix, word = self._prefix_tiers(term)
+            term_levels = [[TIER_PREFIX, prefix & candidates], [TIER_WORD, word & candidates], [TIER_SUBSTRING, None]]
+            if len(term) > 1:
+                # 不是子串的子序列匹配至少跨过 len + 1 个字符
+                term_levels.append([TIER_FUZZY + FUZZY_COMPACT * len(term) / (len(term) + 1), None])
+            levels.append(term_levels)
+
+        def bound(combo):
+            return sum(levels[i][level][0] for i, level in enumerate(combo))
+
+        def level_ids(i, level):
+            term_levels = levels[i]
+            if term_levels[level][1] is None:
+                rest = candidates - term_levels[0][1] - term_levels[1][1]
+                if len(terms[i]) == 1:
+                    term_levels[2][1] = rest
+                else:
+                    hays = self._hays
+                    term = terms[i]
+                    term_levels[2][1] = {id_ for id_ in rest if term in hays[id_]}
+                    term_levels[3][1] = rest - term_levels[2][1]
+            return term_levels[level][1]
+
+        combos = sorted(itertools.product(*(range(len(term_levels)) for term_levels in levels)), key=bound, reverse=True)
+        hays = self._hays
+        found = []
+        threshold = None
+        for total, group in itertools.groupby(combos, key=bound):
+            if threshold is not None and total < threshold:
+                break
+            for combo in group:
+                sets = sorted((level_ids(i, level) for i, level in enumerate(combo)), key=len)
+                ids = sets[0].intersection(*sets[1:])
+                fuzzy_terms = [terms[i] for i, level in enumerate(combo) if level == 3]
+                if not fuzzy_terms:
+                    # 同一组合分数相同，文本短的在前
+                    found.extend((total, -len(hays[id_]), id_)
+                                 for id_ in heapq.nsmallest(limit, ids, key=lambda i: len(hays[i])))
+                    continue
+                plain = sum(levels[i][level][0] for i, level in enumerate(combo) if level < 3)
+                scores = dict.fromkeys(ids, plain)
+                for term in fuzzy_terms:
+                    fuzzy = self._fuzzy_scores(term, scores.keys())
+                    scores = {id_: score + fuzzy[id_] for id_, score in scores.items() if id_ in fuzzy}
+                found.extend((score, -len(hays[id_]), id_) for id_, score in scores.items())
+            if len(found) >= limit:
+                found = heapq.nlargest(limit, found)
+                threshold = found[-1][0]
+        return heapq.nlargest(limit, found)
+
+    def _search_term(self, term, candidates, chars, limit):
+        # 单个查询词：有使用记录的候选完整打分，其余按档次从高到低取，取够就停
+        prefix, word = self._prefix_tiers(term)
+        recent = self._recent & candidates
+        scores = self._term_scores(term, recent, (prefix, word)) if recent else {}
+        bonus = self._bonus
+        for id_ in scores:
+            scores[id_] += bonus[id_]
+        hays = self._hays
+        seen = set(self._recent)
+        need = limit
+
+        def take(ids, score):
+            nonlocal need
+            ids = ids - seen
+            seen.update(ids)
+            # 同一档次分数相同，文本短的在前
+            for id_ in heapq.nsmallest(need, ids, key=lambda i: len(hays[i])):
+                scores[id_] = score
+            need = max(0, need - len(ids))
+
+        take(prefix, TIER_PREFIX)
+        if need:
+            take(word, TIER_WORD)
+        if need:
+            rest = candidates - seen
+            if len(term) > 1:
+                rest = {id_ for id_ in rest if term in hays[id_]}
+            take(rest, TIER_SUBSTRING)
+        if need and len(term) > 1:
+            fuzzy = {id_: score for id_, score in self._cached_scores(term, candidates, chars).items()
+                     if score < TIER_SUBSTRING and id_ not in seen}
+            scores.update((id_, fuzzy[id_]) for _, _, id_ in self._top(fuzzy, need))
+        return self._top(scores, limit)
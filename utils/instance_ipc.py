@@ -0,0 +1,255 @@
+"""
+单实例与本地进程间通信：
+第一个启动的实例在本机回环地址上监听，把端口、随机令牌和 pid 写入 data/instance.json（仅当前用户可读写）。
+之后再运行 main.py 时先读取该文件并连接，把请求（显示窗口、启动图标、运行命令、查看日志）转发给
+已运行的实例，收到回复后直接退出，不导入 PyQt5，也不创建 QApplication。
+协议为一行 JSON 请求、一行 JSON 回复，请求中的令牌不正确时拒绝处理。
+使用 TCP 回环而不是 Unix 域套接字，Windows 和 Linux 上是同一套实现。
+
+命令行:
+    python main.py                     显示已运行实例的窗口（没有则正常启动）
+    python main.py --launch 名称或路径   启动图标区域中的程序
+    python main.py --run "命令"          运行命令
+    python main.py --tail "命令" [--lines N]  输出命令最新日志的最后 N 行
+"""
+
+import os
+import sys
+import json
+import socket
+
+INSTANCE_FILE = 'data/instance.json'
+MAX_MESSAGE_BYTES = 1024 * 1024  # 单条请求/回复的最大字节数
+CONNECT_TIMEOUT = 0.5
+DEFAULT_TAIL_LINES = 50  # --tail 默认输出的行数
+
+# 请求类型
+ACTION_SHOW = 'show'
+ACTION_LAUNCH = 'launch'
+ACTION_RUN = 'run'
+ACTION_TAIL = 'tail'
+
+def _send_message(sock, message):
+    sock.sendall(json.dumps(message, ensure_ascii=False).encode('utf-8') + b'\n')
+
+def _recv_message(sock):
+    """读取一行 JSON，连接关闭或内容无效时返回 None"""
+    chunks = []
+    size = 0
+    while True:
+        chunk = sock.recv(65536)
+        if not chunk:
+            break
+        chunks.append(chunk)
+        size += len(chunk)
+        if b'\n' in chunk or size > MAX_MESSAGE_BYTES:
+            break
+    data = b''.join(chunks).split(b'\n', 1)[0]
+    try:
+        message = json.loads(data.decode('utf-8'))
+    except ValueError:
+        return None
+    return message if isinstance(message, dict) else None
+
+def read_instance(instance_file=INSTANCE_FILE):
+    """读取正在运行的实例信息 {'port', 'token', 'pid'}，文件不存在或无效时返回 None"""
+    try:
+        with open(instance_file, 'r', encoding='utf-8') as f:
+            info = json.load(f)
+        return info if isinstance(info, dict) and 'port' in info and 'token' in info else None
+    except (OSError, ValueError):
+        return None
+
+def send_request(request, instance_file=INSTANCE_FILE, timeout=10.0):
+    """
+    把请求转发给正在运行的实例
+
+    Args:
+        request: 请求 dict，至少包含 'action'
+        instance_file: 实例信息文件
+        timeout: 等待回复的超时（秒）
+
+    Returns:
+        dict: 回复 {'ok', 'message', ...}；没有正在运行的实例时返回 None
+    """
+    info = read_instance(instance_file)
+    if info is None:
+        return None
+    # 直接连接回环地址：create_connection 会先做地址解析（并加载 idna 编码），转发请求只需要这一次连接
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    try:
+        sock.settimeout(CONNECT_TIMEOUT)
+        sock.connect(('127.0.0.1', int(info['port'])))
+    except (OSError, ValueError):
+        sock.close()
+        return None  # 实例已退出，留下了过期的文件
+    with sock:
+        sock.settimeout(timeout)
+        try:
+            _send_message(sock, dict(request, token=info['token']))
+            response = _recv_message(sock)
+        except OSError as e:
+            return {'ok': False, 'message': f'与正在运行的实例通信失败: {e}'}
+    if response is None or 'ok' not in response:
+        return None  # 端口已被其他程序占用
+    return response
+
+class InstanceServer:
+    """
+    单实例服务端：在后台线程中接受本机连接，每个连接在单独的线程中处理
+
+    Args:
+        handler: 请求处理函数 handler(request) -> 回复 dict（在连接线程中调用）
+        instance_file: 实例信息文件
+    """
+    def __init__(self, handler, instance_file=INSTANCE_FILE):
+        self.handler = handler
+        self.instance_file = instance_file
+        self.token = os.urandom(16).hex()
+        self.port = None
+        self.request_count = 0
+        self._sock = None
+        self._thread = None
+
+    def start(self):
+        if self._sock is not None:
+            return
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.bind(('127.0.0.1', 0))
+        sock.listen(16)
+        self._sock = sock
+        self.port = sock.getsockname()[1]
+        self._write_instance_file()
+        import threading  # 客户端转发请求时不加载
+        self._thread = threading.Thread(target=self._accept_loop, name='InstanceServer', daemon=True)
+        self._thread.start()
+
+    def _write_instance_file(self):
+        os.makedirs(os.path.dirname(os.path.abspath(self.instance_file)), exist_ok=True)
+        tmp_path = f'{self.instance_file}.{os.getpid()}.tmp'
+        # 令牌只允许当前用户读取
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump({'port': self.port, 'token': self.token, 'pid': os.getpid()}, f)
+        os.replace(tmp_path, self.instance_file)
+
+    def close(self):
+        """停止监听，删除实例信息文件（只删除自己写入的）"""
+        sock, self._sock = self._sock, None
+        if sock is None:
+            return
+        try:
+            # Linux 上只 close 不会唤醒阻塞在 accept 中的线程，监听会继续，先 shutdown 让 accept 返回
+            sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass  # Windows 上监听套接字不支持 shutdown，close 即可让 accept 返回
+        try:
+            sock.close()
+        except OSError:
+            pass
+        info = read_instance(self.instance_file)
+        if info is not None and info.get('token') == self.token:
+            try:
+                os.remove(self.instance_file)
+            except OSError:
+                pass
+
+    def _accept_loop(self):
+        import threading
+        sock = self._sock
+        while True:
+            try:
+                conn, _ = sock.accept()
+            except OSError:
+                return  # 已关闭
+            threading.Thread(target=self._serve, args=(conn,), daemon=True).start()
+
+    def _serve(self, conn):
+        import hmac  # 只有服务端需要，客户端转发请求时不加载
+        with conn:
+            try:
+                conn.settimeout(5.0)
+                request = _recv_message(conn)
+                if request is None:
+                    return
+                if not hmac.compare_digest(str(request.pop('token', '')), self.token):
+                    _send_message(conn, {'ok': False, 'message': '令牌不正确'})
+                    return
+                self.request_count += 1
+                try:
+                    response = self.handler(request)
+                except Exception as e:
+                    response = {'ok': False, 'message': f'处理请求出错: {e}'}
+                conn.settimeout(None)
+                _send_message(conn, response)
+            except OSError as e:
+                print(f'处理本地请求失败: {e}')
+
+def _parse_simple(argv):
+    """解析没有其他参数的 --show / --launch X / --run X / --tail X [--lines N]，其他情况返回 None 交给 argparse"""
+    if not argv or argv == ['--show']:
+        return {'action': ACTION_SHOW}
+    if len(argv) not in (2, 4) or argv[1].startswith('-'):
+        return None
+    option, value = argv[:2]
+    if len(argv) == 4:
+        if option != '--tail' or argv[2] != '--lines' or not argv[3].isdigit():
+            return None
+        return {'action': ACTION_TAIL, 'cmd': value, 'lines': int(argv[3])}
+    if option == '--launch':
+        return {'action': ACTION_LAUNCH, 'target': value}
+    if option == '--run':
+        return {'action': ACTION_RUN, 'cmd': value}
+    if option == '--tail':
+        return {'action': ACTION_TAIL, 'cmd': value, 'lines': DEFAULT_TAIL_LINES}
+    return None
+
+def parse_request(argv):
+    """
+    解析 main.py 的命令行参数
+
+    Args:
+        argv: 参数列表（不含程序名）
+
+    Returns:
+        tuple: (请求 dict, 未识别的参数列表)；没有指定操作时请求为 {'action': 'show'}
+    """
+    # 常见的简单形式不加载 argparse（连同它用到的 gettext、shutil 等），转发请求更快
+    request = _parse_simple(argv)
+    if request is not None:
+        return request, []
+    import argparse
+    parser = argparse.ArgumentParser(prog='main.py', description='QuickLauncher 启动器')
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument('--show', action='store_true', help='显示已运行实例的窗口')
+    group.add_argument('--launch', metavar='名称或路径', help='启动图标区域中的程序')
+    group.add_argument('--run', metavar='命令', help='运行命令（输出写入日志）')
+    group.add_argument('--tail', metavar='命令', help='输出命令最新日志的最后几行')
+    parser.add_argument('--lines', type=int, default=DEFAULT_TAIL_LINES, help='--tail 输出的行数')
+    args, rest = parser.parse_known_args(argv)
+    if args.launch is not None:
+        request = {'action': ACTION_LAUNCH, 'target': args.launch}
+    elif args.run is not None:
+        request = {'action': ACTION_RUN, 'cmd': args.run}
+    elif args.tail is not None:
+        request = {'action': ACTION_TAIL, 'cmd': args.tail, 'lines': args.lines}
+    else:
+        request = {'action': ACTION_SHOW}
+    return request, rest
+
+def tail_response(cmd, lines=50, log_dir='data/log'):
+    """查看日志请求的回复（实例内和没有实例时本地处理共用）"""
+    from utils.log_tail import tail_command_log
+    log_file, tail = tail_command_log(cmd, lines, log_dir)
+    if log_file is None:
+        return {'ok': False, 'message': f'未找到命令对应的日志文件: {cmd}'}
+    return {'ok': True, 'message': f'日志文件: {log_file}', 'lines': tail}
+
+def print_response(response):
+    """把回复输出到控制台，返回进程退出代码"""
+    ok = bool(response.get('ok'))
+    if response.get('message'):
+        print(response['message'], file=sys.stdout if ok else sys.stderr)
+    for line in response.get('lines', ()):
+        print(line)
+    return 0 if ok else 1
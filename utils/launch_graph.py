@@ -0,0 +1,393 @@
+"""
+启动组（依赖图启动）：
+启动组是由图标和命令组成的有向无环图，每个节点在它依赖的节点全部“就绪”后才启动，
+没有依赖关系的分支并行启动，整组的启动时间由关键路径决定，而不是所有延迟之和。
+节点启动后用就绪探测判断是否就绪：
+- tcp:   端口可以建立连接，如 {"type": "tcp", "port": 8000, "host": "127.0.0.1"}
+- log:   运行日志中出现匹配正则的行（仅命令节点），如 {"type": "log", "pattern": "Listening on"}
+- file:  文件存在，如 {"type": "file", "path": "data/server.pid"}
+- alive: 进程持续运行 N 秒（仅命令节点），如 {"type": "alive", "seconds": 3}
+没有探测的节点启动后立即视为就绪。节点失败（启动出错、进程异常退出或探测超时）时，依赖它的节点不再启动。
+启动组配置保存在 data/launch_groups.json 中，整组在进程监管器的事件循环中执行，不占用额外线程。
+
+配置示例:
+    {"groups": [{"name": "开发环境", "nodes": [
+        {"id": "db", "cmd": "docker start -a pg", "ready": {"type": "tcp", "port": 5432}},
+        {"id": "api", "cmd": "python api.py", "after": ["db"], "ready": {"type": "log", "pattern": "Running on"}},
+        {"id": "ui", "icon": "C:/Tools/client.lnk", "after": ["api"]}
+    ]}]}
+"""
+
+import os
+import re
+import json
+import time
+import asyncio
+import threading
+
+PROBE_TYPES = ('tcp', 'log', 'file', 'alive')
+
+DEFAULT_TIMEOUT = 60.0  # 等待就绪的默认超时（秒）
+DEFAULT_POLL_INTERVAL = 0.2  # 探测间隔（秒）
+
+# 节点状态
+NODE_PENDING = 'pending'  # 等待依赖就绪
+NODE_PROBING = 'probing'  # 已启动，等待就绪
+NODE_READY = 'ready'  # 已就绪
+NODE_FAILED = 'failed'  # 启动出错、进程退出或探测超时
+NODE_SKIPPED = 'skipped'  # 依赖的节点失败，未启动
+NODE_CANCELLED = 'cancelled'  # 整组被取消时尚未就绪
+
+# 事件类型（on_event 的参数中的 'type'）
+EVENT_NODE = 'node'  # 节点状态变化：node、kind、target、status、run（已启动时）、error
+EVENT_FINISHED = 'finished'  # 整组结束：ok、elapsed、results
+
+# 配置文件不存在时写入的示例
+EXAMPLE_CONFIG = {'groups': [{'name': '示例', 'nodes': [
+    {'id': 'server', 'cmd': 'python -m http.server 8000', 'ready': {'type': 'tcp', 'port': 8000}, 'timeout': 30},
+    {'id': 'worker', 'cmd': 'python worker.py', 'ready': {'type': 'alive', 'seconds': 3}},
+    {'id': 'client', 'cmd': 'python client.py', 'after': ['server', 'worker']},
+]}]}
+
+class LaunchGraphError(ValueError):
+    """启动组配置错误（缺少字段、依赖不存在或有循环依赖）"""
+
+class LaunchNode:
+    """
+    启动组中的一个节点
+
+    Args:
+        node_id: 节点标识，默认为命令文本或图标路径
+        kind: 'cmd' 或 'icon'
+        target: 命令文本或图标路径
+        after: 依赖的节点标识列表
+        probe: 就绪探测配置（dict），None 表示启动后立即就绪
+        timeout: 等待就绪的超时（秒）
+    """
+    def __init__(self, node_id, kind, target, after=(), probe=None, timeout=DEFAULT_TIMEOUT):
+        self.id = node_id
+        self.kind = kind
+        self.target = target
+        self.after = list(after)
+        self.probe = probe
+        self.timeout = timeout
+
+    @classmethod
+    def from_dict(cls, config):
+        if 'cmd' in config:
+            kind, target = 'cmd', config['cmd']
+        elif 'icon' in config:
+            kind, target = 'icon', config['icon']
+        else:
+            raise LaunchGraphError(f'节点缺少 cmd 或 icon: {config}')
+        node = cls(config.get('id') or target, kind, target, config.get('after', ()),
+                   config.get('ready'), config.get('timeout', DEFAULT_TIMEOUT))
+        probe = node.probe
+        if probe is not None:
+            if probe.get('type') not in PROBE_TYPES:
+                raise LaunchGraphError(f"节点 {node.id} 的就绪探测类型无效: {probe.get('type')}")
+            if probe['type'] == 'log' and kind != 'cmd':
+                raise LaunchGraphError(f'节点 {node.id} 不是命令，没有运行日志，不能使用 log 探测')
+            # 图标通过系统外壳打开，得到的是很快退出的启动进程而不是程序本身，无法判断是否持续运行
+            if probe['type'] == 'alive' and kind != 'cmd':
+                raise LaunchGraphError(f'节点 {node.id} 不是命令，无法跟踪进程，不能使用 alive 探测')
+            if probe['type'] == 'log':
+                try:
+                    re.compile(probe.get('pattern', ''))
+                except re.error as e:
+                    raise LaunchGraphError(f'节点 {node.id} 的正则表达式无效: {e}')
+            node.probe = probe = dict(probe)
+            # 探测所需的字段在加载时检查并转换，探测过程中不会再因为配置出错
+            try:
+                if probe['type'] == 'tcp':
+                    probe['port'] = int(probe['port'])
+                    if not 0 < probe['port'] < 65536:
+                        raise ValueError(probe['port'])
+                elif probe['type'] == 'alive':
+                    probe['seconds'] = float(probe.get('seconds', 3))
+            except KeyError as e:
+                raise LaunchGraphError(f"节点 {node.id} 的 {probe['type']} 探测缺少 {e.args[0]}")
+            except (TypeError, ValueError):
+                raise LaunchGraphError(f"节点 {node.id} 的 {probe['type']} 探测参数无效: {probe}")
+            if probe['type'] == 'file' and not (isinstance(probe.get('path'), str) and probe['path']):
+                raise LaunchGraphError(f'节点 {node.id} 的 file 探测缺少 path')
+        try:
+            node.timeout = float(node.timeout)
+        except (TypeError, ValueError):
+            raise LaunchGraphError(f'节点 {node.id} 的超时无效: {node.timeout}')
+        return node
+
+    def __repr__(self):
+        return f'<LaunchNode {self.id} {self.kind}={self.target!r} after={self.after}>'
+
+class LaunchGroup:
+    """
+    启动组
+
+    Args:
+        name: 组名
+        nodes: LaunchNode 列表
+    """
+    def __init__(self, name, nodes):
+        self.name = name
+        self.nodes = {}
+        for node in nodes:
+            if node.id in self.nodes:
+                raise LaunchGraphError(f'启动组 {name} 中的节点重复: {node.id}')
+            self.nodes[node.id] = node
+        self.order = self._topological_order()
+
+    @classmethod
+    def from_dict(cls, config):
+        return cls(config.get('name', ''), [LaunchNode.from_dict(n) for n in config.get('nodes', [])])
+
+    def _topological_order(self):
+        """按依赖排序（Kahn 算法），同时检查依赖是否存在和是否有循环"""
+        indegree = {}
+        children = {node_id: [] for node_id in self.nodes}
+        for node in self.nodes.values():
+            for dep in node.after:
+                if dep not in self.nodes:
+                    raise LaunchGraphError(f'启动组 {self.name} 中节点 {node.id} 依赖的 {dep} 不存在')
+                children[dep].append(node.id)
+            indegree[node.id] = len(set(node.after))
+        ready = [node_id for node_id, degree in indegree.items() if degree == 0]
+        order = []
+        while ready:
+            node_id = ready.pop(0)
+            order.append(node_id)
+            for child in children[node_id]:
+                indegree[child] -= 1
+                if indegree[child] == 0:
+                    ready.append(child)
+        if len(order) != len(self.nodes):
+            cycle = sorted(node_id for node_id, degree in indegree.items() if degree > 0)
+            raise LaunchGraphError(f'启动组 {self.name} 中有循环依赖: {", ".join(cycle)}')
+        return order
+
+def load_groups(path='data/launch_groups.json'):
+    """
+    从JSON配置文件加载启动组
+
+    Returns:
+        tuple: (启动组列表, 错误信息列表)；文件不存在时都为空
+    """
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            config = json.load(f)
+    except FileNotFoundError:
+        return [], []
+    except (OSError, ValueError) as e:
+        return [], [f'读取启动组配置失败: {path} 错误: {e}']
+    groups, errors = [], []
+    for group_config in config.get('groups', []):
+        try:
+            groups.append(LaunchGroup.from_dict(group_config))
+        except (LaunchGraphError, TypeError, AttributeError) as e:
+            errors.append(str(e))
+    return groups, errors
+
+def _exit_status(run):
+    """返回 (是否已退出, 退出代码)，run 为 RunHandle 或 subprocess.Popen"""
+    poll = getattr(run, 'poll', None)
+    if poll is not None:
+        code = poll()
+        return code is not None, code
+    return run.done, run.exit_code
+
+class _LogWatcher:
+    """增量读取运行日志，查找匹配的行（跳过启动器写入的 === 标记行，其中包含命令本身）"""
+    def __init__(self, log_path, pattern):
+        self.log_path = log_path
+        self.pattern = re.compile(pattern)
+        self.offset = 0
+        self.partial = b''
+
+    def check(self):
+        try:
+            with open(self.log_path, 'rb') as f:
+                f.seek(self.offset)
+                data = f.read()
+        except OSError:
+            return False
+        if not data:
+            return False
+        self.offset += len(data)
+        lines = (self.partial + data).split(b'\n')
+        self.partial = lines.pop()
+        return any(self.pattern.search(line.decode('utf-8', errors='replace'))
+                   for line in lines if not line.startswith(b'=== '))
+
+async def _tcp_ready(host, port, timeout=1.0):
+    try:
+        _, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+    except (OSError, asyncio.TimeoutError):
+        return False
+    writer.close()
+    return True
+
+async def wait_ready(node, run, poll_interval=DEFAULT_POLL_INTERVAL):
+    """
+    等待节点就绪
+
+    Raises:
+        RuntimeError: 进程异常退出或等待超时
+    """
+    probe = node.probe
+    if probe is None:
+        return
+    kind = probe['type']
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    deadline = started + node.timeout
+    watcher = _LogWatcher(run.log_path, probe.get('pattern', '')) if kind == 'log' else None
+    while True:
+        exited, exit_code = _exit_status(run)
+        if kind == 'tcp':
+            ready = await _tcp_ready(probe.get('host', '127.0.0.1'), int(probe['port']))
+        elif kind == 'log':
+            ready = watcher.check()
+        elif kind == 'file':
+            ready = os.path.exists(os.path.expandvars(os.path.expanduser(probe['path'])))
+        else:
+            ready = not exited and loop.time() - started >= float(probe.get('seconds', 3))
+        if ready:
+            return
+        # alive 探测要求进程一直运行；其他探测只在异常退出时失败（启动脚本可能正常退出、由子进程继续运行）
+        if exited and (kind == 'alive' or exit_code != 0):
+            raise RuntimeError(f'进程已退出，退出代码: {exit_code}')
+        if loop.time() >= deadline:
+            raise RuntimeError(f'等待就绪超时（{node.timeout}秒）')
+        await asyncio.sleep(poll_interval)
+
+class GroupRun:
+    """
+    一次启动组的执行
+
+    Args:
+        group: LaunchGroup
+        start_fn: 启动节点的函数 start_fn(node)，返回 RunHandle 或 subprocess.Popen（在监管器线程中调用）
+        on_event: 事件回调 on_event(dict)，包含 'type'、'group' 及事件相关字段（在监管器线程中调用）
+        poll_interval: 就绪探测间隔（秒）
+    """
+    def __init__(self, group, start_fn, on_event=None, poll_interval=DEFAULT_POLL_INTERVAL):
+        self.group = group
+        self.start_fn = start_fn
+        self.on_event = on_event
+        self.poll_interval = poll_interval
+        self.status = {node_id: NODE_PENDING for node_id in group.nodes}
+        self.runs = {}
+        self.errors = {}
+        self.start_time = None
+        self.end_time = None
+        self._task = None
+        self._loop = None
+        self._cancel_requested = False
+        self._done = threading.Event()
+
+    @property
+    def done(self):
+        return self._done.is_set()
+
+    @property
+    def elapsed(self):
+        if self.start_time is None:
+            return None
+        return (self.end_time or time.monotonic()) - self.start_time
+
+    def counts(self):
+        """各状态的节点数"""
+        counts = {}
+        for status in self.status.values():
+            counts[status] = counts.get(status, 0) + 1
+        return counts
+
+    def wait(self, timeout=None):
+        return self._done.wait(timeout)
+
+    def cancel(self):
+        """取消：尚未启动的节点不再启动，已启动的进程不受影响"""
+        self._cancel_requested = True
+        if self._loop is not None and self._task is not None:
+            self._loop.call_soon_threadsafe(self._task.cancel)
+
+    def _emit(self, event_type, **fields):
+        if self.on_event is None:
+            return
+        try:
+            self.on_event(dict(fields, type=event_type, group=self.group.name))
+        except Exception as e:
+            print(f'启动组事件回调出错: {e}')
+
+    def _set_status(self, node, status, **fields):
+        self.status[node.id] = status
+        self._emit(EVENT_NODE, node=node.id, kind=node.kind, target=node.target, status=status, **fields)
+
+    async def run(self):
+        """在事件循环中执行整组，返回是否全部就绪"""
+        self._loop = asyncio.get_running_loop()
+        self._task = asyncio.current_task()
+        self.start_time = time.monotonic()
+        ready = {node_id: self._loop.create_future() for node_id in self.group.nodes}
+        tasks = [self._loop.create_task(self._run_node(self.group.nodes[node_id], ready))
+                 for node_id in self.group.order]
+        try:
+            if self._cancel_requested:
+                raise asyncio.CancelledError()  # 事件循环开始执行前已被取消
+            await asyncio.gather(*tasks)
+        except asyncio.CancelledError:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+        finally:
+            self.end_time = time.monotonic()
+            ok = all(status == NODE_READY for status in self.status.values())
+            self._done.set()
+            self._emit(EVENT_FINISHED, ok=ok, elapsed=self.elapsed, results=dict(self.status))
+        return ok
+
+    async def _run_node(self, node, ready):
+        try:
+            # 依赖全部就绪才启动，任何一个失败则跳过
+            results = [await ready[dep] for dep in node.after]
+            if not all(results):
+                failed = [dep for dep, ok in zip(node.after, results) if not ok]
+                self.errors[node.id] = f'依赖未就绪: {", ".join(failed)}'
+                self._set_status(node, NODE_SKIPPED, error=self.errors[node.id])
+                ready[node.id].set_result(False)
+                return
+            try:
+                run = self.start_fn(node)
+            except Exception as e:
+                self.errors[node.id] = f'启动出错: {e}'
+                self._set_status(node, NODE_FAILED, error=self.errors[node.id])
+                ready[node.id].set_result(False)
+                return
+            self.runs[node.id] = run
+            self._set_status(node, NODE_PROBING, run=run)
+            try:
+                await wait_ready(node, run, self.poll_interval)
+            except Exception as e:
+                # 除了退出和超时，探测本身出错（如配置有误）也视为节点失败，依赖它的节点不会一直等待
+                self.errors[node.id] = str(e) if isinstance(e, RuntimeError) else f'就绪探测出错: {e!r}'
+                self._set_status(node, NODE_FAILED, run=run, error=str(e))
+                ready[node.id].set_result(False)
+                return
+            self._set_status(node, NODE_READY, run=run)
+            ready[node.id].set_result(True)
+        except asyncio.CancelledError:
+            if self.status[node.id] in (NODE_PENDING, NODE_PROBING):
+                self._set_status(node, NODE_CANCELLED)
+            raise
+
+def start_group(group, start_fn, on_event=None, poll_interval=DEFAULT_POLL_INTERVAL):
+    """
+    在进程监管器的事件循环中执行启动组，立即返回
+
+    Returns:
+        GroupRun
+    """
+    from utils.process_supervisor import get_supervisor
+    group_run = GroupRun(group, start_fn, on_event, poll_interval)
+    get_supervisor().run_coroutine(group_run.run())
+    return group_run
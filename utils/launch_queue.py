@@ -0,0 +1,150 @@
+import time
+import subprocess
+from collections import deque
+
+def launch_path(path):
+    """启动图标区域中的一个程序（交给系统 shell，与双击打开一致），返回 Popen"""
+    return subprocess.Popen([path], shell=True)
+
+class LaunchQueue:
+    """
+    依次启动队列（不依赖Qt），只负责排队、间隔计时和暂停/继续/取消状态，
+    真正的启动动作和定时驱动由调用方（Qt定时器或命令行循环）完成。
+
+    状态: idle(空闲) / running(运行中) / paused(已暂停)
+    """
+    IDLE = 'idle'
+    RUNNING = 'running'
+    PAUSED = 'paused'
+
+    def __init__(self, delay=0.0, clock=time.monotonic):
+        self.delay = delay  # 相邻两项的启动间隔（秒）
+        self.clock = clock
+        self.state = self.IDLE
+        self._queue = deque()
+        self._immediate = deque()  # 暂停期间“立刻启动”的条目，不受暂停和间隔限制
+        self._next_due = None  # 下一项的计划启动时间
+        self._remaining = 0.0  # 暂停时剩余的等待时间
+        self.done = 0  # 本轮已启动数量
+        self.total = 0  # 本轮总数量
+
+    def __len__(self):
+        return len(self._queue) + len(self._immediate)
+
+    def extend(self, entries, delay=None):
+        """追加到队尾，空闲时立即开始新一轮"""
+        entries = list(entries)
+        if delay is not None:
+            self.delay = delay
+        if not entries:
+            return
+        if self.state == self.IDLE:
+            self.done = 0
+            self.total = 0
+            self._next_due = self.clock()
+            self.state = self.RUNNING
+        self._queue.extend(entries)
+        self.total += len(entries)
+
+    def push_front(self, entries):
+        """插到队首并立即到期（用于“立刻启动”），不打断正在进行的一轮；暂停中也立即启动，不恢复这一轮"""
+        entries = list(entries)
+        if not entries:
+            return
+        if self.state == self.IDLE:
+            self.extend(entries)
+            return
+        self.total += len(entries)
+        if self.state == self.RUNNING:
+            self._queue.extendleft(reversed(entries))
+            self._next_due = self.clock()
+        else:
+            self._immediate.extend(entries)
+
+    def pause(self):
+        if self.state != self.RUNNING:
+            return False
+        self._remaining = max(0.0, self._next_due - self.clock())
+        self.state = self.PAUSED
+        return True
+
+    def resume(self):
+        if self.state != self.PAUSED:
+            return False
+        self._next_due = self.clock() + self._remaining
+        self.state = self.RUNNING
+        return True
+
+    def cancel(self):
+        """清空队列，返回被取消的条目"""
+        cancelled = list(self._immediate) + list(self._queue)
+        self._immediate.clear()
+        self._queue.clear()
+        self.state = self.IDLE
+        self._next_due = None
+        return cancelled
+
+    def time_until_next(self):
+        """距离下一项到期的秒数，非运行状态（且没有要立刻启动的条目）返回None"""
+        if self._immediate:
+            return 0.0
+        if self.state != self.RUNNING or not self._queue:
+            return None
+        return max(0.0, self._next_due - self.clock())
+
+    def take_due(self):
+        """
+        取出已到期的下一项
+
+        Returns:
+            tuple: (条目, 计划启动时间)；没有到期项返回None
+        """
+        if self._immediate:
+            self.done += 1
+            return self._immediate.popleft(), self.clock()
+        if self.state != self.RUNNING or not self._queue:
+            return None
+        now = self.clock()
+        if now < self._next_due:
+            return None
+        due = self._next_due
+        entry = self._queue.popleft()
+        self.done += 1
+        self._next_due = now + self.delay
+        if not self._queue:
+            self.state = self.IDLE
+            self._next_due = None
+        return entry, due
+
+def run_queue(queue, launch_func, on_launched=None, sleep=time.sleep):
+    """
+    在当前线程中依次启动队列中的所有条目（命令行模式下代替Qt定时器驱动）
+
+    Args:
+        queue: LaunchQueue
+        launch_func: 启动一项 launch_func(entry)，失败时抛出异常
+        on_launched: 单项结果回调 on_launched(序号, 条目, 是否成功, 错误信息)
+        sleep: 等待函数
+
+    Returns:
+        int: 启动失败的数量
+    """
+    failed = 0
+    while True:
+        wait = queue.time_until_next()
+        if wait is None:
+            return failed
+        if wait > 0:
+            sleep(wait)
+        taken = queue.take_due()
+        if taken is None:
+            continue
+        entry, _ = taken
+        ok, error = True, ''
+        try:
+            launch_func(entry)
+        except Exception as e:
+            ok, error = False, str(e)
+            failed += 1
+        if on_launched is not None:
+            on_launched(queue.done, entry, ok, error)
@@ -0,0 +1,96 @@
+"""
+启动器配置（data/launcher_data.json）的数据模型，不依赖Qt：
+图形界面（LauncherData）和命令行工具（quicklauncher.py）读写同一份配置。
+"""
+
+import os
+import json
+
+DATA_FILE = 'data/launcher_data.json'
+
+class IconEntry:
+    """图标区域的一条记录，只保存必要字段，不创建任何控件"""
+    __slots__ = ('path', 'name', 'checked', 'order', 'launch_time', 'number', 'usage')
+
+    def __init__(self, path, checked=False, launch_time=None, order=None):
+        self.path = path
+        self.name = os.path.basename(path)
+        self.checked = checked
+        self.order = order  # 勾选顺序号
+        self.launch_time = launch_time
+        self.number = None  # 当前显示的勾选序号
+        self.usage = None  # 启动的进程树当前的CPU/内存占用文本
+
+class LauncherProfile:
+    """
+    一份启动器配置
+
+    Args:
+        icons: 图标条目列表（IconEntry）
+        cmds: 命令文本列表
+        cmd_policies: 命令 -> 重启策略（RestartPolicy）
+    """
+    def __init__(self, icons=None, cmds=None, cmd_policies=None):
+        self.icons = list(icons or [])
+        self.cmds = list(cmds or [])
+        self.cmd_policies = dict(cmd_policies or {})
+
+    @classmethod
+    def from_dict(cls, data):
+        # 图标区域在窗口显示前就会用到 IconEntry，其余依赖用到时才导入
+        from utils.restart_policy import RestartPolicy
+        icons = []
+        for icon_info in data.get('icons', []):
+            # 每项为 [路径, 是否勾选, 启动时间, 勾选顺序号]，旧文件可能只有前两项
+            if isinstance(icon_info, (list, tuple)) and len(icon_info) >= 2:
+                path, checked = icon_info[0], icon_info[1]
+                launch_time = icon_info[2] if len(icon_info) > 2 else None
+                checked_order = icon_info[3] if len(icon_info) > 3 else None
+                icons.append(IconEntry(path, checked, launch_time, checked_order))
+        policies = {cmd: RestartPolicy.from_dict(config) for cmd, config in data.get('cmd_policies', {}).items()}
+        return cls(icons, data.get('cmds', []), policies)
+
+    @classmethod
+    def load(cls, path=DATA_FILE):
+        """读取配置文件，文件不存在时返回空配置"""
+        if not os.path.exists(path):
+            return cls()
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls.from_dict(json.load(f))
+
+    def to_dict(self):
+        return {
+            # 图标区域的文件路径、勾选状态、启动时间和勾选顺序号
+            'icons': [(e.path, e.checked, e.launch_time or None, e.order) for e in self.icons],
+            # 命令区域的所有命令文本
+            'cmds': list(self.cmds),
+            # 只保存启用了自动重启的命令
+            'cmd_policies': {cmd: policy.to_dict() for cmd, policy in self.cmd_policies.items() if policy.enabled}
+        }
+
+    def save(self, path=DATA_FILE):
+        from utils.data_writer import atomic_write_json
+        atomic_write_json(path, self.to_dict())
+
+    def checked_icons(self):
+        """按勾选顺序返回已勾选的图标"""
+        checked = [e for e in self.icons if e.checked]
+        # 没有顺序号的（旧文件）排在最后，保持原有先后
+        return sorted(checked, key=lambda e: (e.order is None, e.order or 0))
+
+    def find_icon(self, target):
+        """按完整路径或文件名（不区分大小写，可省略扩展名）查找图标，找不到返回None"""
+        return find_icon(self.icons, target)
+
+def find_icon(entries, target):
+    """在图标条目中按完整路径或文件名查找"""
+    norm = os.path.normcase(os.path.abspath(target))
+    for entry in entries:
+        if os.path.normcase(os.path.abspath(entry.path)) == norm:
+            return entry
+    lowered = target.lower()
+    for entry in entries:
+        name = entry.name.lower()
+        if name == lowered or os.path.splitext(name)[0] == lowered:
+            return entry
+    return None
@@ -0,0 +1,116 @@
+"""
+大日志文件的稀疏行索引：
+只记录每 stride 行的起始字节偏移（array('Q')），2GB、两千万行的日志索引也只占几百KB。
+定位任意一行时先跳到最近的检查点，再向后找不超过 stride 个换行符。
+索引可以随文件增长增量扩展，适合在后台线程中边建边用。
+"""
+
+import os
+import mmap
+import threading
+from array import array
+from itertools import accumulate
+
+class SparseLineIndex:
+    def __init__(self, stride=256, chunk_size=4 * 1024 * 1024):
+        self.stride = stride
+        self.chunk_size = chunk_size
+        self._checkpoints = array('Q', [0])  # 第 i*stride 行的起始偏移
+        self._newlines = 0  # 已索引范围内的换行符数量
+        self._last_line_start = 0  # 最后一行（可能不完整）的起始偏移
+        self.indexed_bytes = 0  # 已索引的字节数
+        self._lock = threading.Lock()
+
+    @property
+    def line_count(self):
+        """已索引范围内的行数（末尾没有换行的半行也算一行）"""
+        with self._lock:
+            return self._newlines + (1 if self.indexed_bytes > self._last_line_start else 0)
+
+    def memory_bytes(self):
+        return self._checkpoints.itemsize * len(self._checkpoints)
+
+    def extend(self, buf, end, should_stop=None):
+        """
+        把索引扩展到 end 字节处
+
+        Args:
+            buf: 支持切片的只读缓冲区（通常是 mmap）
+            end: 扩展到的字节位置
+            should_stop: 可选的回调，返回True时提前结束（用于取消后台索引）
+        """
+        stride = self.stride
+        while self.indexed_bytes < end:
+            if should_stop is not None and should_stop():
+                return
+            start = self.indexed_bytes
+            chunk = buf[start:min(end, start + self.chunk_size)]
+            parts = chunk.split(b'\n')
+            # ends[j] 是本块第 j 个换行符之后（即下一行）的起始偏移，累加在C层完成
+            ends = list(accumulate(map((1).__add__, map(len, parts[:-1])), initial=start))
+            found = len(parts) - 1
+            first = stride - self._newlines % stride
+            with self._lock:
+                self._checkpoints.extend(ends[first::stride])
+                self._newlines += found
+                if found:
+                    self._last_line_start = ends[-1]
+                self.indexed_bytes = start + len(chunk)
+
+    def line_offset(self, buf, line):
+        """第 line 行（从0开始）的起始字节偏移，超出范围返回None"""
+        with self._lock:
+            if line < 0 or line >= self._newlines + (1 if self.indexed_bytes > self._last_line_start else 0):
+                return None
+            checkpoint = line // self.stride
+            pos = self._checkpoints[checkpoint]
+        for _ in range(line - checkpoint * self.stride):
+            pos = buf.find(b'\n', pos) + 1
+        return pos
+
+    def read_lines(self, buf, first, count, encoding='utf-8'):
+        """解码从 first 行开始的最多 count 行，只读取这些行对应的字节"""
+        start = self.line_offset(buf, first)
+        if start is None:
+            return []
+        end_limit = self.indexed_bytes
+        pos = start
+        for _ in range(count):
+            nl = buf.find(b'\n', pos, end_limit)
+            if nl < 0:
+                pos = end_limit
+                break
+            pos = nl + 1
+        text = buf[start:pos].decode(encoding, errors='replace')
+        lines = text.split('\n')
+        if lines and lines[-1] == '':
+            lines.pop()
+        return [line.rstrip('\r') for line in lines[:count]]
+
+class MappedLogFile:
+    """以 mmap 方式只读打开日志文件，文件增长后可重新映射"""
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, 'rb')
+        self.map = None
+        self.size = 0
+        self.remap()
+
+    def remap(self):
+        """文件变大时重新映射，返回新的大小"""
+        size = os.fstat(self._file.fileno()).st_size
+        if size != self.size or self.map is None:
+            if self.map is not None:
+                self.map.close()
+                self.map = None
+            # 空文件不能被映射
+            if size > 0:
+                self.map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            self.size = size
+        return self.size
+
+    def close(self):
+        if self.map is not None:
+            self.map.close()
+            self.map = None
+        self._file.close()
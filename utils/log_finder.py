@@ -1,8 +1,9 @@
 import os
 import re
 import json
-from PyQt5.QtWidgets import QMessageBox
 from utils.log_filename import get_base_log_filename
+from utils.log_index import get_log_index
+from utils.log_io import materialize
 
 def find_command_log_files(command, log_dir='data/log'):
     """
@@ -13,26 +14,11 @@ def find_command_log_files(command, log_dir='data/log'):
         log_dir: 日志目录路径
         
     Returns:
-        str: 最新日志文件的完整路径，如果没找到返回None
+        str: 最新日志文件的完整路径（可能是 .log.gz / .log.xz 压缩归档），如果没找到返回None
     """
-    if not os.path.exists(log_dir):
-        return None
-        
     base_filename = get_base_log_filename(command)
-    
-    # 查找匹配的日志文件
-    matching_files = []
-    for filename in os.listdir(log_dir):
-        if filename.startswith(base_filename + "_") and filename.endswith(".log"):
-            matching_files.append(filename)
-    
-    if matching_files:
-        # 按修改时间排序，选择最新的日志文件
-        matching_files.sort(key=lambda x: os.path.getmtime(os.path.join(log_dir, x)), reverse=True)
-        latest_log = os.path.join(log_dir, matching_files[0])
-        return latest_log
-    
-    return None
+    # 通过日志索引查找，不再每次遍历整个日志目录
+    return get_log_index(log_dir).latest(base_filename)
 
 def open_command_log(command, log_dir='data/log', parent_widget=None):
     """
@@ -47,15 +33,18 @@ def open_command_log(command, log_dir='data/log', parent_widget=None):
     
     if log_file:
         try:
-            os.startfile(log_file)
+            # 压缩归档先解压到临时目录，再交给系统默认程序打开
+            os.startfile(materialize(log_file))
             return True, f'打开日志文件: {log_file}'
         except Exception as e:
             if parent_widget:
+                from PyQt5.QtWidgets import QMessageBox  # 只在图形界面中用到，命令行导入本模块时不加载 PyQt5
                 QMessageBox.warning(parent_widget, '错误', f'无法打开日志文件: {e}')
             return False, f'无法打开日志文件: {e}'
     else:
         base_filename = get_base_log_filename(command)
         if parent_widget:
+            from PyQt5.QtWidgets import QMessageBox
             QMessageBox.information(parent_widget, '提示', 
                                  f'未找到命令对应的日志文件:\n命令: {command}\n基础文件名: {base_filename}')
         return False, f'未找到命令对应的日志文件: {command}'
@@ -0,0 +1,133 @@
+"""
+命令日志索引：
+按 get_base_log_filename 的基础名把 data/log 下的运行日志分组，组内按文件名中的时间戳排序。
+- 首次使用时对目录做一次 os.scandir 扫描建立索引，之后查询最新日志是 O(1)。
+- run_cmd_async_with_log 等创建日志时调用 add() 增量更新。
+- 每次查询只 stat 一次日志目录：目录修改时间变化（外部新增/删除文件）时才重新扫描。
+"""
+
+import os
+import re
+import threading
+from bisect import insort
+
+# 运行日志文件名: <基础名>_<YYYYmmdd>_<HHMMSS>.log，压缩归档再加 .gz / .xz 后缀
+LOG_NAME_RE = re.compile(r'^(?P<base>.+)_(?P<ts>\d{8}_\d{6})\.log(?:\.gz|\.xz)?$')
+
+def parse_log_filename(filename):
+    """
+    解析运行日志文件名
+
+    Returns:
+        tuple: (基础名, 时间戳字符串)，不是运行日志时返回None
+    """
+    match = LOG_NAME_RE.match(filename)
+    if not match:
+        return None
+    return match.group('base'), match.group('ts')
+
+class LogIndex:
+    """单个日志目录的索引"""
+    def __init__(self, log_dir):
+        self.log_dir = log_dir
+        self._lock = threading.RLock()
+        self._runs = {}  # 基础名 -> [(时间戳, 文件名)]，按时间升序
+        self._dir_mtime = None  # 建立索引时目录的修改时间
+        self._built = False
+        self.scan_count = 0  # 目录扫描次数
+
+    def _stat_dir(self):
+        try:
+            return os.stat(self.log_dir).st_mtime_ns
+        except OSError:
+            return None
+
+    def rebuild(self):
+        """扫描一次目录，重建索引"""
+        with self._lock:
+            runs = {}
+            dir_mtime = self._stat_dir()
+            if dir_mtime is not None:
+                with os.scandir(self.log_dir) as it:
+                    for entry in it:
+                        parsed = parse_log_filename(entry.name)
+                        if parsed:
+                            runs.setdefault(parsed[0], []).append((parsed[1], entry.name))
+            for items in runs.values():
+                items.sort()
+            self._runs = runs
+            self._dir_mtime = dir_mtime
+            self._built = True
+            self.scan_count += 1
+
+    def ensure_fresh(self):
+        """未建立索引或目录被外部修改过时重新扫描"""
+        with self._lock:
+            if not self._built or self._stat_dir() != self._dir_mtime:
+                self.rebuild()
+
+    def add(self, path):
+        """登记新创建的日志文件"""
+        filename = os.path.basename(path)
+        parsed = parse_log_filename(filename)
+        if not parsed:
+            return
+        with self._lock:
+            if not self._built:
+                self.rebuild()
+                return
+            items = self._runs.setdefault(parsed[0], [])
+            if (parsed[1], filename) not in items:
+                insort(items, (parsed[1], filename))
+            # 自己创建的文件不应触发重新扫描
+            self._dir_mtime = self._stat_dir()
+
+    def remove(self, path):
+        """登记被删除的日志文件"""
+        filename = os.path.basename(path)
+        parsed = parse_log_filename(filename)
+        if not parsed:
+            return
+        with self._lock:
+            items = self._runs.get(parsed[0])
+            if items and (parsed[1], filename) in items:
+                items.remove((parsed[1], filename))
+                if not items:
+                    del self._runs[parsed[0]]
+            self._dir_mtime = self._stat_dir()
+
+    def latest(self, base):
+        """基础名对应的最新日志完整路径，没有返回None"""
+        with self._lock:
+            self.ensure_fresh()
+            items = self._runs.get(base)
+            while items:
+                path = os.path.join(self.log_dir, items[-1][1])
+                if os.path.exists(path):
+                    return path
+                # 文件已被删除，丢弃后继续找上一份
+                items.pop()
+            return None
+
+    def runs(self, base):
+        """基础名对应的所有日志完整路径，最新的在前"""
+        with self._lock:
+            self.ensure_fresh()
+            return [os.path.join(self.log_dir, name) for _, name in reversed(self._runs.get(base, []))]
+
+    def bases(self):
+        with self._lock:
+            self.ensure_fresh()
+            return list(self._runs)
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+def get_log_index(log_dir='data/log'):
+    """获取日志目录对应的共享索引"""
+    key = os.path.normcase(os.path.abspath(log_dir))
+    with _indexes_lock:
+        index = _indexes.get(key)
+        if index is None:
+            index = _indexes[key] = LogIndex(log_dir)
+        return index
@@ -0,0 +1,145 @@
+"""
+日志文件读取工具：
+运行日志在结束后可能被压缩为 .log.gz 或 .log.xz，读取方统一通过这里打开，
+不需要关心文件是否被压缩。
+需要普通文件时（分页查看、外部程序打开）解压到临时目录，按最近使用时间只保留有限的文件数和总字节数。
+"""
+
+import os
+import gzip
+import lzma
+import time
+import shutil
+import tempfile
+
+# 压缩后缀 -> 打开函数
+COMPRESSORS = {
+    '.gz': gzip.open,
+    '.xz': lzma.open,
+}
+
+MATERIALIZE_MAX_FILES = 8  # 解压目录中最多保留的文件数
+MATERIALIZE_MAX_BYTES = 1024 * 1024 * 1024  # 解压目录的总字节上限
+STALE_TEMP_SECONDS = 3600  # 超过这个时间的未完成解压文件视为中断留下的
+
+def materialized_dir():
+    """压缩日志的默认解压目录"""
+    return os.path.join(tempfile.gettempdir(), 'quicklauncher_logs')
+
+def is_compressed(path):
+    """日志文件是否为压缩归档"""
+    return os.path.splitext(path)[1] in COMPRESSORS
+
+def open_log(path, mode='rb'):
+    """
+    打开日志文件，压缩归档会被透明解压
+
+    Args:
+        path: 日志文件路径（.log / .log.gz / .log.xz）
+        mode: 'rb' 或 'r'（文本模式按 UTF-8 解码）
+
+    Returns:
+        文件对象
+    """
+    opener = COMPRESSORS.get(os.path.splitext(path)[1])
+    if opener is None:
+        if 'b' in mode:
+            return open(path, mode)
+        return open(path, mode, encoding='utf-8', errors='replace')
+    if 'b' in mode:
+        return opener(path, mode)
+    return opener(path, 'rt', encoding='utf-8', errors='replace')
+
+def materialize(path, temp_dir=None):
+    """
+    得到可以直接按普通文件读取的日志路径
+
+    未压缩的日志原样返回；压缩归档流式解压到临时目录（按文件名和修改时间缓存），
+    供外部程序打开或 mmap 分页查看。解压后按 prune_materialized 淘汰较早使用的解压文件。
+
+    Args:
+        path: 日志文件路径
+        temp_dir: 解压目录，默认为 materialized_dir()
+
+    Returns:
+        str: 普通日志文件路径
+    """
+    if not is_compressed(path):
+        return path
+    temp_dir = temp_dir or materialized_dir()
+    os.makedirs(temp_dir, exist_ok=True)
+    st = os.stat(path)
+    target = os.path.join(temp_dir, os.path.splitext(os.path.basename(path))[0])
+    try:
+        cached = os.path.getmtime(target) == st.st_mtime
+    except OSError:
+        cached = False
+    if not cached:
+        fd, temp_path = tempfile.mkstemp(dir=temp_dir, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as dst, open_log(path, 'rb') as src:
+                shutil.copyfileobj(src, dst, 1024 * 1024)
+            os.replace(temp_path, target)
+        except BaseException:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            raise
+    # 修改时间与归档相同，用于判断缓存是否有效；访问时间记录最近使用，用于淘汰
+    os.utime(target, (time.time(), st.st_mtime))
+    prune_materialized(temp_dir, keep=target)
+    return target
+
+def prune_materialized(temp_dir=None, max_files=MATERIALIZE_MAX_FILES, max_bytes=MATERIALIZE_MAX_BYTES, keep=None):
+    """
+    按最近使用时间淘汰解压目录中的文件，并删除中断的解压留下的临时文件
+
+    Args:
+        temp_dir: 解压目录，默认为 materialized_dir()
+        max_files: 最多保留的文件数，0 表示全部删除
+        max_bytes: 保留文件的总字节上限
+        keep: 始终保留的文件（刚解压、正要使用的）
+
+    Returns:
+        int: 删除的文件数
+    """
+    temp_dir = temp_dir or materialized_dir()
+    now = time.time()
+    files = []  # [(最近使用时间, 大小, 路径)]
+    try:
+        with os.scandir(temp_dir) as it:
+            for entry in it:
+                try:
+                    st = entry.stat()
+                except OSError:
+                    continue
+                if not entry.is_file():
+                    continue
+                if entry.name.endswith('.tmp'):
+                    # 可能正在其他线程中解压，只删除很久以前留下的
+                    if now - st.st_mtime > STALE_TEMP_SECONDS:
+                        files.append((0, 0, entry.path))
+                    continue
+                files.append((st.st_atime, st.st_size, entry.path))
+    except OSError:
+        return 0
+    keep = os.path.abspath(keep) if keep else None
+    kept_files = kept_bytes = removed = 0
+    # keep 指定的文件最先计入上限，其余按最近使用时间从新到旧
+    files.sort(key=lambda item: (os.path.abspath(item[2]) == keep, item[0]), reverse=True)
+    for atime, size, path in files:
+        if os.path.abspath(path) == keep or (atime and kept_files < max_files and kept_bytes + size <= max_bytes):
+            kept_files += 1
+            kept_bytes += size
+            continue
+        try:
+            os.remove(path)
+            removed += 1
+        except OSError:
+            pass  # Windows 上正被外部程序打开的文件无法删除，下次再试
+    return removed
+
+def remove_materialized(temp_dir=None):
+    """删除所有解压出的日志（程序退出时调用）"""
+    return prune_materialized(temp_dir, max_files=0)
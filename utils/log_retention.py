@@ -0,0 +1,268 @@
+"""
+日志保留策略：
+1. 按命令（日志基础名）限制保留的运行次数、最长保留天数和总字节数，另有整个目录的总字节上限。
+2. 已结束的运行日志在后台流式压缩为 .log.gz（或 .log.xz），读取方通过 utils.log_io 透明解压。
+3. rotate_file 按大小轮转 launcher.log 这类持续追加的日志。
+正在运行的命令（进程监管器中未结束的句柄）和最近修改过的日志不会被压缩或删除。
+后台线程每次清理时，也按 utils.log_io 的上限清理查看压缩日志时解压出的临时文件。
+"""
+
+import os
+import json
+import time
+import shutil
+import threading
+from utils.log_index import get_log_index
+from utils.log_io import COMPRESSORS, is_compressed, prune_materialized
+
+MB = 1024 * 1024
+
+class RetentionPolicy:
+    """
+    日志保留策略
+
+    Args:
+        max_runs_per_command: 每个命令最多保留的运行日志数量
+        max_age_days: 日志最长保留天数
+        max_command_bytes: 每个命令的日志总字节上限
+        max_total_bytes: 日志目录的总字节上限
+        compress_after_seconds: 日志超过多少秒未修改才视为已结束，可以压缩
+        compression: 压缩格式 'gzip' / 'xz'，None 表示不压缩
+        overrides: 按日志基础名覆盖以上上限，如 {'python_server': {'max_runs_per_command': 100}}
+    """
+    SUFFIXES = {'gzip': '.gz', 'xz': '.xz'}
+    LIMIT_KEYS = ('max_runs_per_command', 'max_age_days', 'max_command_bytes')
+
+    def __init__(self, max_runs_per_command=20, max_age_days=30, max_command_bytes=200 * MB,
+                 max_total_bytes=2048 * MB, compress_after_seconds=300, compression='gzip', overrides=None):
+        self.max_runs_per_command = max_runs_per_command
+        self.max_age_days = max_age_days
+        self.max_command_bytes = max_command_bytes
+        self.max_total_bytes = max_total_bytes
+        self.compress_after_seconds = compress_after_seconds
+        self.compression = compression
+        self.overrides = overrides or {}
+
+    @property
+    def suffix(self):
+        return self.SUFFIXES.get(self.compression)
+
+    def limits_for(self, base):
+        """某个命令生效的上限，返回 (最大运行数, 最长保留秒数, 最大字节数)，None 表示不限制"""
+        limits = {key: getattr(self, key) for key in self.LIMIT_KEYS}
+        limits.update({k: v for k, v in self.overrides.get(base, {}).items() if k in limits})
+        max_age = limits['max_age_days']
+        return (limits['max_runs_per_command'],
+                max_age * 86400 if max_age is not None else None,
+                limits['max_command_bytes'])
+
+    @classmethod
+    def load(cls, path='data/log_retention.json'):
+        """从JSON配置文件加载策略，文件不存在或无效时使用默认值"""
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                config = json.load(f)
+            return cls(**config)
+        except FileNotFoundError:
+            return cls()
+        except (OSError, ValueError, TypeError) as e:
+            print(f'读取日志保留配置失败: {path} 错误: {e}')
+            return cls()
+
+def _active_log_paths():
+    """进程监管器中尚未结束的运行所写的日志"""
+    from utils.process_supervisor import get_supervisor
+    return {os.path.normcase(os.path.abspath(h.log_path)) for h in get_supervisor().active()}
+
+class LogRetention:
+    """
+    按保留策略清理和压缩一个日志目录
+
+    Args:
+        log_dir: 日志目录
+        policy: RetentionPolicy
+        active_paths: 返回正在写入的日志路径集合的函数，默认查询进程监管器
+        clock: 时间函数，便于测试
+    """
+    def __init__(self, log_dir='data/log', policy=None, active_paths=_active_log_paths, clock=time.time):
+        self.log_dir = log_dir
+        self.policy = policy or RetentionPolicy()
+        self.active_paths = active_paths
+        self.clock = clock
+        self.index = get_log_index(log_dir)
+        self._stop = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+        self.last_stats = None
+
+    def start(self, interval=600, initial_delay=30):
+        """启动后台线程，每隔 interval 秒执行一次"""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, args=(interval, initial_delay),
+                                        name='LogRetention', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread = None
+
+    def _loop(self, interval, initial_delay):
+        if self._stop.wait(initial_delay):
+            return
+        while True:
+            try:
+                self.run_once()
+                # 查看压缩日志时解压出的临时文件也按上限清理（包括上次运行异常退出时留下的）
+                prune_materialized()
+            except Exception as e:
+                print(f'日志清理出错: {e}')
+            if self._stop.wait(interval):
+                return
+
+    def run_once(self):
+        """
+        执行一次清理和压缩
+
+        Returns:
+            dict: compressed（压缩数）、deleted（删除数）、freed_bytes（释放的字节数）
+        """
+        with self._lock:
+            stats = {'compressed': 0, 'deleted': 0, 'freed_bytes': 0}
+            policy = self.policy
+            now = self.clock()
+            active = self.active_paths()
+            self.index.ensure_fresh()
+            kept = []  # [(mtime, size, path)]，用于全局上限
+            for base in self.index.bases():
+                max_runs, max_age, max_bytes = policy.limits_for(base)
+                command_bytes = 0
+                # 最新的在前
+                for i, path in enumerate(self.index.runs(base)):
+                    try:
+                        st = os.stat(path)
+                    except OSError:
+                        continue
+                    if self._is_protected(path, st, now, active):
+                        kept.append((st.st_mtime, st.st_size, path))
+                        command_bytes += st.st_size
+                        continue
+                    if (max_runs is not None and i >= max_runs) or (max_age is not None and now - st.st_mtime > max_age):
+                        self._delete(path, st.st_size, stats)
+                        continue
+                    size = st.st_size
+                    if policy.suffix and not is_compressed(path):
+                        compressed = self.compress(path)
+                        if compressed:
+                            stats['compressed'] += 1
+                            path = compressed
+                            size = os.path.getsize(compressed)
+                    # 始终保留每个命令最新的一份日志
+                    if max_bytes is not None and i > 0 and command_bytes + size > max_bytes:
+                        self._delete(path, size, stats)
+                        continue
+                    command_bytes += size
+                    kept.append((st.st_mtime, size, path))
+            total = sum(size for _, size, _ in kept)
+            if policy.max_total_bytes is not None and total > policy.max_total_bytes:
+                # 超出全局上限时从最旧的开始删除
+                for mtime, size, path in sorted(kept):
+                    if total <= policy.max_total_bytes:
+                        break
+                    try:
+                        st = os.stat(path)
+                    except OSError:
+                        continue
+                    if self._is_protected(path, st, now, active):
+                        continue
+                    self._delete(path, size, stats)
+                    total -= size
+            self.last_stats = stats
+            return stats
+
+    def _is_protected(self, path, st, now, active):
+        """正在写入或最近修改过的日志不处理"""
+        if now - st.st_mtime < self.policy.compress_after_seconds:
+            return True
+        return os.path.normcase(os.path.abspath(path)) in active
+
+    def _delete(self, path, size, stats):
+        try:
+            os.remove(path)
+        except OSError as e:
+            print(f'删除日志失败: {path} 错误: {e}')
+            return
+        self.index.remove(path)
+        stats['deleted'] += 1
+        stats['freed_bytes'] += size
+
+    def compress(self, path):
+        """
+        流式压缩一个已结束的日志，成功后删除原文件
+
+        Returns:
+            str: 压缩后的路径，失败或压缩期间文件被修改时返回None
+        """
+        suffix = self.policy.suffix
+        if not suffix or is_compressed(path):
+            return None
+        target = path + suffix
+        temp_path = os.path.join(os.path.dirname(path), f'.{os.path.basename(target)}.tmp')
+        try:
+            before = os.stat(path)
+            with open(path, 'rb') as src, COMPRESSORS[suffix](temp_path, 'wb') as dst:
+                shutil.copyfileobj(src, dst, MB)
+            after = os.stat(path)
+            if (after.st_size, after.st_mtime_ns) != (before.st_size, before.st_mtime_ns):
+                # 压缩期间仍有写入，说明日志还没结束
+                os.remove(temp_path)
+                return None
+            os.utime(temp_path, ns=(before.st_atime_ns, before.st_mtime_ns))
+            os.replace(temp_path, target)
+            os.remove(path)
+        except OSError as e:
+            print(f'压缩日志失败: {path} 错误: {e}')
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            if os.path.exists(target) and os.path.exists(path):
+                # 原文件删除失败（例如仍被打开），保留原文件，丢弃压缩结果
+                try:
+                    os.remove(target)
+                except OSError:
+                    pass
+            return None
+        self.index.remove(path)
+        self.index.add(target)
+        return target
+
+def rotate_file(path, max_bytes=5 * MB, backups=3):
+    """
+    按大小轮转持续追加的日志：path -> path.1 -> path.2 ...，超出 backups 的最旧文件被删除
+
+    Returns:
+        bool: 是否发生了轮转
+    """
+    try:
+        if os.path.getsize(path) < max_bytes:
+            return False
+    except OSError:
+        return False
+    try:
+        oldest = f'{path}.{backups}'
+        if os.path.exists(oldest):
+            os.remove(oldest)
+        for i in range(backups - 1, 0, -1):
+            src = f'{path}.{i}'
+            if os.path.exists(src):
+                os.replace(src, f'{path}.{i + 1}')
+        if backups > 0:
+            os.replace(path, f'{path}.1')
+        else:
+            os.remove(path)
+    except OSError as e:
+        print(f'轮转日志失败: {path} 错误: {e}')
+        return False
+    return True
@@ -0,0 +1,574 @@
+"""
+命令日志全文搜索：
+- 已结束的运行日志（一段时间未修改，包括 .log.gz / .log.xz 归档）增量建立三元组（trigram）倒排索引，
+  保存在 data/log_search.db（SQLite）。建索引前把内容转为小写、数字统一为 0 再按行去重，
+  大量只有时间戳和编号不同的日志行只需处理一次。
+- 每批新索引的日志构成一个段，段内每个三元组保存一张文件位图（zlib 压缩），段数超过上限时合并为一个。
+- 查询时从子串或正则表达式中提取必须出现的三元组，用位图求交、求并得到候选文件，再逐个文件精确匹配；
+  还没有建立索引的日志（正在写入或内容有变化的）直接扫描。
+- 可按命令（日志基础名）和时间范围（运行开始时间）过滤，结果按日志从新到旧逐条回调，达到上限即停止。
+"""
+
+import os
+import re
+import time
+import zlib
+import sqlite3
+import threading
+from utils.log_index import parse_log_filename
+from utils.log_io import open_log, is_compressed
+
+try:
+    from re import _parser as sre_parse  # Python 3.11+
+except ImportError:
+    import sre_parse
+
+SCHEMA_VERSION = 1
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL UNIQUE,
+    base TEXT NOT NULL,
+    ts TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_files_base_ts ON files (base, ts);
+CREATE TABLE IF NOT EXISTS segments (id INTEGER PRIMARY KEY, lo INTEGER NOT NULL, hi INTEGER NOT NULL);
+CREATE TABLE IF NOT EXISTS postings (
+    gram INTEGER NOT NULL,
+    seg INTEGER NOT NULL,
+    bits BLOB NOT NULL,
+    PRIMARY KEY (gram, seg)
+) WITHOUT ROWID;
+"""
+
+SETTLE_SECONDS = 60  # 超过该时间未修改的日志才建立索引
+BATCH_FILES = 500  # 每个段最多包含的日志数
+BATCH_BYTES = 256 * 1024 * 1024  # 每个段最多处理的字节数
+MAX_SEGMENTS = 16  # 段数超过该值时合并
+READ_CHUNK = 8 * 1024 * 1024
+MAX_LINE_CACHE = 200000  # 按行去重时最多记住的行数
+MAX_HIT_TEXT = 500  # 结果中保留的行文本长度
+
+# 建索引和提取查询三元组共用的归一化：ASCII 字母转小写，数字统一为 0
+_NORMALIZE = bytes.maketrans(b'ABCDEFGHIJKLMNOPQRSTUVWXYZ123456789', b'abcdefghijklmnopqrstuvwxyz' + b'0' * 9)
+
+def normalize(data):
+    return data.translate(_NORMALIZE)
+
+def text_grams(data):
+    """已归一化的一行文本中的三元组集合（每个三元组编码为 24 位整数）"""
+    return {(a << 16) | (b << 8) | c for a, b, c in zip(data, data[1:], data[2:])}
+
+def _add_lines(data, grams, seen):
+    for line in set(normalize(data).split(b'\n')):
+        if len(line) >= 3 and line not in seen:
+            grams.update(zip(line, line[1:], line[2:]))
+            seen.add(line)
+    if len(seen) > MAX_LINE_CACHE:
+        seen.clear()
+
+def file_grams(path, chunk_size=READ_CHUNK):
+    """
+    日志文件中出现的所有三元组（按行，不跨行）
+
+    Args:
+        path: 日志路径，压缩归档透明解压
+        chunk_size: 单次读取的字节数
+
+    Returns:
+        set: 三元组整数集合
+    """
+    grams, seen = set(), set()
+    tail = b''
+    with open_log(path, 'rb') as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            data = tail + chunk
+            cut = data.rfind(b'\n') + 1
+            if cut == 0 and len(data) < chunk_size * 4:
+                tail = data
+                continue
+            cut = cut or len(data)
+            tail = data[cut:]
+            _add_lines(data[:cut], grams, seen)
+    if tail:
+        _add_lines(tail, grams, seen)
+    return {(a << 16) | (b << 8) | c for a, b, c in grams}
+
+# 查询计划: None 表示无法缩小范围（扫描全部候选），否则为 ('grams', 集合) / ('and', [子计划]) / ('or', [子计划])
+def _and(nodes):
+    nodes = [node for node in nodes if node is not None]
+    if not nodes:
+        return None
+    return nodes[0] if len(nodes) == 1 else ('and', nodes)
+
+def _or(nodes):
+    if not nodes or any(node is None for node in nodes):
+        return None
+    return nodes[0] if len(nodes) == 1 else ('or', nodes)
+
+def literal_plan(literal):
+    """子串查询的计划：每段不短于三个字节的文本的三元组都必须出现"""
+    runs = [run for run in normalize(literal).split(b'\n') if len(run) >= 3]
+    return _and([('grams', text_grams(run)) for run in runs])
+
+_REPEATS = tuple(getattr(sre_parse, name) for name in ('MAX_REPEAT', 'MIN_REPEAT', 'POSSESSIVE_REPEAT')
+                 if hasattr(sre_parse, name))
+
+def _sequence_plan(items):
+    nodes = []
+    run = bytearray()
+
+    def flush():
+        if run:
+            nodes.append(literal_plan(bytes(run)))
+            run.clear()
+
+    for op, av in items:
+        if op is sre_parse.LITERAL and av < 256:
+            run.append(av)
+            continue
+        if op is sre_parse.AT:
+            continue  # ^ $ \b 等不占字符，前后的文字仍然相邻
+        flush()
+        if op is sre_parse.SUBPATTERN:
+            nodes.append(_sequence_plan(av[-1]))
+        elif op is sre_parse.BRANCH:
+            nodes.append(_or([_sequence_plan(alt) for alt in av[1]]))
+        elif op in _REPEATS and av[0] >= 1:
+            nodes.append(_sequence_plan(av[2]))
+        # 其余（字符集、任意字符、反向引用、断言等）不提供约束
+    flush()
+    return _and(nodes)
+
+def regex_plan(pattern, flags=0):
+    """从正则表达式（bytes）中提取必须出现的三元组，无法分析时返回 None"""
+    try:
+        return _sequence_plan(sre_parse.parse(pattern, flags))
+    except Exception:
+        return None
+
+def compile_query(query, regex=False, ignore_case=False):
+    """
+    编译查询
+
+    Args:
+        query: 查询文本
+        regex: 是否按正则表达式解释
+        ignore_case: 是否忽略大小写
+
+    Returns:
+        tuple: (编译后的 bytes 正则, 查询计划)；正则无效时抛出 re.error
+    """
+    if not query:
+        raise ValueError('查询为空')
+    raw = query.encode('utf-8')
+    flags = re.MULTILINE | (re.IGNORECASE if ignore_case else 0)
+    if regex:
+        return re.compile(raw, flags), regex_plan(raw, flags)
+    return re.compile(re.escape(raw), flags), literal_plan(raw)
+
+def _bitmap(offsets):
+    """偏移列表 -> 位图（整数，第 n 位对应偏移 n）"""
+    value = 0
+    for offset in offsets:
+        value |= 1 << offset
+    return value
+
+def _to_blob(value, size):
+    return zlib.compress(value.to_bytes(size, 'little'))
+
+def _from_blob(blob):
+    return int.from_bytes(zlib.decompress(blob), 'little')
+
+def _bit_positions(value):
+    """位图中为 1 的位置"""
+    positions = []
+    text = bin(value)[:1:-1]  # 低位在前
+    start = text.find('1')
+    while start >= 0:
+        positions.append(start)
+        start = text.find('1', start + 1)
+    return positions
+
+def _ts_bound(seconds):
+    return time.strftime('%Y%m%d_%H%M%S', time.localtime(seconds)) if seconds is not None else None
+
+class LogSearchIndex:
+    """
+    一个日志目录的全文索引
+
+    Args:
+        log_dir: 日志目录
+        db_path: 索引数据库
+        settle_seconds: 日志超过多少秒未修改才建立索引
+        clock: 当前时间（秒）
+    """
+    def __init__(self, log_dir='data/log', db_path='data/log_search.db', settle_seconds=SETTLE_SECONDS,
+                 clock=time.time):
+        self.log_dir = log_dir
+        self.db_path = db_path
+        self.settle_seconds = settle_seconds
+        self.clock = clock
+        self._update_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self.last_update = None  # 最近一次更新的统计
+        self._db_ready = False  # 数据库在第一次使用时（通常在后台线程中）才创建
+        self._db_lock = threading.Lock()
+
+    def _connect(self):
+        if not self._db_ready:
+            with self._db_lock:
+                if not self._db_ready:
+                    self._init_db()
+                    self._db_ready = True
+        return self._open()
+
+    def _open(self):
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        return conn
+
+    def _init_db(self):
+        os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+        conn = self._open()
+        try:
+            conn.executescript(SCHEMA)
+            row = conn.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()
+            if row is not None and row[0] != str(SCHEMA_VERSION):
+                # 格式变化，丢弃旧索引重新建立
+                conn.executescript('DELETE FROM postings; DELETE FROM segments; DELETE FROM files;')
+            conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('version', ?)", (str(SCHEMA_VERSION),))
+            conn.commit()
+        finally:
+            conn.close()
+
+    # 后台定期更新索引（与 LogRetention 相同的方式）
+    def start(self, interval=300, initial_delay=20):
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, args=(interval, initial_delay),
+                                        name='LogSearchIndex', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread = None
+
+    def _loop(self, interval, initial_delay):
+        if self._stop.wait(initial_delay):
+            return
+        while True:
+            try:
+                self.update(should_stop=self._stop.is_set)
+            except Exception as e:
+                print(f'更新日志搜索索引出错: {e}')
+            if self._stop.wait(interval):
+                return
+
+    def _disk_files(self, base=None, since_ts=None, until_ts=None):
+        """目录中的运行日志 {文件名: (基础名, 时间戳, 大小, 修改时间ns)}"""
+        files = {}
+        try:
+            it = os.scandir(self.log_dir)
+        except OSError:
+            return files
+        with it:
+            for entry in it:
+                parsed = parse_log_filename(entry.name)
+                if not parsed:
+                    continue
+                file_base, ts = parsed
+                if (base is not None and file_base != base) or (since_ts and ts < since_ts) or (until_ts and ts > until_ts):
+                    continue
+                try:
+                    st = entry.stat()
+                except OSError:
+                    continue
+                files[entry.name] = (file_base, ts, st.st_size, st.st_mtime_ns)
+        return files
+
+    def update(self, should_stop=None, on_progress=None):
+        """
+        增量更新索引：登记新结束的日志，移除已删除的，内容有变化的重新索引
+
+        Args:
+            should_stop: 返回 True 时尽快停止（已完成的批次会保留）
+            on_progress: 进度回调 on_progress(已处理文件数, 待处理文件数)
+
+        Returns:
+            dict: indexed（新索引数）、removed（移除数）、renamed（压缩后沿用索引数）、bytes（读取字节数）、segments（段数）
+        """
+        with self._update_lock:
+            conn = self._connect()
+            try:
+                stats = self._update(conn, should_stop or (lambda: False), on_progress)
+            finally:
+                conn.close()
+            self.last_update = dict(stats, time=self.clock())
+            return stats
+
+    def _update(self, conn, should_stop, on_progress):
+        stats = {'indexed': 0, 'removed': 0, 'renamed': 0, 'bytes': 0}
+        disk = self._disk_files()
+        indexed = {name: (fid, size, mtime) for fid, name, size, mtime in
+                   conn.execute('SELECT id, name, size, mtime_ns FROM files')}
+        # 日志被压缩为 .log.gz / .log.xz 后内容不变，沿用原来的索引
+        for name, (_, _, size, mtime) in disk.items():
+            stem = os.path.splitext(name)[0]
+            if name not in indexed and is_compressed(name) and stem in indexed and stem not in disk:
+                conn.execute('UPDATE files SET name = ?, size = ?, mtime_ns = ? WHERE name = ?', (name, size, mtime, stem))
+                indexed[name] = (indexed.pop(stem)[0], size, mtime)
+                stats['renamed'] += 1
+        settled_before = (self.clock() - self.settle_seconds) * 1e9
+        pending = []
+        stale = [name for name in indexed if name not in disk]
+        for name, (_, ts, size, mtime) in disk.items():
+            if mtime > settled_before:
+                continue  # 仍在写入，查询时直接扫描
+            row = indexed.get(name)
+            if row is None:
+                pending.append((ts, name))
+            elif row[1:] != (size, mtime):
+                stale.append(name)
+                pending.append((ts, name))
+        if stale:
+            conn.executemany('DELETE FROM files WHERE name = ?', [(name,) for name in stale])
+            stats['removed'] = len(stale)
+        conn.commit()
+        pending.sort()
+        done = 0
+        while done < len(pending) and not should_stop():
+            batch, batch_bytes = [], 0
+            while done + len(batch) < len(pending) and len(batch) < BATCH_FILES and batch_bytes < BATCH_BYTES:
+                name = pending[done + len(batch)][1]
+                batch.append(name)
+                batch_bytes += disk[name][2]
+            stats['indexed'] += self._index_batch(conn, batch, disk, should_stop)
+            stats['bytes'] += batch_bytes
+            done += len(batch)
+            if on_progress is not None:
+                on_progress(done, len(pending))
+        if conn.execute('SELECT COUNT(*) FROM segments').fetchone()[0] > MAX_SEGMENTS and not should_stop():
+            self._merge(conn)
+        stats['segments'] = conn.execute('SELECT COUNT(*) FROM segments').fetchone()[0]
+        return stats
+
+    def _index_batch(self, conn, names, disk, should_stop):
+        """把一批日志写成一个新段，返回成功索引的数量"""
+        results = []
+        for name in names:
+            if should_stop():
+                break
+            try:
+                grams = file_grams(os.path.join(self.log_dir, name))
+            except Exception as e:
+                print(f'建立日志索引失败: {name} 错误: {e}')
+                continue
+            results.append((name, grams))
+        if not results:
+            return 0
+        postings = {}
+        lo = hi = None
+        for name, grams in results:
+            base, ts, size, mtime = disk[name]
+            fid = conn.execute('INSERT INTO files (name, base, ts, size, mtime_ns) VALUES (?, ?, ?, ?, ?)',
+                               (name, base, ts, size, mtime)).lastrowid
+            lo = fid if lo is None else lo
+            hi = fid
+            for gram in grams:
+                postings.setdefault(gram, []).append(fid - lo)
+        seg = conn.execute('INSERT INTO segments (lo, hi) VALUES (?, ?)', (lo, hi)).lastrowid
+        size = (hi - lo) // 8 + 1
+        conn.executemany('INSERT INTO postings (gram, seg, bits) VALUES (?, ?, ?)',
+                         ((gram, seg, _to_blob(_bitmap(offsets), size)) for gram, offsets in postings.items()))
+        conn.commit()
+        return len(results)
+
+    def _merge(self, conn, grams_per_step=2000):
+        """把所有段合并为一个，同时去掉已删除文件的位"""
+        segments = conn.execute('SELECT id, lo, hi FROM segments').fetchall()
+        lo = min(s[1] for s in segments)
+        hi = max(s[2] for s in segments)
+        size = (hi - lo) // 8 + 1
+        live = bytearray(size)
+        for (fid,) in conn.execute('SELECT id FROM files WHERE id BETWEEN ? AND ?', (lo, hi)):
+            offset = fid - lo
+            live[offset >> 3] |= 1 << (offset & 7)
+        live_mask = int.from_bytes(live, 'little')
+        old_ids = [s[0] for s in segments]
+        seg = conn.execute('INSERT INTO segments (lo, hi) VALUES (?, ?)', (lo, hi)).lastrowid
+        grams = [g for (g,) in conn.execute('SELECT DISTINCT gram FROM postings')]
+        marks = ','.join('?' * len(old_ids))
+        for i in range(0, len(grams), grams_per_step):
+            first, last = grams[i], grams[min(i + grams_per_step, len(grams)) - 1]
+            merged = {}
+            rows = conn.execute(f'SELECT p.gram, s.lo, p.bits FROM postings p JOIN segments s ON s.id = p.seg '
+                                f'WHERE p.gram BETWEEN ? AND ? AND p.seg IN ({marks})', (first, last, *old_ids)).fetchall()
+            for gram, seg_lo, bits in rows:
+                merged[gram] = merged.get(gram, 0) | (_from_blob(bits) << (seg_lo - lo))
+            conn.executemany('INSERT INTO postings (gram, seg, bits) VALUES (?, ?, ?)',
+                             ((gram, seg, _to_blob(value & live_mask, size))
+                              for gram, value in merged.items() if value & live_mask))
+        conn.execute(f'DELETE FROM postings WHERE seg IN ({marks})', old_ids)
+        conn.execute(f'DELETE FROM segments WHERE id IN ({marks})', old_ids)
+        conn.commit()
+
+    def _gram_bits(self, conn, gram):
+        value = 0
+        for seg_lo, bits in conn.execute('SELECT s.lo, p.bits FROM postings p JOIN segments s ON s.id = p.seg '
+                                         'WHERE p.gram = ?', (gram,)):
+            value |= _from_blob(bits) << seg_lo
+        return value
+
+    def _evaluate(self, conn, plan, cache):
+        kind, value = plan
+        if kind == 'grams':
+            result = None
+            for gram in value:
+                bits = cache.get(gram)
+                if bits is None:
+                    bits = cache[gram] = self._gram_bits(conn, gram)
+                result = bits if result is None else result & bits
+                if not result:
+                    return 0
+            return result
+        results = [self._evaluate(conn, child, cache) for child in value]
+        combined = results[0]
+        for item in results[1:]:
+            combined = combined & item if kind == 'and' else combined | item
+        return combined
+
+    def search(self, query, regex=False, ignore_case=False, base=None, since=None, until=None,
+               max_results=1000, on_hit=None, should_stop=None):
+        """
+        搜索日志
+
+        Args:
+            query: 子串或正则表达式
+            regex: 是否按正则表达式解释
+            ignore_case: 是否忽略大小写
+            base: 只搜索该日志基础名（get_base_log_filename(命令)）
+            since: 运行开始时间下限（时间戳秒）
+            until: 运行开始时间上限（时间戳秒）
+            max_results: 最多返回的匹配行数
+            on_hit: 每个匹配行的回调 on_hit(dict)，字段 path、name、base、ts、line（从1开始）、text
+            should_stop: 返回 True 时停止搜索
+
+        Returns:
+            dict: hits（匹配行数）、files（扫描的文件数）、candidates（候选文件数）、total（过滤后的文件数）、
+                  unindexed（未索引直接扫描的文件数）、truncated（是否达到上限）、elapsed（秒）
+        """
+        started = time.perf_counter()
+        pattern, plan = compile_query(query, regex, ignore_case)
+        should_stop = should_stop or (lambda: False)
+        since_ts, until_ts = _ts_bound(since), _ts_bound(until)
+        disk = self._disk_files(base, since_ts, until_ts)
+        conn = self._connect()
+        try:
+            indexed = {name: (fid, size, mtime) for fid, name, size, mtime in
+                       conn.execute('SELECT id, name, size, mtime_ns FROM files')}
+            allowed = None if plan is None else set(_bit_positions(self._evaluate(conn, plan, {})))
+        finally:
+            conn.close()
+        candidates = []
+        unindexed = 0
+        for name, (_, ts, size, mtime) in disk.items():
+            row = indexed.get(name)
+            if row is None or row[1:] != (size, mtime):
+                unindexed += 1  # 正在写入或有变化，直接扫描
+            elif allowed is not None and row[0] not in allowed:
+                continue
+            candidates.append((ts, name))
+        candidates.sort(reverse=True)
+        stats = {'hits': 0, 'files': 0, 'candidates': len(candidates), 'total': len(disk),
+                 'unindexed': unindexed, 'truncated': False}
+        for ts, name in candidates:
+            if should_stop() or stats['hits'] >= max_results:
+                stats['truncated'] = stats['hits'] >= max_results
+                break
+            stats['files'] += 1
+            try:
+                self._scan(name, disk[name], pattern, stats, max_results, on_hit, should_stop)
+            except Exception as e:
+                print(f'搜索日志失败: {name} 错误: {e}')
+        stats['elapsed'] = time.perf_counter() - started
+        return stats
+
+    def _scan(self, name, info, pattern, stats, max_results, on_hit, should_stop, chunk_size=READ_CHUNK):
+        base, ts = info[0], info[1]
+        path = os.path.join(self.log_dir, name)
+        line_no = 1
+        tail = b''
+        with open_log(path, 'rb') as f:
+            while True:
+                chunk = f.read(chunk_size)
+                if chunk:
+                    data = tail + chunk
+                    cut = data.rfind(b'\n') + 1
+                    if cut == 0 and len(data) < chunk_size * 4:
+                        tail = data
+                        continue
+                    cut = cut or len(data)
+                    data, tail = data[:cut], data[cut:]
+                elif tail:
+                    data, tail = tail, b''
+                else:
+                    return
+                counted = 0  # data[:counted] 中的换行已计入 line_no
+                line_end = -1
+                for match in pattern.finditer(data):
+                    start = match.start()
+                    if start <= line_end:
+                        continue  # 同一行只报告一次
+                    line_start = data.rfind(b'\n', 0, start) + 1
+                    line_no += data.count(b'\n', counted, line_start)
+                    counted = line_start
+                    line_end = data.find(b'\n', start)
+                    if line_end < 0:
+                        line_end = len(data)
+                    text = data[line_start:line_end].decode('utf-8', errors='replace').rstrip('\r')
+                    stats['hits'] += 1
+                    if on_hit is not None:
+                        on_hit({'path': path, 'name': name, 'base': base, 'ts': ts, 'line': line_no,
+                                'text': text[:MAX_HIT_TEXT]})
+                    if stats['hits'] >= max_results or should_stop():
+                        return
+                line_no += data.count(b'\n', counted)
+
+    def status(self):
+        """索引概况: files（已索引文件数）、segments（段数）、db_bytes（数据库大小）"""
+        conn = self._connect()
+        try:
+            files = conn.execute('SELECT COUNT(*) FROM files').fetchone()[0]
+            segments = conn.execute('SELECT COUNT(*) FROM segments').fetchone()[0]
+        finally:
+            conn.close()
+        db_bytes = 0
+        for suffix in ('', '-wal'):
+            try:
+                db_bytes += os.path.getsize(self.db_path + suffix)
+            except OSError:
+                pass
+        return {'files': files, 'segments': segments, 'db_bytes': db_bytes}
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+def get_log_search(log_dir='data/log', db_path='data/log_search.db'):
+    """获取日志目录对应的共享搜索索引"""
+    key = os.path.normcase(os.path.abspath(log_dir))
+    with _indexes_lock:
+        index = _indexes.get(key)
+        if index is None:
+            index = _indexes[key] = LogSearchIndex(log_dir, db_path)
+        return index
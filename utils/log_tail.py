@@ -0,0 +1,163 @@
+"""
+从文件末尾倒序读取日志：
+只 seek 到文件末尾附近按块向前读取，读取量只与需要的行数有关，与文件大小无关。
+按换行符（0x0A，不会出现在UTF-8多字节字符内部）切分后再解码，不会截断多字节字符。
+压缩归档不能定位到末尾，只能从头流式解压，内存中只保留最后几行，不解压到磁盘。
+"""
+
+import os
+from collections import deque
+from utils.log_filename import get_base_log_filename
+from utils.log_index import get_log_index
+from utils.log_io import is_compressed, open_log
+
+DEFAULT_BLOCK_SIZE = 64 * 1024
+
+def _skip_continuation(data):
+    """去掉开头不完整的UTF-8字符（10xxxxxx 续字节）"""
+    i = 0
+    while i < len(data) and i < 4 and 0x80 <= data[i] <= 0xBF:
+        i += 1
+    return data[i:]
+
+def read_lines_before(f, end, n, block_size=DEFAULT_BLOCK_SIZE, max_bytes=None):
+    """
+    读取 end 字节位置之前的最后 n 行
+
+    Args:
+        f: 以二进制模式打开的文件
+        end: 从该字节位置向前读取
+        n: 行数
+        block_size: 每次向前读取的字节数
+        max_bytes: 最多向前读取的字节数（防止超长行），None 表示不限制
+
+    Returns:
+        tuple: (行列表（按文件顺序，不含换行符）, 第一行的起始字节位置)
+    """
+    if n <= 0 or end <= 0:
+        return [], end
+    chunks = []
+    newlines = 0
+    pos = end
+    # 末尾的换行符属于最后一行，不算作行分隔
+    f.seek(end - 1)
+    trailing_newline = f.read(1) == b'\n'
+    needed = n + (1 if trailing_newline else 0)
+    while pos > 0 and newlines < needed:
+        read_size = min(block_size, pos)
+        if max_bytes is not None:
+            read_size = min(read_size, max_bytes - (end - pos))
+            if read_size <= 0:
+                break
+        pos -= read_size
+        f.seek(pos)
+        chunk = f.read(read_size)
+        newlines += chunk.count(b'\n')
+        chunks.append(chunk)
+    data = b''.join(reversed(chunks))
+    if trailing_newline:
+        data = data[:-1]
+    parts = data.split(b'\n')
+    if len(parts) > n:
+        parts = parts[-n:]
+        start = end - (len(b'\n'.join(parts)) + (1 if trailing_newline else 0))
+    else:
+        start = pos
+        if pos > 0:
+            # 达到 max_bytes 上限，第一行不完整
+            parts[0] = _skip_continuation(parts[0])
+    lines = [part.decode('utf-8', errors='replace').rstrip('\r') for part in parts]
+    return lines, start
+
+def tail_lines(path, n=200, block_size=DEFAULT_BLOCK_SIZE, max_bytes=None):
+    """读取文件最后 n 行（压缩归档流式解压，只保留最后 n 行）"""
+    if is_compressed(path):
+        if n <= 0:
+            return []
+        with open_log(path, 'rb') as f:
+            last = deque(f, maxlen=n)
+        return [line.rstrip(b'\n').decode('utf-8', errors='replace').rstrip('\r') for line in last]
+    with open(path, 'rb') as f:
+        end = os.fstat(f.fileno()).st_size
+        return read_lines_before(f, end, n, block_size, max_bytes)[0]
+
+def tail_text(path, max_bytes):
+    """读取文件最后不超过 max_bytes 字节的文本，开头从完整的字符开始"""
+    with open(path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        f.seek(max(0, size - max_bytes))
+        data = f.read()
+    if size > max_bytes:
+        data = _skip_continuation(data)
+    return data.decode('utf-8', errors='replace')
+
+def tail_command_log(cmd, n=200, log_dir='data/log'):
+    """
+    命令最新一次运行日志的最后 n 行（压缩归档直接流式读取）
+
+    Returns:
+        tuple: (日志路径, 行列表)；没有日志时返回 (None, [])
+    """
+    log_file = get_log_index(log_dir).latest(get_base_log_filename(cmd))
+    if log_file is None:
+        return None, []
+    return log_file, tail_lines(log_file, n)
+
+class TailReader:
+    """
+    按需向前翻页的日志读取器
+
+    第一次调用 read_previous 返回文件最后 n 行，之后每次返回更早的 n 行。
+    可以传入多个文件（如 launcher.log、launcher.log.1 ...，新的在前），
+    读到一个文件开头后继续读更早的轮转文件。
+
+    Args:
+        paths: 文件路径或路径列表（新的在前）
+        block_size: 每次向前读取的字节数
+        max_line_bytes: 单行最多读取的字节数
+    """
+    def __init__(self, paths, block_size=DEFAULT_BLOCK_SIZE, max_line_bytes=1024 * 1024):
+        if isinstance(paths, str):
+            paths = [paths]
+        self.paths = [p for p in paths if os.path.exists(p)]
+        self.block_size = block_size
+        self.max_line_bytes = max_line_bytes
+        self._file_index = 0
+        self._position = None  # 当前文件中已读取部分的起始位置
+        self.bytes_read = 0
+
+    @property
+    def at_start(self):
+        """是否已经读到最早的内容"""
+        return self._file_index >= len(self.paths)
+
+    @property
+    def current_path(self):
+        return None if self.at_start else self.paths[self._file_index]
+
+    def read_previous(self, n=500):
+        """
+        读取更早的 n 行
+
+        Returns:
+            list: 行列表（按文件顺序），已读到开头时返回空列表
+        """
+        lines = []
+        while len(lines) < n and not self.at_start:
+            path = self.paths[self._file_index]
+            try:
+                with open(path, 'rb') as f:
+                    size = os.fstat(f.fileno()).st_size
+                    end = size if self._position is None else min(self._position, size)
+                    # 每行最多 max_line_bytes，整页的读取量也就有上限
+                    older, start = read_lines_before(f, end, n - len(lines), self.block_size,
+                                                     self.max_line_bytes * (n - len(lines)))
+            except OSError:
+                older, start = [], 0
+            self.bytes_read += end - start if older else 0
+            lines = older + lines
+            self._position = start
+            if start <= 0:
+                self._file_index += 1
+                self._position = None
+        return lines
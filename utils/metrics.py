@@ -0,0 +1,426 @@
+"""
+运行指标：热路径上的计数器、仪表和耗时直方图，不依赖Qt
+
+默认关闭：未开启时各记录方法只检查一个布尔值就返回（time() 返回共享的空上下文），几乎没有开销。
+开启后可以：
+- 定期以 Prometheus 文本格式写入 data/metrics.prom（可被 node_exporter 的 textfile collector 收集）；
+- 在 127.0.0.1 上提供 HTTP /metrics（只监听本机回环地址）；
+- 在界面的诊断面板（Ctrl+Shift+D）中查看当前值，也可以在面板中临时开启采集。
+
+命令行: python main.py --metrics [--metrics-port 端口]，或设置环境变量 QUICKLAUNCHER_METRICS=1。
+"""
+
+import os
+import sys
+import time
+import bisect
+import threading
+import contextlib
+
+METRICS_FLAG = '--metrics'
+PORT_FLAG = '--metrics-port'
+ENV_VAR = 'QUICKLAUNCHER_METRICS'
+TEXTFILE = 'data/metrics.prom'
+
+# 耗时直方图的默认分桶（秒），覆盖 0.1ms ~ 10s
+DEFAULT_BUCKETS = (0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_NULL_TIMER = contextlib.nullcontext()
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+def _format_labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    if isinstance(value, float) and value.is_integer() and abs(value) < 1e15:
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+class _Metric:
+    kind = None
+
+    def __init__(self, registry, name, help_text, labels=()):
+        self.registry = registry
+        self.name = name
+        self.help = help_text
+        self.label_names = tuple(labels)
+        self._values = {}  # 标签值元组 -> 值
+
+    def _key(self, labels):
+        return tuple(str(labels.get(name, '')) for name in self.label_names)
+
+    def _reset(self):
+        self._values.clear()
+
+class Counter(_Metric):
+    """只增不减的计数器"""
+    kind = 'counter'
+
+    def inc(self, amount=1, **labels):
+        if not self.registry.enabled:
+            return
+        key = self._key(labels)
+        with self.registry.lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        return self._values.get(self._key(labels), 0)
+
+class Gauge(_Metric):
+    """
+    可增可减的当前值
+
+    set_function 设置后在采集时调用函数取值（如运行中的子进程数），热路径上不需要任何记录。
+    """
+    kind = 'gauge'
+
+    def __init__(self, registry, name, help_text, labels=()):
+        super().__init__(registry, name, help_text, labels)
+        self._func = None
+
+    def set(self, value, **labels):
+        if not self.registry.enabled:
+            return
+        key = self._key(labels)
+        with self.registry.lock:
+            self._values[key] = value
+
+    def set_function(self, func):
+        """采集时调用 func() 取值，传 None 取消"""
+        self._func = func
+
+    def value(self, **labels):
+        return self._values.get(self._key(labels), 0)
+
+    def _collect(self, values):
+        if self._func is None:
+            return values
+        try:
+            return {(): self._func()}
+        except Exception:
+            return {}
+
+class Histogram(_Metric):
+    """
+    耗时（或其他数值）分布：按分桶计数，同时记录总和、次数和最大值
+
+    Args:
+        buckets: 递增的分桶上限
+    """
+    kind = 'histogram'
+
+    def __init__(self, registry, name, help_text, labels=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(registry, name, help_text, labels)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, **labels):
+        if not self.registry.enabled:
+            return
+        key = self._key(labels)
+        with self.registry.lock:
+            state = self._values.get(key)
+            if state is None:
+                # [各分桶计数(不累计), 总和, 次数, 最大值]
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0, 0.0]
+            state[0][bisect.bisect_left(self.buckets, value)] += 1
+            state[1] += value
+            state[2] += 1
+            if value > state[3]:
+                state[3] = value
+
+    def time(self, **labels):
+        """计时上下文：with histogram.time(): ...，未开启时返回空上下文"""
+        if not self.registry.enabled:
+            return _NULL_TIMER
+        return _Timer(self, labels)
+
+    def count(self, **labels):
+        state = self._values.get(self._key(labels))
+        return state[2] if state else 0
+
+    def quantile(self, q, **labels):
+        """按分桶估算分位数（在桶内线性插值），没有数据时返回 None"""
+        state = self._values.get(self._key(labels))
+        return None if not state else self._quantile(state, q)
+
+    def _quantile(self, state, q):
+        counts, _, total, maximum = state
+        if not total:
+            return None
+        rank = q * total
+        seen = 0
+        for i, count in enumerate(counts):
+            if count and seen + count >= rank:
+                lower = self.buckets[i - 1] if i else 0.0
+                upper = self.buckets[i] if i < len(self.buckets) else maximum
+                return min(lower + (upper - lower) * (rank - seen) / count, maximum)
+            seen += count
+        return maximum
+
+class _Timer:
+    __slots__ = ('histogram', 'labels', 'start')
+
+    def __init__(self, histogram, labels):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.start, **self.labels)
+        return False
+
+class MetricsRegistry:
+    """
+    指标注册表
+
+    所有指标共用一把锁（记录只做几次字典操作），后台线程和界面线程都可以记录。
+
+    Args:
+        enabled: 是否采集
+    """
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.lock = threading.Lock()
+        self._metrics = {}  # 名称 -> 指标，按注册顺序
+
+    def _register(self, cls, name, help_text, **kwargs):
+        metric = self._metrics.get(name)
+        if metric is None:
+            metric = self._metrics[name] = cls(self, name, help_text, **kwargs)
+        elif not isinstance(metric, cls):
+            raise ValueError(f'指标 {name} 已注册为 {metric.kind}')
+        return metric
+
+    def counter(self, name, help_text, labels=()):
+        return self._register(Counter, name, help_text, labels=labels)
+
+    def gauge(self, name, help_text, labels=()):
+        return self._register(Gauge, name, help_text, labels=labels)
+
+    def histogram(self, name, help_text, labels=(), buckets=DEFAULT_BUCKETS):
+        return self._register(Histogram, name, help_text, labels=labels, buckets=buckets)
+
+    def get(self, name):
+        return self._metrics.get(name)
+
+    def metrics(self):
+        return list(self._metrics.values())
+
+    def enable(self, enabled=True):
+        self.enabled = enabled
+
+    def reset(self):
+        """清空所有已记录的值（函数取值的仪表不受影响）"""
+        with self.lock:
+            for metric in self._metrics.values():
+                metric._reset()
+
+    def _collect(self):
+        """在锁内复制所有指标的值，函数取值的仪表在锁外调用"""
+        with self.lock:
+            items = [(metric, {key: (list(value[0]),) + tuple(value[1:]) if isinstance(metric, Histogram) else value
+                               for key, value in metric._values.items()})
+                     for metric in self._metrics.values()]
+        return [(metric, metric._collect(values) if isinstance(metric, Gauge) else values) for metric, values in items]
+
+    def snapshot(self):
+        """
+        当前所有指标的值（诊断面板使用）
+
+        Returns:
+            list: [{'name', 'kind', 'help', 'labels': dict, 'value'}]，直方图的 value 为
+                {'count', 'sum', 'avg', 'p50', 'p95', 'max'}；没有记录过的指标也列出一行，value 为 None
+        """
+        rows = []
+        items = self._collect()
+        for metric, values in items:
+            if not values:
+                rows.append({'name': metric.name, 'kind': metric.kind, 'help': metric.help,
+                             'labels': {}, 'value': None})
+            for key, value in sorted(values.items()):
+                if isinstance(metric, Histogram):
+                    _, total, count, maximum = value
+                    value = {'count': count, 'sum': total, 'avg': total / count if count else None,
+                             'p50': metric._quantile(value, 0.5), 'p95': metric._quantile(value, 0.95),
+                             'max': maximum}
+                rows.append({'name': metric.name, 'kind': metric.kind, 'help': metric.help,
+                             'labels': dict(zip(metric.label_names, key)), 'value': value})
+        return rows
+
+    def render(self):
+        """按 Prometheus 文本格式（0.0.4）输出所有指标"""
+        lines = []
+        for metric, values in self._collect():
+            lines.append(f'# HELP {metric.name} {metric.help}')
+            lines.append(f'# TYPE {metric.name} {metric.kind}')
+            names = metric.label_names
+            for key, value in sorted(values.items()):
+                if isinstance(metric, Histogram):
+                    counts, total, count, _ = value
+                    cumulative = 0
+                    for upper, bucket_count in zip(metric.buckets + (float('inf'),), counts):
+                        cumulative += bucket_count
+                        labels = _format_labels(names, key, [('le', _format_value(float(upper)))])
+                        lines.append(f'{metric.name}_bucket{labels} {cumulative}')
+                    labels = _format_labels(names, key)
+                    lines.append(f'{metric.name}_sum{labels} {_format_value(total)}')
+                    lines.append(f'{metric.name}_count{labels} {count}')
+                else:
+                    lines.append(f'{metric.name}{_format_labels(names, key)} {_format_value(value)}')
+        return '\n'.join(lines) + '\n'
+
+    def write_textfile(self, path=TEXTFILE):
+        """原子地写入 Prometheus 文本文件（textfile collector 不会读到写了一半的文件）"""
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        tmp_path = f'{path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(self.render())
+        os.replace(tmp_path, path)
+
+class MetricsExporter:
+    """
+    在后台线程中定期写入文本文件，并可选地在本机回环地址上提供 HTTP /metrics
+
+    Args:
+        registry: 指标注册表
+        path: 文本文件路径，None 表示不写文件
+        interval: 写文件的间隔（秒）
+        port: HTTP 端口，None 表示不监听；0 表示由系统分配（实际端口见 self.port）
+    """
+    def __init__(self, registry, path=TEXTFILE, interval=10.0, port=None):
+        self.registry = registry
+        self.path = path
+        self.interval = interval
+        self.port = port
+        self.last_error = None
+        self._stop = threading.Event()
+        self._thread = None
+        self._server = None
+
+    @property
+    def url(self):
+        return f'http://127.0.0.1:{self.port}/metrics' if self._server is not None else None
+
+    def start(self):
+        """开始导出，HTTP 端口被占用时抛出 OSError"""
+        if self.path:
+            self._thread = threading.Thread(target=self._run, name='MetricsExporter', daemon=True)
+            self._thread.start()
+        if self.port is not None:
+            self._start_server()
+
+    def _start_server(self):
+        from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+        registry = self.registry
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] not in ('/', '/metrics'):
+                    self.send_error(404)
+                    return
+                body = registry.render().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(('127.0.0.1', self.port), Handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        threading.Thread(target=self._server.serve_forever, name='MetricsHTTP', daemon=True).start()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.write()
+
+    def write(self):
+        try:
+            self.registry.write_textfile(self.path)
+            self.last_error = None
+        except OSError as e:
+            self.last_error = e
+
+    def close(self):
+        """停止导出，最后写一次文本文件"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(2.0)
+            self._thread = None
+            self.write()
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+def options_from_argv(argv=None):
+    """
+    读取 --metrics、--metrics-port 端口（保留在参数中，程序重启后仍然开启）
+
+    Returns:
+        dict: {'enabled': 是否开启, 'port': HTTP 端口或 None}；指定端口即视为开启
+    """
+    argv = sys.argv if argv is None else argv
+    enabled = METRICS_FLAG in argv or os.environ.get(ENV_VAR, '') not in ('', '0')
+    port = None
+    if PORT_FLAG in argv:
+        i = argv.index(PORT_FLAG)
+        value = argv[i + 1] if i + 1 < len(argv) else ''
+        try:
+            port = int(value)
+            enabled = True
+        except ValueError:
+            print(f'无效的指标端口: {value!r}')
+    return {'enabled': enabled, 'port': port}
+
+_registry = MetricsRegistry()
+
+def get_metrics():
+    """获取全局共享的指标注册表"""
+    return _registry
+
+# ---- 热路径指标 ----
+SAVE_REQUESTS = _registry.counter(
+    'quicklauncher_save_requests_total', '保存请求次数（合并写入之前）')
+SAVE_SNAPSHOT_SECONDS = _registry.histogram(
+    'quicklauncher_save_snapshot_seconds', '界面线程生成保存快照的耗时')
+DATA_WRITE_SECONDS = _registry.histogram(
+    'quicklauncher_data_write_seconds', '后台线程原子写入数据文件的耗时（次数即落盘次数）', labels=('file',))
+RENUMBER_SECONDS = _registry.histogram(
+    'quicklauncher_renumber_seconds', '勾选、取消勾选或清空勾选时更新序号的耗时')
+ICON_SPAWN_SECONDS = _registry.histogram(
+    'quicklauncher_icon_spawn_seconds', '图标从计划启动时间到进程创建完成的延迟')
+CMD_SPAWN_SECONDS = _registry.histogram(
+    'quicklauncher_cmd_spawn_seconds', '命令从提交到子进程创建完成的延迟（含排队）')
+LAUNCH_FAILURES = _registry.counter(
+    'quicklauncher_launch_failures_total', '启动失败次数', labels=('kind',))
+LOG_BYTES = _registry.counter(
+    'quicklauncher_log_bytes_total', '命令输出写入日志的字节数（按日志基础名区分）', labels=('cmd',))
+LOG_LINES = _registry.counter(
+    'quicklauncher_log_lines_total', '命令输出写入日志的行数（按日志基础名区分）', labels=('cmd',))
+TAIL_LAG_SECONDS = _registry.histogram(
+    'quicklauncher_tail_lag_seconds', '日志查看器从输出写入到读出显示的延迟')
+TAIL_BEHIND_BYTES = _registry.gauge(
+    'quicklauncher_tail_behind_bytes', '日志查看器尚未读取的字节数')
+CHILDREN_RUNNING = _registry.gauge(
+    'quicklauncher_children_running', '正在运行的命令子进程数')
+CHILDREN_QUEUED = _registry.gauge(
+    'quicklauncher_children_queued', '等待启动的命令数（超出并发上限）')
+OUTPUT_RING_BYTES = _registry.gauge(
+    'quicklauncher_output_ring_bytes', '正在运行的命令的输出内存缓冲占用的字节数')
+PROCESS_TREES = _registry.gauge(
+    'quicklauncher_process_trees', '资源监视中仍在运行的进程树数（图标和命令）')
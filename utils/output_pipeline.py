@@ -0,0 +1,130 @@
+"""
+子进程输出管道：
+1. BufferedLogWriter: 以二进制块写入日志文件，缓冲区达到字节上限、距上次落盘超过时间间隔，
+   或读端把管道读空（输出暂停）时才 flush，避免逐行 write+flush。
+2. LineFramer: 把二进制块增量解码（UTF-8，跨块的多字节字符不会被截断）并切成整行，
+   只给真正需要按行处理的消费者使用。
+"""
+
+import sys
+import time
+import codecs
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+DEFAULT_FLUSH_BYTES = 256 * 1024
+DEFAULT_FLUSH_INTERVAL = 0.2
+
+class BufferedLogWriter:
+    """
+    有界缓冲的日志写入器
+
+    Args:
+        fileobj: 以二进制模式打开的日志文件
+        flush_bytes: 缓冲字节上限，达到后立即落盘
+        flush_interval: 缓冲数据最长停留时间（秒）
+        echo: 是否同时输出到控制台（原样写入 sys.stdout.buffer）
+        on_data: 每个数据块的回调 on_data(bytes)，例如按行处理或转发给界面
+        ring: OutputRing，写入文件的每个字节（含标记）同时追加到这个内存缓冲，供界面直接订阅
+    """
+    def __init__(self, fileobj, flush_bytes=DEFAULT_FLUSH_BYTES, flush_interval=DEFAULT_FLUSH_INTERVAL,
+                 echo=False, on_data=None, ring=None):
+        self.fileobj = fileobj
+        self.flush_bytes = flush_bytes
+        self.flush_interval = flush_interval
+        self.on_data = on_data
+        self.ring = ring
+        self.echo_stream = None
+        if echo and sys.stdout is not None:
+            self.echo_stream = getattr(sys.stdout, 'buffer', None)
+        self._buffer = []
+        self._buffered = 0
+        self._first_buffered_at = None
+        self.bytes_written = 0  # 累计写入的输出字节数（不含起止标记）
+        self.flush_count = 0
+
+    def write(self, data, drained=False):
+        """
+        写入一块输出
+
+        Args:
+            data: 二进制数据
+            drained: 读端是否已把管道读空；为True时立即落盘，保证实时查看不滞后
+        """
+        if data:
+            self._buffer.append(data)
+            self._buffered += len(data)
+            self.bytes_written += len(data)
+            if self._first_buffered_at is None:
+                self._first_buffered_at = time.monotonic()
+            if self.echo_stream is not None:
+                try:
+                    self.echo_stream.write(data)
+                except (OSError, ValueError):
+                    self.echo_stream = None
+            if self.on_data is not None:
+                self.on_data(data)
+            if self.ring is not None:
+                self.ring.append(data)
+        if self._buffered and (drained or self._buffered >= self.flush_bytes
+                               or time.monotonic() - self._first_buffered_at >= self.flush_interval):
+            self.flush()
+
+    def write_text(self, text):
+        """写入标记文本（如开始/结束标记），立即落盘"""
+        self.flush()
+        data = text.encode('utf-8')
+        self.fileobj.write(data)
+        self.fileobj.flush()
+        if self.ring is not None:
+            self.ring.append(data)
+
+    def flush(self):
+        if self._buffered:
+            self.fileobj.write(b''.join(self._buffer))
+            self._buffer.clear()
+            self._buffered = 0
+            self._first_buffered_at = None
+            self.flush_count += 1
+        self.fileobj.flush()
+        if self.echo_stream is not None:
+            try:
+                self.echo_stream.flush()
+            except (OSError, ValueError):
+                self.echo_stream = None
+
+class LineFramer:
+    """把二进制输出块切成完整的文本行"""
+    def __init__(self, encoding='utf-8', errors='replace'):
+        self._decoder = codecs.getincrementaldecoder(encoding)(errors=errors)
+        self._partial = ''
+
+    def feed(self, data):
+        """输入一块数据，返回其中已完整的行（不含换行符）"""
+        text = self._partial + self._decoder.decode(data)
+        lines = text.split('\n')
+        self._partial = lines.pop()
+        return [line.rstrip('\r') for line in lines]
+
+    def close(self):
+        """输出结束，返回最后一段不完整的行"""
+        text = self._partial + self._decoder.decode(b'', final=True)
+        self._partial = ''
+        return [text] if text else []
+
+def pump_pipe(pipe, writer, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    以大块二进制方式读取管道直到EOF，交给 writer
+
+    Args:
+        pipe: 无缓冲的二进制管道（Popen(..., bufsize=0) 的 stdout）
+        writer: BufferedLogWriter
+        chunk_size: 单次读取的最大字节数
+    """
+    read = pipe.read
+    while True:
+        data = read(chunk_size)
+        if not data:
+            break
+        # 读到的数据不足一块，说明管道已被读空，子进程暂时没有更多输出
+        writer.write(data, drained=len(data) < chunk_size)
+    writer.flush()
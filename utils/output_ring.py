@@ -0,0 +1,184 @@
+"""
+运行输出环形缓冲：
+每个正在运行的命令在内存中保留最近一段输出（按字节数限额），与日志文件中的字节一一对应（偏移量相同）。
+写日志的一端（BufferedLogWriter）把每块输出同时追加到缓冲，查看日志的一端直接订阅缓冲，
+不必等数据落盘后再从文件读回；切换到正在运行的命令时也直接从内存显示。
+日志文件仍是完整、持久的副本，超出缓冲的更早内容和已结束的运行从文件读取；
+运行结束后，缓冲在所有订阅者读完（退订）时释放已保留的内容。
+"""
+
+import os
+import threading
+from collections import deque
+
+DEFAULT_CAPACITY = 1024 * 1024  # 每次运行保留的输出字节数
+COALESCE_BYTES = 16 * 1024  # 小块输出合并到同一块中，避免逐行输出时产生大量小对象
+
+class OutputRing:
+    """
+    按字节数限额的输出环形缓冲
+
+    数据按块保存，超过限额时从最早的块开始丢弃；start/end 为缓冲内容在日志文件中的起止偏移量。
+    追加和读取可以在不同线程中进行。关闭后没有订阅者时丢弃全部内容（只保留偏移量），
+    需要读取剩余内容的一方应在关闭前订阅，读完后退订。
+
+    Args:
+        path: 对应的日志文件路径
+        base: 第一个字节在日志文件中的偏移量（追加到已有日志时为原文件大小）
+        capacity: 最多保留的字节数
+    """
+    def __init__(self, path, base=0, capacity=DEFAULT_CAPACITY):
+        self.path = path
+        self.capacity = capacity
+        self._coalesce = min(COALESCE_BYTES, max(1, capacity // 8))
+        self._lock = threading.Lock()
+        self._chunks = deque()  # [(起始偏移量, bytes 或 bytearray)]
+        self._start = base
+        self._end = base
+        self._subscribers = []
+        self.closed = False
+
+    @property
+    def start(self):
+        return self._start
+
+    @property
+    def end(self):
+        return self._end
+
+    def __len__(self):
+        return self._end - self._start
+
+    def append(self, data):
+        """追加一块输出并通知订阅者"""
+        if not data:
+            return
+        with self._lock:
+            if self.closed and not self._subscribers:
+                # 内容已释放，不再保留，只推进偏移量
+                self._end += len(data)
+                self._start = self._end
+                return
+            if len(data) >= self.capacity:
+                # 单块就超过限额，只保留末尾部分
+                self._chunks.clear()
+                self._start = self._end + len(data) - self.capacity
+                self._chunks.append((self._start, bytes(data[-self.capacity:])))
+            else:
+                last = self._chunks[-1][1] if self._chunks else None
+                if isinstance(last, bytearray) and len(last) + len(data) <= self._coalesce:
+                    last += data
+                elif len(data) < self._coalesce:
+                    self._chunks.append((self._end, bytearray(data)))
+                else:
+                    self._chunks.append((self._end, bytes(data)))
+                while len(self._chunks) > 1 and self._end + len(data) - self._start > self.capacity:
+                    self._chunks.popleft()
+                    self._start = self._chunks[0][0]
+            self._end += len(data)
+            subscribers = list(self._subscribers)
+        for callback in subscribers:
+            callback()
+
+    def read_from(self, offset, limit=None):
+        """
+        读取从 offset 开始的内容
+
+        Args:
+            offset: 日志文件中的偏移量
+            limit: 最多读取的字节数，None 表示读到末尾
+
+        Returns:
+            tuple: (数据, 读取开始的偏移量)；offset 早于缓冲起点时从起点读，调用方据此得知中间被丢弃的字节数
+        """
+        with self._lock:
+            offset = max(offset, self._start)
+            end = self._end if limit is None else min(self._end, offset + limit)
+            if offset >= end:
+                return b'', offset
+            # 从后往前找到 offset 所在的块（读取方通常只落后最后几块）
+            i = len(self._chunks) - 1
+            while self._chunks[i][0] > offset:
+                i -= 1
+            parts = []
+            position = offset
+            while position < end:
+                chunk_start, chunk = self._chunks[i]
+                parts.append(bytes(chunk[position - chunk_start:end - chunk_start]))
+                position = chunk_start + len(chunk)
+                i += 1
+            return b''.join(parts), offset
+
+    def subscribe(self, callback):
+        """有新输出或运行结束时调用 callback()（在写入方线程中调用，回调应尽快返回）"""
+        with self._lock:
+            self._subscribers.append(callback)
+
+    def unsubscribe(self, callback):
+        with self._lock:
+            if callback in self._subscribers:
+                self._subscribers.remove(callback)
+            if self.closed and not self._subscribers:
+                self._drop()
+
+    def close(self):
+        """运行结束，通知订阅者；已保留的内容在所有订阅者退订后释放，没有订阅者时立即释放"""
+        with self._lock:
+            self.closed = True
+            subscribers = list(self._subscribers)
+            if not subscribers:
+                self._drop()
+        for callback in subscribers:
+            callback()
+
+    def _drop(self):
+        # 调用方持有锁
+        self._chunks.clear()
+        self._start = self._end
+
+def _normalize(path):
+    return os.path.normcase(os.path.abspath(path))
+
+class OutputRings:
+    """正在运行的命令的输出缓冲，按日志文件路径查找"""
+    def __init__(self, capacity=DEFAULT_CAPACITY):
+        self.capacity = capacity
+        self._lock = threading.Lock()
+        self._rings = {}  # 规范化的日志路径 -> OutputRing
+
+    def open(self, path, base=0):
+        """为一次运行创建缓冲（同一日志的上一次运行的缓冲被替换）"""
+        ring = OutputRing(path, base, self.capacity)
+        with self._lock:
+            self._rings[_normalize(path)] = ring
+        return ring
+
+    def get(self, path):
+        """日志文件对应的、仍在运行的缓冲，没有时返回 None"""
+        if not path:
+            return None
+        with self._lock:
+            return self._rings.get(_normalize(path))
+
+    def release(self, ring):
+        """运行结束：关闭缓冲并移出查找表，已订阅的读取方仍可读完剩余内容"""
+        with self._lock:
+            key = _normalize(ring.path)
+            if self._rings.get(key) is ring:
+                del self._rings[key]
+        ring.close()
+
+    def total_bytes(self):
+        with self._lock:
+            return sum(len(ring) for ring in self._rings.values())
+
+_rings = None
+_rings_lock = threading.Lock()
+
+def get_output_rings():
+    """获取全局共享的运行输出缓冲表"""
+    global _rings
+    with _rings_lock:
+        if _rings is None:
+            _rings = OutputRings()
+        return _rings
@@ -0,0 +1,371 @@
+"""
+进程资源采样器：
+跟踪启动器启动的每个进程及其子进程（进程树），按固定间隔在一轮中读取所有被跟踪进程的
+/proc/<pid>/stat（CPU时间、RSS、父进程），样本存入每个进程固定容量的环形缓冲区（array）。
+- 每隔 rescan_every 轮扫描一次 /proc 发现新的子进程，并读取 /proc/<pid>/status 中的 VmHWM（RSS峰值）；
+  其余轮次只读被跟踪进程自己的 stat，开销与系统中其它进程数量无关。
+- 已发现的子进程即使父进程退出（被重新挂到 init 下）也继续计入原来的进程树。
+- 以 (pid, 启动时间) 识别进程，pid 被复用时不会串号。
+非 Linux 平台在安装了 psutil 时改用 psutil 读取，否则采样器不可用（available 为 False）。
+"""
+
+import os
+import sys
+import time
+import threading
+from array import array
+
+class RingBuffer:
+    """固定容量的环形缓冲区，存放数值样本"""
+    __slots__ = ('_data', '_capacity', '_next', '_count')
+
+    def __init__(self, capacity, typecode='f'):
+        self._data = array(typecode, bytes(array(typecode).itemsize * capacity))
+        self._capacity = capacity
+        self._next = 0
+        self._count = 0
+
+    def append(self, value):
+        self._data[self._next] = value
+        self._next = (self._next + 1) % self._capacity
+        self._count = min(self._count + 1, self._capacity)
+
+    def __len__(self):
+        return self._count
+
+    @property
+    def last(self):
+        if not self._count:
+            return None
+        return self._data[self._next - 1]
+
+    def values(self):
+        """按时间顺序返回所有样本"""
+        if self._count < self._capacity:
+            return self._data[:self._count].tolist()
+        return (self._data[self._next:] + self._data[:self._next]).tolist()
+
+    def max(self):
+        return max(self._data[:self._count]) if self._count else None
+
+class ProcessStats:
+    """单个进程的样本"""
+    __slots__ = ('pid', 'start', 'name', 'cpu', 'rss', 'peak_rss', '_last_ticks', '_last_time')
+
+    def __init__(self, pid, start, name, history):
+        self.pid = pid
+        self.start = start  # 进程启动时间（自开机以来的时钟滴答数）
+        self.name = name
+        self.cpu = RingBuffer(history, 'f')  # CPU 使用率（%，可超过100表示多核）
+        self.rss = RingBuffer(history, 'L')  # 常驻内存（KB）
+        self.peak_rss = 0  # 内核记录的 RSS 峰值（KB）
+        self._last_ticks = None
+        self._last_time = None
+
+class _ProcfsReader:
+    """Linux /proc 读取"""
+    def __init__(self):
+        self.clk_tck = os.sysconf('SC_CLK_TCK')
+        self.page_kb = os.sysconf('SC_PAGE_SIZE') // 1024
+
+    @staticmethod
+    def _read(path):
+        # 直接用 os.open/os.read，省去文件对象的创建开销
+        try:
+            fd = os.open(path, os.O_RDONLY)
+        except OSError:
+            return None
+        try:
+            return os.read(fd, 4096)
+        except OSError:
+            return None
+        finally:
+            os.close(fd)
+
+    def read_stat(self, pid):
+        """返回 (进程名, 父pid, 启动时间, utime+stime 滴答数, rss KB)，进程不存在返回None"""
+        data = self._read(f'/proc/{pid}/stat')
+        if not data:
+            return None
+        # 进程名可能包含空格和括号，以最后一个 ')' 为界
+        close = data.rfind(b')')
+        name = data[data.find(b'(') + 1:close].decode('utf-8', errors='replace')
+        fields = data[close + 2:].split()
+        # fields[0] 是第3个字段 state，僵尸进程已退出、只是还没被父进程回收
+        if fields[0] == b'Z':
+            return None
+        return (name, int(fields[1]), int(fields[19]),
+                int(fields[11]) + int(fields[12]), int(fields[21]) * self.page_kb)
+
+    def read_peak_rss(self, pid):
+        data = self._read(f'/proc/{pid}/status')
+        start = data.find(b'VmHWM:') if data else -1
+        if start < 0:
+            return 0
+        try:
+            return int(data[start + 6:data.find(b'kB', start)])
+        except ValueError:
+            return 0
+
+    def list_pids(self):
+        return [int(name) for name in os.listdir('/proc') if name.isdigit()]
+
+class _PsutilReader:
+    """非 Linux 平台使用 psutil"""
+    def __init__(self, psutil):
+        self.psutil = psutil
+        self.clk_tck = 100
+
+    def read_stat(self, pid):
+        psutil = self.psutil
+        try:
+            p = psutil.Process(pid)
+            with p.oneshot():
+                times = p.cpu_times()
+                return (p.name(), p.ppid(), int(p.create_time() * 100),
+                        int((times.user + times.system) * 100), p.memory_info().rss // 1024)
+        except (psutil.Error, OSError):
+            return None
+
+    def read_peak_rss(self, pid):
+        try:
+            info = self.psutil.Process(pid).memory_info()
+            return getattr(info, 'peak_wset', 0) // 1024
+        except (self.psutil.Error, OSError):
+            return 0
+
+    def list_pids(self):
+        return self.psutil.pids()
+
+def _default_reader():
+    if sys.platform.startswith('linux') and os.path.isdir('/proc'):
+        return _ProcfsReader()
+    try:
+        import psutil
+    except ImportError:
+        return None
+    return _PsutilReader(psutil)
+
+class ProcSampler:
+    """
+    按进程树汇总的 CPU/内存采样器
+
+    Args:
+        interval: 采样间隔（秒）
+        history: 每个进程保留的样本数
+        rescan_every: 每隔多少轮扫描一次 /proc 发现子进程
+    """
+    def __init__(self, interval=2.0, history=120, rescan_every=5, reader=None):
+        self.interval = interval
+        self.history = history
+        self.rescan_every = max(1, rescan_every)
+        self.reader = reader if reader is not None else _default_reader()
+        self._lock = threading.Lock()
+        self._roots = {}  # 键 -> 根进程 (pid, 启动时间)
+        self._pending = {}  # 键 -> 尚未得到 pid 的对象（如排队中的 RunHandle）
+        self._members = {}  # 键 -> {(pid, 启动时间)}
+        self._procs = {}  # (pid, 启动时间) -> ProcessStats
+        self._peaks = {}  # 键 -> [整棵树的 CPU% 峰值, RSS 峰值 KB]
+        self._force_rescan = False
+        self._thread = None
+        self._stop = threading.Event()
+        self.pass_count = 0
+        self.busy_seconds = 0.0  # 采样累计消耗的 CPU 时间
+        self.last_pass_seconds = 0.0
+
+    @property
+    def available(self):
+        return self.reader is not None
+
+    # ---- 跟踪 ----
+    def track(self, key, pid):
+        """
+        开始跟踪一个进程及其子进程
+
+        Args:
+            key: 任意可哈希的键（如图标条目、('cmd', 命令)），同一个键再次跟踪会替换之前的进程
+            pid: 进程ID；也可以是带 pid 属性的对象（如排队中的 RunHandle），得到 pid 后才开始采样
+        """
+        if not self.available:
+            return
+        with self._lock:
+            self._drop(key)
+            if isinstance(pid, int):
+                self._pending.pop(key, None)
+                self._attach(key, pid)
+            else:
+                self._pending[key] = pid
+
+    def untrack(self, key):
+        with self._lock:
+            self._pending.pop(key, None)
+            self._drop(key)
+
+    def _attach(self, key, pid):
+        stat = self.reader.read_stat(pid)
+        if stat is None:
+            return
+        ident = (pid, stat[2])
+        self._roots[key] = ident
+        self._members[key] = {ident}
+        if ident not in self._procs:
+            self._procs[ident] = ProcessStats(pid, stat[2], stat[0], self.history)
+        # 下一轮立即扫描子进程
+        self._force_rescan = True
+
+    def _drop(self, key):
+        self._roots.pop(key, None)
+        self._peaks.pop(key, None)
+        members = self._members.pop(key, set())
+        still_used = set().union(*self._members.values()) if self._members else set()
+        for ident in members - still_used:
+            self._procs.pop(ident, None)
+
+    # ---- 采样 ----
+    def start(self):
+        if self._thread is not None or not self.available:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='ProcSampler', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread = None
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.sample_once()
+            except Exception as e:
+                print(f'进程采样出错: {e}')
+
+    def sample_once(self):
+        """采样一轮"""
+        if not self.available:
+            return
+        cpu_start = time.thread_time()
+        with self._lock:
+            for key, source in list(self._pending.items()):
+                pid = getattr(source, 'pid', None)
+                if pid:
+                    del self._pending[key]
+                    self._attach(key, pid)
+                elif getattr(source, 'done', False):
+                    del self._pending[key]
+            rescan = self._force_rescan or self.pass_count % self.rescan_every == 0
+            self._force_rescan = False
+            if self._roots:
+                self._sample(rescan)
+            self.pass_count += 1
+        elapsed = time.thread_time() - cpu_start
+        self.last_pass_seconds = elapsed
+        self.busy_seconds += elapsed
+
+    def _sample(self, rescan):
+        reader = self.reader
+        now = time.monotonic()
+        stats = {}
+        if rescan:
+            # 全量扫描一次，找出被跟踪进程的所有后代
+            children = {}
+            for pid in reader.list_pids():
+                stat = reader.read_stat(pid)
+                if stat is not None:
+                    stats[(pid, stat[2])] = stat
+                    children.setdefault(stat[1], []).append((pid, stat[2]))
+            for key, members in self._members.items():
+                stack = [pid for pid, _ in members]
+                while stack:
+                    for child in children.get(stack.pop(), ()):
+                        if child not in members:
+                            members.add(child)
+                            stack.append(child[0])
+                            if child not in self._procs:
+                                self._procs[child] = ProcessStats(child[0], child[1], stats[child][0], self.history)
+        else:
+            for ident in self._procs:
+                stat = reader.read_stat(ident[0])
+                if stat is not None and stat[2] == ident[1]:
+                    stats[ident] = stat
+        # 更新样本，移除已退出的进程
+        exited = set()
+        for ident in list(self._procs):
+            stat = stats.get(ident)
+            proc = self._procs[ident]
+            if stat is None:
+                del self._procs[ident]
+                exited.add(ident)
+                continue
+            ticks, rss = stat[3], stat[4]
+            if proc._last_ticks is not None and now > proc._last_time:
+                cpu = (ticks - proc._last_ticks) / reader.clk_tck / (now - proc._last_time) * 100
+            else:
+                cpu = 0.0
+            proc._last_ticks = ticks
+            proc._last_time = now
+            proc.cpu.append(cpu)
+            proc.rss.append(rss)
+            if rescan:
+                proc.peak_rss = max(proc.peak_rss, reader.read_peak_rss(ident[0]))
+            proc.peak_rss = max(proc.peak_rss, rss)
+        for key in list(self._members):
+            members = self._members[key]
+            if exited:
+                members -= exited
+            if not members:
+                # 整个进程树都已退出
+                self._roots.pop(key, None)
+                self._peaks.pop(key, None)
+                del self._members[key]
+                continue
+            procs = [self._procs[ident] for ident in members]
+            peaks = self._peaks.setdefault(key, [0.0, 0])
+            peaks[0] = max(peaks[0], sum(p.cpu.last for p in procs))
+            # 内核记录的单进程峰值可能出现在两次采样之间
+            peaks[1] = max(peaks[1], sum(p.rss.last for p in procs), max(p.peak_rss for p in procs))
+
+    # ---- 查询 ----
+    def usage(self, key):
+        """
+        某个键对应进程树的资源占用
+
+        Returns:
+            dict: cpu（当前CPU%）、rss（当前KB）、peak_cpu、peak_rss（整棵树的峰值，KB）、
+                  processes（进程数）；未跟踪或已全部退出时返回None
+        """
+        with self._lock:
+            members = self._members.get(key)
+            if not members:
+                return None
+            procs = [self._procs[ident] for ident in members if ident in self._procs]
+            peak_cpu, peak_rss = self._peaks.get(key, (0.0, 0))
+            return {
+                'cpu': sum(p.cpu.last or 0.0 for p in procs),
+                'rss': sum(p.rss.last or 0 for p in procs),
+                'peak_cpu': peak_cpu,
+                'peak_rss': peak_rss,
+                'processes': len(procs),
+            }
+
+    def usages(self):
+        """所有被跟踪的键的资源占用"""
+        with self._lock:
+            keys = list(self._members)
+        result = {}
+        for key in keys:
+            usage = self.usage(key)
+            if usage is not None:
+                result[key] = usage
+        return result
+
+    def history_of(self, key):
+        """某个键对应进程树中每个进程的样本：[(pid, 进程名, [cpu...], [rss...])]"""
+        with self._lock:
+            return [(p.pid, p.name, p.cpu.values(), p.rss.values())
+                    for ident in self._members.get(key, ()) for p in [self._procs.get(ident)] if p]
+
+    @property
+    def tracked_processes(self):
+        with self._lock:
+            return len(self._procs)
@@ -0,0 +1,405 @@
+"""
+进程监管器：
+在一个后台线程中运行唯一的 asyncio 事件循环，用 asyncio.create_subprocess_shell 启动命令并
+多路读取所有子进程的输出，无论同时运行多少命令，线程数都保持不变。
+- max_concurrent 限制同时运行的进程数，超出的命令进入等待队列，按提交顺序启动。
+- 每次提交返回一个 RunHandle，可查询 pid、状态、退出代码，等待结束或取消。
+- 只保留未结束的句柄和最近结束的 recent_handles 个句柄，长时间运行、反复重启命令时内存不会增长。
+"""
+
+import os
+import sys
+import time
+import signal
+import asyncio
+import threading
+from collections import deque
+from utils.log_filename import get_base_log_filename
+from utils.metrics import get_metrics, CMD_SPAWN_SECONDS, LAUNCH_FAILURES, LOG_BYTES, LOG_LINES
+from utils.output_pipeline import (BufferedLogWriter, DEFAULT_CHUNK_SIZE,
+                                   DEFAULT_FLUSH_BYTES, DEFAULT_FLUSH_INTERVAL)
+
+RECENT_HANDLES = 64  # 保留的最近结束的句柄数
+
+if sys.version_info < (3, 12) and hasattr(os, 'pidfd_open'):
+    class _PidfdChildWatcher(asyncio.AbstractChildWatcher):
+        """
+        用 pidfd 监视子进程退出，不绑定事件循环（与 Python 3.12 起 asyncio 自带的实现相同）
+
+        更早版本自带的 PidfdChildWatcher 只服务一个事件循环，再安装一个会解除前一个监管器的监视。
+        """
+        def add_child_handler(self, pid, callback, *args):
+            loop = asyncio.get_running_loop()
+            pidfd = os.pidfd_open(pid)
+            loop.add_reader(pidfd, self._do_wait, loop, pid, pidfd, callback, args)
+
+        def _do_wait(self, loop, pid, pidfd, callback, args):
+            loop.remove_reader(pidfd)
+            try:
+                _, status = os.waitpid(pid, 0)
+                returncode = os.waitstatus_to_exitcode(status)
+            except ChildProcessError:
+                returncode = 255  # 已被其他地方回收，与 asyncio 的处理一致
+            os.close(pidfd)
+            callback(pid, returncode, *args)
+
+        def remove_child_handler(self, pid):
+            return True
+
+        def attach_loop(self, loop):
+            pass
+
+        def is_active(self):
+            return True
+
+        def close(self):
+            pass
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):
+            pass
+else:
+    _PidfdChildWatcher = None
+
+_watcher_lock = threading.Lock()
+_watcher_installed = False
+
+def _install_child_watcher():
+    """Linux 上用 pidfd 监视子进程退出，避免每个子进程一个等待线程；整个进程共用一个，只安装一次"""
+    global _watcher_installed
+    if _PidfdChildWatcher is None:
+        return  # Python 3.12 起默认就是这样，Windows 和 macOS 上没有 pidfd
+    with _watcher_lock:
+        if _watcher_installed:
+            return
+        _watcher_installed = True
+        try:
+            os.close(os.pidfd_open(os.getpid()))  # 内核不支持时（Linux 5.3 之前）保留默认实现
+        except OSError:
+            return
+        asyncio.set_child_watcher(_PidfdChildWatcher())
+
+class RunHandle:
+    """一次命令运行的句柄"""
+    QUEUED = 'queued'  # 排队等待
+    RUNNING = 'running'  # 运行中
+    EXITED = 'exited'  # 已结束（查看 exit_code）
+    FAILED = 'failed'  # 启动失败
+    CANCELLED = 'cancelled'  # 排队时被取消
+
+    def __init__(self, supervisor, cmd, log_path, on_output=None, ring=None):
+        self.supervisor = supervisor
+        self.cmd = cmd
+        self.log_path = log_path
+        self.on_output = on_output
+        self.ring = ring  # 最近输出的内存缓冲（OutputRing），可为 None
+        self.pid = None
+        self.status = self.QUEUED
+        self.exit_code = None
+        self.error = None
+        self.submit_time = time.time()
+        self.start_time = None
+        self.end_time = None
+        self.bytes_written = 0
+        self._process = None
+        self._cancel_requested = False
+        self._done = threading.Event()
+        self._callbacks_run = threading.Event()  # 结束回调已全部执行
+        self._callbacks = []
+        self._callbacks_lock = threading.Lock()
+
+    @property
+    def done(self):
+        return self._done.is_set()
+
+    @property
+    def cancelled(self):
+        """是否被请求取消（排队时取消，或终止了正在运行的进程）"""
+        return self._cancel_requested
+
+    @property
+    def duration(self):
+        if self.start_time is None:
+            return None
+        return (self.end_time or time.time()) - self.start_time
+
+    def wait(self, timeout=None):
+        """等待运行结束且结束回调（写入运行历史、释放输出缓冲等）都已执行，返回是否已结束"""
+        return self._callbacks_run.wait(timeout)
+
+    def cancel(self):
+        """取消排队中的命令，或终止正在运行的进程"""
+        self.supervisor.cancel(self)
+
+    def add_done_callback(self, callback):
+        """运行结束后调用 callback(handle)（在监管器线程中调用；已结束时立即在当前线程调用）"""
+        with self._callbacks_lock:
+            if not self.done:
+                self._callbacks.append(callback)
+                return
+        callback(self)
+
+    def _finish(self, status):
+        self.status = status
+        self.end_time = time.time()
+        with self._callbacks_lock:
+            self._done.set()
+            callbacks = self._callbacks
+            self._callbacks = []
+        for callback in callbacks:
+            try:
+                callback(self)
+            except Exception as e:
+                print(f'运行结束回调出错: {e}')
+        self._callbacks_run.set()
+
+    def __repr__(self):
+        return f'<RunHandle pid={self.pid} status={self.status} exit_code={self.exit_code} cmd={self.cmd!r}>'
+
+class ProcessSupervisor:
+    """
+    单线程多路复用的进程监管器
+
+    Args:
+        max_concurrent: 同时运行的最大进程数
+        chunk_size / flush_bytes / flush_interval: 输出管道参数，同 run_cmd_with_log
+        recent_handles: 保留的最近结束的句柄数，更早结束的句柄不再由监管器引用
+    """
+    def __init__(self, max_concurrent=16, chunk_size=DEFAULT_CHUNK_SIZE,
+                 flush_bytes=DEFAULT_FLUSH_BYTES, flush_interval=DEFAULT_FLUSH_INTERVAL,
+                 recent_handles=RECENT_HANDLES):
+        self.max_concurrent = max_concurrent
+        self.chunk_size = chunk_size
+        self.flush_bytes = flush_bytes
+        self.flush_interval = flush_interval
+        self._queue = deque()
+        self._running = set()
+        self._active = {}  # 排队中和运行中的句柄（按提交顺序，值不使用）
+        self._recent = deque(maxlen=max(1, recent_handles))  # 最近结束的句柄
+        self._by_log = {}  # 日志路径 -> 最近提交的句柄（只包含上面两处保留的句柄）
+        self._submitted = 0
+        self._lock = threading.Lock()
+        self._loop = None
+        self._thread = None
+        self._started = threading.Event()
+
+    # ---- 线程安全的公共接口 ----
+    def start(self):
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run_loop, name='ProcessSupervisor', daemon=True)
+            self._thread.start()
+        self._started.wait()
+
+    def submit(self, cmd, log_path, on_output=None, ring=None):
+        """
+        提交命令，输出追加写入 log_path
+
+        Args:
+            cmd: 要执行的命令
+            log_path: 日志文件路径（以追加模式写入）
+            on_output: 输出数据块回调 on_output(bytes)（在监管器线程中调用）
+            ring: OutputRing，写入日志的内容同时追加到这个内存缓冲
+
+        Returns:
+            RunHandle
+        """
+        self.start()
+        handle = RunHandle(self, cmd, log_path, on_output, ring)
+        with self._lock:
+            self._active[handle] = None
+            self._by_log[log_path] = handle
+            self._submitted += 1
+        self._loop.call_soon_threadsafe(self._enqueue, handle)
+        return handle
+
+    def cancel(self, handle):
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._cancel, handle)
+
+    def call_later(self, delay, callback, *args):
+        """在监管器线程中延迟 delay 秒调用 callback(*args)"""
+        self.start()
+        self._loop.call_soon_threadsafe(self._loop.call_later, delay, callback, *args)
+
+    def run_coroutine(self, coro):
+        """在监管器的事件循环中执行协程，返回 concurrent.futures.Future"""
+        self.start()
+        return asyncio.run_coroutine_threadsafe(coro, self._loop)
+
+    def set_max_concurrent(self, value):
+        self.max_concurrent = max(1, int(value))
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._pump)
+
+    def handles(self):
+        """最近结束的句柄（按结束顺序）和未结束的句柄（按提交顺序）"""
+        with self._lock:
+            return list(self._recent) + list(self._active)
+
+    def active(self):
+        """排队中和运行中的句柄"""
+        with self._lock:
+            return list(self._active)
+
+    def find(self, log_path):
+        """按日志路径查找最近的句柄（未结束或最近结束的）"""
+        with self._lock:
+            return self._by_log.get(log_path)
+
+    def stats(self):
+        return {
+            'running': len(self._running),
+            'queued': len(self._queue),
+            'total': self._submitted,
+        }
+
+    def _retire(self, handle):
+        # 运行结束：从未结束的句柄移到最近结束的句柄，挤出的最早句柄不再保留
+        with self._lock:
+            if handle not in self._active:
+                return
+            del self._active[handle]
+            if len(self._recent) == self._recent.maxlen:
+                oldest = self._recent[0]
+                if self._by_log.get(oldest.log_path) is oldest:
+                    del self._by_log[oldest.log_path]
+            self._recent.append(handle)
+
+    # ---- 事件循环线程 ----
+    def _run_loop(self):
+        if sys.platform == 'win32':
+            loop = asyncio.ProactorEventLoop()
+        else:
+            loop = asyncio.new_event_loop()
+            _install_child_watcher()
+        asyncio.set_event_loop(loop)
+        self._loop = loop
+        self._started.set()
+        loop.run_forever()
+
+    def _enqueue(self, handle):
+        self._queue.append(handle)
+        self._pump()
+
+    def _pump(self):
+        while self._queue and len(self._running) < self.max_concurrent:
+            handle = self._queue.popleft()
+            if handle.done:
+                continue
+            self._running.add(handle)
+            self._loop.create_task(self._run(handle))
+
+    def _cancel(self, handle):
+        if handle.done:
+            return
+        handle._cancel_requested = True
+        if handle in self._queue:
+            self._queue.remove(handle)
+            self._write_marker(handle.log_path, "\n=== 已取消 ===\n", handle.ring)
+            self._retire(handle)
+            handle._finish(RunHandle.CANCELLED)
+            return
+        # 已出队：进程已启动则终止，正在启动则在启动后立即终止
+        if handle._process is not None:
+            self._loop.create_task(self._terminate_tree(handle._process))
+
+    @staticmethod
+    async def _terminate_tree(process):
+        """终止 shell 及其启动的整个进程树"""
+        try:
+            if sys.platform == 'win32':
+                killer = await asyncio.create_subprocess_exec(
+                    'taskkill', '/F', '/T', '/PID', str(process.pid),
+                    stdout=asyncio.subprocess.DEVNULL, stderr=asyncio.subprocess.DEVNULL)
+                await killer.wait()
+            else:
+                os.killpg(process.pid, signal.SIGTERM)
+        except (ProcessLookupError, PermissionError, OSError):
+            try:
+                process.terminate()
+            except ProcessLookupError:
+                pass
+
+    @staticmethod
+    def _write_marker(log_path, text, ring=None):
+        data = text.encode('utf-8')
+        try:
+            with open(log_path, 'ab') as f:
+                f.write(data)
+        except OSError as e:
+            print(f'写入日志失败: {log_path} 错误: {e}')
+            return
+        if ring is not None:
+            ring.append(data)
+
+    async def _run(self, handle):
+        status = RunHandle.EXITED
+        try:
+            os.makedirs(os.path.dirname(handle.log_path) or '.', exist_ok=True)
+            with open(handle.log_path, 'ab') as log_file:
+                writer = BufferedLogWriter(log_file, self.flush_bytes, self.flush_interval,
+                                           on_data=handle.on_output, ring=handle.ring)
+                start_time = time.strftime('%Y-%m-%d %H:%M:%S')
+                writer.write_text(f"=== 开始执行命令 [{start_time}]: {handle.cmd} ===\n")
+                try:
+                    # POSIX 下放入独立进程组，取消时可以终止整个进程树
+                    process = await asyncio.create_subprocess_shell(
+                        handle.cmd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.STDOUT,
+                        start_new_session=sys.platform != 'win32')
+                except Exception as e:
+                    handle.error = str(e)
+                    status = RunHandle.FAILED
+                    LAUNCH_FAILURES.inc(kind='cmd')
+                    writer.write_text(f"\n=== 执行出错: {e} ===\n")
+                    return
+                handle._process = process
+                handle.pid = process.pid
+                handle.start_time = time.time()
+                handle.status = RunHandle.RUNNING
+                CMD_SPAWN_SECONDS.observe(handle.start_time - handle.submit_time)
+                if handle._cancel_requested:
+                    self._loop.create_task(self._terminate_tree(process))
+                read = process.stdout.read
+                chunk_size = self.chunk_size
+                metrics = get_metrics()
+                # 标签用日志基础名而不是完整命令，取值与日志文件的分组一致，不随命令文本的细微差别增长
+                label = get_base_log_filename(handle.cmd)
+                while True:
+                    data = await read(chunk_size)
+                    if not data:
+                        break
+                    writer.write(data, drained=len(data) < chunk_size)
+                    handle.bytes_written = writer.bytes_written
+                    if metrics.enabled:
+                        LOG_BYTES.inc(len(data), cmd=label)
+                        LOG_LINES.inc(data.count(b'\n'), cmd=label)
+                writer.flush()
+                handle.exit_code = await process.wait()
+                end_time = time.strftime('%Y-%m-%d %H:%M:%S')
+                writer.write_text(f"\n=== 命令执行完成 [{end_time}] 退出代码: {handle.exit_code} ===\n")
+        except Exception as e:
+            handle.error = str(e)
+            status = RunHandle.FAILED
+            print(f'命令执行失败: {handle.cmd} 错误: {e}')
+            self._write_marker(handle.log_path, f"\n=== 执行出错: {e} ===\n", handle.ring)
+        finally:
+            handle._process = None
+            self._running.discard(handle)
+            self._retire(handle)
+            handle._finish(status)
+            self._pump()
+
+_supervisor = None
+_supervisor_lock = threading.Lock()
+
+def get_supervisor():
+    """获取全局共享的进程监管器"""
+    global _supervisor
+    with _supervisor_lock:
+        if _supervisor is None:
+            _supervisor = ProcessSupervisor()
+        return _supervisor
@@ -1,7 +1,32 @@
 import sys
 import os
 
+# 重启前需要执行的回调（如保存未写入的数据）
+_restart_hooks = []
+
+def register_restart_hook(callback):
+    """注册在重启程序前调用的回调"""
+    if callback not in _restart_hooks:
+        _restart_hooks.append(callback)
+
 def restart_program():
     """重启当前程序"""
+    for callback in list(_restart_hooks):
+        try:
+            callback()
+        except Exception as e:
+            print(f'重启前回调执行失败: {e}')
     python = sys.executable
     os.execl(python, python, *sys.argv)
+
+def set_console_utf8():
+    """Windows 控制台切换到 UTF-8 代码页（65001），直接调用系统接口，不再启动 chcp 子进程；其他平台无需设置"""
+    if sys.platform != 'win32':
+        return
+    try:
+        import ctypes
+        kernel32 = ctypes.windll.kernel32
+        kernel32.SetConsoleOutputCP(65001)
+        kernel32.SetConsoleCP(65001)
+    except (AttributeError, OSError) as e:
+        print(f'设置控制台编码失败: {e}')
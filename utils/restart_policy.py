@@ -0,0 +1,299 @@
+"""
+命令重启策略：
+为命令区域中需要长期运行的服务（开发服务器、后台脚本等）设置监管策略，进程退出后按策略自动重启。
+- never / on-failure / always 三种模式，被用户取消或停止的运行不会重启。
+- 重启前按指数退避等待，并加入随机抖动，避免多个服务同时重启。
+- 运行时间达到 min_uptime 视为正常运行过，退避重新计算。
+- 时间窗口内重启次数超过上限、或连续多次启动后很快退出（崩溃循环）时停止重启并通知。
+重启的延迟调度在进程监管器的事件循环中进行，不占用额外线程。
+"""
+
+import time
+import random
+import threading
+from collections import deque
+
+# 重启模式
+RESTART_NEVER = 'never'  # 不重启
+RESTART_ON_FAILURE = 'on-failure'  # 退出代码非0或启动失败时重启
+RESTART_ALWAYS = 'always'  # 只要退出就重启
+
+RESTART_MODES = (RESTART_NEVER, RESTART_ON_FAILURE, RESTART_ALWAYS)
+
+# 监管状态
+STATE_IDLE = 'idle'  # 未运行或策略为不重启
+STATE_RUNNING = 'running'  # 运行中
+STATE_BACKOFF = 'backoff'  # 等待重启
+STATE_STOPPED = 'stopped'  # 被用户停止
+STATE_LIMIT = 'limit'  # 时间窗口内重启次数超过上限，已停止重启
+STATE_CRASH_LOOP = 'crash_loop'  # 连续多次启动后很快退出，已停止重启
+
+# 事件类型（on_event 的参数中的 'type'）
+EVENT_SCHEDULED = 'scheduled'  # 已安排重启：delay、attempt
+EVENT_RESTARTED = 'restarted'  # 已重启：handle、previous（上一次运行）、total（累计重启次数）
+EVENT_RESTART_FAILED = 'restart_failed'  # 重启时出错：error
+EVENT_LIMIT = STATE_LIMIT  # 已停止重启：count、handle
+EVENT_CRASH_LOOP = STATE_CRASH_LOOP  # 已停止重启：count、handle
+
+class RestartPolicy:
+    """
+    单个命令的重启策略
+
+    Args:
+        mode: 重启模式 'never' / 'on-failure' / 'always'
+        backoff_initial: 第一次重启前等待的秒数
+        backoff_max: 重启前最长等待的秒数
+        backoff_factor: 每次连续重启等待时间的倍数
+        jitter: 随机抖动比例，0.2 表示在 ±20% 范围内浮动
+        max_restarts: window_seconds 内最多重启次数
+        window_seconds: 统计重启次数的时间窗口（秒）
+        min_uptime: 运行时间达到该秒数视为正常运行过，重置退避和崩溃计数
+        crash_loop_count: 连续多少次运行不足 min_uptime 就退出视为崩溃循环
+        new_log: 每次重启写入新的运行日志，否则追加到同一个日志
+    """
+    FIELDS = ('mode', 'backoff_initial', 'backoff_max', 'backoff_factor', 'jitter', 'max_restarts',
+              'window_seconds', 'min_uptime', 'crash_loop_count', 'new_log')
+
+    def __init__(self, mode=RESTART_NEVER, backoff_initial=1.0, backoff_max=60.0, backoff_factor=2.0,
+                 jitter=0.2, max_restarts=10, window_seconds=600, min_uptime=10.0, crash_loop_count=5,
+                 new_log=False):
+        if mode not in RESTART_MODES:
+            raise ValueError(f'未知的重启模式: {mode}')
+        self.mode = mode
+        self.backoff_initial = backoff_initial
+        self.backoff_max = backoff_max
+        self.backoff_factor = backoff_factor
+        self.jitter = jitter
+        self.max_restarts = max_restarts
+        self.window_seconds = window_seconds
+        self.min_uptime = min_uptime
+        self.crash_loop_count = crash_loop_count
+        self.new_log = new_log
+
+    @property
+    def enabled(self):
+        return self.mode != RESTART_NEVER
+
+    def should_restart(self, status, exit_code):
+        """按模式判断一次结束的运行是否需要重启（status 为 RunHandle 的状态）"""
+        if status == 'cancelled' or self.mode == RESTART_NEVER:
+            return False
+        if self.mode == RESTART_ALWAYS:
+            return True
+        return status == 'failed' or exit_code != 0
+
+    def backoff(self, attempt, rand=random.random):
+        """第 attempt 次（从0开始）连续重启前等待的秒数"""
+        delay = min(self.backoff_max, self.backoff_initial * self.backoff_factor ** attempt)
+        return max(0.0, delay * (1 + self.jitter * (2 * rand() - 1)))
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self.FIELDS}
+
+    @classmethod
+    def from_dict(cls, config):
+        """从保存的配置创建，忽略未知字段，无效时返回默认策略"""
+        try:
+            return cls(**{k: v for k, v in (config or {}).items() if k in cls.FIELDS})
+        except (TypeError, ValueError) as e:
+            print(f'读取重启策略失败: {config} 错误: {e}')
+            return cls()
+
+class _Service:
+    """一个命令的监管状态"""
+    def __init__(self, cmd):
+        self.cmd = cmd
+        self.state = STATE_IDLE
+        self.handle = None  # 最近一次运行
+        self.generation = 0  # 手动启动/停止时递增，使已安排的重启失效
+        self.attempt = 0  # 连续重启次数，用于计算退避
+        self.quick_exits = 0  # 连续运行不足 min_uptime 就退出的次数
+        self.restart_times = deque()  # 时间窗口内的重启时间
+        self.total_restarts = 0
+        self.next_restart_at = None
+
+    def info(self):
+        return {
+            'cmd': self.cmd,
+            'state': self.state,
+            'attempt': self.attempt,
+            'total_restarts': self.total_restarts,
+            'next_restart_at': self.next_restart_at,
+        }
+
+def _schedule_on_supervisor(delay, callback, *args):
+    from utils.process_supervisor import get_supervisor
+    get_supervisor().call_later(delay, callback, *args)
+
+class RestartSupervisor:
+    """
+    按重启策略监管命令的运行
+
+    Args:
+        start_fn: 重启命令的函数 start_fn(cmd, log_path)，log_path 为 None 时写入新日志，返回 RunHandle
+        policies: 命令 -> RestartPolicy 的字典（共享引用，修改后立即生效）
+        on_event: 事件回调 on_event(dict)，包含 'type'、'cmd' 及事件相关字段（在监管器线程中调用）
+        schedule: 延迟调用函数 schedule(delay, callback, *args)，默认使用进程监管器的事件循环
+        clock: 时间函数，便于测试
+        rand: 随机数函数，便于测试
+    """
+    def __init__(self, start_fn, policies=None, on_event=None, schedule=_schedule_on_supervisor,
+                 clock=time.monotonic, rand=random.random):
+        self.start_fn = start_fn
+        self.policies = policies if policies is not None else {}
+        self.on_event = on_event
+        self.schedule = schedule
+        self.clock = clock
+        self.rand = rand
+        self._services = {}
+        self._lock = threading.Lock()
+
+    def policy_for(self, cmd):
+        return self.policies.get(cmd) or RestartPolicy()
+
+    def _service(self, cmd):
+        service = self._services.get(cmd)
+        if service is None:
+            service = self._services[cmd] = _Service(cmd)
+        return service
+
+    def watch(self, cmd, handle):
+        """
+        开始监管一次手动启动的运行：取消已安排的重启，重新计算重启次数
+
+        Args:
+            cmd: 命令
+            handle: RunHandle
+        """
+        with self._lock:
+            service = self._service(cmd)
+            service.generation += 1
+            service.attempt = 0
+            service.quick_exits = 0
+            service.restart_times.clear()
+            service.next_restart_at = None
+            generation = self._attach(service, handle)
+        self._add_callback(service, handle, generation)
+
+    @staticmethod
+    def _attach(service, handle):
+        service.handle = handle
+        service.state = STATE_RUNNING
+        return service.generation
+
+    def _add_callback(self, service, handle, generation):
+        # 不能在持有锁时添加：已结束的句柄会立即调用回调
+        handle.add_done_callback(lambda h: self._on_done(service, h, generation))
+
+    def stop(self, cmd):
+        """停止监管：取消已安排的重启并终止正在运行的进程"""
+        with self._lock:
+            service = self._services.get(cmd)
+            if service is None:
+                return
+            service.generation += 1
+            service.state = STATE_STOPPED
+            service.next_restart_at = None
+            handle = service.handle
+        if handle is not None and not handle.done:
+            handle.cancel()
+
+    def forget(self, cmd):
+        """命令被删除或改名时调用：取消已安排的重启并丢弃监管状态，正在运行的进程不终止"""
+        with self._lock:
+            service = self._services.pop(cmd, None)
+            if service is not None:
+                service.generation += 1
+                service.state = STATE_IDLE
+                service.next_restart_at = None
+
+    def state(self, cmd):
+        """命令的监管状态（dict），没有监管过时返回 None"""
+        with self._lock:
+            service = self._services.get(cmd)
+            return service.info() if service else None
+
+    def states(self):
+        with self._lock:
+            return {cmd: service.info() for cmd, service in self._services.items()}
+
+    def _emit(self, event_type, service, **fields):
+        if self.on_event is None:
+            return
+        try:
+            self.on_event(dict(fields, type=event_type, cmd=service.cmd))
+        except Exception as e:
+            print(f'重启事件回调出错: {e}')
+
+    # 运行结束（在监管器线程中调用）
+    def _on_done(self, service, handle, generation):
+        policy = self.policy_for(service.cmd)
+        with self._lock:
+            if generation != service.generation or handle is not service.handle:
+                return  # 之后又被手动启动或停止过
+            if not policy.should_restart(handle.status, handle.exit_code) or handle.cancelled:
+                service.state = STATE_IDLE
+                return
+            now = self.clock()
+            # 正常运行过一段时间，退避和崩溃计数重新开始
+            uptime = handle.duration or 0
+            if uptime >= policy.min_uptime:
+                service.attempt = 0
+                service.quick_exits = 0
+            else:
+                service.quick_exits += 1
+            while service.restart_times and now - service.restart_times[0] > policy.window_seconds:
+                service.restart_times.popleft()
+            if service.quick_exits >= policy.crash_loop_count:
+                service.state = STATE_CRASH_LOOP
+                event = (EVENT_CRASH_LOOP, {'count': service.quick_exits, 'exit_code': handle.exit_code,
+                                            'handle': handle})
+            elif len(service.restart_times) >= policy.max_restarts:
+                service.state = STATE_LIMIT
+                event = (EVENT_LIMIT, {'count': len(service.restart_times), 'exit_code': handle.exit_code,
+                                       'handle': handle})
+            else:
+                delay = policy.backoff(service.attempt, self.rand)
+                service.attempt += 1
+                service.state = STATE_BACKOFF
+                service.next_restart_at = time.time() + delay
+                event = (EVENT_SCHEDULED, {'delay': delay, 'attempt': service.attempt,
+                                           'exit_code': handle.exit_code, 'handle': handle})
+        event_type, fields = event
+        self._emit(event_type, service, **fields)
+        if event_type == EVENT_SCHEDULED:
+            self.schedule(fields['delay'], self._restart, service, generation)
+
+    def _restart(self, service, generation):
+        policy = self.policy_for(service.cmd)
+        with self._lock:
+            if generation != service.generation or service.state != STATE_BACKOFF:
+                return
+            if not policy.enabled:
+                service.state = STATE_IDLE  # 等待期间策略被关闭或命令被删除
+                return
+            service.restart_times.append(self.clock())
+            service.total_restarts += 1
+            service.next_restart_at = None
+            previous = service.handle
+        log_path = None if policy.new_log or previous is None else previous.log_path
+        try:
+            handle = self.start_fn(service.cmd, log_path)
+        except Exception as e:
+            with self._lock:
+                service.state = STATE_IDLE
+            self._emit(EVENT_RESTART_FAILED, service, error=str(e))
+            return
+        with self._lock:
+            stale = generation != service.generation
+            stopped = service.state == STATE_STOPPED
+            if not stale:
+                self._attach(service, handle)
+        if stale:
+            # 重启的同时被手动启动或停止，新的运行不再监管，停止时一并终止
+            if stopped:
+                handle.cancel()
+            return
+        self._emit(EVENT_RESTARTED, service, handle=handle, previous=previous, attempt=service.attempt,
+                   total=service.total_restarts)
+        self._add_callback(service, handle, generation)
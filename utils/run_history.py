@@ -0,0 +1,260 @@
+"""
+命令运行历史：
+每次运行的命令、起止时间、耗时、退出代码、pid、日志路径和输出字节数记录在 data/run_history.db（SQLite）中，
+按命令和开始时间建立索引，可以直接查询“本周失败的命令”“某个脚本的平均耗时”等，不必再翻日志文件。
+写入在后台线程中批量提交，调用方只把记录放进队列。
+"""
+
+import os
+import time
+import sqlite3
+import threading
+
+SCHEMA_VERSION = 1
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    cmd TEXT NOT NULL,
+    start_time REAL NOT NULL,
+    end_time REAL,
+    duration REAL,
+    exit_code INTEGER,
+    status TEXT NOT NULL,
+    pid INTEGER,
+    log_path TEXT,
+    bytes_written INTEGER,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_runs_cmd_start ON runs (cmd, start_time);
+CREATE INDEX IF NOT EXISTS idx_runs_start ON runs (start_time);
+"""
+
+COLUMNS = ('cmd', 'start_time', 'end_time', 'duration', 'exit_code', 'status',
+           'pid', 'log_path', 'bytes_written', 'error')
+
+# 运行结果
+STATUS_SUCCESS = 'success'  # 退出代码为0
+STATUS_FAILED = 'failed'  # 退出代码非0或启动失败
+STATUS_CANCELLED = 'cancelled'  # 被取消
+STATUS_RUNNING = 'running'  # 界面上的运行中状态，不写入历史
+STATUS_BACKOFF = 'backoff'  # 界面上的等待自动重启状态，不写入历史
+
+STATUS_TEXT = {
+    STATUS_SUCCESS: '成功',
+    STATUS_FAILED: '失败',
+    STATUS_CANCELLED: '已取消',
+    STATUS_RUNNING: '运行中',
+    STATUS_BACKOFF: '等待重启',
+}
+
+def format_duration(seconds):
+    if seconds is None:
+        return '-'
+    if seconds < 60:
+        return f'{seconds:.1f}s'
+    if seconds < 3600:
+        return f'{int(seconds // 60)}m{int(seconds % 60):02d}s'
+    return f'{int(seconds // 3600)}h{int(seconds % 3600 // 60):02d}m'
+
+def format_status(run):
+    """命令列表右侧显示的最近状态，如 "失败(1) 3.2s 10-18 19:05"，自动重启的命令附带说明 """
+    status = run.get('status')
+    text = STATUS_TEXT.get(status, status or '')
+    if status == STATUS_FAILED and run.get('exit_code') is not None:
+        text += f"({run['exit_code']})"
+    if status == STATUS_BACKOFF:
+        if run.get('restart_at'):
+            text += time.strftime(' %H:%M:%S', time.localtime(run['restart_at']))
+    elif status != STATUS_RUNNING:
+        text += f" {format_duration(run.get('duration'))}"
+    if run.get('start_time'):
+        text += time.strftime(' %m-%d %H:%M', time.localtime(run['start_time']))
+    if run.get('note'):
+        text += f" [{run['note']}]"
+    return text
+
+def run_from_handle(handle):
+    """把进程监管器的 RunHandle 转为历史记录"""
+    if handle.cancelled or handle.status == 'cancelled':
+        status = STATUS_CANCELLED
+    elif handle.status == 'exited' and handle.exit_code == 0:
+        status = STATUS_SUCCESS
+    else:
+        status = STATUS_FAILED
+    start_time = handle.start_time or handle.submit_time
+    end_time = handle.end_time or time.time()
+    return {
+        'cmd': handle.cmd,
+        'start_time': start_time,
+        'end_time': end_time,
+        'duration': end_time - start_time if handle.start_time else None,
+        'exit_code': handle.exit_code,
+        'status': status,
+        'pid': handle.pid,
+        'log_path': handle.log_path,
+        'bytes_written': handle.bytes_written,
+        'error': handle.error,
+    }
+
+class RunHistory:
+    """
+    SQLite 运行历史
+
+    Args:
+        db_path: 数据库文件路径
+    """
+    QUERY_BATCH = 500  # 按命令批量查询时每条语句的最大命令数
+    def __init__(self, db_path='data/run_history.db'):
+        self.db_path = db_path
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self._cond = threading.Condition()
+        self._pending = []
+        self._writing = False
+        self._closed = False
+        self.write_count = 0  # 已提交的记录数
+        self.batch_count = 0
+        self.last_error = None
+        self._init_db()
+        # 查询使用单独的连接，WAL 模式下读取不会被后台写入阻塞
+        self._read_lock = threading.Lock()
+        self._reader = sqlite3.connect(db_path, check_same_thread=False)
+        self._reader.row_factory = sqlite3.Row
+        self._thread = threading.Thread(target=self._run, name='RunHistory', daemon=True)
+        self._thread.start()
+
+    def _init_db(self):
+        conn = sqlite3.connect(self.db_path)
+        try:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.executescript(SCHEMA)
+            conn.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+            conn.commit()
+        finally:
+            conn.close()
+
+    # ---- 写入 ----
+    def record(self, run):
+        """提交一条运行记录（dict，键见 COLUMNS），立即返回"""
+        with self._cond:
+            if self._closed:
+                return
+            self._pending.append(tuple(run.get(column) for column in COLUMNS))
+            self._cond.notify()
+
+    def record_handle(self, handle):
+        """记录一次已结束的监管器运行，可直接用作 RunHandle.add_done_callback 的回调"""
+        self.record(run_from_handle(handle))
+
+    def flush(self, timeout=2.0):
+        """等待已提交的记录全部写入"""
+        with self._cond:
+            return self._cond.wait_for(lambda: not self._pending and not self._writing, timeout)
+
+    def close(self, timeout=2.0):
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        self._thread.join(timeout)
+        with self._read_lock:
+            self._reader.close()
+
+    def _run(self):
+        conn = sqlite3.connect(self.db_path)
+        placeholders = ', '.join('?' * len(COLUMNS))
+        sql = f'INSERT INTO runs ({", ".join(COLUMNS)}) VALUES ({placeholders})'
+        try:
+            while True:
+                with self._cond:
+                    self._cond.wait_for(lambda: self._pending or self._closed)
+                    batch = self._pending
+                    self._pending = []
+                    if not batch and self._closed:
+                        return
+                    self._writing = True
+                try:
+                    # 一批记录在一个事务中提交
+                    with conn:
+                        conn.executemany(sql, batch)
+                    self.write_count += len(batch)
+                    self.batch_count += 1
+                    self.last_error = None
+                except sqlite3.Error as e:
+                    self.last_error = e
+                    print(f'写入运行历史失败: {self.db_path} 错误: {e}')
+                finally:
+                    with self._cond:
+                        self._writing = False
+                        self._cond.notify_all()
+        finally:
+            conn.close()
+
+    # ---- 查询 ----
+    def _query(self, sql, params=()):
+        with self._read_lock:
+            return [dict(row) for row in self._reader.execute(sql, params)]
+
+    def history(self, cmd, limit=200):
+        """某个命令最近的运行记录，最新的在前"""
+        return self._query('SELECT * FROM runs WHERE cmd = ? ORDER BY start_time DESC LIMIT ?', (cmd, limit))
+
+    def last_runs(self, cmds):
+        """
+        每个命令最近一次运行
+
+        Returns:
+            dict: 命令 -> 运行记录，没有运行过的命令不在结果中
+        """
+        cmds = list(set(cmds))
+        result = {}
+        # 一次查询取出所有命令的最近一次运行（分批是为了不超过 SQLite 的参数个数上限）
+        for i in range(0, len(cmds), self.QUERY_BATCH):
+            batch = cmds[i:i + self.QUERY_BATCH]
+            rows = self._query(
+                'SELECT * FROM (SELECT *, ROW_NUMBER() OVER '
+                '(PARTITION BY cmd ORDER BY start_time DESC, id DESC) AS rank '
+                f'FROM runs WHERE cmd IN ({", ".join("?" * len(batch))})) WHERE rank = 1', batch)
+            for row in rows:
+                del row['rank']
+                result[row['cmd']] = row
+        return result
+
+    def summary(self, cmd):
+        """某个命令的运行统计：次数、失败次数、平均/最长耗时、最近运行时间"""
+        rows = self._query(
+            'SELECT COUNT(*) AS count, '
+            f"SUM(status = '{STATUS_FAILED}') AS failures, "
+            'AVG(duration) AS avg_duration, MAX(duration) AS max_duration, '
+            'MAX(start_time) AS last_start '
+            'FROM runs WHERE cmd = ?', (cmd,))
+        summary = rows[0]
+        summary['failures'] = summary['failures'] or 0
+        return summary
+
+    def usage(self):
+        """
+        每个命令的运行次数和最近一次运行时间（启动面板按使用频率排序）
+
+        Returns:
+            dict: 命令 -> (次数, 最近运行的开始时间)
+        """
+        rows = self._query('SELECT cmd, COUNT(*) AS count, MAX(start_time) AS last_start FROM runs GROUP BY cmd')
+        return {row['cmd']: (row['count'], row['last_start']) for row in rows}
+
+    def failures(self, since, until=None):
+        """某段时间内失败的运行，最新的在前"""
+        until = time.time() if until is None else until
+        return self._query(
+            'SELECT * FROM runs WHERE start_time BETWEEN ? AND ? AND status = ? ORDER BY start_time DESC',
+            (since, until, STATUS_FAILED))
+
+_history = None
+_history_lock = threading.Lock()
+
+def get_run_history():
+    """获取全局共享的运行历史"""
+    global _history
+    with _history_lock:
+        if _history is None:
+            _history = RunHistory()
+        return _history
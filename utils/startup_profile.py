@@ -0,0 +1,71 @@
+"""
+启动耗时分析：
+python main.py --profile-startup 时按阶段（导入、创建 QApplication、构建界面、加载数据、首次绘制等）
+记录耗时，窗口首次绘制并完成延迟加载后打印分解表。未开启时 mark 只是空操作。
+"""
+
+import sys
+import time
+
+PROFILE_FLAG = '--profile-startup'
+
+def _display_width(text):
+    """终端显示宽度，中文字符占两列"""
+    return sum(2 if ord(ch) > 0x2E80 else 1 for ch in text)
+
+class StartupProfiler:
+    """
+    按阶段记录启动耗时
+
+    Args:
+        enabled: 是否记录
+        clock: 计时函数
+        start: 开始计时的时间（clock 的返回值），None 表示从创建时开始
+    """
+    def __init__(self, enabled=False, clock=time.perf_counter, start=None):
+        self.enabled = enabled
+        self.clock = clock
+        self.start = clock() if start is None else start
+        self.marks = []  # [(阶段, 时间)]
+        self.reported = False
+
+    @classmethod
+    def from_argv(cls, argv=None, start=None):
+        """命令行带 --profile-startup 时开启，并从参数中移除该选项"""
+        argv = sys.argv if argv is None else argv
+        enabled = PROFILE_FLAG in argv
+        while PROFILE_FLAG in argv:
+            argv.remove(PROFILE_FLAG)
+        return cls(enabled, start=start)
+
+    def mark(self, phase):
+        """记录一个阶段结束（从上一个阶段结束算起）"""
+        if self.enabled:
+            self.marks.append((phase, self.clock()))
+
+    def phases(self):
+        """
+        Returns:
+            list: [(阶段, 本阶段耗时秒数, 累计秒数)]
+        """
+        result = []
+        previous = self.start
+        for phase, at in self.marks:
+            result.append((phase, at - previous, at - self.start))
+            previous = at
+        return result
+
+    def format_report(self):
+        width = max((_display_width(phase) for phase, _ in self.marks), default=0)
+        lines = ['启动耗时分析:']
+        for phase, duration, total in self.phases():
+            pad = ' ' * (width - _display_width(phase))
+            lines.append(f'  {phase}{pad}  {duration * 1000:8.1f} ms   累计 {total * 1000:8.1f} ms')
+        return '\n'.join(lines)
+
+    def report(self, stream=None):
+        """打印分解表（只打印一次）"""
+        if not self.enabled or self.reported:
+            return
+        self.reported = True
+        print(self.format_report(), file=stream or sys.stdout, flush=True)
@@ -1,18 +1,33 @@
 import subprocess
 import time
 import os
-import threading
 from utils.log_filename import generate_log_filename
+from utils.log_index import get_log_index
+from utils.output_ring import get_output_rings
+from utils.run_history import get_run_history, STATUS_SUCCESS, STATUS_FAILED
+from utils.output_pipeline import (BufferedLogWriter, pump_pipe, DEFAULT_CHUNK_SIZE,
+                                   DEFAULT_FLUSH_BYTES, DEFAULT_FLUSH_INTERVAL)
 
-def run_cmd_with_log(cmd, log_dir='data/log', append_mode=False, existing_log_filename=None):
+def run_cmd_with_log(cmd, log_dir='data/log', append_mode=False, existing_log_filename=None,
+                     echo=True, on_output=None, chunk_size=DEFAULT_CHUNK_SIZE,
+                     flush_bytes=DEFAULT_FLUSH_BYTES, flush_interval=DEFAULT_FLUSH_INTERVAL, history=None):
     """
     运行命令并将输出写入日志文件
+
+    子进程输出以二进制大块读取，经有界缓冲按字节数/时间阈值（或管道读空时）批量落盘，
+    不再逐行解码、打印和 flush。
     
     Args:
         cmd: 要执行的命令
         log_dir: 日志目录
         append_mode: 是否以追加模式打开日志文件
         existing_log_filename: 已存在的日志文件名（用于追加模式）
+        echo: 是否同时把输出原样回显到控制台
+        on_output: 输出数据块回调 on_output(bytes)，需要按行处理时配合 LineFramer 使用
+        chunk_size: 单次读取管道的最大字节数
+        flush_bytes: 日志缓冲字节上限
+        flush_interval: 日志缓冲最长停留时间（秒）
+        history: 记录运行的 RunHistory，None 时使用全局共享的运行历史（data/run_history.db）
         
     Returns:
         str: 日志文件路径或None(如果执行失败)
@@ -27,31 +42,36 @@ def run_cmd_with_log(cmd, log_dir='data/log', append_mode=False, existing_log_fi
         print(f'[run_cmd_with_log] 日志路径: {log_filename}')
     
     try:
-        # 根据模式打开文件
-        file_mode = 'a' if append_mode else 'w'
-        with open(log_filename, file_mode, encoding='utf-8') as log_file:
-            # 写入开始执行的标记（如果不是追加模式，或者是追加模式但没有指定要跳过）
+        # 根据模式打开文件（二进制，子进程输出原样写入）
+        file_mode = 'ab' if append_mode else 'wb'
+        with open(log_filename, file_mode) as log_file:
+            writer = BufferedLogWriter(log_file, flush_bytes, flush_interval, echo=echo, on_data=on_output)
+            # 写入开始执行的标记
             start_time = time.strftime('%Y-%m-%d %H:%M:%S')
-            log_file.write(f"=== 开始执行命令 [{start_time}]: {cmd} ===\n")
-            log_file.flush()
+            writer.write_text(f"=== 开始执行命令 [{start_time}]: {cmd} ===\n")
+            # 登记到日志索引（重复登记会被忽略）
+            get_log_index(log_dir).add(log_filename)
             
-            process = subprocess.Popen(cmd, shell=True, stdout=subprocess.PIPE, 
-                                      stderr=subprocess.STDOUT, encoding='utf-8', errors='replace')
+            started_at = time.time()
+            process = subprocess.Popen(cmd, shell=True, stdout=subprocess.PIPE,
+                                       stderr=subprocess.STDOUT, bufsize=0)
             
             if process.stdout is not None:
-                for line in process.stdout:
-                    decoded = line.rstrip()
-                    print(decoded)
-                    log_file.write(decoded + '\n')
-                    log_file.flush()  # 确保实时写入文件
+                pump_pipe(process.stdout, writer, chunk_size)
+                process.stdout.close()
                     
             exit_code = process.wait()
             
             # 写入结束执行的标记
             end_time = time.strftime('%Y-%m-%d %H:%M:%S')
-            log_file.write(f"\n=== 命令执行完成 [{end_time}] 退出代码: {exit_code} ===\n")
-            log_file.flush()
+            writer.write_text(f"\n=== 命令执行完成 [{end_time}] 退出代码: {exit_code} ===\n")
             
+        ended_at = time.time()
+        (history or get_run_history()).record({
+            'cmd': cmd, 'start_time': started_at, 'end_time': ended_at, 'duration': ended_at - started_at,
+            'exit_code': exit_code, 'status': STATUS_SUCCESS if exit_code == 0 else STATUS_FAILED,
+            'pid': process.pid, 'log_path': log_filename, 'bytes_written': writer.bytes_written,
+        })
         print(f'命令执行完成，日志文件: {log_filename}')
         return log_filename
     except Exception as e:
@@ -64,40 +84,64 @@ def run_cmd_with_log(cmd, log_dir='data/log', append_mode=False, existing_log_fi
             pass
         return None
 
-def run_cmd_async_with_log(cmd, log_dir='data/log'):
+def start_cmd_with_log(cmd, log_dir='data/log', on_output=None, existing_log_filename=None, history=None):
     """
-    异步运行命令并将输出写入日志文件
+    交给进程监管器异步运行命令并将输出写入日志文件
     
     Args:
         cmd: 要执行的命令
         log_dir: 日志目录
+        on_output: 输出数据块回调 on_output(bytes)（在监管器线程中调用）
+        existing_log_filename: 已存在的日志文件名，给出时追加写入（用于自动重启）
+        history: 记录运行的 RunHistory，None 时使用全局共享的运行历史
         
     Returns:
-        str: 日志文件路径
+        RunHandle: 运行句柄，可查询 pid、状态和退出代码
     """
-    # 创建日志文件
+    # 创建日志文件，或追加到已有日志
     os.makedirs(log_dir, exist_ok=True)
-    log_filename = os.path.join(log_dir, generate_log_filename(cmd))
+    if existing_log_filename:
+        log_filename = existing_log_filename
+        file_mode, header = 'ab', '\n=== 准备重新执行命令'
+    else:
+        log_filename = os.path.join(log_dir, generate_log_filename(cmd))
+        file_mode, header = 'wb', '=== 准备执行命令'
     
-    # 先写入准备执行信息
-    with open(log_filename, 'w', encoding='utf-8') as log_file:
+    # 先写入准备执行信息（二进制写入，与内存缓冲中的字节和偏移量一致）
+    with open(log_filename, file_mode) as log_file:
         start_time = time.strftime('%Y-%m-%d %H:%M:%S')
-        log_file.write(f"=== 准备执行命令 [{start_time}]: {cmd} ===\n")
-        log_file.write("正在启动...\n\n")
+        data = f"{header} [{start_time}]: {cmd} ===\n正在启动...\n\n".encode('utf-8')
+        base = log_file.tell()
+        log_file.write(data)
         log_file.flush()
+    # 运行期间最近的输出同时保留在内存中，日志查看器直接订阅，不必从文件读回
+    rings = get_output_rings()
+    ring = rings.open(log_filename, base)
+    ring.append(data)
+    # 登记到日志索引，之后查找最新日志无需扫描目录
+    get_log_index(log_dir).add(log_filename)
     
-    # 创建线程运行命令
-    def run_in_thread():
-        # 在线程中以追加模式调用同步方法
-        run_cmd_with_log(cmd, log_dir, append_mode=True, existing_log_filename=log_filename)
-        
-    # 创建并开启线程
-    thread = threading.Thread(target=run_in_thread)
-    thread.daemon = True
-    thread.start()
+    # 由监管器在其事件循环中启动，超过并发上限时排队（监管器依赖 asyncio，用到时才导入）
+    from utils.process_supervisor import get_supervisor
+    handle = get_supervisor().submit(cmd, log_filename, on_output=on_output, ring=ring)
+    # 结束后释放内存缓冲，写入运行历史
+    handle.add_done_callback(lambda _: rings.release(ring))
+    handle.add_done_callback((history or get_run_history()).record_handle)
+    return handle
+
+def run_cmd_async_with_log(cmd, log_dir='data/log'):
+    """
+    异步运行命令并将输出写入日志文件
     
+    Args:
+        cmd: 要执行的命令
+        log_dir: 日志目录
+        
+    Returns:
+        str: 日志文件路径
+    """
     # 立即返回日志文件名
-    return log_filename
+    return start_cmd_with_log(cmd, log_dir).log_path
 
 if __name__ == '__main__':
     # 你可以修改下面的命令进行测试